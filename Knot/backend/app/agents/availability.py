@@ -9,31 +9,78 @@ verifying recommendation URLs and confirming prices from product pages.
    user can actually buy); an in-app idea is used only as a last resort — the best
    spare idea, or, failing that, the original converted to a linkless idea card. We
    never show a web-search link, and the count never falls below 3 (PRD F2).
-3. Fetches page content for verified candidates and extracts real prices via Claude.
+   With AVAILABILITY_SPECULATIVE_SWAPS, backups start resolving the moment a
+   slot fails, concurrently with each other and with the remaining page fetches.
+   Once the pipeline's latency budget is nearly spent, failing slots go
+   straight to the idea fallback instead. A card left unresolved because Brave
+   was rate limiting (url_throttled_ids) is kept as a linkless idea card rather
+   than swapped, and swaps stop once Brave throttles a backup lookup: more
+   searches would only hit the same limit.
+3. Fetches page content for verified candidates and extracts real prices, from
+   the page's structured data when it states one, otherwise via Claude (skipped
+   if the latency budget can't cover the call).
 4. Updates price_cents and price_confidence based on verification results.
 
 Verification strategy:
 - Fetches each URL via GET (also serves as availability check).
-- Extracts visible text and JSON-LD structured data from the HTML response.
-- Sends all page excerpts to Claude in a single batched call for price extraction.
+- Extracts visible text and JSON-LD structured data from the HTML response
+  while it streams in, stopping once the prompt's budget is filled (or at
+  MAX_PAGE_BYTES) instead of downloading and parsing the whole page.
+- Reads prices from schema.org JSON-LD, microdata and OpenGraph fields
+  locally (app.services.price_extraction); only pages it can't resolve are
+  sent to Claude, in a single batched call.
 - Falls back gracefully if page fetch or Claude extraction fails.
+- Reuses recent results per URL (app.services.page_cache): fresh pages and
+  their prices are served from memory, stale ones are revalidated with a
+  conditional GET, dead ones are remembered briefly.
 
 Step 5.7: Create Availability Verification Node
 Step 14.1: Add Price Verification via Page Scraping
 """
 
 import asyncio
+import codecs
 import json
 import logging
 import re
+import time
+from html.parser import HTMLParser
 from typing import Any
 
 import httpx
-from bs4 import BeautifulSoup
 
+from app.agents.budget import (
+    BRAVE_THROTTLED,
+    IDEAS_INSTEAD_OF_SWAPS,
+    PRICE_VERIFICATION_MIN_SECONDS,
+    SKIPPED_PRICE_VERIFICATION,
+    SWAP_MIN_SECONDS,
+    collect_degradations,
+    has_budget,
+    note_degradation,
+    remaining,
+)
+from app.agents.progress import CARD_VERIFIED, emit_progress
 from app.agents.state import CandidateRecommendation, RecommendationState
 from app.agents.url_resolution import _localize_search_query, _search_for_purchase_url
+from app.core.config import AVAILABILITY_SPECULATIVE_SWAPS
+from app.core.http_clients import upstream_client
+from app.core.pipeline_metrics import IDEA_FALLBACK, SWAP, count_event
+from app.services.brave_limiter import BraveThrottled
+from app.services.claude_client import get_claude_client
 from app.services.llm_tuning import fast_generation_params
+from app.services.page_cache import (
+    cache_page,
+    cache_price,
+    conditional_headers,
+    get_cached_page,
+    get_cached_price,
+    is_cacheable_failure,
+    mark_revalidated,
+    page_cache_version,
+    record_page_cache_event,
+)
+from app.services.price_extraction import extract_price
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +89,21 @@ REQUEST_TIMEOUT = 10.0  # seconds per page fetch (increased from 5s for full GET
 MAX_REPLACEMENT_ATTEMPTS = 3  # max times to try replacing a single slot
 VALID_STATUS_RANGE = range(200, 400)  # 2xx and 3xx are considered available
 MAX_PAGE_CONTENT_CHARS = 8000  # limit page text sent to Claude per candidate
+MAX_PAGE_BYTES = 1024 * 1024  # stop downloading a page after this many bytes
+MAX_BODY_TEXT_CHARS = 4000  # visible page text kept per candidate
+MAX_JSONLD_BLOCKS = 3  # JSON-LD blocks kept per candidate
+MAX_PRICE_META_ENTRIES = 8  # OpenGraph / microdata price fields kept per candidate
+
+# HTML extraction internals
+_JSONLD_TYPE = "application/ld+json"
+_FEED_CHUNK_CHARS = 16 * 1024  # parser input granularity (early-exit checks)
+_MAX_SCRIPT_TAG_CHARS = 512  # longest <script ...> opening tag scanned for
+# <meta property=...> and itemprop=... fields that carry a price
+_PRICE_META_PROPERTIES = frozenset({
+    "product:price:amount", "product:price:currency",
+    "og:price:amount", "og:price:currency",
+})
+_PRICE_ITEMPROPS = frozenset({"price", "pricecurrency", "lowprice", "highprice"})
 
 # Claude model for price extraction
 CLAUDE_PRICE_MODEL = "claude-sonnet-4-6"
@@ -58,60 +120,255 @@ USER_AGENT = (
 # HTML text extraction
 # ======================================================================
 
+class _PageTextExtractor(HTMLParser):
+    """
+    Incremental extractor behind _extract_text_from_html and _fetch_page.
+
+    Fed the page in pieces as it downloads, it keeps only what the price
+    prompt uses: the title, meta description, OpenGraph and microdata price
+    fields, the first MAX_JSONLD_BLOCKS JSON-LD blocks and the first
+    MAX_BODY_TEXT_CHARS of visible text, skipping script and style bodies. Once the text budget is full the rest
+    of the page is no longer parsed, only scanned for JSON-LD blocks (some
+    merchants emit them at the end of <body>), and `done` is set once
+    nothing more can be collected.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.meta_description = ""
+        self.price_meta: dict[str, str] = {}
+        self.jsonld: list[str] = []
+        self.text_full = False
+        self._title: list[str] = []
+        self._in_title = False
+        self._title_seen = False
+        self._skipping: str | None = None  # script/style whose body is dropped
+        self._jsonld_parts: list[str] | None = None  # JSON-LD block being read
+        self._price_itemprop: str | None = None  # itemprop awaiting its text
+        self._text: list[str] = []
+        self._text_chars = 0
+        self._scanning = False  # text budget full: scanning, not parsing
+        self._tail = ""  # unscanned input while scanning
+
+    @property
+    def done(self) -> bool:
+        return self.text_full and len(self.jsonld) >= MAX_JSONLD_BLOCKS
+
+    # --- Input ---
+
+    def feed(self, data: str) -> None:
+        for start in range(0, len(data), _FEED_CHUNK_CHARS):
+            if self.done:
+                return
+            piece = data[start:start + _FEED_CHUNK_CHARS]
+            if self._scanning or self._stop_parsing():
+                self._scan_jsonld(piece)
+            else:
+                super().feed(piece)
+
+    def close(self) -> None:
+        if not (self._scanning or self._stop_parsing()):
+            super().close()
+
+    def _stop_parsing(self) -> bool:
+        """Hand over to _scan_jsonld once the text budget is full."""
+        if not self.text_full or self._jsonld_parts is not None or self._skipping:
+            return False
+        self._scanning = True
+        self._tail, self.rawdata = self.rawdata, ""
+        self._scan_jsonld("")
+        return True
+
+    def _scan_jsonld(self, data: str) -> None:
+        """Collect JSON-LD blocks from unparsed input with substring search."""
+        self._tail += data
+        lower = self._tail.lower()
+        pos = 0
+        while len(self.jsonld) < MAX_JSONLD_BLOCKS:
+            marker = lower.find(_JSONLD_TYPE, pos)
+            if marker == -1:
+                # Keep enough for a <script ...> tag split across chunks
+                pos = max(pos, len(lower) - _MAX_SCRIPT_TAG_CHARS)
+                break
+            open_at = lower.rfind("<script", pos, marker)
+            if open_at == -1 or lower.find(">", open_at, marker) != -1:
+                pos = marker + len(_JSONLD_TYPE)  # not inside a <script> tag
+                continue
+            tag_end = lower.find(">", marker)
+            close_at = lower.find("</script", tag_end) if tag_end != -1 else -1
+            if close_at == -1:
+                pos = open_at  # wait for the rest of the block
+                break
+            self.jsonld.append(self._tail[tag_end + 1:close_at].strip())
+            pos = close_at + len("</script")
+        self._tail = self._tail[pos:]
+
+    # --- Raw text elements ---
+    # Older html.parser releases only end a <script>/<style> body at an
+    # exact </script>, so </script foo="bar"> swallowed the rest of the page
+    # as script. Per HTML5, any </script followed by whitespace, "/" or ">"
+    # ends it.
+
+    def set_cdata_mode(self, elem: str, **kwargs: Any) -> None:
+        super().set_cdata_mode(elem, **kwargs)
+        self.interesting = re.compile(r"</%s(?=[\t\n\r\f />])" % elem, re.I)
+
+    def parse_endtag(self, i: int) -> int:
+        if self.cdata_elem is None:
+            return super().parse_endtag(i)
+        end = self.rawdata.find(">", i)
+        if end == -1:
+            return -1
+        self.handle_endtag(self.cdata_elem)
+        self.clear_cdata_mode()
+        return end + 1
+
+    # --- HTMLParser callbacks ---
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        if not self.text_full:
+            self._text.append(" ")
+        attributes = dict(attrs)
+        if tag in ("script", "style"):
+            script_type = (attributes.get("type") or "").strip().lower()
+            if tag == "script" and script_type == _JSONLD_TYPE:
+                self._jsonld_parts = []
+            else:
+                self._skipping = tag
+            return
+        if tag == "title" and not self._title_seen:
+            self._in_title = True
+        elif tag == "meta":
+            name = (attributes.get("name") or "").strip().lower()
+            prop = (attributes.get("property") or "").strip().lower()
+            if name == "description" and not self.meta_description:
+                self.meta_description = (attributes.get("content") or "").strip()
+            elif prop in _PRICE_META_PROPERTIES:
+                self._add_price_meta(prop, attributes.get("content"))
+
+        itemprop = (attributes.get("itemprop") or "").strip()
+        if itemprop.lower() in _PRICE_ITEMPROPS:
+            # Microdata puts the machine-readable value in content="...",
+            # falling back to the element's text
+            if attributes.get("content") is not None:
+                self._add_price_meta(f"itemprop:{itemprop}", attributes["content"])
+            elif tag != "meta":
+                self._price_itemprop = f"itemprop:{itemprop}"
+
+    def handle_endtag(self, tag: str) -> None:
+        if not self.text_full:
+            self._text.append(" ")
+        self._price_itemprop = None
+        if tag == self._skipping:
+            self._skipping = None
+        elif tag == "script" and self._jsonld_parts is not None:
+            if len(self.jsonld) < MAX_JSONLD_BLOCKS:
+                self.jsonld.append("".join(self._jsonld_parts).strip())
+            self._jsonld_parts = None
+        elif tag == "title" and self._in_title:
+            self._in_title = False
+            self._title_seen = True
+
+    def handle_data(self, data: str) -> None:
+        if self._jsonld_parts is not None:
+            self._jsonld_parts.append(data)
+            return
+        if self._skipping:
+            return
+        if self._price_itemprop and data.strip():
+            self._add_price_meta(self._price_itemprop, data)
+            self._price_itemprop = None
+        if self._in_title:
+            self._title.append(data)
+        if not self.text_full:
+            # A text node can arrive in several calls, so whitespace is
+            # collapsed once in result(); tags separate nodes with a space
+            self._text.append(data)
+            self._text_chars += len("".join(data.split()))
+            self.text_full = self._text_chars > MAX_BODY_TEXT_CHARS
+
+    def _add_price_meta(self, key: str, value: str | None) -> None:
+        value = " ".join((value or "").replace(";", " ").split())
+        if value and key not in self.price_meta and len(self.price_meta) < MAX_PRICE_META_ENTRIES:
+            self.price_meta[key] = value
+
+    # --- Output ---
+
+    def result(self) -> str:
+        title = "".join(self._title).strip()
+        jsonld_text = "\n".join(self.jsonld[:MAX_JSONLD_BLOCKS]).strip()
+        body_text = " ".join("".join(self._text).split())
+
+        parts = []
+        if title:
+            parts.append(f"Title: {title}")
+        if self.meta_description:
+            parts.append(f"Meta: {self.meta_description}")
+        if self.price_meta:
+            fields = "; ".join(f"{key}={value}" for key, value in self.price_meta.items())
+            parts.append(f"Price Meta: {fields}")
+        if jsonld_text:
+            parts.append(f"Structured Data: {jsonld_text}")
+        if body_text:
+            parts.append(f"Page Text: {body_text[:MAX_BODY_TEXT_CHARS]}")
+
+        return "\n".join(parts)[:MAX_PAGE_CONTENT_CHARS]
+
+
 def _extract_text_from_html(html: str) -> str:
     """
     Extract price-relevant text from HTML content.
 
     Prioritizes structured data (JSON-LD) which is the most reliable
     source of machine-readable prices, then falls back to visible text.
+    Parsing stops once everything the prompt uses has been collected, so
+    the cost is bounded by that budget rather than by the page size.
 
     Args:
         html: Raw HTML content from a product page.
 
     Returns:
-        A text string containing title, meta description, JSON-LD data,
-        and visible body text, capped at MAX_PAGE_CONTENT_CHARS.
+        A text string containing title, meta description, OpenGraph and
+        microdata price fields, JSON-LD data, and visible body text, capped
+        at MAX_PAGE_CONTENT_CHARS.
     """
     # Parse with a real HTML parser rather than regex — regex-based tag
     # filtering is unreliable against malformed markup (e.g. </script foo="bar">)
     # and lets script bodies leak into the extracted text (CodeQL py/bad-tag-filter).
-    soup = BeautifulSoup(html, "html.parser")
-
-    def _is_jsonld(tag: Any) -> bool:
-        return (tag.get("type") or "").strip().lower() == "application/ld+json"
-
-    # Extract JSON-LD structured data (often contains exact prices) before
-    # decomposing any scripts, so it survives the script/style stripping below.
-    jsonld_matches = [
-        s.get_text() for s in soup.find_all("script") if _is_jsonld(s)
-    ]
-    jsonld_text = "\n".join(jsonld_matches[:3]).strip()
-
-    # Extract title and meta description before stripping body content.
-    title = soup.title.get_text().strip() if soup.title else ""
-
-    meta_tag = soup.find("meta", attrs={"name": re.compile(r"^description$", re.IGNORECASE)})
-    meta_desc = (meta_tag.get("content") or "").strip() if meta_tag else ""
+    extractor = _PageTextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    return extractor.result()
 
-    # Remove script and style blocks (except JSON-LD scripts) for body text.
-    for tag in soup.find_all(["script", "style"]):
-        if tag.name == "script" and _is_jsonld(tag):
-            continue
-        tag.decompose()
-
-    body_text = re.sub(r"\s+", " ", soup.get_text(" ")).strip()
 
-    parts = []
-    if title:
-        parts.append(f"Title: {title}")
-    if meta_desc:
-        parts.append(f"Meta: {meta_desc}")
-    if jsonld_text:
-        parts.append(f"Structured Data: {jsonld_text}")
-    if body_text:
-        parts.append(f"Page Text: {body_text[:4000]}")
+async def _read_page_text(response: httpx.Response) -> str:
+    """
+    Download a streamed HTML response into the extractor.
 
-    return "\n".join(parts)[:MAX_PAGE_CONTENT_CHARS]
+    Reading stops as soon as the extractor is done or MAX_PAGE_BYTES have
+    been received; the rest of the body is never downloaded.
+    """
+    try:
+        decoder = codecs.getincrementaldecoder(response.charset_encoding or "utf-8")(
+            errors="replace",
+        )
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    extractor = _PageTextExtractor()
+    received = 0
+    async for chunk in response.aiter_bytes():
+        chunk = chunk[:MAX_PAGE_BYTES - received]
+        received += len(chunk)
+        extractor.feed(decoder.decode(chunk))
+        if extractor.done or received >= MAX_PAGE_BYTES:
+            break
+    else:
+        # Complete body: flush text held back at the end of the last chunk
+        # (a cut-off body would only flush half a tag)
+        extractor.feed(decoder.decode(b"", final=True))
+        extractor.close()
+    return extractor.result()
 
 
 # ======================================================================
@@ -126,8 +383,10 @@ async def _fetch_page(
     Fetch a URL via GET and return availability status plus page text.
 
     Combines URL availability checking with page content extraction
-    for price verification. Falls back to HEAD if GET times out on
-    a second attempt (to still confirm availability without content).
+    for price verification. Results are cached per URL: a fresh entry is
+    returned without a request, a stale one is revalidated with a
+    conditional GET (a 304 reuses its text), and a dead page is remembered
+    for PAGE_CACHE_NEGATIVE_TTL. Network errors and 5xx are not cached.
 
     Args:
         url: The external URL to fetch.
@@ -137,24 +396,49 @@ async def _fetch_page(
         A tuple of (is_available, page_text). page_text is empty if
         the page couldn't be fetched or parsed.
     """
+    entry = get_cached_page(url)
+    if entry is not None and entry.is_fresh(time.time()):
+        record_page_cache_event("fresh_hits" if entry.available else "negative_hits")
+        return entry.available, entry.text
+
+    version = page_cache_version(url)
+    revalidation = conditional_headers(entry)
     try:
-        response = await client.get(
+        async with client.stream(
+            "GET",
             url,
             follow_redirects=True,
-            headers={"User-Agent": USER_AGENT},
-        )
-        if response.status_code in VALID_STATUS_RANGE:
-            content_type = response.headers.get("content-type", "")
-            if "text/html" in content_type or "text/plain" in content_type:
-                page_text = _extract_text_from_html(response.text)
-                return True, page_text
-            # Non-HTML response (PDF, image, etc.) — available but no text
-            return True, ""
-        return False, ""
+            headers={"User-Agent": USER_AGENT, **revalidation},
+        ) as response:
+            status_code = response.status_code
+            headers = response.headers
+            page_text = ""
+            if status_code in VALID_STATUS_RANGE and not (
+                status_code == 304 and revalidation
+            ):
+                content_type = headers.get("content-type", "")
+                if "text/html" in content_type or "text/plain" in content_type:
+                    page_text = await _read_page_text(response)
+                # Non-HTML response (PDF, image, etc.) — available but no
+                # text, and its body is never downloaded
     except (httpx.TimeoutException, httpx.ConnectError, httpx.HTTPError) as exc:
         logger.warning("Page fetch failed for %s: %s", url, exc)
         return False, ""
 
+    if status_code == 304 and revalidation:
+        record_page_cache_event("revalidated")
+        mark_revalidated(url, entry, version)
+        return True, entry.text
+
+    record_page_cache_event("changed" if entry is not None else "misses")
+    if status_code in VALID_STATUS_RANGE:
+        cache_page(url, True, page_text, version, headers)
+        return True, page_text
+
+    if is_cacheable_failure(status_code):
+        cache_page(url, False, "", version)
+    return False, ""
+
 
 # ======================================================================
 # Claude price verification
@@ -193,14 +477,13 @@ async def _verify_prices_with_claude(
     if not candidates_with_content:
         return {}
 
-    from anthropic import AsyncAnthropic
-    from app.core.config import ANTHROPIC_API_KEY, is_claude_search_configured
+    from app.core.config import is_claude_search_configured
 
     if not is_claude_search_configured():
         logger.info("Claude not configured — skipping price verification")
         return {}
 
-    client = AsyncAnthropic(api_key=ANTHROPIC_API_KEY)
+    client = get_claude_client("price_verification")
 
     prompt_parts = []
     for candidate, content in candidates_with_content:
@@ -305,6 +588,10 @@ async def _resolve_and_verify(
 
     Returns (candidate with a live external_url, page_content) or None if no
     real, reachable page could be found.
+
+    Raises:
+        BraveThrottled: Brave is rate limiting, so nothing is known about the
+            backup's page.
     """
     if not candidate.search_query:
         return None
@@ -318,6 +605,308 @@ async def _resolve_and_verify(
     return candidate.model_copy(update={"external_url": url}), content
 
 
+class _SpeculativeSpares:
+    """
+    Backups resolved ahead of need (AVAILABILITY_SPECULATIVE_SWAPS).
+
+    Each time a slot turns out not to be bookable, the next
+    MAX_REPLACEMENT_ATTEMPTS purchasable backups (by final_score) start
+    resolving and live-checking in the background, while the remaining
+    primary pages are still being fetched. Failing slots then claim, in
+    order, the best-scored spare that came back bookable. Brave calls and
+    page fetches are bounded as in the one-at-a-time loop, but a slot costs
+    the slowest lookup instead of their sum. Once every slot is filled,
+    unfinished lookups are cancelled; finished ones stay in the Brave and
+    page caches.
+    """
+
+    def __init__(
+        self,
+        pool: list[CandidateRecommendation],
+        used_ids: set[str],
+        client: httpx.AsyncClient,
+    ) -> None:
+        self._pool = pool
+        self._used_ids = used_ids  # shared with verify_availability
+        self._client = client
+        self._backups: list[CandidateRecommendation] = []  # rank order
+        self._tasks: dict[str, asyncio.Task] = {}
+        self.throttled = False  # Brave throttled a lookup; start no more
+
+    def extend(self) -> None:
+        """Start resolving spares for one more failing slot."""
+        if self.throttled:
+            return
+        fresh = [
+            b for b in _get_backup_candidates(self._pool, self._used_ids)
+            if not b.is_idea and b.id not in self._tasks
+        ][:MAX_REPLACEMENT_ATTEMPTS]
+        for backup in fresh:
+            self._backups.append(backup)
+            self._tasks[backup.id] = asyncio.create_task(self._resolve(backup))
+
+    async def _resolve(
+        self,
+        backup: CandidateRecommendation,
+    ) -> tuple[CandidateRecommendation, str] | None:
+        try:
+            return await _resolve_and_verify(backup, self._client)
+        except BraveThrottled as exc:
+            logger.warning("Speculative resolution of '%s' throttled: %s", backup.title, exc)
+            if not self.throttled:
+                self.throttled = True
+                note_degradation(BRAVE_THROTTLED)
+            return None
+        except Exception as exc:
+            logger.warning("Speculative resolution of '%s' failed: %s", backup.title, exc)
+            return None
+
+    async def claim(self) -> tuple[CandidateRecommendation, str] | None:
+        """The best unclaimed spare that resolved to a live page, or None."""
+        for backup in self._backups:
+            if backup.id in self._used_ids:
+                continue
+            result = await self._tasks[backup.id]
+            self._used_ids.add(backup.id)
+            if result is not None:
+                return result
+        return None
+
+    async def aclose(self) -> None:
+        """Cancel lookups no slot needs any more."""
+        pending = [task for task in self._tasks.values() if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.debug("Cancelled %d speculative backup lookups", len(pending))
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def _verify_slots(
+    selected: list[CandidateRecommendation],
+    filtered_pool: list[CandidateRecommendation],
+    used_ids: set[str],
+    client: httpx.AsyncClient,
+    spares: _SpeculativeSpares | None,
+    verified: list[CandidateRecommendation],
+    candidates_with_content: list[tuple[CandidateRecommendation, str]],
+    deadline: float | None = None,
+    throttled_ids: frozenset[str] = frozenset(),
+) -> None:
+    """
+    Check every selected slot and fill `verified` (and the pages to price,
+    `candidates_with_content`) in slot order, swapping unbookable slots.
+    With `spares`, backups are resolved speculatively; otherwise one at a time.
+    Backup lookups stop once less than SWAP_MIN_SECONDS of `deadline` remain,
+    or once Brave throttles one. Unresolved slots in `throttled_ids` are kept
+    as linkless cards without looking for a swap.
+    """
+    brave_throttled = False
+
+    def _throttled_slot(candidate: CandidateRecommendation) -> bool:
+        return candidate.external_url is None and candidate.id in throttled_ids
+
+    def _can_swap(slot: int) -> bool:
+        if brave_throttled:
+            return False
+        if has_budget(deadline, SWAP_MIN_SECONDS):
+            return True
+        logger.warning(
+            "Slot %d: latency budget nearly spent — skipping backup lookups", slot,
+        )
+        note_degradation(IDEAS_INSTEAD_OF_SWAPS)
+        return False
+
+    # ----------------------------------------------------------------
+    # Phase 1: Fetch all pages in parallel (happy path)
+    # Ideas are no-ops (no URL). A purchasable with no resolved URL is NOT a
+    # no-op — it counts as unavailable so Phase 2 swaps it for a bookable spare.
+    # A failing slot starts its speculative spares right away.
+    # ----------------------------------------------------------------
+    async def _fetch_indexed(
+        idx: int,
+        candidate: CandidateRecommendation,
+    ) -> tuple[int, bool, str]:
+        if candidate.is_idea:
+            return idx, True, ""
+        if candidate.external_url is None:
+            is_avail, content = False, ""
+        else:
+            is_avail, content = await _fetch_page(candidate.external_url, client)
+        if (
+            not is_avail and spares is not None and not _throttled_slot(candidate)
+            and has_budget(deadline, SWAP_MIN_SECONDS)
+        ):
+            spares.extend()
+        return idx, is_avail, content
+
+    fetch_results = await asyncio.gather(
+        *[_fetch_indexed(i, c) for i, c in enumerate(selected)],
+    )
+
+    # ----------------------------------------------------------------
+    # Phase 2: Process results; handle failures with replacement logic
+    # ----------------------------------------------------------------
+    for idx, is_available, page_content in fetch_results:
+        candidate = selected[idx]
+        i = idx  # keep variable name consistent with original logging
+
+        # Skip URL verification for ideas — they have no external URL (Step 14.5)
+        if candidate.is_idea:
+            logger.debug(
+                "Slot %d: '%s' is an idea — skipping URL verification",
+                i + 1, candidate.title,
+            )
+            verified.append(candidate)
+            continue
+
+        if is_available:
+            logger.debug(
+                "Slot %d: '%s' verified (URL: %s)",
+                i + 1, candidate.title, candidate.external_url,
+            )
+            verified.append(candidate)
+            if page_content:
+                candidates_with_content.append((candidate, page_content))
+            continue
+
+        if _throttled_slot(candidate):
+            # Brave never answered for this card, so it may well be bookable;
+            # keep it rather than burn more throttled searches on swaps.
+            logger.warning(
+                "Slot %d: '%s' unresolved (Brave throttled) — keeping it as a "
+                "linkless idea card",
+                i + 1, candidate.title,
+            )
+            count_event(IDEA_FALLBACK)
+            verified.append(_as_linkless_idea(candidate))
+            continue
+
+        # Not bookable (no resolved URL, or a dead one) — swap for a spare that IS.
+        logger.info(
+            "Slot %d: '%s' not bookable (URL: %s) — seeking replacement",
+            i + 1, candidate.title, candidate.external_url or "unresolved",
+        )
+        used_ids.add(candidate.id)
+
+        # Prefer a real bookable replacement (the user's stated priority), so try
+        # PURCHASABLE backups first — resolving + live-checking each. Ideas are
+        # held back for the last-resort step below. Speculative spares are
+        # already in flight; otherwise each attempt is a serial Brave call + page
+        # GET, so the loop is bounded by MAX_REPLACEMENT_ATTEMPTS to cap
+        # worst-case tail latency.
+        replaced = False
+        if spares is not None and _can_swap(i + 1):
+            try:
+                result = await asyncio.wait_for(spares.claim(), timeout=remaining(deadline))
+            except asyncio.TimeoutError:
+                note_degradation(IDEAS_INSTEAD_OF_SWAPS)
+                result = None
+            if result is not None:
+                live_replacement, content = result
+                logger.info(
+                    "Slot %d: Replaced with '%s' (URL: %s, speculative)",
+                    i + 1, live_replacement.title, live_replacement.external_url,
+                )
+                verified.append(live_replacement)
+                if content:
+                    candidates_with_content.append((live_replacement, content))
+                count_event(SWAP)
+                replaced = True
+
+        for attempt in range(MAX_REPLACEMENT_ATTEMPTS if spares is None else 0):
+            if not _can_swap(i + 1):
+                break
+            purchasable_backups = [
+                b for b in _get_backup_candidates(filtered_pool, used_ids)
+                if not b.is_idea
+            ]
+            if not purchasable_backups:
+                logger.warning(
+                    "Slot %d: No more purchasable backups (attempt %d/%d)",
+                    i + 1, attempt + 1, MAX_REPLACEMENT_ATTEMPTS,
+                )
+                break
+
+            replacement = purchasable_backups[0]
+            used_ids.add(replacement.id)
+
+            # Backups arrive URL-less — resolve to a real page and live-check it.
+            try:
+                result = await asyncio.wait_for(
+                    _resolve_and_verify(replacement, client), timeout=remaining(deadline),
+                )
+            except asyncio.TimeoutError:
+                note_degradation(IDEAS_INSTEAD_OF_SWAPS)
+                break
+            except BraveThrottled as exc:
+                logger.warning(
+                    "Slot %d: Brave throttled backup lookups (%s) — no more swaps",
+                    i + 1, exc,
+                )
+                note_degradation(BRAVE_THROTTLED)
+                brave_throttled = True
+                break
+            if result is not None:
+                live_replacement, content = result
+                logger.info(
+                    "Slot %d: Replaced with '%s' (URL: %s, attempt %d)",
+                    i + 1, live_replacement.title, live_replacement.external_url,
+                    attempt + 1,
+                )
+                verified.append(live_replacement)
+                if content:
+                    candidates_with_content.append((live_replacement, content))
+                count_event(SWAP)
+                replaced = True
+                break
+            else:
+                logger.debug(
+                    "Slot %d: Replacement '%s' not bookable (attempt %d/%d)",
+                    i + 1, replacement.title, attempt + 1,
+                    MAX_REPLACEMENT_ATTEMPTS,
+                )
+
+        if not replaced:
+            count_event(IDEA_FALLBACK)
+            # Never drop a card (PRD F2) and never show a web-search link. Last
+            # resort: use the best remaining idea (needs no URL); if none exists,
+            # keep the original as a linkless idea-style card so it still renders
+            # with a Save action instead of a dead buy button.
+            idea = _best_unused_idea(filtered_pool, used_ids)
+            if idea is not None:
+                used_ids.add(idea.id)
+                logger.warning(
+                    "Slot %d: no bookable replacement — using idea '%s'",
+                    i + 1, idea.title,
+                )
+                verified.append(idea)
+            else:
+                logger.warning(
+                    "Slot %d: no bookable replacement and no spare idea — keeping "
+                    "'%s' as a linkless idea card",
+                    i + 1, candidate.title,
+                )
+                verified.append(_as_linkless_idea(candidate))
+
+
+def _as_linkless_idea(candidate: CandidateRecommendation) -> CandidateRecommendation:
+    """
+    Convert a purchasable fully to an idea, so BOTH the detail view and the
+    card/deck (which branch on `type`) render it as a linkless, saveable idea
+    — not a purchasable with a dead price/merchant.
+    """
+    return candidate.model_copy(
+        update={
+            "external_url": None,
+            "is_idea": True,
+            "type": "idea",
+            "price_cents": None,
+            "merchant_name": None,
+        },
+    )
+
+
 # ======================================================================
 # LangGraph node
 # ======================================================================
@@ -336,8 +925,9 @@ async def verify_availability(
        first, then falling back to a spare idea, then to the original converted to a
        linkless idea card. Never a web-search link; never drops below the input count
        (PRD F2)
-    4. Sends page content for all verified candidates to Claude in a single call
-       for price extraction and verification
+    4. Reads prices from structured page data where present, and sends the
+       remaining pages to Claude in a single call for price extraction
+       (skipped when the latency budget can't cover it)
     5. Updates price_cents and price_confidence based on verification results
     6. Returns the verified and price-enriched list
 
@@ -346,8 +936,20 @@ async def verify_availability(
                filtered_recommendations (backup pool).
 
     Returns:
-        A dict with "final_three" key containing the verified recommendations.
+        A dict with "final_three" key containing the verified recommendations,
+        and "degradations" if swaps or price checks were cut for the latency
+        budget.
     """
+    with collect_degradations() as degradations:
+        verified = await _verify_and_price(state)
+
+    if degradations:
+        return {"final_three": verified, "degradations": degradations}
+    return {"final_three": verified}
+
+
+async def _verify_and_price(state: RecommendationState) -> list[CandidateRecommendation]:
+    """verify_availability's body: the verified, price-enriched final_three."""
     selected = list(state.final_three)
     filtered_pool = list(state.filtered_recommendations)
 
@@ -358,7 +960,7 @@ async def verify_availability(
 
     if not selected:
         logger.warning("No recommendations to verify")
-        return {"final_three": []}
+        return []
 
     # Track all IDs we've used or tried (to avoid re-checking the same candidate)
     used_ids: set[str] = {c.id for c in selected}
@@ -366,142 +968,71 @@ async def verify_availability(
     verified: list[CandidateRecommendation] = []
     candidates_with_content: list[tuple[CandidateRecommendation, str]] = []
 
-    async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
-
-        # ----------------------------------------------------------------
-        # Phase 1: Fetch all pages in parallel (happy path)
-        # Ideas are no-ops (no URL). A purchasable with no resolved URL is NOT a
-        # no-op — it counts as unavailable so Phase 2 swaps it for a bookable spare.
-        # ----------------------------------------------------------------
-        async def _fetch_indexed(
-            idx: int,
-            candidate: CandidateRecommendation,
-        ) -> tuple[int, bool, str]:
-            if candidate.is_idea:
-                return idx, True, ""
-            if candidate.external_url is None:
-                return idx, False, ""
-            is_avail, content = await _fetch_page(candidate.external_url, client)
-            return idx, is_avail, content
-
-        fetch_results = await asyncio.gather(
-            *[_fetch_indexed(i, c) for i, c in enumerate(selected)],
+    async with upstream_client("merchants", timeout=REQUEST_TIMEOUT) as client:
+        spares = (
+            _SpeculativeSpares(filtered_pool, used_ids, client)
+            if AVAILABILITY_SPECULATIVE_SWAPS else None
         )
+        try:
+            await _verify_slots(
+                selected, filtered_pool, used_ids, client, spares,
+                verified, candidates_with_content, state.deadline,
+                frozenset(state.url_throttled_ids),
+            )
+        finally:
+            if spares is not None:
+                await spares.aclose()
 
-        # ----------------------------------------------------------------
-        # Phase 2: Process results; handle failures with replacement logic
-        # ----------------------------------------------------------------
-        for idx, is_available, page_content in fetch_results:
-            candidate = selected[idx]
-            i = idx  # keep variable name consistent with original logging
-
-            # Skip URL verification for ideas — they have no external URL (Step 14.5)
-            if candidate.is_idea:
-                logger.debug(
-                    "Slot %d: '%s' is an idea — skipping URL verification",
-                    i + 1, candidate.title,
-                )
-                verified.append(candidate)
+    # --- Price verification pass ---
+    if candidates_with_content:
+        # Pages whose price was extracted on an earlier run (and which are
+        # unchanged since, per the page cache) skip Claude, as do pages whose
+        # structured data (JSON-LD, microdata, OpenGraph) states the price.
+        price_results: dict[str, dict[str, Any]] = {}
+        to_verify: list[tuple[CandidateRecommendation, str]] = []
+        structured = 0
+        for candidate, content in candidates_with_content:
+            cached_price = get_cached_price(candidate.external_url)
+            if cached_price is not None:
+                price_results[candidate.id] = cached_price
                 continue
-
-            if is_available:
+            extracted = extract_price(content)
+            if extracted is not None:
                 logger.debug(
-                    "Slot %d: '%s' verified (URL: %s)",
-                    i + 1, candidate.title, candidate.external_url,
+                    "Price for '%s' read from %s (confidence %.2f)",
+                    candidate.title, extracted.source, extracted.confidence,
                 )
-                verified.append(candidate)
-                if page_content:
-                    candidates_with_content.append((candidate, page_content))
-                continue
-
-            # Not bookable (no resolved URL, or a dead one) — swap for a spare that IS.
-            logger.info(
-                "Slot %d: '%s' not bookable (URL: %s) — seeking replacement",
-                i + 1, candidate.title, candidate.external_url or "unresolved",
+                price_results[candidate.id] = extracted.as_result()
+                structured += 1
+            else:
+                to_verify.append((candidate, content))
+
+        if to_verify and not has_budget(state.deadline, PRICE_VERIFICATION_MIN_SECONDS):
+            logger.warning(
+                "Latency budget nearly spent — skipping Claude price verification "
+                "for %d candidates",
+                len(to_verify),
             )
-            used_ids.add(candidate.id)
-
-            # Prefer a real bookable replacement (the user's stated priority), so try
-            # PURCHASABLE backups first — resolving + live-checking each. Ideas are
-            # held back for the last-resort step below. Each attempt is a serial
-            # Brave call + page GET, so the loop is bounded by MAX_REPLACEMENT_ATTEMPTS
-            # to cap worst-case tail latency.
-            replaced = False
-            for attempt in range(MAX_REPLACEMENT_ATTEMPTS):
-                purchasable_backups = [
-                    b for b in _get_backup_candidates(filtered_pool, used_ids)
-                    if not b.is_idea
-                ]
-                if not purchasable_backups:
-                    logger.warning(
-                        "Slot %d: No more purchasable backups (attempt %d/%d)",
-                        i + 1, attempt + 1, MAX_REPLACEMENT_ATTEMPTS,
-                    )
-                    break
-
-                replacement = purchasable_backups[0]
-                used_ids.add(replacement.id)
-
-                # Backups arrive URL-less — resolve to a real page and live-check it.
-                result = await _resolve_and_verify(replacement, client)
-                if result is not None:
-                    live_replacement, content = result
-                    logger.info(
-                        "Slot %d: Replaced with '%s' (URL: %s, attempt %d)",
-                        i + 1, live_replacement.title, live_replacement.external_url,
-                        attempt + 1,
-                    )
-                    verified.append(live_replacement)
-                    if content:
-                        candidates_with_content.append((live_replacement, content))
-                    replaced = True
-                    break
-                else:
-                    logger.debug(
-                        "Slot %d: Replacement '%s' not bookable (attempt %d/%d)",
-                        i + 1, replacement.title, attempt + 1,
-                        MAX_REPLACEMENT_ATTEMPTS,
-                    )
-
-            if not replaced:
-                # Never drop a card (PRD F2) and never show a web-search link. Last
-                # resort: use the best remaining idea (needs no URL); if none exists,
-                # keep the original as a linkless idea-style card so it still renders
-                # with a Save action instead of a dead buy button.
-                idea = _best_unused_idea(filtered_pool, used_ids)
-                if idea is not None:
-                    used_ids.add(idea.id)
-                    logger.warning(
-                        "Slot %d: no bookable replacement — using idea '%s'",
-                        i + 1, idea.title,
-                    )
-                    verified.append(idea)
-                else:
-                    logger.warning(
-                        "Slot %d: no bookable replacement and no spare idea — keeping "
-                        "'%s' as a linkless idea card",
-                        i + 1, candidate.title,
-                    )
-                    # Convert fully to an idea so BOTH the detail view and the
-                    # card/deck (which branch on `type`) render it as a linkless,
-                    # saveable idea — not a purchasable with a dead price/merchant.
-                    verified.append(candidate.model_copy(
-                        update={
-                            "external_url": None,
-                            "is_idea": True,
-                            "type": "idea",
-                            "price_cents": None,
-                            "merchant_name": None,
-                        },
-                    ))
+            note_degradation(SKIPPED_PRICE_VERIFICATION)
+            to_verify = []
 
-    # --- Price verification pass ---
-    if candidates_with_content:
         logger.info(
-            "Verifying prices for %d candidates via Claude",
-            len(candidates_with_content),
+            "Verifying prices for %d candidates via Claude "
+            "(%d cached, %d from structured data)",
+            len(to_verify), len(price_results) - structured, structured,
         )
-        price_results = await _verify_prices_with_claude(candidates_with_content)
+        try:
+            claude_results = await asyncio.wait_for(
+                _verify_prices_with_claude(to_verify), timeout=remaining(state.deadline),
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Claude price verification ran past the latency budget")
+            note_degradation(SKIPPED_PRICE_VERIFICATION)
+            claude_results = {}
+        for candidate, _ in to_verify:
+            if candidate.id in claude_results:
+                cache_price(candidate.external_url, claude_results[candidate.id])
+        price_results.update(claude_results)
 
         if price_results:
             updated_verified: list[CandidateRecommendation] = []
@@ -540,7 +1071,10 @@ async def verify_availability(
         [f"{c.title} ({c.price_confidence})" for c in verified],
     )
 
+    for index, candidate in enumerate(verified):
+        emit_progress(CARD_VERIFIED, index=index, candidate=candidate)
+
     # Count is always preserved — an unbookable slot is swapped for a bookable spare
     # or an idea (never dropped, never a web-search link) — so there is no
     # partial-results path to warn about.
-    return {"final_three": verified}
+    return verified
@@ -3,10 +3,22 @@ Briefing Generation Node — LangGraph node for milestone briefing generation.
 
 Generates a contextual, conversational briefing that accompanies milestone-triggered
 recommendations. Only runs when milestone_context is present in the state.
+
+The briefing is optional, so it yields to the pipeline's latency budget: it
+is skipped when too little time remains to start it, and abandoned if it is
+still running at the deadline.
 """
 
+import asyncio
 import logging
 
+from app.agents.budget import (
+    BRIEFING_MIN_SECONDS,
+    SKIPPED_BRIEFING,
+    has_budget,
+    remaining,
+)
+from app.agents.progress import BRIEFING, emit_progress
 from app.agents.state import RecommendationState
 from app.services.briefing_generation import generate_milestone_briefing
 
@@ -21,22 +33,40 @@ async def generate_briefing(state: RecommendationState) -> dict:
     Writes briefing_text, briefing_snippet, and briefing_hint_ids back to state.
 
     Skips silently if no milestone context is provided (non-milestone
-    recommendations don't need a briefing).
+    recommendations don't need a briefing). Skips with a SKIPPED_BRIEFING
+    degradation if the latency budget runs out before or during generation.
     """
     if not state.milestone_context:
         logger.debug("No milestone context — skipping briefing generation")
         return {}
 
-    result = await generate_milestone_briefing(
-        vault_data=state.vault_data,
-        hints=state.relevant_hints,
-        milestone_context=state.milestone_context,
-    )
+    if not has_budget(state.deadline, BRIEFING_MIN_SECONDS):
+        logger.warning("Latency budget nearly spent — skipping briefing generation")
+        return {"degradations": [SKIPPED_BRIEFING]}
+
+    try:
+        result = await asyncio.wait_for(
+            generate_milestone_briefing(
+                vault_data=state.vault_data,
+                hints=state.relevant_hints,
+                milestone_context=state.milestone_context,
+            ),
+            timeout=remaining(state.deadline),
+        )
+    except asyncio.TimeoutError:
+        logger.warning("Briefing generation ran past the latency budget — dropping it")
+        return {"degradations": [SKIPPED_BRIEFING]}
 
     if result is None:
         logger.info("Briefing generation returned None — continuing without briefing")
         return {}
 
+    emit_progress(
+        BRIEFING,
+        briefing_text=result.briefing_text,
+        briefing_snippet=result.briefing_snippet,
+    )
+
     return {
         "briefing_text": result.briefing_text,
         "briefing_snippet": result.briefing_snippet,
@@ -0,0 +1,100 @@
+"""
+Pipeline Latency Budget — one end-to-end deadline for a recommendation run.
+
+Every node has its own fixed timeouts (Claude retries, BRAVE_TIMEOUT, the
+merchant REQUEST_TIMEOUT), so without a shared deadline the worst case is
+their sum. The runners in app.agents.pipeline stamp RecommendationState.deadline
+(a time.monotonic() value, PIPELINE_LATENCY_BUDGET_SECONDS from the start of
+the run) and each node checks it before optional work, degrading instead of
+overrunning:
+
+- generate_unified — no further Claude retries     → CAPPED_RETRIES
+- generate_briefing — skipped, or cut off at the deadline → SKIPPED_BRIEFING
+- resolve_urls — no Brave lookups                  → SKIPPED_URL_RESOLUTION
+- verify_urls — failing slots get an idea instead of a resolved backup
+                                                   → IDEAS_INSTEAD_OF_SWAPS
+- verify_urls — no Claude price call (structured-data prices still apply)
+                                                   → SKIPPED_PRICE_VERIFICATION
+
+Brave rate limiting degrades the same way: resolve_urls leaves throttled
+cards unresolved and verify_urls keeps them as linkless cards instead of
+spending more Brave calls on swaps
+                                                   → BRAVE_THROTTLED
+
+Nodes return the degradations they applied under "degradations" (merged
+across the parallel branches) and the API reports them in the response.
+Services below the node layer report through note_degradation(), collected
+by the node with collect_degradations().
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from app.core.config import PIPELINE_LATENCY_BUDGET_SECONDS
+
+# --- Degradations (reported to clients; keep values stable) ---
+CAPPED_RETRIES = "capped_retries"
+SKIPPED_BRIEFING = "skipped_briefing"
+SKIPPED_URL_RESOLUTION = "skipped_url_resolution"
+IDEAS_INSTEAD_OF_SWAPS = "ideas_instead_of_swaps"
+SKIPPED_PRICE_VERIFICATION = "skipped_price_verification"
+BRAVE_THROTTLED = "brave_throttled"
+
+# --- Seconds that must remain to start each optional step ---
+GENERATION_RETRY_MIN_SECONDS = 20.0  # a full unified generation call
+BRIEFING_MIN_SECONDS = 4.0
+URL_RESOLUTION_MIN_SECONDS = 3.0  # one Brave search
+SWAP_MIN_SECONDS = 5.0  # Brave search + page fetch for a backup
+PRICE_VERIFICATION_MIN_SECONDS = 5.0  # one Sonnet price-extraction call
+
+_collector: ContextVar[Optional[list[str]]] = ContextVar(
+    "pipeline_degradations", default=None,
+)
+
+
+def pipeline_deadline(budget: Optional[float] = None) -> Optional[float]:
+    """
+    Deadline for a run starting now, or None if the budget is disabled.
+
+    Args:
+        budget: Seconds allowed; defaults to PIPELINE_LATENCY_BUDGET_SECONDS.
+    """
+    if budget is None:
+        budget = PIPELINE_LATENCY_BUDGET_SECONDS
+    if budget <= 0:
+        return None
+    return time.monotonic() + budget
+
+
+def remaining(deadline: Optional[float]) -> Optional[float]:
+    """Seconds left before `deadline` (never negative), or None if unbounded."""
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def has_budget(deadline: Optional[float], seconds: float) -> bool:
+    """True if at least `seconds` remain before `deadline` (always, if None)."""
+    left = remaining(deadline)
+    return left is None or left >= seconds
+
+
+def note_degradation(name: str) -> None:
+    """Record a degradation for the enclosing collect_degradations() block."""
+    collected = _collector.get()
+    if collected is not None and name not in collected:
+        collected.append(name)
+
+
+@contextmanager
+def collect_degradations() -> Iterator[list[str]]:
+    """Collect note_degradation() calls made inside the block, in order."""
+    collected: list[str] = []
+    token = _collector.set(collected)
+    try:
+        yield collected
+    finally:
+        _collector.reset(token)
@@ -1,8 +1,11 @@
 """
 Hint Retrieval Node — LangGraph node for semantic hint search.
 
-Queries pgvector via the match_hints() RPC function to find hints
-semantically related to the current milestone or occasion.
+Ranks the vault's hints by semantic similarity to the current milestone
+or occasion. With HINT_SEARCH_MODE="exact" (the default) the ranking is an
+exact in-process scan of the vault's cached embedding matrix
+(app.services.hint_index); with "rpc", or when the exact path can't serve
+the vault, it queries pgvector via the match_hints() RPC function.
 
 If Vertex AI embedding generation is unavailable, falls back to
 returning the most recent hints in chronological order.
@@ -10,12 +13,23 @@ returning the most recent hints in chronological order.
 Step 5.2: Create Hint Retrieval Node
 """
 
+import asyncio
 import logging
-from typing import Any
+from typing import Any, Optional
 
 from app.agents.state import RecommendationState, RelevantHint
+from app.core.config import HINT_SEARCH_MODE
+from app.db.async_client import run_query
 from app.db.supabase_client import get_service_client
 from app.services.embedding import generate_embedding, format_embedding_for_pgvector
+from app.services.hint_index import (
+    HINT_INDEX_MAX_HINTS,
+    build_hint_index,
+    cache_hint_index,
+    get_cached_hint_index,
+    hint_index_version,
+)
+from app.services.lru_cache import MISS
 
 logger = logging.getLogger(__name__)
 
@@ -65,7 +79,8 @@ async def retrieve_relevant_hints(
 
     1. Builds a query from the milestone context or occasion type
     2. Generates an embedding for the query via Vertex AI
-    3. Calls match_hints() RPC to find the top 10 similar hints
+    3. Finds the top 10 similar hints (exact in-process search, or the
+       match_hints() RPC)
     4. Returns the hints as RelevantHint objects in the state update
 
     If embedding generation fails, falls back to returning the most recent
@@ -88,7 +103,7 @@ async def retrieve_relevant_hints(
     embedding = await generate_embedding(query_text)
 
     if embedding is not None:
-        # Step 3a: Semantic search via match_hints() RPC
+        # Step 3a: Semantic search (exact scan or match_hints() RPC)
         hints = await _semantic_search(vault_id, embedding)
     else:
         # Step 3b: Fallback to chronological hints
@@ -108,6 +123,89 @@ async def _semantic_search(
     query_embedding: list[float],
     max_count: int = MAX_HINTS,
     threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+) -> list[RelevantHint]:
+    """
+    Find the vault's hints most similar to the query embedding.
+
+    Uses the exact in-process search when HINT_SEARCH_MODE is "exact",
+    falling back to the match_hints() RPC if the vault is too large to
+    index or the exact path fails.
+
+    Args:
+        vault_id: The vault to search within.
+        query_embedding: 768-dim embedding vector for the query.
+        max_count: Maximum number of hints to return.
+        threshold: Minimum cosine similarity (0.0–1.0).
+
+    Returns:
+        List of RelevantHint objects ordered by similarity (highest first).
+    """
+    if HINT_SEARCH_MODE == "exact":
+        try:
+            hints = await _exact_search(vault_id, query_embedding, max_count, threshold)
+            if hints is not None:
+                return hints
+        except Exception as exc:
+            logger.warning(f"Exact hint search failed, using match_hints(): {exc}")
+
+    return await _match_hints_rpc(vault_id, query_embedding, max_count, threshold)
+
+
+async def _exact_search(
+    vault_id: str,
+    query_embedding: list[float],
+    max_count: int,
+    threshold: float,
+) -> Optional[list[RelevantHint]]:
+    """
+    Exact cosine search over the vault's cached hint matrix.
+
+    Loads and caches the vault's embedded hints on a miss. Returns None
+    when the vault has more than HINT_INDEX_MAX_HINTS hints, leaving it
+    to the RPC. The size is checked with a count-only query first, so a
+    large vault never pulls its embeddings.
+    """
+    index = get_cached_hint_index(vault_id)
+    if index is MISS:
+        version = hint_index_version(vault_id)
+        client = get_service_client()
+        count_result = await run_query(
+            client.table("hints")
+            .select("id", count="exact", head=True)
+            .eq("vault_id", vault_id)
+        )
+        if count_result.count is not None and count_result.count > HINT_INDEX_MAX_HINTS:
+            cache_hint_index(vault_id, None, version)
+            return None
+
+        response = await run_query(
+            client.table("hints")
+            .select("id, hint_text, source, is_used, created_at, hint_embedding")
+            .eq("vault_id", vault_id)
+            .limit(HINT_INDEX_MAX_HINTS + 1)
+        )
+        rows = response.data or []
+        if len(rows) > HINT_INDEX_MAX_HINTS:  # grew since the count
+            index = None
+        else:
+            # Decoding hundreds of 768-dim vectors is CPU work; keep it off the loop
+            index = await asyncio.to_thread(build_hint_index, rows)
+        cache_hint_index(vault_id, index, version)
+
+    if index is None:
+        return None
+
+    return [
+        _to_relevant_hint(row, similarity)
+        for row, similarity in index.search(query_embedding, max_count, threshold)
+    ]
+
+
+async def _match_hints_rpc(
+    vault_id: str,
+    query_embedding: list[float],
+    max_count: int = MAX_HINTS,
+    threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
 ) -> list[RelevantHint]:
     """
     Query pgvector via match_hints() RPC for semantically similar hints.
@@ -125,7 +223,7 @@ async def _semantic_search(
     embedding_str = format_embedding_for_pgvector(query_embedding)
 
     try:
-        response = client.rpc(
+        response = await run_query(client.rpc(
             "match_hints",
             {
                 "query_embedding": embedding_str,
@@ -133,20 +231,13 @@ async def _semantic_search(
                 "match_threshold": threshold,
                 "match_count": max_count,
             },
-        ).execute()
+        ))
 
         if not response.data:
             return []
 
         return [
-            RelevantHint(
-                id=str(row["id"]),
-                hint_text=row["hint_text"],
-                similarity_score=row.get("similarity", 0.0),
-                source=row.get("source", "text_input"),
-                is_used=row.get("is_used", False),
-                created_at=row.get("created_at"),
-            )
+            _to_relevant_hint(row, row.get("similarity", 0.0))
             for row in response.data
         ]
     except Exception as exc:
@@ -154,6 +245,17 @@ async def _semantic_search(
         return []
 
 
+def _to_relevant_hint(row: dict, similarity: float) -> RelevantHint:
+    return RelevantHint(
+        id=str(row["id"]),
+        hint_text=row["hint_text"],
+        similarity_score=similarity,
+        source=row.get("source", "text_input"),
+        is_used=row.get("is_used", False),
+        created_at=row.get("created_at"),
+    )
+
+
 async def _chronological_fallback(
     vault_id: str,
     max_count: int = MAX_HINTS,
@@ -167,13 +269,12 @@ async def _chronological_fallback(
     client = get_service_client()
 
     try:
-        response = (
+        response = await run_query(
             client.table("hints")
             .select("id, hint_text, source, is_used, created_at")
             .eq("vault_id", vault_id)
             .order("created_at", desc=True)
             .limit(max_count)
-            .execute()
         )
 
         if not response.data:
@@ -4,9 +4,26 @@ Recommendation Pipeline — LangGraph graph for the unified recommendation syste
 Chains the recommendation generation nodes into an executable graph:
 1. retrieve_hints — Fetch semantically similar hints from pgvector
 2. generate_unified — Claude generates 3 personalized recommendations
-3. generate_briefing — Claude generates contextual milestone briefing (if milestone present)
-4. resolve_urls — Find real purchase URLs for purchasable items via Brave Search
-5. verify_urls — Confirm URLs are valid, enrich prices via page scraping
+3. resolve_urls — Find real purchase URLs for purchasable items via Brave Search
+4. verify_urls — Confirm URLs are valid, enrich prices via page scraping
+
+generate_briefing — Claude's contextual milestone briefing (if milestone
+present) — only needs the hints and milestone, so it fans out from
+retrieve_hints and runs alongside steps 2-4; both branches end at END and
+LangGraph merges their (disjoint) state updates. Forking at retrieve_hints
+rather than after generate_unified matters: LangGraph runs nodes in
+lock-step supersteps, so a briefing started next to resolve_urls would hold
+verify_urls back until it finished. Started next to generate_unified (~20s),
+it is hidden entirely and pipeline time is max(), not sum(), of the branches.
+
+Every run carries a latency budget (app.agents.budget): the runners stamp
+state.deadline, nodes skip optional work as it runs out, and the final state
+lists what was skipped under "degradations".
+
+Every node is wrapped by app.core.pipeline_metrics.instrument_node, and each
+run is recorded as a pipeline_run: per-node wall time, outbound calls, Claude
+token usage and outcome counters, summarised per request and aggregated into
+process histograms (GET /api/v1/admin/pipeline-metrics).
 
 Conditional edges short-circuit the pipeline on error:
 - If generate_unified returns 0 recommendations → END with error
@@ -16,16 +33,24 @@ Step 15.1: Unified AI Recommendation System — simplified 4-node pipeline
 """
 
 import logging
+from collections.abc import AsyncIterator
 from typing import Any
 
 from langgraph.graph import END, START, StateGraph
 
 from app.agents.availability import verify_availability
 from app.agents.briefing_node import generate_briefing
+from app.agents.budget import pipeline_deadline
 from app.agents.hint_retrieval import retrieve_relevant_hints
 from app.agents.state import RecommendationState
 from app.agents.unified_generation_node import generate_unified
 from app.agents.url_resolution import resolve_purchase_urls
+from app.core.pipeline_metrics import (
+    SHORT_CIRCUIT,
+    count_event,
+    instrument_node,
+    pipeline_run,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +67,7 @@ def _check_after_generation(state: RecommendationState) -> str:
     """
     if not state.final_three:
         logger.warning("Pipeline short-circuit: no recommendations after unified generation")
+        count_event(SHORT_CIRCUIT, node="generate_unified")
         return "error"
     return "continue"
 
@@ -66,28 +92,35 @@ def build_recommendation_graph() -> StateGraph:
     """
     graph = StateGraph(RecommendationState)
 
-    # --- Add nodes ---
-    graph.add_node("retrieve_hints", retrieve_relevant_hints)
-    graph.add_node("generate_unified", generate_unified)
-    graph.add_node("generate_briefing", generate_briefing)
-    graph.add_node("resolve_urls", resolve_purchase_urls)
-    graph.add_node("verify_urls", verify_availability)
+    # --- Add nodes (each instrumented — see app.core.pipeline_metrics) ---
+    nodes = {
+        "retrieve_hints": retrieve_relevant_hints,
+        "generate_unified": generate_unified,
+        "generate_briefing": generate_briefing,
+        "resolve_urls": resolve_purchase_urls,
+        "verify_urls": verify_availability,
+    }
+    for name, node in nodes.items():
+        graph.add_node(name, instrument_node(name, node))
 
     # --- Define edges ---
 
-    # START → retrieve_hints → generate_unified
+    # START → retrieve_hints → (fan-out) generate_unified + generate_briefing
     graph.add_edge(START, "retrieve_hints")
     graph.add_edge("retrieve_hints", "generate_unified")
+    graph.add_edge("retrieve_hints", "generate_briefing")
 
-    # generate_unified → (conditional) generate_briefing or END
+    # Briefing branch: generate_briefing → END
+    graph.add_edge("generate_briefing", END)
+
+    # Recommendation branch: generate_unified → (conditional) resolve_urls or END
     graph.add_conditional_edges(
         "generate_unified",
         _check_after_generation,
-        {"continue": "generate_briefing", "error": END},
+        {"continue": "resolve_urls", "error": END},
     )
 
-    # generate_briefing → resolve_urls → verify_urls → END
-    graph.add_edge("generate_briefing", "resolve_urls")
+    # resolve_urls → verify_urls → END
     graph.add_edge("resolve_urls", "verify_urls")
     graph.add_edge("verify_urls", END)
 
@@ -121,6 +154,8 @@ async def run_recommendation_pipeline(
         A dict with the final pipeline state, including:
         - "final_three": list of 3 verified recommendations (or fewer)
         - "error": error message string if the pipeline short-circuited
+        - "degradations": optional steps skipped to stay within the
+          latency budget (app.agents.budget)
         - All intermediate state fields (relevant_hints, etc.)
     """
     logger.info(
@@ -129,11 +164,70 @@ async def run_recommendation_pipeline(
         state.occasion_type,
     )
 
-    result = await recommendation_graph.ainvoke(state)
+    with pipeline_run(state.vault_data.vault_id) as run:
+        result = await recommendation_graph.ainvoke(_with_deadline(state))
+        run.finish(result)
+    _log_outcome(state, result)
+    return result
+
+
+async def stream_recommendation_pipeline(
+    state: RecommendationState,
+) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+    """
+    Run the pipeline, yielding node progress events as they happen.
+
+    Same graph and final state as run_recommendation_pipeline, but run with
+    LangGraph's custom stream mode so the events nodes publish through
+    app.agents.progress.emit_progress reach the caller.
+
+    Args:
+        state: A populated RecommendationState (see run_recommendation_pipeline).
+
+    Yields:
+        ("progress", {"event": ..., ...}) for each node event, then exactly
+        one ("result", final_state) once the graph finishes.
+    """
+    logger.info(
+        "Starting streamed recommendation pipeline for vault %s (occasion: %s)",
+        state.vault_data.vault_id,
+        state.occasion_type,
+    )
+
+    result: dict[str, Any] = {}
+    with pipeline_run(state.vault_data.vault_id) as run:
+        async for mode, chunk in recommendation_graph.astream(
+            _with_deadline(state), stream_mode=["custom", "values"],
+        ):
+            if mode == "custom":
+                yield "progress", chunk
+            else:
+                result = chunk
+        run.finish(result)
+
+    _log_outcome(state, result)
+    yield "result", result
+
+
+def _with_deadline(state: RecommendationState) -> RecommendationState:
+    """Start the latency budget clock unless the caller already set a deadline."""
+    if state.deadline is not None:
+        return state
+    return state.model_copy(update={"deadline": pipeline_deadline()})
+
 
-    # Log outcome
+def _log_outcome(state: RecommendationState, result: dict[str, Any]) -> None:
+    """Log the pipeline's final outcome for a vault."""
     final_three = result.get("final_three", [])
     error = result.get("error")
+    degradations = result.get("degradations") or []
+
+    if degradations:
+        logger.warning(
+            "Pipeline degraded to meet its latency budget for vault %s: %s",
+            state.vault_data.vault_id,
+            degradations,
+        )
 
     if error:
         logger.warning(
@@ -148,5 +242,3 @@ async def run_recommendation_pipeline(
             len(final_three),
             [r.title for r in final_three],
         )
-
-    return result
@@ -0,0 +1,37 @@
+"""
+Pipeline Progress Events — Per-node progress for streaming clients.
+
+Nodes call emit_progress() at the points a streaming client cares about
+(a card generated, a card's URL resolved, a card verified, the briefing).
+Events go to LangGraph's custom stream, so they only surface when the graph
+is run with stream_mode="custom" (see stream_recommendation_pipeline in
+app.agents.pipeline). Under a plain ainvoke(), or when a node is called
+directly outside a graph run, emit_progress() is a no-op.
+
+Event names:
+    card           — a shown card was generated (index, candidate)
+    card_resolved  — URL resolution finished for a shown card (index, candidate);
+                     ideas pass through with no URL
+    card_verified  — a slot's final, verified card (index, candidate); may be
+                     a swapped-in replacement for the card first sent
+    briefing       — the milestone briefing (briefing_text, briefing_snippet)
+"""
+
+from typing import Any
+
+from langgraph.config import get_stream_writer
+
+CARD = "card"
+CARD_RESOLVED = "card_resolved"
+CARD_VERIFIED = "card_verified"
+BRIEFING = "briefing"
+
+
+def emit_progress(event: str, **data: Any) -> None:
+    """Publish a progress event to the running graph's custom stream, if any."""
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        # Called outside a graph run (direct node calls, unit tests)
+        return
+    writer({"event": event, **data})
@@ -14,7 +14,8 @@ Step 15.1: Unified AI recommendation system — Claude generates all recommendat
 
 from __future__ import annotations
 
-from typing import Any, Literal, Optional
+import operator
+from typing import Annotated, Any, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -187,6 +188,9 @@ class RecommendationState(BaseModel):
     excluded_descriptions: list[str] = Field(default_factory=list)
     vibe_override: Optional[list[str]] = None
     rejection_reason: Optional[str] = None
+    # time.monotonic() deadline for the whole run (app.agents.budget); set by
+    # the pipeline runners. None means no latency budget.
+    deadline: Optional[float] = None
 
     # --- Populated by graph nodes ---
     relevant_hints: list[RelevantHint] = Field(default_factory=list)
@@ -197,6 +201,12 @@ class RecommendationState(BaseModel):
         default_factory=list
     )
     final_three: list[CandidateRecommendation] = Field(default_factory=list)
+    # IDs in final_three whose URL resolution already ran while generation was
+    # still streaming; resolve_purchase_urls skips them.
+    url_resolved_ids: list[str] = Field(default_factory=list)
+    # IDs in final_three left unresolved because Brave was rate limiting;
+    # verify_availability keeps them rather than swapping.
+    url_throttled_ids: list[str] = Field(default_factory=list)
 
     # --- Populated by briefing node ---
     briefing_text: Optional[str] = None
@@ -205,3 +215,6 @@ class RecommendationState(BaseModel):
 
     # --- Error/status tracking ---
     error: Optional[str] = None
+    # Optional work skipped to stay within the deadline (app.agents.budget).
+    # Appended to by both branches, so updates are concatenated, not replaced.
+    degradations: Annotated[list[str], operator.add] = Field(default_factory=list)
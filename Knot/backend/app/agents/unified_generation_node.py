@@ -4,21 +4,88 @@ Unified Generation Node — LangGraph node wrapping the unified generation servi
 Calls Claude to generate all 3 recommendations in a single call,
 producing a mix of purchasable items and personalized ideas.
 
+With UNIFIED_GENERATION_STREAMING on, the response is streamed and URL
+resolution for each shown card starts as soon as Claude finishes writing it,
+overlapping Brave lookups for card 1 with generation of cards 2-5. The
+resolved IDs are recorded in url_resolved_ids so resolve_urls skips them.
+
+Retries are skipped once the pipeline's latency budget (state.deadline) can't
+cover another Claude call; the node reports that as a degradation.
+
 Step 15.1: Unified AI Recommendation System
 """
 
+import asyncio
 import logging
 from typing import Any
 
-from app.agents.state import RecommendationState
+from app.agents.budget import collect_degradations
+from app.agents.progress import CARD, CARD_RESOLVED, emit_progress
+from app.agents.state import CandidateRecommendation, RecommendationState
+from app.agents.url_resolution import resolve_candidate_url
+from app.core.config import UNIFIED_GENERATION_STREAMING
 from app.services.unified_generation import (
     PRIMARY_RECOMMENDATION_COUNT,
     generate_unified_recommendations,
+    stream_unified_recommendations,
 )
 
 logger = logging.getLogger(__name__)
 
 
+async def _generate_streaming(
+    state: RecommendationState,
+) -> tuple[list[CandidateRecommendation], dict[str, CandidateRecommendation]]:
+    """
+    Consume the streaming generator, resolving each shown card's URL as it lands.
+
+    Returns:
+        (recommendations in generation order, URL-resolved shown cards by ID).
+        A shown card whose resolution failed is left out of the map, so
+        resolve_urls retries it.
+    """
+    recommendations: list[CandidateRecommendation] = []
+    resolutions: list[asyncio.Task] = []
+
+    async def _resolve(index: int, candidate: CandidateRecommendation) -> CandidateRecommendation:
+        resolved = await resolve_candidate_url(candidate)
+        emit_progress(CARD_RESOLVED, index=index, candidate=resolved)
+        return resolved
+
+    try:
+        async for candidate in stream_unified_recommendations(
+            vault_data=state.vault_data,
+            hints=state.relevant_hints,
+            occasion_type=state.occasion_type,
+            budget_range=state.budget_range,
+            milestone_context=state.milestone_context,
+            excluded_titles=state.excluded_titles,
+            excluded_descriptions=state.excluded_descriptions,
+            vibe_override=state.vibe_override,
+            rejection_reason=state.rejection_reason,
+            deadline=state.deadline,
+        ):
+            index = len(recommendations)
+            if index < PRIMARY_RECOMMENDATION_COUNT:
+                emit_progress(CARD, index=index, candidate=candidate)
+                resolutions.append(asyncio.create_task(_resolve(index, candidate)))
+            recommendations.append(candidate)
+
+        results = await asyncio.gather(*resolutions, return_exceptions=True)
+    except BaseException:
+        for task in resolutions:
+            task.cancel()
+        raise
+
+    resolved: dict[str, CandidateRecommendation] = {}
+    for result in results:
+        if isinstance(result, BaseException):
+            logger.warning("Early URL resolution failed: %s", result)
+            continue
+        resolved[result.id] = result
+    return recommendations, resolved
+
+
 async def generate_unified(
     state: RecommendationState,
 ) -> dict[str, Any]:
@@ -36,24 +103,34 @@ async def generate_unified(
         A dict with "final_three" (the 3 recommendations shown to the user) and
         "filtered_recommendations" (any over-generated surplus, used by the URL
         pipeline as a swap pool when a purchasable resolves no real booking page),
-        or "error" if generation failed.
+        plus "url_resolved_ids" for shown cards already URL-resolved while
+        streaming, or "error" if generation failed; "degradations" lists
+        any retries skipped for the latency budget.
     """
     logger.info(
         "Generating unified recommendations for vault %s",
         state.vault_data.vault_id,
     )
 
-    recommendations = await generate_unified_recommendations(
-        vault_data=state.vault_data,
-        hints=state.relevant_hints,
-        occasion_type=state.occasion_type,
-        budget_range=state.budget_range,
-        milestone_context=state.milestone_context,
-        excluded_titles=state.excluded_titles,
-        excluded_descriptions=state.excluded_descriptions,
-        vibe_override=state.vibe_override,
-        rejection_reason=state.rejection_reason,
-    )
+    resolved: dict[str, CandidateRecommendation] = {}
+    with collect_degradations() as degradations:
+        if UNIFIED_GENERATION_STREAMING:
+            recommendations, resolved = await _generate_streaming(state)
+        else:
+            recommendations = await generate_unified_recommendations(
+                vault_data=state.vault_data,
+                hints=state.relevant_hints,
+                occasion_type=state.occasion_type,
+                budget_range=state.budget_range,
+                milestone_context=state.milestone_context,
+                excluded_titles=state.excluded_titles,
+                excluded_descriptions=state.excluded_descriptions,
+                vibe_override=state.vibe_override,
+                rejection_reason=state.rejection_reason,
+                deadline=state.deadline,
+            )
+            for index, candidate in enumerate(recommendations[:PRIMARY_RECOMMENDATION_COUNT]):
+                emit_progress(CARD, index=index, candidate=candidate)
 
     if not recommendations:
         logger.error(
@@ -63,6 +140,7 @@ async def generate_unified(
         return {
             "final_three": [],
             "error": "Unable to generate recommendations. Please try again.",
+            "degradations": degradations,
         }
 
     logger.info(
@@ -74,10 +152,14 @@ async def generate_unified(
     # First 3 are the shown cards; any surplus becomes the swap pool for the
     # URL-resolution/availability stage (so an unbookable purchasable can be
     # replaced by a spare that resolves a real page, or by a spare idea).
-    final_three = recommendations[:PRIMARY_RECOMMENDATION_COUNT]
+    final_three = [
+        resolved.get(r.id, r) for r in recommendations[:PRIMARY_RECOMMENDATION_COUNT]
+    ]
     backups = recommendations[PRIMARY_RECOMMENDATION_COUNT:]
 
     return {
         "final_three": final_three,
         "filtered_recommendations": backups,
+        "url_resolved_ids": list(resolved),
+        "degradations": degradations,
     }
@@ -5,7 +5,10 @@ For each purchasable item (gift, experience, date) in the final_three,
 performs a targeted Brave Search using the search_query provided by Claude,
 then picks the best matching result URL.
 
-Ideas (is_idea=True) skip URL resolution entirely.
+Ideas (is_idea=True) skip URL resolution entirely. Lookups are skipped, or cut
+off, when the pipeline's latency budget (state.deadline) runs out; the cards
+stay unresolved and verify_availability fills their slots. Cards Brave's rate
+limit left unresolved are reported in url_throttled_ids.
 
 Step 15.1: Unified AI Recommendation System
 """
@@ -17,8 +20,20 @@ from urllib.parse import parse_qs, urlparse
 
 import httpx
 
+from app.agents.budget import (
+    BRAVE_THROTTLED,
+    SKIPPED_URL_RESOLUTION,
+    URL_RESOLUTION_MIN_SECONDS,
+    has_budget,
+    remaining,
+)
+from app.agents.progress import CARD_RESOLVED, emit_progress
 from app.agents.state import CandidateRecommendation, LocationData, RecommendationState
 from app.core.config import BRAVE_SEARCH_API_KEY, is_brave_search_configured
+from app.core.http_clients import upstream_client
+from app.services.brave_cache import cache_search_result, get_cached_search_result
+from app.services.brave_limiter import BraveThrottled, brave_get
+from app.services.lru_cache import MISS
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +44,7 @@ logger = logging.getLogger(__name__)
 BRAVE_SEARCH_URL = "https://api.search.brave.com/res/v1/web/search"
 BRAVE_TIMEOUT = 10.0
 RESULTS_PER_QUERY = 10
+BRAVE_SEARCH_LANG = "en"
 
 # General search engines — we must never hand the user a Google/Bing-style results,
 # comparison, or cache page. These are registrable domains; `_is_rejected_domain`
@@ -234,11 +250,26 @@ async def _search_for_purchase_url(
     best-scoring surviving result (preferring known commerce/ticketing domains and
     buy/book paths). Never returns a web-search or listing link.
 
+    Outcomes of successful searches — a URL or "nothing suitable" — are
+    cached per normalized query (app.services.brave_cache); failed searches
+    are not. Requests go through the shared Brave rate limiter, which waits
+    out a 429 and retries once before this gives up.
+
     Returns the best real page URL, or None if nothing suitable was found.
+
+    Raises:
+        BraveThrottled: Brave is rate limiting (a 429 outlasted the retry, or
+            no limiter token came in time), so the search says nothing about
+            whether a purchase page exists.
     """
     if not is_brave_search_configured():
         return None
 
+    cached = await get_cached_search_result(search_query, BRAVE_SEARCH_LANG)
+    if cached is not MISS:
+        logger.debug("Brave cache hit for: %s", search_query[:60])
+        return cached
+
     headers = {
         "Accept": "application/json",
         "Accept-Encoding": "gzip",
@@ -248,12 +279,13 @@ async def _search_for_purchase_url(
         "q": search_query,
         "count": RESULTS_PER_QUERY,
         "text_decorations": False,
-        "search_lang": "en",
+        "search_lang": BRAVE_SEARCH_LANG,
     }
 
     try:
-        async with httpx.AsyncClient(timeout=BRAVE_TIMEOUT) as client:
-            response = await client.get(
+        async with upstream_client("brave", timeout=BRAVE_TIMEOUT) as client:
+            response = await brave_get(
+                client,
                 BRAVE_SEARCH_URL,
                 headers=headers,
                 params=params,
@@ -261,7 +293,7 @@ async def _search_for_purchase_url(
 
             if response.status_code == 429:
                 logger.warning("Brave Search rate limited for query: %s", search_query[:60])
-                return None
+                raise BraveThrottled(f"Brave Search returned 429 for: {search_query[:60]}")
 
             response.raise_for_status()
             data = response.json()
@@ -282,6 +314,7 @@ async def _search_for_purchase_url(
 
             if best_url is None:
                 logger.debug("No suitable purchase URL found for: %s", search_query[:60])
+            await cache_search_result(search_query, BRAVE_SEARCH_LANG, best_url)
             return best_url
 
     except (httpx.TimeoutException, httpx.HTTPError) as exc:
@@ -318,6 +351,52 @@ def _localize_search_query(
     return f"{search_query} {locale}".strip()
 
 
+# ======================================================================
+# Per-candidate resolution
+# ======================================================================
+
+async def resolve_candidate_url(
+    candidate: CandidateRecommendation,
+) -> CandidateRecommendation:
+    """
+    Resolve the purchase URL for a single candidate.
+
+    Ideas and candidates without a search_query are returned unchanged. A
+    purchasable with no real purchase page comes back with external_url None,
+    so the availability node swaps it. BraveThrottled propagates: a throttled
+    search is not evidence that no page exists.
+
+    Used by resolve_purchase_urls and by the streaming generation node, which
+    starts resolving each card as soon as Claude finishes writing it.
+    """
+    # Skip ideas — no URL needed
+    if candidate.is_idea or not candidate.search_query:
+        return candidate
+
+    # Keep location-bound experiences (date/experience carry a location)
+    # resolving to a LOCAL result even if Claude omitted the city.
+    query = _localize_search_query(candidate.search_query, candidate.location)
+
+    url = await _search_for_purchase_url(
+        search_query=query,
+        merchant_name=candidate.merchant_name,
+    )
+
+    if url:
+        logger.info(
+            "Resolved URL for '%s': %s",
+            candidate.title, url,
+        )
+        return candidate.model_copy(update={"external_url": url})
+
+    # No real purchase page — leave external_url None so availability swaps it.
+    logger.info(
+        "No dedicated purchase page for '%s' — marking for replacement",
+        candidate.title,
+    )
+    return candidate.model_copy(update={"external_url": None})
+
+
 # ======================================================================
 # LangGraph node
 # ======================================================================
@@ -334,14 +413,19 @@ async def resolve_purchase_urls(
 
     If resolution fails, the item's external_url is left None — a signal to the
     downstream availability node to SWAP it for a bookable spare (or an idea).
-    We never synthesize a web-search link.
+    We never synthesize a web-search link. Items left unresolved because Brave
+    was rate limiting are listed in url_throttled_ids instead, so availability
+    keeps them rather than searching for swaps against the same limit.
 
     Args:
         state: The current RecommendationState with final_three populated
                by the generate_unified node.
 
     Returns:
-        A dict with "final_three" containing updated candidates with URLs.
+        A dict with "final_three" containing updated candidates with URLs,
+        "url_throttled_ids" for items Brave's rate limit left unresolved, and
+        "degradations" if lookups were skipped for the latency budget or
+        throttled.
     """
     selected = list(state.final_three)
 
@@ -354,37 +438,51 @@ async def resolve_purchase_urls(
         len(selected),
     )
 
-    # Run all URL searches in parallel
-    async def _resolve_single(candidate: CandidateRecommendation) -> CandidateRecommendation:
-        # Skip ideas — no URL needed
-        if candidate.is_idea or not candidate.search_query:
-            return candidate
-
-        # Keep location-bound experiences (date/experience carry a location)
-        # resolving to a LOCAL result even if Claude omitted the city.
-        query = _localize_search_query(candidate.search_query, candidate.location)
+    # Streaming generation already resolved these while later cards were
+    # still being generated — don't search for them twice.
+    already_resolved = set(state.url_resolved_ids)
 
-        url = await _search_for_purchase_url(
-            search_query=query,
-            merchant_name=candidate.merchant_name,
+    pending = [c for c in selected if not c.is_idea and c.id not in already_resolved]
+    if pending and not has_budget(state.deadline, URL_RESOLUTION_MIN_SECONDS):
+        logger.warning(
+            "Latency budget nearly spent — skipping URL resolution for %d recommendations",
+            len(pending),
         )
+        return {"final_three": selected, "degradations": [SKIPPED_URL_RESOLUTION]}
 
-        if url:
-            logger.info(
-                "Resolved URL for '%s': %s",
-                candidate.title, url,
-            )
-            return candidate.model_copy(update={"external_url": url})
+    timed_out = False
+    throttled_ids: list[str] = []
 
-        # No real purchase page — leave external_url None so availability swaps it.
-        logger.info(
-            "No dedicated purchase page for '%s' — marking for replacement",
-            candidate.title,
-        )
-        return candidate.model_copy(update={"external_url": None})
+    async def _resolve_single(index: int, candidate: CandidateRecommendation) -> CandidateRecommendation:
+        nonlocal timed_out
+        if candidate.id in already_resolved:
+            return candidate
+        try:
+            resolved = await asyncio.wait_for(
+                resolve_candidate_url(candidate),
+                # Ideas return at once; only real lookups are held to the budget.
+                timeout=None if candidate.is_idea else remaining(state.deadline),
+            )
+        except asyncio.TimeoutError:
+            logger.warning(
+                "URL resolution for '%s' ran past the latency budget — leaving it unresolved",
+                candidate.title,
+            )
+            timed_out = True
+            return candidate
+        except BraveThrottled as exc:
+            logger.warning(
+                "URL resolution for '%s' throttled by Brave (%s) — leaving it unresolved",
+                candidate.title, exc,
+            )
+            throttled_ids.append(candidate.id)
+            return candidate
+        emit_progress(CARD_RESOLVED, index=index, candidate=resolved)
+        return resolved
 
+    # Run all URL searches in parallel
     resolved = await asyncio.gather(
-        *[_resolve_single(c) for c in selected],
+        *[_resolve_single(i, c) for i, c in enumerate(selected)],
     )
 
     logger.info(
@@ -395,4 +493,13 @@ async def resolve_purchase_urls(
         ],
     )
 
-    return {"final_three": list(resolved)}
+    update: dict[str, Any] = {"final_three": list(resolved)}
+    degradations = []
+    if timed_out:
+        degradations.append(SKIPPED_URL_RESOLUTION)
+    if throttled_ids:
+        update["url_throttled_ids"] = throttled_ids
+        degradations.append(BRAVE_THROTTLED)
+    if degradations:
+        update["degradations"] = degradations
+    return update
@@ -0,0 +1,101 @@
+"""
+Admin API — Operational introspection for maintainers.
+
+GET /api/v1/admin/pipeline-metrics — Recommendation pipeline timing, calls,
+                                     token usage and outcome counters
+GET /api/v1/admin/cache-stats       — Hit/miss counters and occupancy of the
+                                     in-process and disk caches
+
+Every route requires the X-Admin-Token header to match ADMIN_API_TOKEN and is
+disabled (403) when that is unset. Metrics are per worker process; the
+response carries the worker's pid.
+"""
+
+import os
+
+from fastapi import APIRouter, Depends, Query, status
+
+from app.core.config import PIPELINE_METRICS_RECENT_RUNS
+from app.core.pipeline_metrics import get_pipeline_metrics
+from app.core.security import get_account_status_cache_stats, require_admin_token
+from app.services.brave_cache import get_brave_cache_stats
+from app.services.embedding import get_embedding_cache_stats
+from app.services.hint_index import get_hint_index_stats
+from app.services.page_cache import get_page_cache_stats
+from app.services.vault_cache import get_vault_cache_stats
+
+router = APIRouter(
+    prefix="/api/v1/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_admin_token)],
+)
+
+
+# ===================================================================
+# GET /api/v1/admin/pipeline-metrics — Pipeline Instrumentation
+# ===================================================================
+
+@router.get(
+    "/pipeline-metrics",
+    status_code=status.HTTP_200_OK,
+)
+async def pipeline_metrics(
+    recent: int = Query(20, ge=0, le=PIPELINE_METRICS_RECENT_RUNS),
+) -> dict:
+    """
+    Return this worker's recommendation pipeline metrics.
+
+    - runs: pipeline runs by outcome (ok, error, failed, abandoned)
+    - pipeline_seconds / nodes: wall-time histograms (count, sum, mean,
+      p50/p95/p99 at bucket resolution, bucket counts) per run and per node
+    - upstreams: outbound calls, errors and latency per upstream (anthropic,
+      brave, merchants, ...)
+    - tokens: Claude usage per call site
+    - events: retries, swaps, idea fallbacks, short-circuits, errors and
+      degradations per node
+    - recent: the latest per-run summaries, newest first
+
+    Returns:
+        200: The metrics snapshot.
+        401: Missing or wrong X-Admin-Token.
+        403: Admin endpoints are disabled (ADMIN_API_TOKEN unset).
+    """
+    return get_pipeline_metrics(recent=recent)
+
+
+# ===================================================================
+# GET /api/v1/admin/cache-stats — Cache Hit Rates
+# ===================================================================
+
+@router.get(
+    "/cache-stats",
+    status_code=status.HTTP_200_OK,
+)
+async def cache_stats() -> dict:
+    """
+    Return this worker's cache counters, for sizing the caches.
+
+    - vault: vault data, vault id and learned-weights caches
+    - embeddings: query-embedding memory and disk tiers
+    - brave: Brave result lookups, memory tiers and disk tier
+    - pages: merchant page lookups (fresh, revalidated, changed, ...)
+    - hint_index: per-vault exact-search index cache
+    - account_status: pending-deletion gate caches (pending / not pending)
+
+    The same hits and misses are exported at GET /metrics as
+    knot_cache_lookups_total, merged across workers.
+
+    Returns:
+        200: The cache counters.
+        401: Missing or wrong X-Admin-Token.
+        403: Admin endpoints are disabled (ADMIN_API_TOKEN unset).
+    """
+    return {
+        "pid": os.getpid(),
+        "vault": get_vault_cache_stats(),
+        "embeddings": get_embedding_cache_stats(),
+        "brave": get_brave_cache_stats(),
+        "pages": get_page_cache_stats(),
+        "hint_index": get_hint_index_stats(),
+        "account_status": get_account_status_cache_stats(),
+    }
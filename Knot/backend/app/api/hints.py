@@ -9,21 +9,28 @@ Step 4.4: POST /api/v1/hints — Now generates 768-dim embeddings via Vertex AI
           GET /api/v1/hints — List hints for the authenticated user
 Step 4.6: DELETE /api/v1/hints/{hint_id} — Delete a hint
 Step 14.11: Trigger background idea generation via QStash after hint creation
+
+POST /api/v1/hints/backfill-embeddings — QStash webhook that embeds hints
+stored with a NULL embedding (app.services.embedding_backfill)
 """
 
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 
 from app.core.security import get_active_user_id
+from app.db.async_client import run_query
 from app.db.supabase_client import get_service_client
 from app.models.hints import (
+    EmbeddingBackfillResponse,
     HintCreateRequest,
     HintCreateResponse,
     HintListResponse,
     HintResponse,
 )
 from app.services.embedding import generate_embedding, format_embedding_for_pgvector
+from app.services.embedding_backfill import run_embedding_backfill
+from app.services.hint_index import invalidate_hint_index
 
 logger = logging.getLogger(__name__)
 
@@ -67,11 +74,10 @@ async def create_hint(
     client = get_service_client()
 
     # --- 1. Look up the user's vault_id ---
-    vault_result = (
+    vault_result = await run_query(
         client.table("partner_vaults")
         .select("id")
         .eq("user_id", user_id)
-        .execute()
     )
 
     if not vault_result.data:
@@ -83,7 +89,8 @@ async def create_hint(
     vault_id = vault_result.data[0]["id"]
 
     # --- 2. Generate embedding via Vertex AI (async, non-blocking) ---
-    embedding = await generate_embedding(payload.hint_text)
+    # One-off text: keep it out of the query-embedding cache
+    embedding = await generate_embedding(payload.hint_text, use_cache=False)
 
     if embedding is not None:
         logger.info(
@@ -108,16 +115,18 @@ async def create_hint(
         hint_data["hint_embedding"] = format_embedding_for_pgvector(embedding)
 
     try:
-        hint_result = (
+        hint_result = await run_query(
             client.table("hints")
             .insert(hint_data)
-            .execute()
         )
     except Exception as exc:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create hint: {exc}",
         )
+    finally:
+        # Drop the vault's cached search index whether or not the insert landed
+        invalidate_hint_index(vault_id)
 
     if not hint_result.data:
         raise HTTPException(
@@ -197,11 +206,10 @@ async def list_hints(
     client = get_service_client()
 
     # --- 1. Look up the user's vault_id ---
-    vault_result = (
+    vault_result = await run_query(
         client.table("partner_vaults")
         .select("id")
         .eq("user_id", user_id)
-        .execute()
     )
 
     if not vault_result.data:
@@ -214,21 +222,19 @@ async def list_hints(
 
     # --- 2. Fetch hints (newest first) ---
     # Select all columns except hint_embedding (large vector, not needed for display)
-    hints_result = (
+    hints_result = await run_query(
         client.table("hints")
         .select("id, hint_text, source, is_used, created_at")
         .eq("vault_id", vault_id)
         .order("created_at", desc=True)
         .range(offset, offset + limit - 1)
-        .execute()
     )
 
     # --- 3. Get total count ---
-    count_result = (
+    count_result = await run_query(
         client.table("hints")
         .select("id", count="exact")
         .eq("vault_id", vault_id)
-        .execute()
     )
 
     total = count_result.count if count_result.count is not None else len(hints_result.data or [])
@@ -273,11 +279,10 @@ async def delete_hint(
     client = get_service_client()
 
     # --- 1. Look up the user's vault_id ---
-    vault_result = (
+    vault_result = await run_query(
         client.table("partner_vaults")
         .select("id")
         .eq("user_id", user_id)
-        .execute()
     )
 
     if not vault_result.data:
@@ -289,12 +294,11 @@ async def delete_hint(
     vault_id = vault_result.data[0]["id"]
 
     # --- 2. Verify the hint exists and belongs to this user's vault ---
-    hint_result = (
+    hint_result = await run_query(
         client.table("hints")
         .select("id")
         .eq("id", hint_id)
         .eq("vault_id", vault_id)
-        .execute()
     )
 
     if not hint_result.data:
@@ -305,9 +309,91 @@ async def delete_hint(
 
     # --- 3. Delete the hint ---
     try:
-        client.table("hints").delete().eq("id", hint_id).execute()
+        await run_query(client.table("hints").delete().eq("id", hint_id))
     except Exception as exc:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to delete hint: {exc}",
         )
+    finally:
+        invalidate_hint_index(vault_id)
+
+
+# ===================================================================
+# POST /api/v1/hints/backfill-embeddings — Embedding Backfill (QStash)
+# ===================================================================
+
+@router.post(
+    "/backfill-embeddings",
+    status_code=status.HTTP_200_OK,
+    response_model=EmbeddingBackfillResponse,
+    include_in_schema=False,
+)
+async def backfill_hint_embeddings(request: Request) -> EmbeddingBackfillResponse:
+    """
+    QStash webhook that embeds hints stored with a NULL embedding.
+
+    Runs one time-boxed pass of the backfill job, which checkpoints after
+    every page. If hints remain when the time budget runs out, the
+    endpoint queues itself again via QStash so the backfill continues
+    from the checkpoint until it completes.
+
+    The endpoint verifies the QStash signature before processing.
+
+    Returns:
+        200: Backfill pass finished (see status).
+        401: Invalid QStash signature.
+        500: Backfill failed (the checkpoint is kept for the retry).
+        503: Vertex AI embedded nothing (likely an outage); QStash retries
+             from the checkpoint.
+    """
+    from app.core.config import WEBHOOK_BASE_URL, is_qstash_configured
+    from app.services.qstash import publish_to_qstash, verify_qstash_signature
+
+    if not is_qstash_configured():
+        logger.warning("QStash not configured — rejecting embedding backfill")
+        return EmbeddingBackfillResponse(status="skipped")
+
+    body = await request.body()
+    signature = request.headers.get("upstash-signature", "")
+    try:
+        verify_qstash_signature(signature, body, str(request.url))
+    except ValueError as exc:
+        logger.warning("QStash signature verification failed: %s", exc)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid QStash signature.",
+        )
+
+    try:
+        result = await run_embedding_backfill()
+    except Exception as exc:
+        logger.error("Embedding backfill failed: %s", exc, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Embedding backfill failed. Check server logs.",
+        )
+
+    if result["status"] == "error":
+        # Non-2xx so QStash retries with backoff instead of dropping the run
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Embedding backfill could not embed hints. Retry later.",
+        )
+
+    response = EmbeddingBackfillResponse(**result)
+
+    # --- Continue from the checkpoint in a fresh request ---
+    if result["status"] == "partial" and WEBHOOK_BASE_URL:
+        try:
+            await publish_to_qstash(
+                destination_url=f"{WEBHOOK_BASE_URL}/api/v1/hints/backfill-embeddings",
+                body={"cursor": result["cursor"]},
+                deduplication_id=f"hint-embedding-backfill-{result['cursor']}",
+            )
+            response.requeued = True
+        except Exception as exc:
+            # The checkpoint is saved; the next scheduled run picks it up
+            logger.warning("Failed to requeue embedding backfill: %s", exc)
+
+    return response
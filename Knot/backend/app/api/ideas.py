@@ -17,6 +17,7 @@ import logging
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 
 from app.core.security import get_active_user_id
+from app.db.async_client import run_query
 from app.db.supabase_client import get_service_client
 from app.models.recommendations import (
     IdeaContentSection,
@@ -26,7 +27,7 @@ from app.models.recommendations import (
     IdeaListResponse,
 )
 from app.services.idea_generation import generate_ideas
-from app.services.vault_loader import load_vault_data
+from app.services.vault_loader import load_vault_data, load_vault_id
 
 logger = logging.getLogger(__name__)
 
@@ -49,13 +50,12 @@ async def _load_recent_hints(vault_id: str, max_count: int = 10):
 
     client = get_service_client()
     try:
-        response = (
+        response = await run_query(
             client.table("hints")
             .select("id, hint_text, source, is_used, created_at")
             .eq("vault_id", vault_id)
             .order("created_at", desc=True)
             .limit(max_count)
-            .execute()
         )
         if not response.data:
             return []
@@ -190,7 +190,7 @@ async def generate_knot_ideas(
         })
 
     try:
-        db_result = client.table("recommendations").insert(rec_rows).execute()
+        db_result = await run_query(client.table("recommendations").insert(rec_rows))
     except Exception as exc:
         logger.error(
             "Failed to store ideas for vault %s: %s", vault_id, exc,
@@ -253,13 +253,7 @@ async def list_ideas(
 
     # 1. Get vault_id
     try:
-        vault_result = (
-            client.table("partner_vaults")
-            .select("id")
-            .eq("user_id", user_id)
-            .limit(1)
-            .execute()
-        )
+        vault_id = await load_vault_id(client, user_id)
     except Exception as exc:
         logger.error("Failed to look up vault: %s", exc)
         raise HTTPException(
@@ -267,24 +261,21 @@ async def list_ideas(
             detail="Failed to look up vault.",
         )
 
-    if not vault_result.data:
+    if vault_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No partner vault found. Complete onboarding first.",
         )
 
-    vault_id = vault_result.data[0]["id"]
-
     # 2. Fetch ideas (is_idea=True recommendations)
     try:
-        ideas_result = (
+        ideas_result = await run_query(
             client.table("recommendations")
             .select("*", count="exact")
             .eq("vault_id", vault_id)
             .eq("is_idea", True)
             .order("created_at", desc=True)
             .range(offset, offset + limit - 1)
-            .execute()
         )
     except Exception as exc:
         logger.error("Failed to load ideas for vault %s: %s", vault_id, exc)
@@ -328,13 +319,7 @@ async def get_idea(
 
     # 1. Get vault_id
     try:
-        vault_result = (
-            client.table("partner_vaults")
-            .select("id")
-            .eq("user_id", user_id)
-            .limit(1)
-            .execute()
-        )
+        vault_id = await load_vault_id(client, user_id)
     except Exception as exc:
         logger.error("Failed to look up vault: %s", exc)
         raise HTTPException(
@@ -342,23 +327,20 @@ async def get_idea(
             detail="Failed to look up vault.",
         )
 
-    if not vault_result.data:
+    if vault_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No partner vault found.",
         )
 
-    vault_id = vault_result.data[0]["id"]
-
     # 2. Fetch the idea
     try:
-        rec_result = (
+        rec_result = await run_query(
             client.table("recommendations")
             .select("*")
             .eq("id", idea_id)
             .eq("is_idea", True)
             .limit(1)
-            .execute()
         )
     except Exception as exc:
         logger.error("Failed to fetch idea %s: %s", idea_id, exc)
@@ -489,7 +471,7 @@ async def generate_ideas_background(
         })
 
     try:
-        client.table("recommendations").insert(rec_rows).execute()
+        await run_query(client.table("recommendations").insert(rec_rows))
     except Exception as exc:
         logger.error("Failed to store background ideas: %s", exc, exc_info=True)
         return {"status": "error", "reason": "db_insert_failed"}
@@ -16,6 +16,7 @@ from datetime import date
 from fastapi import APIRouter, Depends, HTTPException, status
 
 from app.core.security import get_active_user_id
+from app.db.async_client import run_query
 from app.db.supabase_client import get_service_client
 from app.models.milestones import (
     MilestoneCreateRequest,
@@ -27,6 +28,8 @@ from app.services.notification_scheduler import (
     compute_next_occurrence,
     schedule_milestone_notifications,
 )
+from app.services.vault_cache import invalidate_vault
+from app.services.vault_loader import load_vault_id
 
 logger = logging.getLogger(__name__)
 
@@ -37,21 +40,15 @@ router = APIRouter(prefix="/api/v1/milestones", tags=["milestones"])
 # Helpers
 # ===================================================================
 
-def _get_vault_id(client, user_id: str) -> str:
-    """Look up the user's vault ID. Raises 404 if not found."""
-    result = (
-        client.table("partner_vaults")
-        .select("id")
-        .eq("user_id", user_id)
-        .limit(1)
-        .execute()
-    )
-    if not result.data:
+async def _get_vault_id(client, user_id: str) -> str:
+    """Look up the user's vault ID (cached per user). Raises 404 if not found."""
+    vault_id = await load_vault_id(client, user_id)
+    if vault_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No partner vault found. Complete onboarding first.",
         )
-    return result.data[0]["id"]
+    return vault_id
 
 
 def _compute_days_until(milestone: dict) -> int | None:
@@ -106,15 +103,14 @@ async def list_milestones(
     many days remain until the next occurrence.
     """
     client = get_service_client()
-    vault_id = _get_vault_id(client, user_id)
+    vault_id = await _get_vault_id(client, user_id)
 
     try:
-        result = (
+        result = await run_query(
             client.table("partner_milestones")
             .select("*")
             .eq("vault_id", vault_id)
             .order("milestone_date", desc=False)
-            .execute()
         )
     except Exception as exc:
         logger.error("Failed to list milestones for vault %s: %s", vault_id, exc)
@@ -154,7 +150,7 @@ async def create_milestone(
     - custom → just_because
     """
     client = get_service_client()
-    vault_id = _get_vault_id(client, user_id)
+    vault_id = await _get_vault_id(client, user_id)
 
     # Default budget tier based on milestone type
     budget_tier = payload.budget_tier
@@ -177,7 +173,7 @@ async def create_milestone(
     }
 
     try:
-        result = client.table("partner_milestones").insert(row).execute()
+        result = await run_query(client.table("partner_milestones").insert(row))
     except Exception as exc:
         logger.error("Failed to create milestone for vault %s: %s", vault_id, exc)
         raise HTTPException(
@@ -185,6 +181,7 @@ async def create_milestone(
             detail="Failed to create milestone.",
         )
 
+    invalidate_vault(user_id)
     milestone = result.data[0]
 
     # Schedule notifications for the new milestone
@@ -226,15 +223,14 @@ async def update_milestone(
     and new ones are scheduled.
     """
     client = get_service_client()
-    vault_id = _get_vault_id(client, user_id)
+    vault_id = await _get_vault_id(client, user_id)
 
     # Verify milestone belongs to this vault
-    existing = (
+    existing = await run_query(
         client.table("partner_milestones")
         .select("*")
         .eq("id", milestone_id)
         .eq("vault_id", vault_id)
-        .execute()
     )
 
     if not existing.data:
@@ -260,11 +256,10 @@ async def update_milestone(
         return _build_milestone_response(old_milestone)
 
     try:
-        result = (
+        result = await run_query(
             client.table("partner_milestones")
             .update(update_data)
             .eq("id", milestone_id)
-            .execute()
         )
     except Exception as exc:
         logger.error("Failed to update milestone %s: %s", milestone_id[:8], exc)
@@ -273,6 +268,7 @@ async def update_milestone(
             detail="Failed to update milestone.",
         )
 
+    invalidate_vault(user_id)
     updated_milestone = result.data[0]
 
     # Reschedule notifications if date or recurrence changed
@@ -282,9 +278,9 @@ async def update_milestone(
     if date_changed or recurrence_changed:
         # Delete pending notifications for this milestone
         try:
-            client.table("notification_queue").delete().eq(
+            await run_query(client.table("notification_queue").delete().eq(
                 "milestone_id", milestone_id
-            ).eq("status", "pending").execute()
+            ).eq("status", "pending"))
         except Exception as exc:
             logger.warning(
                 "Failed to delete pending notifications for milestone %s: %s",
@@ -327,15 +323,14 @@ async def delete_milestone(
     The notification_queue entries are deleted via CASCADE.
     """
     client = get_service_client()
-    vault_id = _get_vault_id(client, user_id)
+    vault_id = await _get_vault_id(client, user_id)
 
     # Verify milestone belongs to this vault
-    existing = (
+    existing = await run_query(
         client.table("partner_milestones")
         .select("id")
         .eq("id", milestone_id)
         .eq("vault_id", vault_id)
-        .execute()
     )
 
     if not existing.data:
@@ -345,10 +340,12 @@ async def delete_milestone(
         )
 
     try:
-        client.table("partner_milestones").delete().eq("id", milestone_id).execute()
+        await run_query(client.table("partner_milestones").delete().eq("id", milestone_id))
     except Exception as exc:
         logger.error("Failed to delete milestone %s: %s", milestone_id[:8], exc)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to delete milestone.",
         )
+
+    invalidate_vault(user_id)
@@ -26,6 +26,7 @@ from app.agents.state import RecommendationState
 from app.api.recommendations import resolve_image_url
 from app.core.config import is_apns_configured, is_qstash_configured, WEBHOOK_BASE_URL
 from app.core.security import get_active_user_id
+from app.db.async_client import run_query
 from app.db.supabase_client import get_service_client
 from app.models.notifications import (
     NotificationHistoryItem,
@@ -34,6 +35,7 @@ from app.models.notifications import (
     NotificationProcessResponse,
 )
 from app.services.apns import deliver_push_notification
+from app.services.claude_client import background_claude_calls
 from app.services.dnd import check_quiet_hours
 from app.services.qstash import publish_to_qstash, verify_qstash_signature
 from app.services.vault_loader import (
@@ -126,11 +128,10 @@ async def process_notification(
     client = get_service_client()
 
     try:
-        notif_result = (
+        notif_result = await run_query(
             client.table("notification_queue")
             .select("*")
             .eq("id", payload.notification_id)
-            .execute()
         )
     except Exception as exc:
         logger.error(f"Database error looking up notification: {exc}")
@@ -184,9 +185,9 @@ async def process_notification(
 
         # Mark as skipped in the database
         try:
-            client.table("notification_queue").update({
+            await run_query(client.table("notification_queue").update({
                 "status": "cancelled",
-            }).eq("id", payload.notification_id).execute()
+            }).eq("id", payload.notification_id))
         except Exception as exc:
             logger.warning(
                 "Failed to mark notification %s as cancelled: %s",
@@ -290,7 +291,9 @@ async def process_notification(
                 learned_weights=learned_weights,
             )
 
-            result = await run_recommendation_pipeline(state)
+            # Background work: capped so it can't starve interactive /generate
+            with background_claude_calls():
+                result = await run_recommendation_pipeline(state)
 
             error = result.get("error")
             if error:
@@ -335,7 +338,7 @@ async def process_notification(
                                 candidate.personalization_note
                             )
                         rec_rows.append(row)
-                    client.table("recommendations").insert(rec_rows).execute()
+                    await run_query(client.table("recommendations").insert(rec_rows))
                     recommendations_count = len(final_three)
 
                     logger.info(
@@ -351,14 +354,14 @@ async def process_notification(
                 briefing_snippet = result.get("briefing_snippet")
                 if briefing_text:
                     try:
-                        client.table("milestone_briefings").insert({
+                        await run_query(client.table("milestone_briefings").insert({
                             "vault_id": vault_id,
                             "milestone_id": payload.milestone_id,
                             "notification_id": payload.notification_id,
                             "briefing_text": briefing_text,
                             "briefing_snippet": briefing_snippet or briefing_text[:100],
                             "hints_referenced": result.get("briefing_hint_ids", []),
-                        }).execute()
+                        }))
                     except Exception as exc:
                         logger.warning(
                             "Failed to store briefing for notification %s: %s",
@@ -465,9 +468,9 @@ async def process_notification(
         update_fields: dict = {"status": final_status}
         if final_status == "sent":
             update_fields["sent_at"] = datetime.now(timezone.utc).isoformat()
-        client.table("notification_queue").update(update_fields).eq(
+        await run_query(client.table("notification_queue").update(update_fields).eq(
             "id", payload.notification_id
-        ).execute()
+        ))
     except Exception as exc:
         logger.error(
             f"Failed to update notification {payload.notification_id}: {exc}"
@@ -545,14 +548,13 @@ async def get_notification_history(
 
     # --- 1. Fetch sent/failed notifications for this user ---
     try:
-        notif_result = (
+        notif_result = await run_query(
             client.table("notification_queue")
             .select("*")
             .eq("user_id", user_id)
             .in_("status", ["sent", "failed"])
             .order("sent_at", desc=True)
             .range(offset, offset + limit - 1)
-            .execute()
         )
     except Exception as exc:
         logger.error(f"Failed to load notification history: {exc}")
@@ -568,11 +570,10 @@ async def get_notification_history(
     milestone_ids = list({n["milestone_id"] for n in notif_result.data})
     milestones_map: dict[str, dict] = {}
     try:
-        ms_result = (
+        ms_result = await run_query(
             client.table("partner_milestones")
             .select("id, milestone_name, milestone_type, milestone_date")
             .in_("id", milestone_ids)
-            .execute()
         )
         for ms in (ms_result.data or []):
             milestones_map[ms["id"]] = ms
@@ -582,12 +583,11 @@ async def get_notification_history(
     # --- 3. Get the user's vault_id for recommendations count lookup ---
     vault_id = None
     try:
-        vault_result = (
+        vault_result = await run_query(
             client.table("partner_vaults")
             .select("id")
             .eq("user_id", user_id)
             .limit(1)
-            .execute()
         )
         if vault_result.data:
             vault_id = vault_result.data[0]["id"]
@@ -598,12 +598,11 @@ async def get_notification_history(
     rec_counts: dict[str, int] = {}
     if vault_id and milestone_ids:
         try:
-            rec_result = (
+            rec_result = await run_query(
                 client.table("recommendations")
                 .select("milestone_id")
                 .eq("vault_id", vault_id)
                 .in_("milestone_id", milestone_ids)
-                .execute()
             )
             for rec in (rec_result.data or []):
                 mid = rec["milestone_id"]
@@ -613,12 +612,11 @@ async def get_notification_history(
 
     # --- 5. Get total count for pagination ---
     try:
-        count_result = (
+        count_result = await run_query(
             client.table("notification_queue")
             .select("id", count="exact")
             .eq("user_id", user_id)
             .in_("status", ["sent", "failed"])
-            .execute()
         )
         total = count_result.count if count_result.count is not None else len(notif_result.data)
     except Exception:
@@ -677,12 +675,11 @@ async def mark_notification_viewed(
     client = get_service_client()
 
     try:
-        result = (
+        result = await run_query(
             client.table("notification_queue")
             .update({"viewed_at": datetime.now(timezone.utc).isoformat()})
             .eq("id", notification_id)
             .eq("user_id", user_id)
-            .execute()
         )
     except Exception as exc:
         logger.error(f"Failed to mark notification {notification_id} as viewed: {exc}")
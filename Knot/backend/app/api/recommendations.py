@@ -8,14 +8,19 @@ Step 5.9: POST /api/v1/recommendations/generate — Generate recommendations
 Step 5.10: POST /api/v1/recommendations/refresh — Refresh/re-roll with exclusions
 Step 6.3: POST /api/v1/recommendations/feedback — Record user feedback
 Step 7.7: GET /api/v1/recommendations/by-milestone/{milestone_id} — Fetch stored recommendations
+POST /api/v1/recommendations/generate/stream — Generate with progressive Server-Sent Events
 """
 
+import asyncio
 import json
 import logging
+from collections.abc import AsyncIterator
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 
-from app.agents.pipeline import run_recommendation_pipeline
+from app.agents.pipeline import run_recommendation_pipeline, stream_recommendation_pipeline
+from app.agents.progress import BRIEFING
 from app.agents.state import (
     BudgetRange,
     CandidateRecommendation,
@@ -23,6 +28,7 @@ from app.agents.state import (
 )
 from app.agents.url_resolution import is_search_or_shopping_url
 from app.core.security import get_active_user_id
+from app.db.async_client import run_query
 from app.db.supabase_client import get_service_client
 from app.models.notifications import (
     MilestoneRecommendationItem,
@@ -41,15 +47,24 @@ from app.models.recommendations import (
 from app.services.text_cleanup import trim_to_complete_sentence
 from app.services.vault_loader import (
     find_budget_range,
+    load_concurrently,
     load_learned_weights,
     load_milestone_context,
     load_vault_data,
+    load_vault_id,
 )
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/recommendations", tags=["recommendations"])
 
+# Context loads a request can proceed without, and what to use if they fail.
+OPTIONAL_CONTEXT_FALLBACKS = {
+    "learned_weights": None,
+    "excluded_titles": [],
+    "excluded_descriptions": [],
+}
+
 
 def _safe_external_url(url: str | None) -> str | None:
     """
@@ -93,6 +108,51 @@ async def generate_recommendations(
         422: Validation error in the request payload.
         500: Pipeline error or unexpected failure.
     """
+    state, vault_id = await _build_generate_state(payload, user_id)
+
+    try:
+        result = await run_recommendation_pipeline(state)
+    except Exception as exc:
+        logger.error(
+            "Pipeline failed for vault %s: %s",
+            vault_id,
+            exc,
+            exc_info=True,
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Unable to find recommendations right now. Please try again.",
+        )
+
+    # Check for pipeline error
+    error = result.get("error")
+    if error:
+        logger.warning(
+            "Pipeline returned error for vault %s: %s",
+            vault_id,
+            error,
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=error,
+        )
+
+    return await _store_generation(payload, vault_id, result)
+
+
+async def _build_generate_state(
+    payload: RecommendationGenerateRequest,
+    user_id: str,
+) -> tuple[RecommendationState, str]:
+    """
+    Load everything the pipeline needs for a generate request.
+
+    Returns:
+        (pipeline state, vault_id).
+
+    Raises:
+        HTTPException 404: No vault exists, or the milestone isn't in it.
+    """
     # =================================================================
     # 1. Load the user's vault data
     # =================================================================
@@ -105,18 +165,31 @@ async def generate_recommendations(
         )
 
     # =================================================================
-    # 2. Load milestone context (if milestone_id provided)
+    # 2. Load milestone context, learned weights, and history concurrently
     # =================================================================
-    milestone_context = None
+    # Everything below needs only the vault ID, so it is fetched in one
+    # round. Weights and history are optional: a failed load degrades to
+    # "no personalization" / "no exclusions" rather than failing the request.
+    client = get_service_client()
+
+    loads = {
+        "learned_weights": load_learned_weights(user_id),
+        # Recent recommendation titles + descriptions to exclude from new results
+        "excluded_titles": _load_recent_titles(client, vault_id),
+        "excluded_descriptions": _load_recent_descriptions(client, vault_id),
+    }
     if payload.milestone_id:
-        milestone_context = await load_milestone_context(
+        loads["milestone_context"] = load_milestone_context(
             payload.milestone_id, vault_id,
         )
-        if milestone_context is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Milestone not found or does not belong to this vault.",
-            )
+    context = await load_concurrently(loads, fallbacks=OPTIONAL_CONTEXT_FALLBACKS)
+
+    milestone_context = context.get("milestone_context")
+    if payload.milestone_id and milestone_context is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Milestone not found or does not belong to this vault.",
+        )
 
     # =================================================================
     # 3. Determine budget range for this occasion
@@ -124,53 +197,32 @@ async def generate_recommendations(
     budget_range = find_budget_range(vault_data.budgets, payload.occasion_type)
 
     # =================================================================
-    # 4. Load learned weights, history, and build pipeline state
+    # 4. Build pipeline state
     # =================================================================
-    client = get_service_client()
-
-    learned_weights = await load_learned_weights(user_id)
-
-    # Load recent recommendation titles + descriptions to exclude from new results
-    excluded_titles = _load_recent_titles(client, vault_id)
-    excluded_descriptions = _load_recent_descriptions(client, vault_id)
-
     state = RecommendationState(
         vault_data=vault_data,
         occasion_type=payload.occasion_type,
         milestone_context=milestone_context,
         budget_range=budget_range,
-        learned_weights=learned_weights,
-        excluded_titles=excluded_titles,
-        excluded_descriptions=excluded_descriptions,
+        learned_weights=context["learned_weights"],
+        excluded_titles=context["excluded_titles"],
+        excluded_descriptions=context["excluded_descriptions"],
     )
+    return state, vault_id
 
-    try:
-        result = await run_recommendation_pipeline(state)
-    except Exception as exc:
-        logger.error(
-            "Pipeline failed for vault %s: %s",
-            vault_id,
-            exc,
-            exc_info=True,
-        )
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Unable to find recommendations right now. Please try again.",
-        )
 
-    # Check for pipeline error
-    error = result.get("error")
-    if error:
-        logger.warning(
-            "Pipeline returned error for vault %s: %s",
-            vault_id,
-            error,
-        )
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=error,
-        )
+async def _store_generation(
+    payload: RecommendationGenerateRequest,
+    vault_id: str,
+    result: dict,
+) -> RecommendationGenerateResponse:
+    """
+    Persist a successful pipeline run and build the generate response.
 
+    Storage failures are logged, not raised — the recommendations are still
+    returned (with their in-memory IDs) so the user sees them.
+    """
+    client = get_service_client()
     final_three = result.get("final_three", [])
 
     if not final_three:
@@ -207,7 +259,7 @@ async def generate_recommendations(
         rec_rows.append(row)
 
     try:
-        db_result = client.table("recommendations").insert(rec_rows).execute()
+        db_result = await run_query(client.table("recommendations").insert(rec_rows))
     except Exception as exc:
         logger.error(
             "Failed to store recommendations for vault %s: %s",
@@ -225,13 +277,13 @@ async def generate_recommendations(
 
     if briefing_text and payload.milestone_id:
         try:
-            client.table("milestone_briefings").insert({
+            await run_query(client.table("milestone_briefings").insert({
                 "vault_id": vault_id,
                 "milestone_id": payload.milestone_id,
                 "briefing_text": briefing_text,
                 "briefing_snippet": briefing_snippet or briefing_text[:100],
                 "hints_referenced": result.get("briefing_hint_ids", []),
-            }).execute()
+            }))
         except Exception as exc:
             logger.warning(
                 "Failed to store briefing for milestone %s: %s",
@@ -250,9 +302,127 @@ async def generate_recommendations(
         occasion_type=payload.occasion_type,
         briefing_text=briefing_text,
         briefing_snippet=briefing_snippet,
+        degradations=result.get("degradations") or [],
     )
 
 
+# ===================================================================
+# POST /api/v1/recommendations/generate/stream — Progressive Generate
+# ===================================================================
+
+@router.post(
+    "/generate/stream",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+)
+async def generate_recommendations_stream(
+    payload: RecommendationGenerateRequest,
+    user_id: str = Depends(get_active_user_id),
+) -> StreamingResponse:
+    """
+    Generate recommendations, streaming progress as Server-Sent Events.
+
+    Same request and pipeline as POST /generate, but cards are pushed as soon
+    as they exist instead of after the full ~30s run. Events, in order:
+
+    - generation_started: {occasion_type, milestone_id}
+    - card: {index, recommendation} — a shown card, as soon as Claude
+      finishes writing it (IDs are provisional until "complete")
+    - card_resolved: {index, recommendation} — the card with its purchase URL
+    - card_verified: {index, recommendation} — the slot's final card after
+      availability and price checks (may be a swapped-in replacement)
+    - briefing: {briefing_text, briefing_snippet} — milestone requests only
+    - complete: the full RecommendationGenerateResponse, with persisted IDs
+    - error: {status_code, detail} — the pipeline failed; no "complete" follows
+
+    Returns:
+        200: text/event-stream of the events above.
+        401: Missing or invalid authentication token.
+        404: No vault exists for this user, or milestone not found.
+        422: Validation error in the request payload.
+    """
+    # Load before streaming starts so 404s are still real status codes.
+    state, vault_id = await _build_generate_state(payload, user_id)
+
+    return StreamingResponse(
+        _generate_event_stream(payload, state, vault_id),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Stop reverse proxies from buffering the stream
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _progress_event(progress: dict) -> str:
+    """Convert a pipeline progress event (app.agents.progress) into an SSE."""
+    event = progress["event"]
+    if event == BRIEFING:
+        return _sse(event, {
+            "briefing_text": progress.get("briefing_text"),
+            "briefing_snippet": progress.get("briefing_snippet"),
+        })
+    item = _build_response_items([progress["candidate"]])[0]
+    return _sse(event, {
+        "index": progress["index"],
+        "recommendation": item.model_dump(mode="json"),
+    })
+
+
+async def _generate_event_stream(
+    payload: RecommendationGenerateRequest,
+    state: RecommendationState,
+    vault_id: str,
+) -> AsyncIterator[str]:
+    """Run the pipeline and yield its progress, then the stored result, as SSEs."""
+    yield _sse("generation_started", {
+        "occasion_type": payload.occasion_type,
+        "milestone_id": payload.milestone_id,
+    })
+
+    result: dict = {}
+    try:
+        async for kind, data in stream_recommendation_pipeline(state):
+            if kind == "progress":
+                yield _progress_event(data)
+            else:
+                result = data
+    except Exception as exc:
+        logger.error(
+            "Streamed pipeline failed for vault %s: %s",
+            vault_id,
+            exc,
+            exc_info=True,
+        )
+        yield _sse("error", {
+            "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+            "detail": "Unable to find recommendations right now. Please try again.",
+        })
+        return
+
+    error = result.get("error")
+    if error:
+        logger.warning(
+            "Streamed pipeline returned error for vault %s: %s",
+            vault_id,
+            error,
+        )
+        yield _sse("error", {
+            "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+            "detail": error,
+        })
+        return
+
+    response = await _store_generation(payload, vault_id, result)
+    yield _sse("complete", response.model_dump(mode="json"))
+
+
 # ===================================================================
 # POST /api/v1/recommendations/refresh — Refresh (Re-roll) Logic
 # ===================================================================
@@ -293,90 +463,9 @@ async def refresh_recommendations(
         422: Validation error in the request payload.
         500: Pipeline error or unexpected failure.
     """
-    # =================================================================
-    # 1. Load the user's vault data
-    # =================================================================
-    try:
-        vault_data, vault_id = await load_vault_data(user_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="No partner vault found. Complete onboarding first.",
-        )
-
+    state, vault_id = await _build_refresh_state(payload, user_id)
     client = get_service_client()
 
-    # =================================================================
-    # 2. Load rejected recommendations from the database
-    # =================================================================
-    rejected_recs = (
-        client.table("recommendations")
-        .select("*")
-        .eq("vault_id", vault_id)
-        .in_("id", payload.rejected_recommendation_ids)
-        .execute()
-    )
-
-    if not rejected_recs.data:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Rejected recommendations not found or do not belong to this user.",
-        )
-
-    # =================================================================
-    # 3. Store feedback with action='refreshed'
-    # =================================================================
-    for rec in rejected_recs.data:
-        try:
-            client.table("recommendation_feedback").insert({
-                "recommendation_id": rec["id"],
-                "user_id": user_id,
-                "action": "refreshed",
-                "feedback_text": payload.rejection_reason,
-            }).execute()
-        except Exception as exc:
-            logger.warning(
-                "Failed to store refresh feedback for rec %s: %s",
-                rec["id"], exc,
-            )
-
-    # =================================================================
-    # 4. Determine occasion type and build pipeline state
-    # =================================================================
-    occasion_type = "just_because"
-    if rejected_recs.data[0].get("milestone_id"):
-        ms_result = (
-            client.table("partner_milestones")
-            .select("budget_tier")
-            .eq("id", rejected_recs.data[0]["milestone_id"])
-            .execute()
-        )
-        if ms_result.data:
-            occasion_type = ms_result.data[0]["budget_tier"]
-
-    # Apply session-scoped vibe override if provided (Step 6.5)
-    if payload.vibe_override:
-        vault_data.vibes = payload.vibe_override
-
-    budget_range = find_budget_range(vault_data.budgets, occasion_type)
-
-    learned_weights = await load_learned_weights(user_id)
-
-    # Load recent recommendation titles + descriptions to exclude from new results
-    excluded_titles = _load_recent_titles(client, vault_id)
-    excluded_descriptions = _load_recent_descriptions(client, vault_id)
-
-    state = RecommendationState(
-        vault_data=vault_data,
-        occasion_type=occasion_type,
-        budget_range=budget_range,
-        learned_weights=learned_weights,
-        excluded_titles=excluded_titles,
-        excluded_descriptions=excluded_descriptions,
-        vibe_override=payload.vibe_override,
-        rejection_reason=payload.rejection_reason,
-    )
-
     try:
         result = await run_recommendation_pipeline(state)
     except Exception as exc:
@@ -437,7 +526,7 @@ async def refresh_recommendations(
         rec_rows.append(row)
 
     try:
-        db_result = client.table("recommendations").insert(rec_rows).execute()
+        db_result = await run_query(client.table("recommendations").insert(rec_rows))
     except Exception as exc:
         logger.error(
             "Failed to store refreshed recommendations for vault %s: %s",
@@ -454,9 +543,145 @@ async def refresh_recommendations(
         recommendations=response_items,
         count=len(response_items),
         rejection_reason=payload.rejection_reason,
+        degradations=result.get("degradations") or [],
     )
 
 
+async def _build_refresh_state(
+    payload: RecommendationRefreshRequest,
+    user_id: str,
+) -> tuple[RecommendationState, str]:
+    """
+    Load everything the pipeline needs for a refresh request, and record
+    the 'refreshed' feedback for the rejected recommendations.
+
+    Returns:
+        (pipeline state, vault_id).
+
+    Raises:
+        HTTPException 404: No vault exists, or the rejected recommendations
+                           don't belong to it.
+    """
+    # =================================================================
+    # 1. Load the user's vault data
+    # =================================================================
+    try:
+        vault_data, vault_id = await load_vault_data(user_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No partner vault found. Complete onboarding first.",
+        )
+
+    client = get_service_client()
+
+    # =================================================================
+    # 2. Load rejected recommendations, learned weights, and history
+    # =================================================================
+    context = await load_concurrently(
+        {
+            "rejected_recs": _load_rejected_recommendations(
+                client, vault_id, payload.rejected_recommendation_ids,
+            ),
+            "learned_weights": load_learned_weights(user_id),
+            "excluded_titles": _load_recent_titles(client, vault_id),
+            "excluded_descriptions": _load_recent_descriptions(client, vault_id),
+        },
+        fallbacks=OPTIONAL_CONTEXT_FALLBACKS,
+    )
+    rejected_recs = context["rejected_recs"]
+
+    if not rejected_recs:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Rejected recommendations not found or do not belong to this user.",
+        )
+
+    # =================================================================
+    # 3. Store feedback with action='refreshed' and look up the occasion
+    # =================================================================
+    # Both depend only on the rejected recommendations, so they share a round.
+    occasion_and_feedback = await load_concurrently(
+        {
+            "occasion_type": _load_occasion_type(
+                client, rejected_recs[0].get("milestone_id"),
+            ),
+            "feedback": asyncio.gather(*[
+                _store_refresh_feedback(client, user_id, rec["id"], payload.rejection_reason)
+                for rec in rejected_recs
+            ]),
+        },
+        fallbacks={"occasion_type": "just_because", "feedback": None},
+    )
+    occasion_type = occasion_and_feedback["occasion_type"]
+
+    # =================================================================
+    # 4. Build pipeline state
+    # =================================================================
+    # Apply session-scoped vibe override if provided (Step 6.5)
+    if payload.vibe_override:
+        vault_data.vibes = payload.vibe_override
+
+    budget_range = find_budget_range(vault_data.budgets, occasion_type)
+
+    state = RecommendationState(
+        vault_data=vault_data,
+        occasion_type=occasion_type,
+        budget_range=budget_range,
+        learned_weights=context["learned_weights"],
+        excluded_titles=context["excluded_titles"],
+        excluded_descriptions=context["excluded_descriptions"],
+        vibe_override=payload.vibe_override,
+        rejection_reason=payload.rejection_reason,
+    )
+    return state, vault_id
+
+
+async def _load_rejected_recommendations(
+    client, vault_id: str, recommendation_ids: list[str],
+) -> list[dict]:
+    """Load the rejected recommendations that belong to this vault."""
+    result = await run_query(
+        client.table("recommendations")
+        .select("*")
+        .eq("vault_id", vault_id)
+        .in_("id", recommendation_ids)
+    )
+    return result.data or []
+
+
+async def _load_occasion_type(client, milestone_id: str | None) -> str:
+    """Occasion (budget tier) of the milestone the rejected recs were for."""
+    if not milestone_id:
+        return "just_because"
+    ms_result = await run_query(
+        client.table("partner_milestones")
+        .select("budget_tier")
+        .eq("id", milestone_id)
+    )
+    if ms_result.data:
+        return ms_result.data[0]["budget_tier"]
+    return "just_because"
+
+
+async def _store_refresh_feedback(
+    client, user_id: str, recommendation_id: str, rejection_reason: str,
+) -> None:
+    """Record a 'refreshed' feedback row; failures are logged, not raised."""
+    try:
+        await run_query(client.table("recommendation_feedback").insert({
+            "recommendation_id": recommendation_id,
+            "user_id": user_id,
+            "action": "refreshed",
+            "feedback_text": rejection_reason,
+        }))
+    except Exception as exc:
+        logger.warning(
+            "Failed to store refresh feedback for rec %s: %s",
+            recommendation_id, exc,
+        )
+
+
 # ===================================================================
 # POST /api/v1/recommendations/feedback — Record User Feedback
 # ===================================================================
@@ -486,11 +711,10 @@ async def record_feedback(
     client = get_service_client()
 
     # Verify the recommendation exists and belongs to this user's vault
-    rec_result = (
+    rec_result = await run_query(
         client.table("recommendations")
         .select("id, vault_id")
         .eq("id", payload.recommendation_id)
-        .execute()
     )
 
     if not rec_result.data:
@@ -500,12 +724,11 @@ async def record_feedback(
         )
 
     # Verify the vault belongs to this user
-    vault_result = (
+    vault_result = await run_query(
         client.table("partner_vaults")
         .select("id")
         .eq("id", rec_result.data[0]["vault_id"])
         .eq("user_id", user_id)
-        .execute()
     )
 
     if not vault_result.data:
@@ -524,10 +747,9 @@ async def record_feedback(
     }
 
     try:
-        result = (
+        result = await run_query(
             client.table("recommendation_feedback")
             .insert(feedback_row)
-            .execute()
         )
     except Exception as exc:
         logger.error(
@@ -586,13 +808,7 @@ async def get_recommendations_by_milestone(
 
     # 1. Get the user's vault_id
     try:
-        vault_result = (
-            client.table("partner_vaults")
-            .select("id")
-            .eq("user_id", user_id)
-            .limit(1)
-            .execute()
-        )
+        vault_id = await load_vault_id(client, user_id)
     except Exception as exc:
         logger.error(f"Failed to look up vault: {exc}")
         raise HTTPException(
@@ -600,24 +816,21 @@ async def get_recommendations_by_milestone(
             detail="Failed to look up vault.",
         )
 
-    if not vault_result.data:
+    if vault_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No partner vault found. Complete onboarding first.",
         )
 
-    vault_id = vault_result.data[0]["id"]
-
     # 2. Fetch the newest batch of recommendations for this milestone + vault
     try:
-        rec_result = (
+        rec_result = await run_query(
             client.table("recommendations")
             .select("*")
             .eq("vault_id", vault_id)
             .eq("milestone_id", milestone_id)
             .order("created_at", desc=True)
             .limit(3)
-            .execute()
         )
     except Exception as exc:
         logger.error(f"Failed to load recommendations for milestone {milestone_id}: {exc}")
@@ -661,14 +874,13 @@ async def get_recommendations_by_milestone(
     #    the notification webhook and POST /generate both store one).
     briefing_text = None
     try:
-        briefing_result = (
+        briefing_result = await run_query(
             client.table("milestone_briefings")
             .select("briefing_text")
             .eq("vault_id", vault_id)
             .eq("milestone_id", milestone_id)
             .order("created_at", desc=True)
             .limit(1)
-            .execute()
         )
         if briefing_result.data:
             briefing_text = briefing_result.data[0].get("briefing_text")
@@ -870,13 +1082,7 @@ async def get_recommendation_by_id(
 
     # 1. Get the user's vault_id
     try:
-        vault_result = (
-            client.table("partner_vaults")
-            .select("id")
-            .eq("user_id", user_id)
-            .limit(1)
-            .execute()
-        )
+        vault_id = await load_vault_id(client, user_id)
     except Exception as exc:
         logger.error(f"Failed to look up vault: {exc}")
         raise HTTPException(
@@ -884,22 +1090,19 @@ async def get_recommendation_by_id(
             detail="Failed to look up vault.",
         )
 
-    if not vault_result.data:
+    if vault_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No partner vault found. Complete onboarding first.",
         )
 
-    vault_id = vault_result.data[0]["id"]
-
     # 2. Fetch the recommendation by ID
     try:
-        rec_result = (
+        rec_result = await run_query(
             client.table("recommendations")
             .select("*")
             .eq("id", recommendation_id)
             .limit(1)
-            .execute()
         )
     except Exception as exc:
         logger.error(
@@ -944,16 +1147,15 @@ async def get_recommendation_by_id(
 # ===================================================================
 
 
-def _load_recent_titles(client, vault_id: str, limit: int = 200) -> list[str]:
+async def _load_recent_titles(client, vault_id: str, limit: int = 200) -> list[str]:
     """Load titles of recent recommendations for a vault to exclude from new results."""
     try:
-        result = (
+        result = await run_query(
             client.table("recommendations")
             .select("title")
             .eq("vault_id", vault_id)
             .order("created_at", desc=True)
             .limit(limit)
-            .execute()
         )
         return [row["title"] for row in (result.data or []) if row.get("title")]
     except Exception as exc:
@@ -963,16 +1165,15 @@ def _load_recent_titles(client, vault_id: str, limit: int = 200) -> list[str]:
         return []
 
 
-def _load_recent_descriptions(client, vault_id: str, limit: int = 200) -> list[str]:
+async def _load_recent_descriptions(client, vault_id: str, limit: int = 200) -> list[str]:
     """Load description snippets of recent recommendations for semantic dedup."""
     try:
-        result = (
+        result = await run_query(
             client.table("recommendations")
             .select("description")
             .eq("vault_id", vault_id)
             .order("created_at", desc=True)
             .limit(limit)
-            .execute()
         )
         return [
             row["description"][:100]
@@ -27,7 +27,13 @@ from app.core.config import (
     WEBHOOK_BASE_URL,
     is_qstash_configured,
 )
-from app.core.security import get_active_user_id, get_current_user_id
+from app.core.http_clients import upstream_client
+from app.core.security import (
+    get_active_user_id,
+    get_current_user_id,
+    invalidate_account_status,
+)
+from app.db.async_client import run_query
 from app.db.supabase_client import get_service_client
 from app.models.users import (
     AccountDeleteResponse,
@@ -40,6 +46,7 @@ from app.models.users import (
     NotificationPreferencesResponse,
 )
 from app.services.qstash import publish_to_qstash, verify_qstash_signature
+from app.services.vault_cache import invalidate_learned_weights, invalidate_vault
 
 DELETION_GRACE_DAYS = 60
 
@@ -79,11 +86,10 @@ async def register_device_token(
 
     # Check if user already has a device token stored
     try:
-        existing = (
+        existing = await run_query(
             client.table("users")
             .select("device_token")
             .eq("id", user_id)
-            .execute()
         )
     except Exception as exc:
         logger.error("Database error looking up user %s: %s", user_id[:8], exc)
@@ -104,10 +110,10 @@ async def register_device_token(
 
     # Upsert the device token
     try:
-        client.table("users").update({
+        await run_query(client.table("users").update({
             "device_token": payload.device_token,
             "device_platform": payload.platform,
-        }).eq("id", user_id).execute()
+        }).eq("id", user_id))
     except Exception as exc:
         logger.error(
             "Failed to store device token for user %s: %s", user_id[:8], exc
@@ -142,7 +148,7 @@ async def _hard_delete_auth_user(user_id: str) -> None:
     the next QStash retry" — QStash retries failed webhooks automatically.
     """
     try:
-        async with httpx.AsyncClient() as http_client:
+        async with upstream_client("supabase") as http_client:
             resp = await http_client.delete(
                 f"{SUPABASE_URL}/auth/v1/admin/users/{user_id}",
                 headers={
@@ -192,11 +198,10 @@ async def get_account_status(
     """
     client = get_service_client()
     try:
-        result = (
+        result = await run_query(
             client.table("users")
             .select("scheduled_deletion_at")
             .eq("id", user_id)
-            .execute()
         )
     except Exception as exc:
         logger.error("Failed to read account status for %s: %s", user_id[:8], exc)
@@ -246,11 +251,10 @@ async def delete_account(
 
     # 1. Verify user exists in public.users
     try:
-        existing = (
+        existing = await run_query(
             client.table("users")
             .select("id")
             .eq("id", user_id)
-            .execute()
         )
     except Exception as exc:
         logger.error("Database error looking up user %s: %s", user_id[:8], exc)
@@ -271,9 +275,9 @@ async def delete_account(
 
     # 2. Mark the user as pending deletion.
     try:
-        client.table("users").update(
+        await run_query(client.table("users").update(
             {"scheduled_deletion_at": scheduled_iso}
-        ).eq("id", user_id).execute()
+        ).eq("id", user_id))
     except Exception as exc:
         logger.error(
             "Failed to set scheduled_deletion_at for user %s: %s",
@@ -284,6 +288,9 @@ async def delete_account(
             detail="Failed to schedule account deletion.",
         )
 
+    # The gate must 410 on the very next request, not after the cache TTL.
+    invalidate_account_status(user_id)
+
     # 3. Enqueue the QStash purge job. 60 days exceeds the 7-day delay_seconds
     #    cap, so we use not_before with the Unix timestamp.
     if is_qstash_configured():
@@ -345,9 +352,9 @@ async def restore_account(
     """
     client = get_service_client()
     try:
-        client.table("users").update(
+        await run_query(client.table("users").update(
             {"scheduled_deletion_at": None}
-        ).eq("id", user_id).execute()
+        ).eq("id", user_id))
     except Exception as exc:
         logger.error(
             "Failed to clear scheduled_deletion_at for user %s: %s",
@@ -358,6 +365,8 @@ async def restore_account(
             detail="Failed to restore account.",
         )
 
+    invalidate_account_status(user_id)
+
     logger.info("Account restored: user=%s", user_id[:8])
     return AccountRestoreResponse()
 
@@ -391,9 +400,9 @@ async def dev_reset_account(
     client = get_service_client()
 
     try:
-        client.table("users").update(
+        await run_query(client.table("users").update(
             {"scheduled_deletion_at": None}
-        ).eq("id", user_id).execute()
+        ).eq("id", user_id))
     except Exception as exc:
         logger.error(
             "dev-reset: failed to clear scheduled_deletion_at for %s: %s",
@@ -404,8 +413,10 @@ async def dev_reset_account(
             detail="Failed to clear pending deletion.",
         )
 
+    invalidate_account_status(user_id)
+
     try:
-        client.table("partner_vaults").delete().eq("user_id", user_id).execute()
+        await run_query(client.table("partner_vaults").delete().eq("user_id", user_id))
     except Exception as exc:
         logger.error(
             "dev-reset: failed to delete vault for %s: %s", user_id[:8], exc,
@@ -415,6 +426,9 @@ async def dev_reset_account(
             detail="Failed to delete vault.",
         )
 
+    invalidate_vault(user_id)
+    invalidate_learned_weights(user_id)
+
     logger.info(
         "dev-reset: cleared pending deletion + vault for user=%s", user_id[:8],
     )
@@ -469,11 +483,10 @@ async def process_account_deletion(
 
     client = get_service_client()
     try:
-        result = (
+        result = await run_query(
             client.table("users")
             .select("scheduled_deletion_at")
             .eq("id", user_id)
-            .execute()
         )
     except Exception as exc:
         logger.error(
@@ -494,6 +507,9 @@ async def process_account_deletion(
             user_id[:8],
         )
         await _hard_delete_auth_user(user_id)
+        invalidate_account_status(user_id)
+        invalidate_vault(user_id)
+        invalidate_learned_weights(user_id)
         return {"status": "deleted", "user_id": user_id}
 
     scheduled = result.data[0].get("scheduled_deletion_at")
@@ -526,6 +542,9 @@ async def process_account_deletion(
         return {"status": "skipped", "reason": "rescheduled", "user_id": user_id}
 
     await _hard_delete_auth_user(user_id)
+    invalidate_account_status(user_id)
+    invalidate_vault(user_id)
+    invalidate_learned_weights(user_id)
     logger.info(
         "process-deletion: hard-deleted user=%s scheduled_at=%s",
         user_id[:8], scheduled,
@@ -566,11 +585,10 @@ async def export_user_data(
 
     # --- 1. Fetch user account info ---
     try:
-        user_result = (
+        user_result = await run_query(
             client.table("users")
             .select("id, email, created_at")
             .eq("id", user_id)
-            .execute()
         )
     except Exception as exc:
         logger.error("Export: failed to fetch user %s: %s", user_id[:8], exc)
@@ -585,11 +603,10 @@ async def export_user_data(
 
     # --- 2. Fetch partner vault (if exists) ---
     try:
-        vault_result = (
+        vault_result = await run_query(
             client.table("partner_vaults")
             .select("*")
             .eq("user_id", user_id)
-            .execute()
         )
     except Exception as exc:
         logger.error("Export: failed to fetch vault for %s: %s", user_id[:8], exc)
@@ -609,49 +626,42 @@ async def export_user_data(
 
         # --- 3. Fetch all vault child tables ---
         try:
-            interests_result = (
+            interests_result = await run_query(
                 client.table("partner_interests")
                 .select("interest_type, interest_category, created_at")
                 .eq("vault_id", vault_id)
-                .execute()
             )
-            milestones_result = (
+            milestones_result = await run_query(
                 client.table("partner_milestones")
                 .select("id, milestone_type, milestone_name, milestone_date, recurrence, budget_tier, created_at")
                 .eq("vault_id", vault_id)
-                .execute()
             )
-            vibes_result = (
+            vibes_result = await run_query(
                 client.table("partner_vibes")
                 .select("vibe_tag, created_at")
                 .eq("vault_id", vault_id)
-                .execute()
             )
-            budgets_result = (
+            budgets_result = await run_query(
                 client.table("partner_budgets")
                 .select("occasion_type, min_amount, max_amount, currency, created_at")
                 .eq("vault_id", vault_id)
-                .execute()
             )
-            love_languages_result = (
+            love_languages_result = await run_query(
                 client.table("partner_love_languages")
                 .select("language, priority, created_at")
                 .eq("vault_id", vault_id)
-                .execute()
             )
-            hints_result = (
+            hints_result = await run_query(
                 client.table("hints")
                 .select("id, hint_text, source, is_used, created_at")
                 .eq("vault_id", vault_id)
                 .order("created_at", desc=True)
-                .execute()
             )
-            rec_result = (
+            rec_result = await run_query(
                 client.table("recommendations")
                 .select("id, milestone_id, recommendation_type, title, description, external_url, price_cents, merchant_name, image_url, created_at")
                 .eq("vault_id", vault_id)
                 .order("created_at", desc=True)
-                .execute()
             )
         except Exception as exc:
             logger.error("Export: failed to fetch vault data for %s: %s", user_id[:8], exc)
@@ -693,19 +703,17 @@ async def export_user_data(
 
     # --- 4. Fetch user-level data (not vault-scoped) ---
     try:
-        feedback_result = (
+        feedback_result = await run_query(
             client.table("recommendation_feedback")
             .select("id, recommendation_id, action, rating, feedback_text, created_at")
             .eq("user_id", user_id)
             .order("created_at", desc=True)
-            .execute()
         )
-        notification_result = (
+        notification_result = await run_query(
             client.table("notification_queue")
             .select("id, milestone_id, scheduled_for, days_before, status, sent_at, created_at")
             .eq("user_id", user_id)
             .order("created_at", desc=True)
-            .execute()
         )
     except Exception as exc:
         logger.error("Export: failed to fetch feedback/notifications for %s: %s", user_id[:8], exc)
@@ -766,11 +774,10 @@ async def get_notification_preferences(
     client = get_service_client()
 
     try:
-        result = (
+        result = await run_query(
             client.table("users")
             .select("notifications_enabled, quiet_hours_start, quiet_hours_end, timezone")
             .eq("id", user_id)
-            .execute()
         )
     except Exception as exc:
         logger.error("Failed to fetch notification preferences for %s: %s", user_id[:8], exc)
@@ -827,11 +834,10 @@ async def update_notification_preferences(
 
     # Verify user exists
     try:
-        existing = (
+        existing = await run_query(
             client.table("users")
             .select("id")
             .eq("id", user_id)
-            .execute()
         )
     except Exception as exc:
         logger.error("Database error looking up user %s: %s", user_id[:8], exc)
@@ -864,7 +870,7 @@ async def update_notification_preferences(
 
     # Apply update
     try:
-        client.table("users").update(update_data).eq("id", user_id).execute()
+        await run_query(client.table("users").update(update_data).eq("id", user_id))
     except Exception as exc:
         logger.error("Failed to update notification preferences for %s: %s", user_id[:8], exc)
         raise HTTPException(
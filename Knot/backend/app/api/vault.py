@@ -14,6 +14,7 @@ import logging
 from fastapi import APIRouter, Depends, HTTPException, status
 
 from app.core.security import get_active_user_id
+from app.db.async_client import run_query
 from app.db.supabase_client import get_service_client
 from app.models.vault import (
     BudgetResponse,
@@ -26,6 +27,7 @@ from app.models.vault import (
 )
 
 from app.services.notification_scheduler import schedule_notifications_for_milestones
+from app.services.vault_cache import invalidate_vault
 
 logger = logging.getLogger(__name__)
 
@@ -73,8 +75,8 @@ async def create_vault(
             "location_state": payload.location_state,
             "location_country": payload.location_country or "US",
         }
-        vault_result = (
-            client.table("partner_vaults").insert(vault_data).execute()
+        vault_result = await run_query(
+            client.table("partner_vaults").insert(vault_data)
         )
 
         if not vault_result.data:
@@ -104,7 +106,7 @@ async def create_vault(
             }
             for category in payload.dislikes
         ]
-        client.table("partner_interests").insert(interest_rows).execute()
+        await run_query(client.table("partner_interests").insert(interest_rows))
 
         # =============================================================
         # 3. Insert milestones
@@ -124,10 +126,9 @@ async def create_vault(
         ]
         milestone_result = None
         if milestone_rows:
-            milestone_result = (
+            milestone_result = await run_query(
                 client.table("partner_milestones")
                 .insert(milestone_rows)
-                .execute()
             )
 
         # =============================================================
@@ -137,7 +138,7 @@ async def create_vault(
             {"vault_id": vault_id, "vibe_tag": vibe}
             for vibe in payload.vibes
         ]
-        client.table("partner_vibes").insert(vibe_rows).execute()
+        await run_query(client.table("partner_vibes").insert(vibe_rows))
 
         # =============================================================
         # 5. Insert budgets
@@ -152,7 +153,7 @@ async def create_vault(
             }
             for b in payload.budgets
         ]
-        client.table("partner_budgets").insert(budget_rows).execute()
+        await run_query(client.table("partner_budgets").insert(budget_rows))
 
         # =============================================================
         # 6. Insert love languages
@@ -169,7 +170,7 @@ async def create_vault(
                 "priority": 2,
             },
         ]
-        client.table("partner_love_languages").insert(love_language_rows).execute()
+        await run_query(client.table("partner_love_languages").insert(love_language_rows))
 
         # =============================================================
         # 7. Schedule milestone notifications (best-effort)
@@ -217,7 +218,7 @@ async def create_vault(
             for marker in ["duplicate", "unique", "23505"]
         ):
             # Clean up partial vault if one was created
-            _cleanup_vault(client, vault_id)
+            await _cleanup_vault(client, vault_id)
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail=(
@@ -227,14 +228,18 @@ async def create_vault(
             )
 
         # For any other database error, clean up and report
-        _cleanup_vault(client, vault_id)
+        await _cleanup_vault(client, vault_id)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create vault: {error_str}",
         )
 
+    finally:
+        # Drop cached VaultData whether the write succeeded or was rolled back
+        invalidate_vault(user_id)
 
-def _cleanup_vault(client, vault_id: str | None) -> None:
+
+async def _cleanup_vault(client, vault_id: str | None) -> None:
     """
     Delete a partially-created vault to avoid orphaned data.
 
@@ -244,7 +249,7 @@ def _cleanup_vault(client, vault_id: str | None) -> None:
     if vault_id is None:
         return
     try:
-        client.table("partner_vaults").delete().eq("id", vault_id).execute()
+        await run_query(client.table("partner_vaults").delete().eq("id", vault_id))
     except Exception:
         # Best-effort cleanup — don't mask the original error
         pass
@@ -276,11 +281,10 @@ async def get_vault(
     client = get_service_client()
 
     # --- 1. Fetch the vault ---
-    vault_result = (
+    vault_result = await run_query(
         client.table("partner_vaults")
         .select("*")
         .eq("user_id", user_id)
-        .execute()
     )
 
     if not vault_result.data:
@@ -293,39 +297,34 @@ async def get_vault(
     vault_id = vault["id"]
 
     # --- 2. Fetch all related data in parallel-ish (sequential for PostgREST) ---
-    interests_result = (
+    interests_result = await run_query(
         client.table("partner_interests")
         .select("*")
         .eq("vault_id", vault_id)
-        .execute()
     )
 
-    milestones_result = (
+    milestones_result = await run_query(
         client.table("partner_milestones")
         .select("*")
         .eq("vault_id", vault_id)
-        .execute()
     )
 
-    vibes_result = (
+    vibes_result = await run_query(
         client.table("partner_vibes")
         .select("*")
         .eq("vault_id", vault_id)
-        .execute()
     )
 
-    budgets_result = (
+    budgets_result = await run_query(
         client.table("partner_budgets")
         .select("*")
         .eq("vault_id", vault_id)
-        .execute()
     )
 
-    love_languages_result = (
+    love_languages_result = await run_query(
         client.table("partner_love_languages")
         .select("*")
         .eq("vault_id", vault_id)
-        .execute()
     )
 
     # --- 3. Build response ---
@@ -425,11 +424,10 @@ async def update_vault(
     client = get_service_client()
 
     # --- 1. Verify vault exists ---
-    vault_result = (
+    vault_result = await run_query(
         client.table("partner_vaults")
         .select("id")
         .eq("user_id", user_id)
-        .execute()
     )
 
     if not vault_result.data:
@@ -444,13 +442,12 @@ async def update_vault(
     # 2. Snapshot existing data before any mutations.
     #    If any step fails, we restore from this snapshot.
     # =================================================================
-    snapshot = _snapshot_vault_children(client, vault_id)
-    original_vault = (
+    snapshot = await _snapshot_vault_children(client, vault_id)
+    original_vault = await run_query(
         client.table("partner_vaults")
         .select("partner_name, relationship_tenure_months, cohabitation_status, "
                 "location_city, location_state, location_country")
         .eq("id", vault_id)
-        .execute()
     )
     original_vault_data = original_vault.data[0] if original_vault.data else None
 
@@ -466,12 +463,12 @@ async def update_vault(
             "location_state": payload.location_state,
             "location_country": payload.location_country or "US",
         }
-        client.table("partner_vaults").update(vault_update).eq("id", vault_id).execute()
+        await run_query(client.table("partner_vaults").update(vault_update).eq("id", vault_id))
 
         # =============================================================
         # 4. Replace interests (delete old, insert new)
         # =============================================================
-        client.table("partner_interests").delete().eq("vault_id", vault_id).execute()
+        await run_query(client.table("partner_interests").delete().eq("vault_id", vault_id))
 
         interest_rows = [
             {
@@ -489,12 +486,12 @@ async def update_vault(
             }
             for category in payload.dislikes
         ]
-        client.table("partner_interests").insert(interest_rows).execute()
+        await run_query(client.table("partner_interests").insert(interest_rows))
 
         # =============================================================
         # 5. Replace milestones (delete old, insert new)
         # =============================================================
-        client.table("partner_milestones").delete().eq("vault_id", vault_id).execute()
+        await run_query(client.table("partner_milestones").delete().eq("vault_id", vault_id))
 
         milestone_rows = [
             {
@@ -509,27 +506,26 @@ async def update_vault(
         ]
         milestone_result = None
         if milestone_rows:
-            milestone_result = (
+            milestone_result = await run_query(
                 client.table("partner_milestones")
                 .insert(milestone_rows)
-                .execute()
             )
 
         # =============================================================
         # 6. Replace vibes (delete old, insert new)
         # =============================================================
-        client.table("partner_vibes").delete().eq("vault_id", vault_id).execute()
+        await run_query(client.table("partner_vibes").delete().eq("vault_id", vault_id))
 
         vibe_rows = [
             {"vault_id": vault_id, "vibe_tag": vibe}
             for vibe in payload.vibes
         ]
-        client.table("partner_vibes").insert(vibe_rows).execute()
+        await run_query(client.table("partner_vibes").insert(vibe_rows))
 
         # =============================================================
         # 7. Replace budgets (delete old, insert new)
         # =============================================================
-        client.table("partner_budgets").delete().eq("vault_id", vault_id).execute()
+        await run_query(client.table("partner_budgets").delete().eq("vault_id", vault_id))
 
         budget_rows = [
             {
@@ -541,12 +537,12 @@ async def update_vault(
             }
             for b in payload.budgets
         ]
-        client.table("partner_budgets").insert(budget_rows).execute()
+        await run_query(client.table("partner_budgets").insert(budget_rows))
 
         # =============================================================
         # 8. Replace love languages (delete old, insert new)
         # =============================================================
-        client.table("partner_love_languages").delete().eq("vault_id", vault_id).execute()
+        await run_query(client.table("partner_love_languages").delete().eq("vault_id", vault_id))
 
         love_language_rows = [
             {
@@ -560,7 +556,7 @@ async def update_vault(
                 "priority": 2,
             },
         ]
-        client.table("partner_love_languages").insert(love_language_rows).execute()
+        await run_query(client.table("partner_love_languages").insert(love_language_rows))
 
         # =============================================================
         # 9. Schedule milestone notifications (best-effort)
@@ -603,7 +599,7 @@ async def update_vault(
     except Exception as exc:
         error_str = str(exc)
         # Attempt to restore the vault to its pre-update state
-        _restore_vault_from_snapshot(
+        await _restore_vault_from_snapshot(
             client, vault_id, snapshot, original_vault_data,
         )
         raise HTTPException(
@@ -611,8 +607,12 @@ async def update_vault(
             detail=f"Failed to update vault: {error_str}",
         )
 
+    finally:
+        # Drop cached VaultData whether the write succeeded or was rolled back
+        invalidate_vault(user_id)
+
 
-def _snapshot_vault_children(client, vault_id: str) -> dict:
+async def _snapshot_vault_children(client, vault_id: str) -> dict:
     """
     Capture a snapshot of all child table rows for a vault.
 
@@ -622,36 +622,31 @@ def _snapshot_vault_children(client, vault_id: str) -> dict:
     Returns a dict keyed by table name, each containing the list of rows
     with only the columns needed for re-insertion (no id/created_at).
     """
-    interests = (
+    interests = await run_query(
         client.table("partner_interests")
         .select("vault_id, interest_type, interest_category")
         .eq("vault_id", vault_id)
-        .execute()
     )
-    milestones = (
+    milestones = await run_query(
         client.table("partner_milestones")
         .select("vault_id, milestone_type, milestone_name, "
                 "milestone_date, recurrence, budget_tier")
         .eq("vault_id", vault_id)
-        .execute()
     )
-    vibes = (
+    vibes = await run_query(
         client.table("partner_vibes")
         .select("vault_id, vibe_tag")
         .eq("vault_id", vault_id)
-        .execute()
     )
-    budgets = (
+    budgets = await run_query(
         client.table("partner_budgets")
         .select("vault_id, occasion_type, min_amount, max_amount, currency")
         .eq("vault_id", vault_id)
-        .execute()
     )
-    love_languages = (
+    love_languages = await run_query(
         client.table("partner_love_languages")
         .select("vault_id, language, priority")
         .eq("vault_id", vault_id)
-        .execute()
     )
 
     return {
@@ -663,7 +658,7 @@ def _snapshot_vault_children(client, vault_id: str) -> dict:
     }
 
 
-def _restore_vault_from_snapshot(
+async def _restore_vault_from_snapshot(
     client,
     vault_id: str,
     snapshot: dict,
@@ -682,17 +677,19 @@ def _restore_vault_from_snapshot(
     try:
         # Restore the vault row to its original values
         if original_vault_data:
-            client.table("partner_vaults").update(
-                original_vault_data
-            ).eq("id", vault_id).execute()
+            await run_query(
+                client.table("partner_vaults")
+                .update(original_vault_data)
+                .eq("id", vault_id)
+            )
 
         # Wipe any partial new data and re-insert originals
         for table_name, rows in snapshot.items():
-            client.table(table_name).delete().eq(
-                "vault_id", vault_id
-            ).execute()
+            await run_query(
+                client.table(table_name).delete().eq("vault_id", vault_id)
+            )
             if rows:
-                client.table(table_name).insert(rows).execute()
+                await run_query(client.table(table_name).insert(rows))
 
     except Exception:
         # Best-effort — don't mask the original error.
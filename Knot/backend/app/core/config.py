@@ -21,10 +21,35 @@ PROJECT_NAME = "Knot"
 SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
 SUPABASE_ANON_KEY: str = os.getenv("SUPABASE_ANON_KEY", "")
 SUPABASE_SERVICE_ROLE_KEY: str = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
+# Max PostgREST queries in flight per worker (size of the run_query thread pool
+# and of the service client's HTTP connection pool).
+SUPABASE_DB_MAX_CONCURRENCY: int = int(os.getenv("SUPABASE_DB_MAX_CONCURRENCY", "16"))
+# Legacy HS256 project JWT secret (Dashboard → Settings → API). Optional — when
+# absent, access tokens signed with the project's asymmetric keys are verified
+# against the JWKS endpoint instead.
+SUPABASE_JWT_SECRET: str = os.getenv("SUPABASE_JWT_SECRET", "")
+# "local" verifies access tokens in-process and only calls /auth/v1/user when the
+# signing key is unknown; "remote" validates every token against /auth/v1/user.
+SUPABASE_JWT_VERIFICATION: str = os.getenv("SUPABASE_JWT_VERIFICATION", "local").lower()
 
 # --- Vertex AI (future steps) ---
 GOOGLE_CLOUD_PROJECT: str = os.getenv("GOOGLE_CLOUD_PROJECT", "")
 GOOGLE_APPLICATION_CREDENTIALS: str = os.getenv("GOOGLE_APPLICATION_CREDENTIALS", "")
+# Query-embedding cache. Entries are keyed by model and normalized text, so
+# the TTL only bounds how long an unused entry occupies space.
+EMBEDDING_CACHE_MAX_ENTRIES: int = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "4096"))
+EMBEDDING_CACHE_TTL: int = int(os.getenv("EMBEDDING_CACHE_TTL", "604800"))
+# SQLite file for the on-disk tier, shared by all workers on a host; empty
+# disables it (memory only).
+EMBEDDING_CACHE_PATH: str = os.getenv("EMBEDDING_CACHE_PATH", "")
+# Hint semantic search: "exact" ranks a vault's hints in-process from a cached
+# NumPy matrix (app.services.hint_index); "rpc" uses match_hints() over the
+# global HNSW index.
+HINT_SEARCH_MODE: str = os.getenv("HINT_SEARCH_MODE", "exact").lower()
+# Embedding micro-batching: concurrent requests are held for up to the window
+# and sent to Vertex AI as one call of at most EMBEDDING_BATCH_MAX_SIZE texts.
+EMBEDDING_BATCH_WINDOW_MS: float = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "5"))
+EMBEDDING_BATCH_MAX_SIZE: int = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32"))
 
 
 # --- Upstash QStash ---
@@ -66,9 +91,60 @@ FIRECRAWL_API_KEY: str = os.getenv("FIRECRAWL_API_KEY", "")
 
 # --- Anthropic (Claude for recommendation search) ---
 ANTHROPIC_API_KEY: str = os.getenv("ANTHROPIC_API_KEY", "")
+# Max Claude requests in flight per worker, across all call sites.
+CLAUDE_MAX_CONCURRENCY: int = int(os.getenv("CLAUDE_MAX_CONCURRENCY", "16"))
+# Stream unified generation and start URL resolution for each card as soon as
+# its JSON object completes, instead of waiting for the whole response.
+UNIFIED_GENERATION_STREAMING: bool = (
+    os.getenv("UNIFIED_GENERATION_STREAMING", "true").lower() == "true"
+)
 
 # --- Brave Search API ---
 BRAVE_SEARCH_API_KEY: str = os.getenv("BRAVE_SEARCH_API_KEY", "")
+# Process-wide Brave rate limit (app.services.brave_limiter). Size to the
+# plan's requests/second divided by the number of workers.
+BRAVE_RATE_LIMIT_PER_SECOND: float = float(os.getenv("BRAVE_RATE_LIMIT_PER_SECOND", "20"))
+BRAVE_RATE_LIMIT_BURST: int = int(os.getenv("BRAVE_RATE_LIMIT_BURST", "20"))
+# Longest a Brave call waits for a rate-limit token before giving up
+BRAVE_QUEUE_TIMEOUT: float = float(os.getenv("BRAVE_QUEUE_TIMEOUT", "5"))
+# Purchase-URL lookups cache (app.services.brave_cache). Searches that found
+# nothing usable are cached for the shorter BRAVE_CACHE_NEGATIVE_TTL.
+BRAVE_CACHE_MAX_ENTRIES: int = int(os.getenv("BRAVE_CACHE_MAX_ENTRIES", "2048"))
+BRAVE_CACHE_TTL: int = int(os.getenv("BRAVE_CACHE_TTL", "86400"))
+BRAVE_CACHE_NEGATIVE_TTL: int = int(os.getenv("BRAVE_CACHE_NEGATIVE_TTL", "3600"))
+# SQLite file for the on-disk tier, shared by all workers on a host; empty
+# disables it (memory only).
+BRAVE_CACHE_PATH: str = os.getenv("BRAVE_CACHE_PATH", "")
+
+# --- Availability verification ---
+# Resolve and live-check backup candidates concurrently, as soon as a slot
+# turns out not to be bookable, instead of one attempt at a time.
+AVAILABILITY_SPECULATIVE_SWAPS: bool = (
+    os.getenv("AVAILABILITY_SPECULATIVE_SWAPS", "true").lower() == "true"
+)
+
+# --- Recommendation pipeline ---
+# End-to-end latency budget for one pipeline run, in seconds (0 disables).
+# Nodes skip optional work as it runs out — see app/agents/budget.py.
+PIPELINE_LATENCY_BUDGET_SECONDS: float = float(
+    os.getenv("PIPELINE_LATENCY_BUDGET_SECONDS", "45")
+)
+# Per-run pipeline summaries kept in memory for the admin metrics endpoint
+PIPELINE_METRICS_RECENT_RUNS: int = int(os.getenv("PIPELINE_METRICS_RECENT_RUNS", "200"))
+
+# --- Admin endpoints ---
+# Shared secret for /api/v1/admin/* (sent as X-Admin-Token). Unset disables
+# the admin endpoints entirely.
+ADMIN_API_TOKEN: str = os.getenv("ADMIN_API_TOKEN", "")
+
+# --- Metrics (GET /metrics) ---
+# Directory where each uvicorn worker writes its metrics snapshot so /metrics
+# reports every worker, not just the one that served the scrape. Unset:
+# single-worker reporting. Clear it before starting the server.
+METRICS_MULTIPROC_DIR: str = os.getenv("METRICS_MULTIPROC_DIR", "")
+# Bearer token Prometheus must send to scrape /metrics. Unset leaves the
+# endpoint open — restrict it at the network edge instead.
+METRICS_BEARER_TOKEN: str = os.getenv("METRICS_BEARER_TOKEN", "")
 
 # --- Universal Links (Apple App Site Association) ---
 APP_DOMAIN: str = os.getenv("APP_DOMAIN", "api.knot-app.com")
@@ -0,0 +1,225 @@
+"""
+HTTP Client Registry — Application-lifetime httpx clients per upstream.
+
+Creating an httpx.AsyncClient per call means a fresh TCP + TLS handshake
+(and HTTP/2 negotiation for APNs) on every outbound request. The registry
+keeps one long-lived client per upstream, each with its own connection
+pool limits, keep-alive expiry and HTTP/2 setting, so connections are
+reused across requests.
+
+The registry is opened and closed by the FastAPI lifespan hook in
+app.main. Call sites always go through upstream_client():
+
+    async with upstream_client("brave", timeout=BRAVE_TIMEOUT) as client:
+        response = await client.get(...)
+
+While the registry is open this yields the shared client (and does NOT
+close it on exit). Outside the app lifecycle — scripts, background jobs
+run standalone, unit tests — it falls back to a per-call client with the
+same settings, so callers behave identically either way.
+
+Every client's transport records each request's latency (to response
+headers) and failures in app.core.pipeline_metrics, attributed to the
+upstream and to the pipeline node making the call.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Optional
+
+import httpx
+
+from app.core.pipeline_metrics import record_call
+
+logger = logging.getLogger(__name__)
+
+
+# ===================================================================
+# Upstream configuration
+# ===================================================================
+
+@dataclass(frozen=True)
+class UpstreamConfig:
+    """Connection pool settings for one upstream."""
+
+    max_connections: int
+    max_keepalive_connections: int
+    keepalive_expiry: float  # seconds an idle connection stays pooled
+    default_timeout: float = 10.0
+    http2: bool = False
+
+
+UPSTREAMS: dict[str, UpstreamConfig] = {
+    # Brave Search API — URL resolution and Claude search grounding
+    "brave": UpstreamConfig(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30.0),
+    # Supabase Auth / Admin API (PostgREST uses its own pooled sync client)
+    "supabase": UpstreamConfig(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30.0),
+    # Upstash QStash publish API
+    "qstash": UpstreamConfig(max_connections=10, max_keepalive_connections=5, keepalive_expiry=30.0),
+    # Apple Push Notification service. HTTP/2 multiplexes pushes over a few
+    # connections; Apple asks providers to keep them open long-term.
+    "apns": UpstreamConfig(
+        max_connections=4, max_keepalive_connections=4, keepalive_expiry=300.0, http2=True,
+    ),
+    # Arbitrary merchant pages (availability verification) — many hosts,
+    # short keep-alive so idle sockets to one-off hosts don't pile up.
+    "merchants": UpstreamConfig(max_connections=100, max_keepalive_connections=20, keepalive_expiry=15.0),
+    # Third-party catalog integrations
+    "yelp": UpstreamConfig(max_connections=10, max_keepalive_connections=5, keepalive_expiry=30.0),
+    "ticketmaster": UpstreamConfig(max_connections=10, max_keepalive_connections=5, keepalive_expiry=30.0),
+    "amazon": UpstreamConfig(max_connections=10, max_keepalive_connections=5, keepalive_expiry=30.0),
+    "shopify": UpstreamConfig(max_connections=10, max_keepalive_connections=5, keepalive_expiry=30.0),
+    "firecrawl": UpstreamConfig(
+        max_connections=10, max_keepalive_connections=5, keepalive_expiry=30.0, default_timeout=15.0,
+    ),
+}
+
+
+# ===================================================================
+# Registry state
+# ===================================================================
+
+# Shared clients keyed by (upstream, timeout) — None while the registry is
+# closed. Timeouts come from each caller's module constant, so in practice
+# there is one client per upstream.
+_clients: Optional[dict[tuple[str, float], httpx.AsyncClient]] = None
+
+
+def _client_kwargs(upstream: str, timeout: Optional[float]) -> dict:
+    """httpx.AsyncClient keyword arguments for an upstream."""
+    config = UPSTREAMS[upstream]
+    kwargs = {
+        "timeout": timeout if timeout is not None else config.default_timeout,
+        "limits": httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+        ),
+    }
+    if config.http2:
+        kwargs["http2"] = True
+    return kwargs
+
+
+class _InstrumentedTransport(httpx.AsyncBaseTransport):
+    """
+    Transport that records every request to an upstream (app.core.pipeline_metrics).
+
+    The underlying transport is opened on the first request: building one
+    creates an SSL context, which is tens of milliseconds of blocking work
+    that a client constructed and never used shouldn't pay.
+    """
+
+    def __init__(
+        self,
+        upstream: str,
+        open_transport: Callable[[], httpx.AsyncBaseTransport],
+    ) -> None:
+        self._upstream = upstream
+        self._open_transport = open_transport
+        self._transport: Optional[httpx.AsyncBaseTransport] = None
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self._transport is None:
+            self._transport = self._open_transport()
+        start = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            record_call(self._upstream, time.perf_counter() - start, error=True)
+            raise
+        # Throttling and server errors count against the upstream; other 4xx
+        # (a dead merchant page, say) are answers, not failures.
+        record_call(
+            self._upstream,
+            time.perf_counter() - start,
+            error=response.status_code >= 500 or response.status_code == 429,
+        )
+        return response
+
+    async def aclose(self) -> None:
+        if self._transport is not None:
+            await self._transport.aclose()
+
+
+def _new_client(upstream: str, timeout: Optional[float]) -> httpx.AsyncClient:
+    """A client for an upstream whose requests are recorded."""
+    kwargs = _client_kwargs(upstream, timeout)
+    transport = _InstrumentedTransport(upstream, lambda: httpx.AsyncHTTPTransport(
+        limits=kwargs["limits"], http2=kwargs.get("http2", False),
+    ))
+    return httpx.AsyncClient(**kwargs, transport=transport)
+
+
+async def open_http_clients() -> None:
+    """Open the registry. Called from the application lifespan on startup."""
+    global _clients
+    if _clients is None:
+        _clients = {}
+        logger.info("HTTP client registry opened (%d upstreams)", len(UPSTREAMS))
+
+
+async def close_http_clients() -> None:
+    """Close every shared client. Called from the application lifespan on shutdown."""
+    global _clients
+    clients, _clients = _clients, None
+    if not clients:
+        return
+    results = await asyncio.gather(
+        *(client.aclose() for client in clients.values()),
+        return_exceptions=True,
+    )
+    for (upstream, _), result in zip(clients, results):
+        if isinstance(result, Exception):
+            logger.warning("Failed to close %s HTTP client: %s", upstream, result)
+    logger.info("HTTP client registry closed")
+
+
+def http_clients_open() -> bool:
+    """Whether shared clients are currently being handed out."""
+    return _clients is not None
+
+
+def _get_shared_client(upstream: str, timeout: Optional[float]) -> httpx.AsyncClient:
+    """Return the shared client for an upstream, creating it on first use."""
+    kwargs = _client_kwargs(upstream, timeout)
+    key = (upstream, float(kwargs["timeout"]))
+    client = _clients.get(key)
+    # No await between lookup and insert, so concurrent tasks can't race
+    if client is None or client.is_closed:
+        client = _new_client(upstream, timeout)
+        _clients[key] = client
+    return client
+
+
+@asynccontextmanager
+async def upstream_client(
+    upstream: str,
+    *,
+    timeout: Optional[float] = None,
+) -> AsyncIterator[httpx.AsyncClient]:
+    """
+    Yield an httpx client for `upstream` (a key of UPSTREAMS).
+
+    Args:
+        upstream: Upstream name, e.g. "brave", "apns", "merchants".
+        timeout: Request timeout in seconds. Defaults to the upstream's
+                 default_timeout.
+
+    Yields:
+        The shared long-lived client while the registry is open, otherwise
+        a per-call client that is closed on exit.
+    """
+    if upstream not in UPSTREAMS:
+        raise KeyError(f"Unknown upstream '{upstream}'")
+
+    if _clients is not None:
+        yield _get_shared_client(upstream, timeout)
+        return
+
+    async with _new_client(upstream, timeout) as client:
+        yield client
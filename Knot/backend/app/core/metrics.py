@@ -0,0 +1,623 @@
+"""
+Metrics — Prometheus-format process metrics, served at GET /metrics.
+
+Lightweight in-process collectors (no prometheus_client dependency):
+
+- knot_http_request_duration_seconds{method,route,status} — every HTTP
+  request, labelled with the route template (MetricsMiddleware)
+- knot_db_query_duration_seconds{table,operation} and
+  knot_db_query_errors_total — every Supabase query run through
+  app.db.async_client.run_query
+- knot_upstream_request_duration_seconds{upstream} and
+  knot_upstream_request_errors_total — every outbound call recorded by
+  app.core.pipeline_metrics.record_call (upstream_client transports, the
+  shared Claude client, Vertex AI embeddings)
+- knot_event_loop_lag_seconds — how late the event loop wakes a sleeping
+  task, sampled every LOOP_LAG_INTERVAL by the metrics monitor
+- knot_pipeline_run_duration_seconds{outcome},
+  knot_pipeline_node_duration_seconds{node}, knot_pipeline_events_total
+  and knot_claude_tokens_total — fed by app.core.pipeline_metrics, whose
+  admin snapshot reads them back
+- knot_pipeline_runs_in_flight / knot_pipeline_nodes_in_flight{node}
+- knot_cache_lookups_total{cache,tier,result} and
+  knot_cache_evictions_total — every VersionedLRUCache and SQLiteTTLCache;
+  knot_cache_outcomes_total — the Brave result and merchant page caches
+
+Recording is a dict lookup and a few additions under one uncontended lock;
+labels are low-cardinality by construction (route templates, table names,
+upstream names — never raw paths or merchant hosts).
+
+Multiple workers: each uvicorn worker is its own process with its own
+samples. When METRICS_MULTIPROC_DIR is set, every worker writes its snapshot
+to <dir>/<pid>.json every FLUSH_INTERVAL seconds (and on shutdown), and
+/metrics merges them: counters and histograms are summed across live
+workers and AGGREGATE_FILE, while gauges only count live workers. The files
+of workers that have exited are folded into AGGREGATE_FILE (counters and
+histograms only) and deleted, so totals don't drop, the directory doesn't
+grow with restarts, and a worker that reuses an exited worker's pid folds
+the old file before overwriting it. Clear the directory before starting
+the server. Without it, /metrics reports only the worker that served it.
+
+Usage:
+    DB_QUERIES.observe(elapsed, "hints", "select")
+    text = render_metrics()
+"""
+
+import asyncio
+import bisect
+import contextlib
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterator, MutableMapping
+from typing import Any, Optional
+
+from app.core.config import METRICS_MULTIPROC_DIR
+
+logger = logging.getLogger(__name__)
+
+# ===================================================================
+# Configuration
+# ===================================================================
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+PIPELINE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 45.0, 60.0)
+
+LOOP_LAG_INTERVAL = 0.5  # seconds between event-loop lag samples
+FLUSH_INTERVAL = 5.0  # seconds between snapshot writes (METRICS_MULTIPROC_DIR)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# In METRICS_MULTIPROC_DIR: exited workers' counters and histograms, and the
+# lock serializing folds into it
+AGGREGATE_FILE = "aggregate.json"
+FOLD_LOCK_FILE = ".fold.lock"
+
+UNMATCHED_ROUTE = "unmatched"  # requests no route matched (404s, probes)
+HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+_lock = threading.Lock()
+_registry: dict[str, "_Metric"] = {}
+
+
+# ===================================================================
+# Collectors
+# ===================================================================
+
+class _Metric:
+    """A named family of samples keyed by label values."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._samples: dict[tuple[str, ...], Any] = {}
+        _registry[name] = self
+
+    def _snapshot(self) -> list:
+        return [[list(labels), value] for labels, value in self._samples.items()]
+
+    def samples(self) -> dict[tuple[str, ...], Any]:
+        """A copy of this worker's samples, keyed by label values."""
+        with _lock:
+            return {tuple(labels): value for labels, value in self._snapshot()}
+
+    def _merge(self, merged: dict, labels: tuple[str, ...], value: Any, live: bool) -> None:
+        merged[labels] = merged.get(labels, 0.0) + value
+
+    def _render(self, lines: list[str], labels: tuple[str, ...], value: Any) -> None:
+        lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+
+
+class Counter(_Metric):
+    """Monotonic count. Name it *_total."""
+
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with _lock:
+            self._samples[labels] = self._samples.get(labels, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """
+    Current value. Across workers, "sum" adds the live workers' values and
+    "max" reports the highest.
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        merge: str = "sum",
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.merge = merge
+
+    def set(self, value: float, *labels: str) -> None:
+        with _lock:
+            self._samples[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with _lock:
+            self._samples[labels] = self._samples.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def _merge(self, merged: dict, labels: tuple[str, ...], value: Any, live: bool) -> None:
+        if not live:
+            return  # an exited worker has nothing in flight
+        if self.merge == "max" and labels in merged:
+            merged[labels] = max(merged[labels], value)
+        else:
+            merged[labels] = merged.get(labels, 0.0) + value
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram; each sample is [per-bucket counts, sum]."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)  # last slot: +Inf
+        with _lock:
+            sample = self._samples.get(labels)
+            if sample is None:
+                sample = self._samples[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            sample[0][index] += 1
+            sample[1] += value
+
+    def _snapshot(self) -> list:
+        return [
+            [list(labels), [list(counts), total]]
+            for labels, (counts, total) in self._samples.items()
+        ]
+
+    def summarize(self, *samples: Any) -> dict:
+        """
+        Count, sum, mean, p50/p95/p99 and bucket counts of one or more
+        samples (summed). Quantiles are at bucket resolution: the upper
+        bound of the bucket holding them, or the largest bound when they
+        fall above every bound.
+        """
+        counts = [0] * (len(self.buckets) + 1)
+        total = 0.0
+        for sample_counts, sample_total in samples:
+            counts = [a + b for a, b in zip(counts, sample_counts)]
+            total += sample_total
+        count = sum(counts)
+
+        def _quantile(q: float) -> float:
+            if not count:
+                return 0.0
+            seen = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                seen += bucket_count
+                if seen >= q * count:
+                    return bound
+            return self.buckets[-1]
+
+        return {
+            "count": count,
+            "sum": round(total, 4),
+            "mean": round(total / count, 4) if count else 0.0,
+            "p50": _quantile(0.5),
+            "p95": _quantile(0.95),
+            "p99": _quantile(0.99),
+            "buckets": {
+                **{str(bound): n for bound, n in zip(self.buckets, counts)},
+                "+Inf": counts[-1],
+            },
+        }
+
+    def _merge(self, merged: dict, labels: tuple[str, ...], value: Any, live: bool) -> None:
+        counts, total = value
+        if len(counts) != len(self.buckets) + 1:
+            return  # written by a build with different buckets
+        existing = merged.get(labels)
+        if existing is None:
+            merged[labels] = [list(counts), total]
+        else:
+            existing[0] = [a + b for a, b in zip(existing[0], counts)]
+            existing[1] += total
+
+    def _render(self, lines: list[str], labels: tuple[str, ...], value: Any) -> None:
+        counts, total = value
+        names = self.labelnames + ("le",)
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            lines.append(
+                f"{self.name}_bucket{_labels(names, labels + (repr(float(bound)),))} {cumulative}"
+            )
+        cumulative += counts[-1]
+        lines.append(f"{self.name}_bucket{_labels(names, labels + ('+Inf',))} {cumulative}")
+        lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+        lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+
+
+# ===================================================================
+# Metrics
+# ===================================================================
+
+HTTP_REQUESTS = Histogram(
+    "knot_http_request_duration_seconds",
+    "HTTP request latency by route template and response status.",
+    ("method", "route", "status"),
+)
+DB_QUERIES = Histogram(
+    "knot_db_query_duration_seconds",
+    "Supabase (PostgREST) query round-trip time by table and operation.",
+    ("table", "operation"),
+)
+DB_QUERY_ERRORS = Counter(
+    "knot_db_query_errors_total",
+    "Supabase queries that raised, by table and operation.",
+    ("table", "operation"),
+)
+UPSTREAM_REQUESTS = Histogram(
+    "knot_upstream_request_duration_seconds",
+    "Outbound request latency by upstream.",
+    ("upstream",),
+)
+UPSTREAM_ERRORS = Counter(
+    "knot_upstream_request_errors_total",
+    "Outbound requests that failed (connection errors, 429, 5xx) by upstream.",
+    ("upstream",),
+)
+EVENT_LOOP_LAG = Histogram(
+    "knot_event_loop_lag_seconds",
+    "How late the event loop resumed a task sleeping for LOOP_LAG_INTERVAL.",
+    buckets=LOOP_LAG_BUCKETS,
+)
+EVENT_LOOP_LAG_LAST = Gauge(
+    "knot_event_loop_lag_last_seconds",
+    "Most recent event-loop lag sample (highest across workers).",
+    merge="max",
+)
+PIPELINE_RUNS = Histogram(
+    "knot_pipeline_run_duration_seconds",
+    "Recommendation pipeline run wall time by outcome (ok, error, failed, abandoned).",
+    ("outcome",),
+    buckets=PIPELINE_BUCKETS,
+)
+PIPELINE_NODES = Histogram(
+    "knot_pipeline_node_duration_seconds",
+    "Recommendation pipeline node wall time by node.",
+    ("node",),
+    buckets=PIPELINE_BUCKETS,
+)
+PIPELINE_EVENTS = Counter(
+    "knot_pipeline_events_total",
+    "Pipeline retries, swaps, idea fallbacks, short-circuits, errors and degradations by node.",
+    ("node", "event"),
+)
+CLAUDE_TOKENS = Counter(
+    "knot_claude_tokens_total",
+    "Claude tokens by call site and kind (input, output, cache_write, cache_read).",
+    ("call_site", "kind"),
+)
+PIPELINE_RUNS_IN_FLIGHT = Gauge(
+    "knot_pipeline_runs_in_flight",
+    "Recommendation pipeline runs in progress.",
+)
+PIPELINE_NODES_IN_FLIGHT = Gauge(
+    "knot_pipeline_nodes_in_flight",
+    "Recommendation pipeline nodes executing, by node.",
+    ("node",),
+)
+CACHE_LOOKUPS = Counter(
+    "knot_cache_lookups_total",
+    "Cache lookups by cache, tier (memory, disk) and result (hit, miss, error).",
+    ("cache", "tier", "result"),
+)
+CACHE_EVICTIONS = Counter(
+    "knot_cache_evictions_total",
+    "Entries evicted from an in-process cache to stay within max_entries.",
+    ("cache",),
+)
+CACHE_OUTCOMES = Counter(
+    "knot_cache_outcomes_total",
+    "Lookup outcomes of the Brave result and merchant page caches.",
+    ("cache", "outcome"),
+)
+
+
+# ===================================================================
+# HTTP middleware
+# ===================================================================
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording every HTTP request's latency (to the end of
+    the response body, so streamed responses count in full) by method,
+    route template and status. Requests that raise are recorded as 500.
+    """
+
+    def __init__(self, app: Callable[..., Awaitable[None]]) -> None:
+        self.app = app
+
+    async def __call__(self, scope: MutableMapping, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def _send(message: MutableMapping) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            # The router stores the matched route in the scope
+            route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+            method = scope["method"] if scope["method"] in HTTP_METHODS else "OTHER"
+            HTTP_REQUESTS.observe(time.perf_counter() - start, method, route, str(status))
+
+
+# ===================================================================
+# Event-loop monitor
+# ===================================================================
+
+_monitor: Optional[asyncio.Task] = None
+
+
+async def _monitor_loop() -> None:
+    loop = asyncio.get_running_loop()
+    next_flush = loop.time() + FLUSH_INTERVAL
+    while True:
+        start = loop.time()
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        lag = max(0.0, loop.time() - start - LOOP_LAG_INTERVAL)
+        EVENT_LOOP_LAG.observe(lag)
+        EVENT_LOOP_LAG_LAST.set(lag)
+        if METRICS_MULTIPROC_DIR and loop.time() >= next_flush:
+            next_flush = loop.time() + FLUSH_INTERVAL
+            try:
+                await asyncio.to_thread(write_snapshot)
+            except OSError as exc:
+                logger.warning("Could not write metrics snapshot: %s", exc)
+
+
+def start_metrics_monitor() -> None:
+    """Start sampling event-loop lag. Called from the application lifespan on startup."""
+    global _monitor
+    if _monitor is None or _monitor.done():
+        _monitor = asyncio.get_running_loop().create_task(_monitor_loop())
+
+
+async def stop_metrics_monitor() -> None:
+    """Stop the monitor and write a final snapshot. Called on shutdown."""
+    global _monitor
+    if _monitor is not None:
+        _monitor.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await _monitor
+        _monitor = None
+    if METRICS_MULTIPROC_DIR:
+        try:
+            await asyncio.to_thread(write_snapshot)
+        except OSError as exc:
+            logger.warning("Could not write metrics snapshot: %s", exc)
+
+
+# ===================================================================
+# Snapshots and exposition
+# ===================================================================
+
+def _snapshot() -> dict:
+    """This worker's samples, JSON-serializable."""
+    with _lock:
+        return {
+            "pid": os.getpid(),
+            "metrics": {name: metric._snapshot() for name, metric in _registry.items()},
+        }
+
+
+_snapshot_pid: Optional[int] = None  # pid this process last wrote a snapshot as
+
+
+def _write_json(path: str, data: dict) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp, path)  # readers never see a partial file
+
+
+def write_snapshot() -> None:
+    """Write this worker's snapshot to METRICS_MULTIPROC_DIR/<pid>.json."""
+    global _snapshot_pid
+    os.makedirs(METRICS_MULTIPROC_DIR, exist_ok=True)
+    pid = os.getpid()
+    path = os.path.join(METRICS_MULTIPROC_DIR, f"{pid}.json")
+    if _snapshot_pid != pid:
+        # A file under our pid before our first write was left by an exited
+        # worker whose pid we reused: keep its totals
+        with _fold_lock():
+            _fold_into_aggregate([path])
+        _snapshot_pid = pid
+    _write_json(path, _snapshot())
+
+
+@contextlib.contextmanager
+def _fold_lock() -> Iterator[None]:
+    """Serialize folds into AGGREGATE_FILE across workers."""
+    with open(os.path.join(METRICS_MULTIPROC_DIR, FOLD_LOCK_FILE), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)  # released when the file is closed
+        yield
+
+
+def _fold_into_aggregate(paths: list[str]) -> None:
+    """
+    Add the counters and histograms of the snapshots at `paths` to
+    AGGREGATE_FILE, then delete them. Missing files are skipped (another
+    worker folded them first). Hold _fold_lock().
+    """
+    folded = []
+    merged: dict[str, dict] = {name: {} for name in _registry}
+    for path in paths:
+        try:
+            with open(path) as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            continue
+        except (OSError, ValueError) as exc:
+            logger.warning("Skipping unreadable metrics snapshot %s: %s", path, exc)
+            continue
+        _merge_snapshot(merged, snapshot, live=False)
+        folded.append(path)
+    if not folded:
+        return
+
+    aggregate_path = os.path.join(METRICS_MULTIPROC_DIR, AGGREGATE_FILE)
+    try:
+        with open(aggregate_path) as f:
+            _merge_snapshot(merged, json.load(f), live=False)
+    except FileNotFoundError:
+        pass
+    _write_json(aggregate_path, {
+        "pid": None,
+        "metrics": {
+            name: [[list(labels), value] for labels, value in samples.items()]
+            for name, samples in merged.items() if samples
+        },
+    })
+    for path in folded:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+
+
+def _merge_snapshot(merged: dict[str, dict], snapshot: dict, live: bool) -> None:
+    """Merge one snapshot's samples into `merged` ({metric name: {labels: value}})."""
+    for name, samples in snapshot.get("metrics", {}).items():
+        metric = _registry.get(name)
+        if metric is None:
+            continue
+        for labels, value in samples:
+            metric._merge(merged[name], tuple(labels), value, live)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # exists, owned by someone else
+    return True
+
+
+def _worker_snapshots() -> list[tuple[dict, bool]]:
+    """
+    (snapshot, live) for this worker, every live worker in
+    METRICS_MULTIPROC_DIR and AGGREGATE_FILE, after folding the files of
+    exited workers into it.
+    """
+    own = _snapshot()
+    snapshots = [(own, True)]
+    if not METRICS_MULTIPROC_DIR:
+        return snapshots
+
+    try:
+        write_snapshot()
+        names = os.listdir(METRICS_MULTIPROC_DIR)
+    except OSError as exc:
+        logger.warning("Could not read metrics directory %s: %s", METRICS_MULTIPROC_DIR, exc)
+        return snapshots
+
+    live: list[str] = []
+    dead: list[str] = []
+    for name in names:
+        stem, ext = os.path.splitext(name)
+        if ext != ".json" or not stem.isdigit() or int(stem) == own["pid"]:
+            continue
+        path = os.path.join(METRICS_MULTIPROC_DIR, name)
+        (live if _pid_alive(int(stem)) else dead).append(path)
+    if dead:
+        try:
+            with _fold_lock():
+                _fold_into_aggregate(dead)
+        except OSError as exc:
+            logger.warning("Could not fold exited workers' metrics: %s", exc)
+
+    for path in [*live, os.path.join(METRICS_MULTIPROC_DIR, AGGREGATE_FILE)]:
+        try:
+            with open(path) as f:
+                snapshots.append((json.load(f), path in live))
+        except FileNotFoundError:
+            continue  # exited since listing (folded) / nothing folded yet
+        except (OSError, ValueError) as exc:
+            logger.warning("Skipping unreadable metrics snapshot %s: %s", path, exc)
+    return snapshots
+
+
+def render_metrics() -> str:
+    """
+    All metrics in the Prometheus text exposition format, merged across
+    workers when METRICS_MULTIPROC_DIR is set. Does file I/O in that case —
+    call it via asyncio.to_thread() from async code.
+    """
+    merged: dict[str, dict] = {name: {} for name in _registry}
+    for snapshot, live in _worker_snapshots():
+        _merge_snapshot(merged, snapshot, live)
+
+    lines: list[str] = []
+    for name, metric in _registry.items():
+        lines.append(f"# HELP {name} {metric.documentation}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        for labels, value in sorted(merged[name].items()):
+            metric._render(lines, labels, value)
+    return "\n".join(lines) + "\n"
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _reset_metrics() -> None:
+    """
+    Drop every sample.
+
+    Used by tests to isolate metrics between cases. Not intended for
+    production use.
+    """
+    with _lock:
+        for metric in _registry.values():
+            metric._samples.clear()
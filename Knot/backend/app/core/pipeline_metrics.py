@@ -0,0 +1,374 @@
+"""
+Pipeline Metrics — per-node instrumentation for the recommendation pipeline.
+
+Pipeline latency used to be visible only through ad-hoc log lines, which
+can't say whether Claude, Brave or merchant fetches dominate the p99. This
+module records, for every run:
+
+- wall time per node (every node registered in build_recommendation_graph is
+  wrapped with instrument_node)
+- outbound calls per node and upstream, with their latency and errors —
+  recorded by the instrumented transports on app.core.http_clients' clients,
+  the shared Claude client and the Vertex AI embedding calls
+- Claude token usage (input / output / cache write / cache read)
+- outcome counters: retries, swaps, idea fallbacks, short-circuits, errors
+  and latency-budget degradations
+
+The run and node in progress are tracked in context variables, so a call made
+anywhere below a node — including tasks it spawns — is attributed to it
+without passing anything around. Each finished run becomes a summary (kept
+in a ring of the last PIPELINE_METRICS_RECENT_RUNS and logged).
+
+Aggregates live only in the Prometheus collectors of app.core.metrics
+(run and node wall time, upstream calls, events, tokens, runs and nodes in
+flight), which GET /metrics merges across workers. get_pipeline_metrics()
+and GET /api/v1/admin/pipeline-metrics read this worker's samples back
+from them, next to its recent runs (the snapshot carries its pid).
+
+Usage:
+    with pipeline_run(vault_id) as run:
+        result = await graph.ainvoke(state)
+        run.finish(result)
+"""
+
+import functools
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from app.core.config import PIPELINE_METRICS_RECENT_RUNS
+from app.core.metrics import (
+    CLAUDE_TOKENS,
+    PIPELINE_EVENTS,
+    PIPELINE_NODES,
+    PIPELINE_NODES_IN_FLIGHT,
+    PIPELINE_RUNS,
+    PIPELINE_RUNS_IN_FLIGHT,
+    UPSTREAM_ERRORS,
+    UPSTREAM_REQUESTS,
+)
+
+logger = logging.getLogger(__name__)
+
+# ===================================================================
+# Configuration
+# ===================================================================
+
+# Claude usage fields, reported under these names
+TOKEN_FIELDS = {
+    "input_tokens": "input",
+    "output_tokens": "output",
+    "cache_creation_input_tokens": "cache_write",
+    "cache_read_input_tokens": "cache_read",
+}
+
+# Outcome counters (count_event names)
+RETRY = "retries"
+SWAP = "swaps"
+IDEA_FALLBACK = "idea_fallbacks"
+SHORT_CIRCUIT = "short_circuits"
+ERROR = "errors"
+DEGRADATION = "degradations"
+
+# Where events outside any node are filed
+PIPELINE = "pipeline"
+
+
+# ===================================================================
+# Per-run records
+# ===================================================================
+
+@dataclass
+class NodeRecord:
+    """What one node did during one run."""
+
+    seconds: float = 0.0
+    calls: dict[str, int] = field(default_factory=dict)
+    call_seconds: dict[str, float] = field(default_factory=dict)
+    call_errors: dict[str, int] = field(default_factory=dict)
+    tokens: dict[str, int] = field(default_factory=dict)
+    events: dict[str, int] = field(default_factory=dict)
+
+    def summary(self) -> dict:
+        summary: dict[str, Any] = {"seconds": round(self.seconds, 4)}
+        if self.calls:
+            summary["calls"] = dict(self.calls)
+            summary["call_seconds"] = {k: round(v, 4) for k, v in self.call_seconds.items()}
+        if self.call_errors:
+            summary["call_errors"] = dict(self.call_errors)
+        if self.tokens:
+            summary["tokens"] = dict(self.tokens)
+        if self.events:
+            summary["events"] = dict(self.events)
+        return summary
+
+
+def _add(counts: dict, key: str, amount: float = 1) -> None:
+    counts[key] = counts.get(key, 0) + amount
+
+
+class PipelineRun:
+    """Instrumentation for one pipeline run (one request)."""
+
+    def __init__(self, vault_id: str) -> None:
+        self.run_id = uuid.uuid4().hex[:12]
+        self.vault_id = vault_id
+        self.started_at = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        self.seconds: Optional[float] = None
+        self.outcome: Optional[str] = None
+        self.degradations: list[str] = []
+        self.nodes: dict[str, NodeRecord] = {}
+
+    def node(self, name: Optional[str]) -> NodeRecord:
+        name = name or PIPELINE
+        record = self.nodes.get(name)
+        if record is None:
+            record = self.nodes[name] = NodeRecord()
+        return record
+
+    def finish(self, result: Optional[dict] = None, outcome: Optional[str] = None) -> None:
+        """Record the final state; outcome defaults to "error" or "ok" from it."""
+        result = result or {}
+        self.outcome = outcome or ("error" if result.get("error") else "ok")
+        self.degradations = list(result.get("degradations") or [])
+
+    def summary(self) -> dict:
+        totals = NodeRecord()
+        for record in self.nodes.values():
+            for source, target in (
+                (record.calls, totals.calls),
+                (record.tokens, totals.tokens),
+                (record.events, totals.events),
+            ):
+                for key, value in source.items():
+                    _add(target, key, value)
+        seconds = self.seconds if self.seconds is not None else time.perf_counter() - self._start
+        return {
+            "run_id": self.run_id,
+            "vault_id": self.vault_id,
+            "started_at": self.started_at.isoformat(),
+            "seconds": round(seconds, 4),
+            "outcome": self.outcome,
+            "degradations": self.degradations,
+            "calls": totals.calls,
+            "tokens": totals.tokens,
+            "events": totals.events,
+            "nodes": {name: record.summary() for name, record in self.nodes.items()},
+        }
+
+
+# ===================================================================
+# Runs
+# ===================================================================
+
+_lock = threading.Lock()
+_recent: deque[dict] = deque(maxlen=PIPELINE_METRICS_RECENT_RUNS)
+
+_current_run: ContextVar[Optional[PipelineRun]] = ContextVar("pipeline_run", default=None)
+_current_node: ContextVar[Optional[str]] = ContextVar("pipeline_node", default=None)
+
+
+@contextmanager
+def pipeline_run(vault_id: str) -> Iterator[PipelineRun]:
+    """
+    Instrument the pipeline run inside the block.
+
+    On exit the run's summary is logged, kept in the recent-runs ring, and
+    its wall time recorded by outcome. A block that raises is recorded with
+    outcome "failed" unless finish() already set one.
+    """
+    run = PipelineRun(vault_id)
+    token = _current_run.set(run)
+    PIPELINE_RUNS_IN_FLIGHT.inc()
+    try:
+        yield run
+    except BaseException:
+        if run.outcome is None:
+            run.finish(outcome="failed")
+        raise
+    finally:
+        PIPELINE_RUNS_IN_FLIGHT.dec()
+        try:
+            _current_run.reset(token)
+        except ValueError:
+            # A streamed run's generator was closed from another context
+            _current_run.set(None)
+        _record_run(run)
+
+
+def _record_run(run: PipelineRun) -> None:
+    run.seconds = time.perf_counter() - run._start
+    if run.outcome is None:
+        run.outcome = "abandoned"  # e.g. a client disconnected mid-stream
+    summary = run.summary()
+    PIPELINE_RUNS.observe(run.seconds, run.outcome)
+    with _lock:
+        _recent.append(summary)
+
+    logger.info(
+        "Pipeline run %s for vault %s: %s in %.2fs — nodes %s, calls %s, tokens %s, events %s",
+        run.run_id, run.vault_id, run.outcome, run.seconds,
+        {name: node["seconds"] for name, node in summary["nodes"].items()},
+        summary["calls"], summary["tokens"], summary["events"],
+    )
+
+
+def current_run() -> Optional[PipelineRun]:
+    """The run being instrumented in this context, if any."""
+    return _current_run.get()
+
+
+# ===================================================================
+# Recording
+# ===================================================================
+
+def instrument_node(
+    name: str,
+    node: Callable[[Any], Awaitable[dict]],
+) -> Callable[[Any], Awaitable[dict]]:
+    """
+    Wrap a LangGraph node so its wall time, calls and outcomes are recorded.
+
+    The node's returned "degradations" and "error" are counted as events.
+    """
+    @functools.wraps(node)
+    async def _instrumented(state: Any) -> dict:
+        token = _current_node.set(name)
+        PIPELINE_NODES_IN_FLIGHT.inc(name)
+        start = time.perf_counter()
+        try:
+            result = await node(state)
+        except BaseException:
+            count_event(ERROR)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            PIPELINE_NODES_IN_FLIGHT.dec(name)
+            _current_node.reset(token)
+            run = _current_run.get()
+            if run is not None:
+                run.node(name).seconds += elapsed
+            PIPELINE_NODES.observe(elapsed, name)
+
+        if isinstance(result, dict):
+            if result.get("degradations"):
+                count_event(DEGRADATION, len(result["degradations"]), node=name)
+            if result.get("error"):
+                count_event(ERROR, node=name)
+        return result
+
+    return _instrumented
+
+
+def count_event(event: str, amount: int = 1, node: Optional[str] = None) -> None:
+    """
+    Count an outcome (RETRY, SWAP, ...) against `node` (default: the current
+    node) in the current run and the process totals.
+    """
+    node = node or _current_node.get() or PIPELINE
+    run = _current_run.get()
+    if run is not None:
+        _add(run.node(node).events, event, amount)
+    PIPELINE_EVENTS.inc(node, event, amount=amount)
+
+
+def record_call(upstream: str, seconds: float, error: bool = False) -> None:
+    """Record one outbound call to `upstream` made from the current context."""
+    run = _current_run.get()
+    if run is not None:
+        record = run.node(_current_node.get())
+        _add(record.calls, upstream)
+        _add(record.call_seconds, upstream, seconds)
+        if error:
+            _add(record.call_errors, upstream)
+    UPSTREAM_REQUESTS.observe(seconds, upstream)
+    if error:
+        UPSTREAM_ERRORS.inc(upstream)
+
+
+def record_claude_usage(call_site: str, usage: Any) -> None:
+    """Record a Claude response's `usage` (any object with the token fields)."""
+    if usage is None:
+        return
+    tokens = {}
+    for attribute, name in TOKEN_FIELDS.items():
+        value = getattr(usage, attribute, None)
+        if isinstance(value, int) and value:
+            tokens[name] = value
+    if not tokens:
+        return
+    run = _current_run.get()
+    if run is not None:
+        record = run.node(_current_node.get())
+        for name, value in tokens.items():
+            _add(record.tokens, name, value)
+    for name, value in tokens.items():
+        CLAUDE_TOKENS.inc(call_site, name, amount=value)
+
+
+# ===================================================================
+# Stats
+# ===================================================================
+
+def get_pipeline_metrics(recent: int = 20) -> dict:
+    """
+    This worker's pipeline metrics plus the most recent run summaries.
+
+    Args:
+        recent: How many of the latest run summaries to include (newest first).
+    """
+    runs = PIPELINE_RUNS.samples()
+    request_seconds = UPSTREAM_REQUESTS.samples()
+    errors = UPSTREAM_ERRORS.samples()
+    with _lock:
+        recent_runs = list(reversed(_recent))[:max(0, recent)]
+    return {
+        "pid": os.getpid(),
+        "runs": {outcome: sum(sample[0]) for (outcome,), sample in runs.items()},
+        "pipeline_seconds": PIPELINE_RUNS.summarize(*runs.values()),
+        "nodes": {
+            node: PIPELINE_NODES.summarize(sample)
+            for (node,), sample in PIPELINE_NODES.samples().items()
+        },
+        "upstreams": {
+            upstream: {
+                "calls": sum(sample[0]),
+                "errors": int(errors.get((upstream,), 0)),
+                "seconds": UPSTREAM_REQUESTS.summarize(sample),
+            }
+            for (upstream,), sample in request_seconds.items()
+        },
+        "tokens": _nested(CLAUDE_TOKENS.samples()),
+        "events": _nested(PIPELINE_EVENTS.samples()),
+        "recent": recent_runs,
+    }
+
+
+def _nested(samples: dict[tuple[str, str], float]) -> dict[str, dict[str, int]]:
+    """{(outer, inner): value} counter samples as {outer: {inner: int}}."""
+    nested: dict[str, dict[str, int]] = {}
+    for (outer, inner), value in samples.items():
+        nested.setdefault(outer, {})[inner] = int(value)
+    return nested
+
+
+def _reset_pipeline_metrics() -> None:
+    """
+    Drop the recent runs. The aggregates are app.core.metrics samples,
+    cleared by its _reset_metrics().
+
+    Used by tests to isolate metrics between cases. Not intended for
+    production use.
+    """
+    with _lock:
+        _recent.clear()
@@ -1,8 +1,27 @@
 """
 Security — Authentication and authorization middleware.
 
-Validates Bearer tokens against Supabase Auth and extracts
-the authenticated user's ID for use in route handlers.
+Validates Bearer tokens issued by Supabase Auth and extracts the
+authenticated user's ID for use in route handlers.
+
+Verification strategy (SUPABASE_JWT_VERIFICATION="local", the default):
+- Recently validated tokens are served from a small in-process TTL cache.
+- Otherwise the JWT is verified in-process: signature (HS256 project secret,
+  or ES256/RS256 keys from the project's JWKS endpoint), expiry, audience,
+  and issuer.
+- Only when the signing key is unknown locally (no secret configured, or a
+  kid missing from the JWKS even after a refresh) does the token go to
+  Supabase Auth's /auth/v1/user endpoint. An HS256 token that fails the
+  configured secret is rejected locally, so forged tokens never cost a
+  round trip; rotating the secret means redeploying with the new one.
+
+Setting SUPABASE_JWT_VERIFICATION="remote" restores the previous behaviour of
+validating every token against /auth/v1/user.
+
+Admin endpoints (/api/v1/admin/*) use require_admin_token instead: a shared
+ADMIN_API_TOKEN sent as X-Admin-Token, with the endpoints disabled when unset.
+GET /metrics uses require_metrics_token: METRICS_BEARER_TOKEN as a Bearer
+token (Prometheus' `authorization` scrape setting), open when unset.
 
 Usage in route handlers:
     from app.core.security import get_current_user_id
@@ -12,17 +31,68 @@ Usage in route handlers:
         return {"user_id": user_id}
 """
 
-from fastapi import Depends, HTTPException, status
+import asyncio
+import hashlib
+import hmac
+import logging
+import time
+from collections import OrderedDict
+
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 import httpx
+import jwt
+
+from app.core.config import (
+    ADMIN_API_TOKEN,
+    METRICS_BEARER_TOKEN,
+    SUPABASE_JWT_SECRET,
+    SUPABASE_JWT_VERIFICATION,
+    SUPABASE_URL,
+)
+from app.core.http_clients import upstream_client
+from app.services.lru_cache import MISS, VersionedLRUCache
 
-from app.core.config import SUPABASE_URL
+logger = logging.getLogger(__name__)
 
 # HTTPBearer extracts the Bearer token from the Authorization header.
 # auto_error=False so we can return a custom 401 message instead of
 # FastAPI's default 403 for missing credentials.
 _bearer_scheme = HTTPBearer(auto_error=False)
 
+# --- Local JWT verification ---
+JWT_AUDIENCE = "authenticated"  # Supabase's audience for signed-in users
+JWT_LEEWAY_SECONDS = 10  # tolerated clock skew on exp/nbf/iat
+ASYMMETRIC_ALGORITHMS = ("ES256", "RS256")
+JWKS_CACHE_TTL = 10 * 60  # refetch the key set every 10 minutes
+JWKS_MIN_REFRESH_INTERVAL = 30  # rate-limit refetches triggered by an unknown kid
+
+# --- Validated-token cache ---
+TOKEN_CACHE_TTL = 60  # seconds a validated token is trusted without re-checking
+TOKEN_CACHE_MAX_ENTRIES = 1024
+
+# kid -> PyJWK, plus the monotonic time of the last fetch attempt
+_jwks_keys: dict[str, jwt.PyJWK] = {}
+_jwks_fetched_at: float | None = None
+# Serializes JWKS refreshes; bound to the event loop it was created on
+_jwks_lock: asyncio.Lock | None = None
+_jwks_lock_loop: asyncio.AbstractEventLoop | None = None
+
+# sha256(token) -> (user_id, monotonic expiry); oldest entries evicted first
+_token_cache: OrderedDict[str, tuple[str, float]] = OrderedDict()
+
+
+class _UnknownSigningKey(Exception):
+    """The token's signing key is not known locally — defer to Supabase Auth."""
+
+
+def _invalid_token_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired authentication token.",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
 
 async def get_current_user_id(
     credentials: HTTPAuthorizationCredentials | None = Depends(_bearer_scheme),
@@ -30,9 +100,11 @@ async def get_current_user_id(
     """
     FastAPI dependency that validates the Supabase JWT and returns the user ID.
 
-    Extracts the Bearer token from the Authorization header, sends it to
-    Supabase Auth's /auth/v1/user endpoint for validation, and returns
-    the authenticated user's UUID string.
+    Extracts the Bearer token from the Authorization header and validates it
+    in-process (see the module docstring), falling back to Supabase Auth's
+    /auth/v1/user endpoint only when the signing key is unknown. Validated
+    tokens are cached for up to TOKEN_CACHE_TTL seconds (never past their
+    own expiry).
 
     Raises:
         HTTPException(401): If the token is missing, invalid, or expired.
@@ -50,12 +122,188 @@ async def get_current_user_id(
 
     token = credentials.credentials
 
-    # --- 2. Validate the token against Supabase Auth ---
-    # The /auth/v1/user endpoint returns the authenticated user's profile
-    # when called with a valid access token. If the token is invalid or
-    # expired, Supabase returns a 401 error.
+    # --- 2. Recently validated? ---
+    cache_key = hashlib.sha256(token.encode()).hexdigest()
+    cached_user_id = _get_cached_user_id(cache_key)
+    if cached_user_id is not None:
+        return cached_user_id
+
+    # --- 3. Verify in-process, deferring to Supabase Auth for unknown keys ---
+    claims: dict | None = None
+    if SUPABASE_JWT_VERIFICATION == "local":
+        try:
+            claims = await _verify_locally(token)
+        except _UnknownSigningKey as exc:
+            logger.debug("Local JWT verification deferred to Supabase Auth: %s", exc)
+
+    if claims is not None:
+        user_id = claims["sub"]
+        expires_at = claims.get("exp")
+    else:
+        user_id = await _verify_remotely(token)
+        expires_at = _unverified_expiry(token)
+
+    _remember_token(cache_key, user_id, expires_at)
+    return user_id
+
+
+async def _verify_locally(token: str) -> dict:
+    """
+    Verify a Supabase access token in-process and return its claims.
+
+    Checks the signature, exp/nbf/iat (with JWT_LEEWAY_SECONDS of skew),
+    the "authenticated" audience, and — when SUPABASE_URL is set — the
+    issuer. A token without a "sub" claim is rejected.
+
+    Raises:
+        _UnknownSigningKey: If the key that signed the token isn't known
+            locally; the caller falls back to /auth/v1/user.
+        HTTPException(401): If the token is malformed, expired, has the
+            wrong audience/issuer, or fails a known key's signature check
+            (including the configured HS256 secret).
+    """
+    try:
+        header = jwt.get_unverified_header(token)
+    except jwt.PyJWTError:
+        raise _invalid_token_error()
+
+    algorithm = header.get("alg")
+
+    if algorithm == "HS256":
+        if not SUPABASE_JWT_SECRET:
+            raise _UnknownSigningKey("HS256 token but SUPABASE_JWT_SECRET is not set")
+        key = SUPABASE_JWT_SECRET
+    elif algorithm in ASYMMETRIC_ALGORITHMS:
+        key = (await _get_signing_key(header.get("kid"))).key
+    else:
+        raise _UnknownSigningKey(f"unsupported algorithm {algorithm!r}")
+
+    try:
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=[algorithm],
+            audience=JWT_AUDIENCE,
+            issuer=f"{SUPABASE_URL}/auth/v1" if SUPABASE_URL else None,
+            leeway=JWT_LEEWAY_SECONDS,
+            options={
+                "require": ["exp", "sub", "aud"],
+                "verify_iss": bool(SUPABASE_URL),
+            },
+        )
+    except jwt.PyJWTError:
+        raise _invalid_token_error()
+
+    if not claims.get("sub"):
+        raise _invalid_token_error()
+
+    return claims
+
+
+async def _get_signing_key(kid: str | None) -> jwt.PyJWK:
+    """
+    Return the project's public key for `kid`, refreshing the JWKS as needed.
+
+    The key set is refetched when it is older than JWKS_CACHE_TTL, and once
+    more (rate-limited by JWKS_MIN_REFRESH_INTERVAL) when `kid` is missing so
+    a freshly rotated key is picked up without a restart.
+
+    Raises:
+        _UnknownSigningKey: If `kid` is still unknown after a refresh.
+    """
+    if not kid:
+        raise _UnknownSigningKey("token header has no kid")
+
+    if _jwks_age() >= JWKS_CACHE_TTL:
+        await _refresh_jwks(max_age=JWKS_CACHE_TTL)
+
+    if kid not in _jwks_keys and _jwks_age() >= JWKS_MIN_REFRESH_INTERVAL:
+        await _refresh_jwks(max_age=JWKS_MIN_REFRESH_INTERVAL)
+
+    signing_key = _jwks_keys.get(kid)
+    if signing_key is None:
+        raise _UnknownSigningKey(f"kid {kid!r} not in the project JWKS")
+    return signing_key
+
+
+def _jwks_age() -> float:
+    """Seconds since the last JWKS fetch attempt (infinite if never fetched)."""
+    if _jwks_fetched_at is None:
+        return float("inf")
+    return time.monotonic() - _jwks_fetched_at
+
+
+def _get_jwks_lock() -> asyncio.Lock:
+    """The JWKS refresh lock for the running event loop."""
+    global _jwks_lock, _jwks_lock_loop
+    loop = asyncio.get_running_loop()
+    if _jwks_lock is None or _jwks_lock_loop is not loop:
+        _jwks_lock = asyncio.Lock()
+        _jwks_lock_loop = loop
+    return _jwks_lock
+
+
+async def _refresh_jwks(max_age: float = 0.0) -> None:
+    """
+    Refetch the project's JWKS and replace the cached key set.
+
+    Refreshes are serialized: callers arriving while a fetch is in flight
+    wait for it and then skip their own fetch if the key set is now younger
+    than `max_age`. The fetch time is stamped only once the fetch finishes,
+    so nobody reads the old (or empty) key set as fresh in the meantime.
+
+    Failures are logged and leave the previous key set in place — tokens
+    signed with an unknown key then fall back to /auth/v1/user.
+    """
+    global _jwks_keys, _jwks_fetched_at
+
+    async with _get_jwks_lock():
+        if _jwks_age() < max_age:
+            return  # refreshed by the caller we waited on
+
+        if not SUPABASE_URL:
+            _jwks_fetched_at = time.monotonic()
+            return
+
+        try:
+            jwks = await _fetch_jwks()
+            key_set = jwt.PyJWKSet.from_dict(jwks)
+        except (httpx.HTTPError, ValueError, jwt.PyJWTError) as exc:
+            logger.warning("Failed to refresh Supabase JWKS: %s", exc)
+            return
+        finally:
+            _jwks_fetched_at = time.monotonic()
+
+        _jwks_keys = {k.key_id: k for k in key_set.keys if k.key_id}
+        logger.info("Loaded %d Supabase signing key(s) from JWKS", len(_jwks_keys))
+
+
+async def _fetch_jwks() -> dict:
+    """Fetch the project's public signing keys from Supabase Auth."""
+    async with upstream_client("supabase") as client:
+        response = await client.get(
+            f"{SUPABASE_URL}/auth/v1/.well-known/jwks.json",
+            timeout=5.0,
+        )
+    response.raise_for_status()
+    return response.json()
+
+
+async def _verify_remotely(token: str) -> str:
+    """
+    Validate a token against Supabase Auth's /auth/v1/user endpoint.
+
+    The endpoint returns the authenticated user's profile when called with
+    a valid access token, or a 401 if the token is invalid or expired.
+
+    Raises:
+        HTTPException(401): If Supabase rejects the token or is unreachable.
+
+    Returns:
+        str: The authenticated user's UUID.
+    """
     try:
-        async with httpx.AsyncClient() as client:
+        async with upstream_client("supabase") as client:
             response = await client.get(
                 f"{SUPABASE_URL}/auth/v1/user",
                 headers={
@@ -72,13 +320,8 @@ async def get_current_user_id(
             headers={"WWW-Authenticate": "Bearer"},
         ) from exc
 
-    # --- 3. Handle the response ---
     if response.status_code != 200:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired authentication token.",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _invalid_token_error()
 
     try:
         user_data = response.json()
@@ -101,6 +344,57 @@ async def get_current_user_id(
     return user_id
 
 
+def _unverified_expiry(token: str) -> float | None:
+    """Read the exp claim without verification (the token was validated remotely)."""
+    try:
+        exp = jwt.decode(token, options={"verify_signature": False}).get("exp")
+    except jwt.PyJWTError:
+        return None
+    return exp if isinstance(exp, (int, float)) else None
+
+
+def _get_cached_user_id(cache_key: str) -> str | None:
+    """Return the cached user ID for a token hash, dropping expired entries."""
+    entry = _token_cache.get(cache_key)
+    if entry is None:
+        return None
+    user_id, expires_at = entry
+    if time.monotonic() >= expires_at:
+        _token_cache.pop(cache_key, None)
+        return None
+    return user_id
+
+
+def _remember_token(cache_key: str, user_id: str, exp: float | None) -> None:
+    """
+    Cache a validated token for TOKEN_CACHE_TTL seconds, or until its own
+    exp claim if that comes first. Evicts the oldest entry when full.
+    """
+    ttl = float(TOKEN_CACHE_TTL)
+    if exp is not None:
+        ttl = min(ttl, exp - time.time())
+    if ttl <= 0:
+        return
+
+    _token_cache[cache_key] = (user_id, time.monotonic() + ttl)
+    _token_cache.move_to_end(cache_key)
+    while len(_token_cache) > TOKEN_CACHE_MAX_ENTRIES:
+        _token_cache.popitem(last=False)
+
+
+def _reset_verification_caches() -> None:
+    """
+    Clear the JWKS, validated-token, and account-status caches. Used by
+    tests to force re-verification. Not intended for production use.
+    """
+    global _jwks_keys, _jwks_fetched_at
+    _jwks_keys = {}
+    _jwks_fetched_at = None
+    _token_cache.clear()
+    _pending_status_cache.clear()
+    _active_status_cache.clear()
+
+
 async def get_active_user_id(
     user_id: str = Depends(get_current_user_id),
 ) -> str:
@@ -112,46 +406,163 @@ async def get_active_user_id(
         {"detail": "account_pending_deletion", "scheduled_deletion_at": "<iso>"}
     so the iOS client can surface the restore screen before any other UI.
 
+    The users.scheduled_deletion_at lookup is cached per user: a pending
+    status for ACCOUNT_STATUS_CACHE_TTL seconds, "not pending" for only
+    ACCOUNT_STATUS_ACTIVE_TTL. delete_account, restore_account,
+    dev_reset_account and process_account_deletion call
+    invalidate_account_status() so the gate flips immediately in the
+    process that handled the change; other workers start returning 410
+    within ACCOUNT_STATUS_ACTIVE_TTL of a delete.
+
     Used by every authenticated route except:
       - POST /api/v1/users/me/restore (must allow pending users)
       - DELETE /api/v1/users/me (calling delete twice re-schedules, not 410)
       - QStash webhook routes (no JWT)
     """
+    scheduled_at = await _get_scheduled_deletion_at(user_id)
+
+    if scheduled_at is not None:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail={
+                "code": "account_pending_deletion",
+                "scheduled_deletion_at": scheduled_at,
+            },
+        )
+
+    return user_id
+
+
+# --- Account-status cache for the pending-deletion gate ---
+ACCOUNT_STATUS_CACHE_TTL = 10  # seconds; a pending status outlives a restore elsewhere this long
+ACCOUNT_STATUS_ACTIVE_TTL = 1  # seconds; bounds how long another worker lets a deleted user in
+ACCOUNT_STATUS_CACHE_MAX_ENTRIES = 4096
+
+# "Not pending" is what every active user hits, so it's still worth caching,
+# but only briefly: invalidate_account_status() only reaches this worker.
+_pending_status_cache: VersionedLRUCache[str] = VersionedLRUCache(
+    "account_status", ACCOUNT_STATUS_CACHE_MAX_ENTRIES, ACCOUNT_STATUS_CACHE_TTL,
+)
+_active_status_cache: VersionedLRUCache[None] = VersionedLRUCache(
+    "account_status_active", ACCOUNT_STATUS_CACHE_MAX_ENTRIES, ACCOUNT_STATUS_ACTIVE_TTL,
+)
+
+
+async def _get_scheduled_deletion_at(user_id: str) -> str | None:
+    """
+    Return the user's scheduled_deletion_at (None when not pending),
+    served from the account-status caches when fresh.
+
+    A user that passed JWT validation but has no public.users row is treated
+    as not pending — downstream handlers will 404 if they need the row.
+
+    Raises:
+        HTTPException(500): If the column can't be read. We fail closed for
+            the gate: 410 would be wrong (we don't know it's pending).
+    """
+    if _active_status_cache.get(user_id) is not MISS:
+        return None
+    scheduled_at = _pending_status_cache.get(user_id)
+    if scheduled_at is not MISS:
+        return scheduled_at
+
+    pending_version = _pending_status_cache.version(user_id)
+    active_version = _active_status_cache.version(user_id)
+
+    from app.db.async_client import run_query
     from app.db.supabase_client import get_service_client
 
     client = get_service_client()
 
     try:
-        result = (
+        result = await run_query(
             client.table("users")
             .select("scheduled_deletion_at")
             .eq("id", user_id)
-            .execute()
         )
     except Exception:
-        # If we can't read the column we fail closed for the gate: 410 would
-        # be wrong (we don't know it's pending). Re-raise as 500.
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to verify account status.",
         )
 
-    if not result.data:
-        # User passed JWT validation but has no public.users row. Treat as
-        # not pending — downstream handlers will 404 if they need the row.
-        return user_id
+    scheduled_at = result.data[0].get("scheduled_deletion_at") if result.data else None
 
-    scheduled_at = result.data[0].get("scheduled_deletion_at")
-    if scheduled_at is not None:
+    # Skipped when invalidated mid-read, so a stale status is never cached
+    if scheduled_at is None:
+        _active_status_cache.put(user_id, None, active_version)
+    else:
+        _pending_status_cache.put(user_id, scheduled_at, pending_version)
+
+    return scheduled_at
+
+
+def invalidate_account_status(user_id: str) -> None:
+    """
+    Drop the cached pending-deletion status for a user.
+
+    Call after any write to users.scheduled_deletion_at (or after deleting
+    the user) so the next gated request re-reads the column. Bumps the
+    user's version stamps so a read already in flight isn't cached.
+    """
+    _pending_status_cache.invalidate(user_id)
+    _active_status_cache.invalidate(user_id)
+
+
+def get_account_status_cache_stats() -> dict:
+    """Counters and occupancy of the pending-deletion gate's caches."""
+    return {
+        "pending": _pending_status_cache.stats(),
+        "active": _active_status_cache.stats(),
+    }
+
+
+async def require_admin_token(
+    x_admin_token: str | None = Header(None, alias="X-Admin-Token"),
+) -> None:
+    """
+    FastAPI dependency guarding admin endpoints with the shared ADMIN_API_TOKEN.
+
+    Raises:
+        HTTPException(403): ADMIN_API_TOKEN is not configured (admin
+            endpoints are disabled in this environment).
+        HTTPException(401): The X-Admin-Token header is missing or wrong.
+    """
+    if not ADMIN_API_TOKEN:
         raise HTTPException(
-            status_code=status.HTTP_410_GONE,
-            detail={
-                "code": "account_pending_deletion",
-                "scheduled_deletion_at": scheduled_at,
-            },
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin endpoints are disabled in this environment.",
+        )
+    if not x_admin_token or not hmac.compare_digest(
+        x_admin_token.encode(), ADMIN_API_TOKEN.encode(),
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid admin token.",
         )
 
-    return user_id
+
+async def require_metrics_token(
+    credentials: HTTPAuthorizationCredentials | None = Depends(_bearer_scheme),
+) -> None:
+    """
+    FastAPI dependency guarding GET /metrics with METRICS_BEARER_TOKEN.
+
+    A no-op when the token is not configured.
+
+    Raises:
+        HTTPException(401): The Bearer token is missing or wrong.
+    """
+    if not METRICS_BEARER_TOKEN:
+        return
+    if credentials is None or not hmac.compare_digest(
+        credentials.credentials.encode(), METRICS_BEARER_TOKEN.encode(),
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
 
 
 def _get_apikey() -> str:
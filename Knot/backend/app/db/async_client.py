@@ -0,0 +1,129 @@
+"""
+Async Query Execution — Non-blocking access to the synchronous Supabase client.
+
+supabase-py's client is synchronous: every `.execute()` performs a blocking
+PostgREST round trip. Called directly inside an `async def` handler it stalls
+the event loop — and every other request on that worker — for the full round
+trip. run_query() runs the blocking call on a dedicated, bounded thread pool
+so route handlers, pipeline nodes, and services can await it instead.
+
+The pool size (SUPABASE_DB_MAX_CONCURRENCY) caps in-flight PostgREST requests
+per worker; the service client's HTTP connection pool is sized to match (see
+get_service_client), so queries never queue on connections the pool can't use.
+
+Every query's round trip is recorded in app.core.metrics by table and
+operation (select / insert / upsert / update / delete / rpc), read from the
+request builder.
+
+Usage:
+    from app.db.async_client import run_query
+
+    result = await run_query(
+        client.table("users")
+        .select("scheduled_deletion_at")
+        .eq("id", user_id)
+    )
+"""
+
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Protocol
+
+from app.core.config import SUPABASE_DB_MAX_CONCURRENCY
+from app.core.metrics import DB_QUERIES, DB_QUERY_ERRORS
+
+
+class ExecutableQuery(Protocol):
+    """Any supabase-py request builder (table query, RPC call, …)."""
+
+    def execute(self) -> Any: ...
+
+
+# PostgREST HTTP method -> metrics operation label
+_OPERATIONS = {
+    "GET": "select",
+    "HEAD": "select",  # count-only selects
+    "POST": "insert",
+    "PATCH": "update",
+    "DELETE": "delete",
+}
+
+# Module-level executor — initialized lazily
+_executor: ThreadPoolExecutor | None = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Return the shared query executor, creating it on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=SUPABASE_DB_MAX_CONCURRENCY,
+            thread_name_prefix="supabase-query",
+        )
+    return _executor
+
+
+def _describe(query: ExecutableQuery) -> tuple[str, str]:
+    """(table, operation) for a supabase-py request builder's metrics labels."""
+    request = getattr(query, "request", None)
+    url = getattr(request, "path", None)
+    path = getattr(url, "path", url)  # a yarl.URL in postgrest
+    method = getattr(request, "http_method", None)
+    if not isinstance(path, str) or not isinstance(method, str):
+        return "unknown", "unknown"
+    parent, _, name = path.rstrip("/").rpartition("/")
+    if parent.endswith("/rpc"):
+        return name, "rpc"
+    operation = _OPERATIONS.get(method, method.lower())
+    if operation == "insert" and "resolution=" in (request.headers.get("prefer") or ""):
+        operation = "upsert"
+    return name, operation
+
+
+def _execute_timed(query: ExecutableQuery, table: str, operation: str) -> Any:
+    """Run query.execute() on a pool thread, recording its round trip."""
+    start = time.perf_counter()
+    try:
+        return query.execute()
+    except Exception:
+        DB_QUERY_ERRORS.inc(table, operation)
+        raise
+    finally:
+        DB_QUERIES.observe(time.perf_counter() - start, table, operation)
+
+
+async def run_query(query: ExecutableQuery) -> Any:
+    """
+    Execute a supabase-py request builder without blocking the event loop.
+
+    Build the query as usual but pass it here instead of calling
+    `.execute()` — the blocking round trip runs on the bounded query pool
+    and the APIResponse (or the raised APIError) is returned to the caller.
+
+    Args:
+        query: A request builder, e.g. client.table("hints").select("*").eq(...)
+               or client.rpc("match_hints", {...}).
+
+    Returns:
+        Whatever query.execute() returns (an APIResponse with .data/.count).
+    """
+    loop = asyncio.get_running_loop()
+    # Carry the caller's context (log correlation, instrumentation) into the
+    # worker thread.
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(
+        _get_executor(), ctx.run, _execute_timed, query, *_describe(query),
+    )
+
+
+def shutdown_query_executor() -> None:
+    """
+    Shut down the query pool, waiting for in-flight queries to finish.
+    Called on application shutdown; the next run_query() recreates it.
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
@@ -6,14 +6,19 @@ Uses the anon key for user-context operations (respects RLS)
 and the service role key for admin operations (bypasses RLS).
 """
 
-from supabase import create_client, Client
+import httpx
+from supabase import ClientOptions, create_client, Client
 from app.core.config import (
+    SUPABASE_DB_MAX_CONCURRENCY,
     SUPABASE_URL,
     SUPABASE_ANON_KEY,
     SUPABASE_SERVICE_ROLE_KEY,
     validate_supabase_config,
 )
 
+# Per-request timeout for PostgREST calls made through the service client.
+SERVICE_CLIENT_TIMEOUT = 30.0
+
 # Module-level clients — initialized lazily
 _anon_client: Client | None = None
 _service_client: Client | None = None
@@ -41,11 +46,29 @@ def get_service_client() -> Client:
     WARNING: This client BYPASSES Row Level Security.
     Only use for administrative operations (migrations, background jobs,
     notification processing) that need access across all users.
+
+    The client is synchronous — from async code, execute its queries via
+    app.db.async_client.run_query. Its HTTP connection pool is sized to the
+    run_query thread pool (SUPABASE_DB_MAX_CONCURRENCY) so every worker
+    thread can hold a keep-alive connection.
     """
     global _service_client
     if _service_client is None:
         validate_supabase_config()
-        _service_client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+        http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=SUPABASE_DB_MAX_CONCURRENCY,
+                max_keepalive_connections=SUPABASE_DB_MAX_CONCURRENCY,
+            ),
+            timeout=SERVICE_CLIENT_TIMEOUT,
+            follow_redirects=True,
+            http2=True,
+        )
+        _service_client = create_client(
+            SUPABASE_URL,
+            SUPABASE_SERVICE_ROLE_KEY,
+            options=ClientOptions(httpx_client=http_client),
+        )
     return _service_client
 
 
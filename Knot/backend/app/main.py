@@ -3,10 +3,17 @@ Knot Backend — FastAPI Entry Point
 
 This is the main application module for the Knot backend.
 It initializes the FastAPI app and registers all route handlers.
+The lifespan hook owns process-wide resources: the shared outbound HTTP
+clients, the Supabase query pool, and the metrics monitor. Every request's
+latency is recorded by MetricsMiddleware; Prometheus scrapes GET /metrics.
 """
 
-from fastapi import Depends, FastAPI
+import asyncio
+from contextlib import asynccontextmanager
 
+from fastapi import Depends, FastAPI, Response
+
+from app.api.admin import router as admin_router
 from app.api.deeplinks import router as deeplinks_router
 from app.api.feedback import router as feedback_router
 from app.api.hints import router as hints_router
@@ -16,13 +23,40 @@ from app.api.notifications import router as notifications_router
 from app.api.recommendations import router as recommendations_router
 from app.api.users import router as users_router
 from app.api.vault import router as vault_router
-from app.core.security import get_current_user_id
+from app.core.http_clients import close_http_clients, open_http_clients
+from app.core.metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    MetricsMiddleware,
+    render_metrics,
+    start_metrics_monitor,
+    stop_metrics_monitor,
+)
+from app.core.security import get_current_user_id, require_metrics_token
+from app.db.async_client import shutdown_query_executor
+from app.services.claude_client import close_claude_client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared HTTP clients and start the metrics monitor on startup; release them on shutdown."""
+    await open_http_clients()
+    start_metrics_monitor()
+    try:
+        yield
+    finally:
+        await stop_metrics_monitor()
+        await close_http_clients()
+        await close_claude_client()
+        shutdown_query_executor()
+
 
 app = FastAPI(
     title="Knot API",
     description="Relational Excellence on Autopilot — Backend API",
     version="0.1.0",
+    lifespan=lifespan,
 )
+app.add_middleware(MetricsMiddleware)
 
 # --- Register API routers ---
 app.include_router(deeplinks_router)
@@ -34,6 +68,7 @@ app.include_router(milestones_router)
 app.include_router(recommendations_router)
 app.include_router(notifications_router)
 app.include_router(users_router)
+app.include_router(admin_router)
 
 
 @app.get("/health")
@@ -42,6 +77,13 @@ async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+async def metrics():
+    """Prometheus scrape endpoint (text exposition format), merged across workers."""
+    body = await asyncio.to_thread(render_metrics)
+    return Response(content=body, media_type=METRICS_CONTENT_TYPE)
+
+
 @app.get("/api/v1/me")
 async def get_current_user(user_id: str = Depends(get_current_user_id)):
     """
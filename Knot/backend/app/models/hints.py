@@ -5,6 +5,7 @@ Defines request/response models for the hint CRUD endpoints:
 - POST /api/v1/hints — Create hint (Step 4.2)
 - GET /api/v1/hints — List hints (Step 4.2)
 - DELETE /api/v1/hints/{hint_id} — Delete hint (Step 4.6)
+- POST /api/v1/hints/backfill-embeddings — QStash-triggered embedding backfill
 
 Step 4.2: Text Hint Capture
 Step 4.4: Hint Submission with Embedding Generation (adds Vertex AI embedding)
@@ -80,3 +81,14 @@ class HintListResponse(BaseModel):
 
     hints: list[HintResponse]
     total: int
+
+
+class EmbeddingBackfillResponse(BaseModel):
+    """Response from POST /api/v1/hints/backfill-embeddings."""
+
+    status: str  # completed | partial | error | skipped
+    embedded: int = 0
+    failed: int = 0
+    pages: int = 0
+    cursor: Optional[str] = None  # checkpoint the next run resumes after
+    requeued: bool = False  # a follow-up run was queued via QStash
@@ -135,6 +135,9 @@ class RecommendationGenerateResponse(BaseModel):
     occasion_type: str
     briefing_text: Optional[str] = None
     briefing_snippet: Optional[str] = None
+    # Optional steps skipped to meet the pipeline's latency budget, e.g.
+    # "skipped_price_verification" (see app/agents/budget.py)
+    degradations: list[str] = Field(default_factory=list)
 
 
 class RecommendationRefreshResponse(BaseModel):
@@ -148,6 +151,8 @@ class RecommendationRefreshResponse(BaseModel):
     recommendations: list[RecommendationItemResponse]
     count: int
     rejection_reason: str
+    # Optional steps skipped to meet the pipeline's latency budget
+    degradations: list[str] = Field(default_factory=list)
 
 
 # ======================================================================
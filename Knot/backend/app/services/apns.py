@@ -16,7 +16,6 @@ import logging
 import time
 from pathlib import Path
 
-import httpx
 import jwt
 
 from app.core.config import (
@@ -26,6 +25,7 @@ from app.core.config import (
     APNS_TEAM_ID,
     APNS_USE_SANDBOX,
 )
+from app.core.http_clients import upstream_client
 
 logger = logging.getLogger(__name__)
 
@@ -233,7 +233,7 @@ async def send_push_notification(
         "apns-priority": "10",
     }
 
-    async with httpx.AsyncClient(http2=True) as client:
+    async with upstream_client("apns") as client:
         response = await client.post(
             url,
             json=payload,
@@ -326,16 +326,16 @@ async def deliver_push_notification(
     Returns:
         dict with delivery result (see send_push_notification).
     """
+    from app.db.async_client import run_query
     from app.db.supabase_client import get_service_client
 
     client = get_service_client()
 
     try:
-        result = (
+        result = await run_query(
             client.table("users")
             .select("device_token, device_platform")
             .eq("id", user_id)
-            .execute()
         )
     except Exception as exc:
         logger.error(
@@ -0,0 +1,182 @@
+"""
+Brave Cache — Two-tier cache of Brave Search purchase-URL lookups.
+
+app.agents.url_resolution searches Brave for every purchasable card and
+every availability swap. Claude often writes near-identical search_query
+strings for popular items and local venues, and each miss costs a Brave
+round trip (up to BRAVE_TIMEOUT) plus quota. This module caches the URL a
+search resolved to, keyed by the normalized query and search language:
+
+- Positive entries (a purchase URL was found) live BRAVE_CACHE_TTL seconds
+- Negative entries (Brave answered but nothing was usable) live the
+  shorter BRAVE_CACHE_NEGATIVE_TTL, so a new listing is picked up soon
+- Failures (timeouts, 429s, HTTP errors) are never cached
+
+Lookups check an in-process LRU first, then — when BRAVE_CACHE_PATH is
+set — a SQLite tier shared by every worker on the host (see
+app.services.disk_cache), promoting disk hits into memory. Hit rates are
+exposed via get_brave_cache_stats().
+"""
+
+import asyncio
+import hashlib
+import threading
+import unicodedata
+from typing import Any, Optional
+
+from app.core.config import (
+    BRAVE_CACHE_MAX_ENTRIES,
+    BRAVE_CACHE_NEGATIVE_TTL,
+    BRAVE_CACHE_PATH,
+    BRAVE_CACHE_TTL,
+)
+from app.core.metrics import CACHE_OUTCOMES
+from app.services.disk_cache import SQLiteTTLCache
+from app.services.lru_cache import MISS, VersionedLRUCache
+
+# ===================================================================
+# Configuration
+# ===================================================================
+
+# Bump when URL selection changes so cached picks from the old rules are
+# ignored (the disk tier outlives deploys).
+BRAVE_CACHE_KEY_VERSION = 1
+
+# Negative entries are cheaper to recompute and churn faster
+_NEGATIVE_MAX_ENTRIES = max(1, BRAVE_CACHE_MAX_ENTRIES // 4)
+
+_positive_cache: VersionedLRUCache[str] = VersionedLRUCache(
+    "brave_results", BRAVE_CACHE_MAX_ENTRIES, BRAVE_CACHE_TTL,
+)
+_negative_cache: VersionedLRUCache[None] = VersionedLRUCache(
+    "brave_no_results", _NEGATIVE_MAX_ENTRIES, BRAVE_CACHE_NEGATIVE_TTL,
+)
+_disk_tier: Optional[SQLiteTTLCache] = None
+_disk_tier_opened = False
+
+# Lookup outcomes across both tiers
+_counters_lock = threading.Lock()
+_counters = {"hits": 0, "negative_hits": 0, "misses": 0}
+
+
+def _count(outcome: str) -> None:
+    with _counters_lock:
+        _counters[outcome] += 1
+    CACHE_OUTCOMES.inc(_positive_cache.name, outcome)
+
+
+# ===================================================================
+# Keys
+# ===================================================================
+
+def normalize_search_query(query: str) -> str:
+    """Canonical form used for cache keys: NFC, case-folded, whitespace collapsed."""
+    return " ".join(unicodedata.normalize("NFC", query).casefold().split())
+
+
+def _cache_key(query: str, search_lang: str) -> str:
+    normalized = normalize_search_query(query)
+    raw = f"v{BRAVE_CACHE_KEY_VERSION}\n{search_lang}\n{normalized}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _get_disk_tier() -> Optional[SQLiteTTLCache]:
+    """The SQLite tier, opened on first use; None when BRAVE_CACHE_PATH is unset."""
+    global _disk_tier, _disk_tier_opened
+    if not _disk_tier_opened:
+        _disk_tier_opened = True
+        if BRAVE_CACHE_PATH:
+            _disk_tier = SQLiteTTLCache(
+                BRAVE_CACHE_PATH, "brave_results", max_rows=BRAVE_CACHE_MAX_ENTRIES * 16,
+            )
+    return _disk_tier
+
+
+def _remember(key: str, url: Optional[str]) -> None:
+    if url:
+        _positive_cache.put(key, url, _positive_cache.version(key))
+    else:
+        _negative_cache.put(key, None, _negative_cache.version(key))
+
+
+# ===================================================================
+# Lookup and store
+# ===================================================================
+
+async def get_cached_search_result(query: str, search_lang: str) -> Any:
+    """
+    Return the cached purchase URL for a search, None for a cached "no
+    usable result", or MISS.
+    """
+    key = _cache_key(query, search_lang)
+    url = _positive_cache.get(key)
+    if url is not MISS:
+        _count("hits")
+        return url
+    if _negative_cache.get(key) is not MISS:
+        _count("negative_hits")
+        return None
+
+    disk = _get_disk_tier()
+    if disk is not None:
+        entry = await asyncio.to_thread(disk.get, key)
+        if isinstance(entry, dict) and "url" in entry:
+            _remember(key, entry["url"])
+            _count("hits" if entry["url"] else "negative_hits")
+            return entry["url"]
+
+    _count("misses")
+    return MISS
+
+
+async def cache_search_result(query: str, search_lang: str, url: Optional[str]) -> None:
+    """
+    Cache what a successful Brave search resolved to: a URL (positive) or
+    None when no result was usable (negative, shorter TTL).
+    """
+    key = _cache_key(query, search_lang)
+    _remember(key, url)
+    disk = _get_disk_tier()
+    if disk is not None:
+        ttl = BRAVE_CACHE_TTL if url else BRAVE_CACHE_NEGATIVE_TTL
+        await asyncio.to_thread(disk.put, key, {"url": url}, ttl)
+
+
+def get_brave_cache_stats() -> dict:
+    """Lookup outcomes plus per-tier counters for the Brave result cache."""
+    with _counters_lock:
+        outcomes = dict(_counters)
+    lookups = sum(outcomes.values())
+    disk = _get_disk_tier()
+    return {
+        **outcomes,
+        "hit_rate": (
+            round((outcomes["hits"] + outcomes["negative_hits"]) / lookups, 4)
+            if lookups else 0.0
+        ),
+        "memory": {
+            "positive": _positive_cache.stats(),
+            "negative": _negative_cache.stats(),
+        },
+        "disk": disk.stats() if disk is not None else None,
+    }
+
+
+def _reset_brave_cache() -> None:
+    """
+    Empty both memory tiers, zero the counters and close the disk tier, so
+    it is reopened from BRAVE_CACHE_PATH on next use.
+
+    Used by tests to isolate cached searches between cases. Not intended
+    for production use.
+    """
+    global _disk_tier, _disk_tier_opened
+    _positive_cache.clear()
+    _negative_cache.clear()
+    with _counters_lock:
+        for outcome in _counters:
+            _counters[outcome] = 0
+    if _disk_tier is not None:
+        _disk_tier.close()
+    _disk_tier = None
+    _disk_tier_opened = False
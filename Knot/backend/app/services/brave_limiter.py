@@ -0,0 +1,298 @@
+"""
+Brave Limiter — One process-wide rate limiter for every Brave Search call.
+
+Brave is called from URL resolution, the availability node's replacement
+loop (via URL resolution) and the Claude search service. Uncoordinated,
+their bursts trip Brave's per-second limit, and a 429 in URL resolution
+reads as "no purchase page", which triggers even more swap searches.
+
+Every Brave request goes through brave_get():
+
+1. Take a token from a bucket refilled at BRAVE_RATE_LIMIT_PER_SECOND
+   (bursts up to BRAVE_RATE_LIMIT_BURST) — sized to the Brave plan.
+   Waiters queue in FIFO order; one that cannot get a token within its
+   queue timeout raises BraveQueueTimeout instead of waiting on.
+2. Send the request.
+3. On a 429, pause the whole bucket until Retry-After (or an exponential
+   backoff) and halve the effective rate; each success recovers it
+   additively. The request is retried once if the pause fits in the
+   caller's queue timeout.
+
+The limit is per process: with N workers, size BRAVE_RATE_LIMIT_PER_SECOND
+to the plan's limit divided by N. Counters are exposed via
+get_brave_limiter_stats().
+"""
+
+import asyncio
+import logging
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional
+
+import httpx
+
+from app.core.config import (
+    BRAVE_QUEUE_TIMEOUT,
+    BRAVE_RATE_LIMIT_BURST,
+    BRAVE_RATE_LIMIT_PER_SECOND,
+)
+
+logger = logging.getLogger(__name__)
+
+# ===================================================================
+# Configuration
+# ===================================================================
+
+# Retries of a 429'd request, each after the bucket's pause
+BRAVE_RATE_LIMIT_RETRIES = 1
+
+# Backoff when a 429 carries no usable Retry-After: doubles per
+# consecutive 429, capped
+BRAVE_BACKOFF_BASE_SECONDS = 1.0
+BRAVE_BACKOFF_MAX_SECONDS = 30.0
+
+# Adaptive rate: a 429 halves the effective rate (down to this fraction of
+# the configured rate); each success recovers this fraction of it
+MIN_RATE_FACTOR = 0.125
+RATE_RECOVERY_STEP = 0.05
+
+
+class BraveThrottled(Exception):
+    """Brave is rate limiting us: a 429 outlasted the limiter's retry."""
+
+
+class BraveQueueTimeout(BraveThrottled):
+    """No Brave token could be acquired within the caller's queue timeout."""
+
+
+# ===================================================================
+# Token bucket
+# ===================================================================
+
+class AdaptiveTokenBucket:
+    """
+    Token bucket whose refill rate backs off on 429s and recovers on
+    successes. Waiters are served in arrival order.
+    """
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.rate_factor = 1.0
+        self.paused_until = 0.0
+        self.consecutive_throttles = 0
+        self._updated = time.monotonic()
+        # Bound to the event loop that created it; rebuilt for a new loop
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.waiting = 0
+        self.granted = 0
+        self.timeouts = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+
+    @property
+    def effective_rate(self) -> float:
+        return self.rate * self.rate_factor
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - max(self._updated, self.paused_until))
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.effective_rate)
+        self._updated = max(now, self._updated)
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _wait_time(self, now: float) -> float:
+        """Seconds until a token is available (0 if one is now)."""
+        if now < self.paused_until:
+            return self.paused_until - now + 1 / self.effective_rate
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.effective_rate
+
+    async def acquire(self, timeout: float) -> float:
+        """
+        Take one token, waiting at most `timeout` seconds.
+
+        Returns:
+            Seconds spent waiting.
+
+        Raises:
+            BraveQueueTimeout: If no token is available in time.
+        """
+        start = time.monotonic()
+        deadline = start + timeout
+        lock = self._get_lock()
+        self.waiting += 1
+        try:
+            if lock.locked():
+                try:
+                    await asyncio.wait_for(lock.acquire(), timeout=max(0.0, timeout))
+                except asyncio.TimeoutError:
+                    self.timeouts += 1
+                    raise BraveQueueTimeout(
+                        f"Brave queue wait exceeded {timeout:.1f}s"
+                    ) from None
+            else:
+                await lock.acquire()
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = self._wait_time(now)
+                    if wait <= 0:
+                        self.tokens -= 1
+                        break
+                    if now + wait > deadline:
+                        self.timeouts += 1
+                        raise BraveQueueTimeout(
+                            f"Brave token not available within {timeout:.1f}s "
+                            f"(next in {wait:.2f}s)"
+                        )
+                    await asyncio.sleep(wait)
+            finally:
+                lock.release()
+        finally:
+            self.waiting -= 1
+        waited = time.monotonic() - start
+        self.granted += 1
+        self.total_wait += waited
+        return waited
+
+    def record_throttle(self, retry_after: Optional[float]) -> float:
+        """
+        Back off after a 429: pause the bucket and halve the rate.
+
+        Returns:
+            The pause, in seconds.
+        """
+        self.throttled += 1
+        self.consecutive_throttles += 1
+        if retry_after is None:
+            retry_after = min(
+                BRAVE_BACKOFF_MAX_SECONDS,
+                BRAVE_BACKOFF_BASE_SECONDS * 2 ** (self.consecutive_throttles - 1),
+            )
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens = 0.0
+        self.paused_until = max(self.paused_until, now + retry_after)
+        self.rate_factor = max(MIN_RATE_FACTOR, self.rate_factor / 2)
+        return retry_after
+
+    def record_success(self) -> None:
+        """Recover the rate after a request that was not throttled."""
+        self.consecutive_throttles = 0
+        if self.rate_factor < 1.0:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate_factor = min(1.0, self.rate_factor + RATE_RECOVERY_STEP)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "rate_per_second": self.rate,
+            "effective_rate_per_second": round(self.effective_rate, 3),
+            "burst": self.capacity,
+            "waiting": self.waiting,
+            "granted": self.granted,
+            "queue_timeouts": self.timeouts,
+            "throttled": self.throttled,
+            "paused_for_seconds": round(max(0.0, self.paused_until - now), 3),
+            "avg_wait_ms": (
+                round(self.total_wait * 1000 / self.granted, 2) if self.granted else 0.0
+            ),
+        }
+
+
+_bucket = AdaptiveTokenBucket(BRAVE_RATE_LIMIT_PER_SECOND, BRAVE_RATE_LIMIT_BURST)
+
+
+# ===================================================================
+# Requests
+# ===================================================================
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After as seconds (delta-seconds or HTTP-date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+async def brave_get(
+    client: httpx.AsyncClient,
+    url: str,
+    *,
+    queue_timeout: Optional[float] = None,
+    **kwargs: Any,
+) -> httpx.Response:
+    """
+    GET a Brave Search URL through the process-wide rate limiter.
+
+    Args:
+        client: Client from upstream_client("brave").
+        url: Brave endpoint.
+        queue_timeout: Most seconds to wait for rate-limit tokens, in total
+            across the request and its 429 retry. Defaults to
+            BRAVE_QUEUE_TIMEOUT.
+        **kwargs: Passed to client.get() (headers, params).
+
+    Returns:
+        The response. A 429 is returned only once retries are exhausted or
+        the pause would outlast queue_timeout.
+
+    Raises:
+        BraveQueueTimeout: If no token could be acquired in time.
+    """
+    if queue_timeout is None:
+        queue_timeout = BRAVE_QUEUE_TIMEOUT
+    deadline = time.monotonic() + queue_timeout
+    for attempt in range(BRAVE_RATE_LIMIT_RETRIES + 1):
+        await _bucket.acquire(max(0.0, deadline - time.monotonic()))
+        response = await client.get(url, **kwargs)
+        if response.status_code != 429:
+            _bucket.record_success()
+            return response
+
+        pause = _bucket.record_throttle(
+            _parse_retry_after(response.headers.get("Retry-After")),
+        )
+        logger.warning(
+            "Brave Search rate limited (429); pausing all Brave calls for %.1fs "
+            "(effective rate %.2f/s)",
+            pause, _bucket.effective_rate,
+        )
+        if time.monotonic() + pause > deadline:
+            break
+    return response
+
+
+def get_brave_limiter_stats() -> dict:
+    """Token bucket state and counters for the Brave limiter."""
+    return _bucket.stats()
+
+
+def _reset_brave_limiter() -> None:
+    """
+    Replace the bucket with a full one built from the current limits.
+
+    Used by tests to isolate throttling state between cases. Not intended
+    for production use.
+    """
+    global _bucket
+    _bucket = AdaptiveTokenBucket(BRAVE_RATE_LIMIT_PER_SECOND, BRAVE_RATE_LIMIT_BURST)
@@ -18,12 +18,13 @@ from typing import Optional
 
 from pydantic import BaseModel
 
-from anthropic import AsyncAnthropic
 
+from app.services.claude_client import get_claude_client
 from app.services.llm_tuning import fast_generation_params
 
 from app.agents.state import MilestoneContext, RelevantHint, VaultData
-from app.core.config import ANTHROPIC_API_KEY, is_anthropic_configured
+from app.core.config import is_anthropic_configured
+from app.core.pipeline_metrics import RETRY, count_event
 
 logger = logging.getLogger(__name__)
 
@@ -144,7 +145,7 @@ async def generate_milestone_briefing(
         logger.debug("No milestone context — skipping briefing generation")
         return None
 
-    client = AsyncAnthropic(api_key=ANTHROPIC_API_KEY)
+    client = get_claude_client("briefing")
     user_prompt = _build_briefing_prompt(vault_data, hints, milestone_context)
 
     logger.info(
@@ -155,6 +156,8 @@ async def generate_milestone_briefing(
     )
 
     for attempt in range(MAX_RETRIES + 1):
+        if attempt:
+            count_event(RETRY)
         try:
             response = await client.messages.create(
                 model=CLAUDE_MODEL,
@@ -0,0 +1,294 @@
+"""
+Claude Client Provider — One pooled Anthropic client with concurrency limits.
+
+Every Claude call site used to construct its own AsyncAnthropic, paying
+client construction and a cold TLS connection per request. This module owns
+a single process-wide AsyncAnthropic with a pooled HTTP client, and hands
+out per-call-site views of it:
+
+    client = get_claude_client("unified_generation")
+    response = await client.messages.create(...)
+
+Each view's messages.create() (and messages.stream()) first acquires its
+call site's semaphore, then the global one (CLAUDE_MAX_CONCURRENCY).
+Non-interactive sites (auxiliary, background and unknown ones) also share a
+sub-pool in between, of CLAUDE_MAX_CONCURRENCY - INTERACTIVE_RESERVED_SLOTS
+slots, so however their per-site caps add up, a burst of background work
+(e.g. QStash idea generation) leaves INTERACTIVE_RESERVED_SLOTS global
+slots free and interactive /recommendations/generate traffic always finds
+room.
+
+The recommendation pipeline is shared by interactive requests and the QStash
+notification webhook. The webhook runs it inside background_claude_calls(),
+which maps interactive call sites to their background counterparts
+(unified_generation → notification_generation) for every Claude call made
+in the block, so a burst of notifications is capped like any other
+background work.
+
+Every call's latency (excluding time queued for a slot), failures and token
+`usage` are recorded in app.core.pipeline_metrics.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, Optional
+
+import httpx
+from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
+
+from app.core.config import ANTHROPIC_API_KEY, CLAUDE_MAX_CONCURRENCY
+from app.core.pipeline_metrics import record_call, record_claude_usage
+
+logger = logging.getLogger(__name__)
+
+# ===================================================================
+# Configuration
+# ===================================================================
+
+# Per-call-site caps on concurrent Claude requests. Interactive sites may
+# use every global slot; the other sites are capped individually here and
+# together by the non-interactive sub-pool (see _semaphores).
+CALL_SITE_LIMITS: dict[str, int] = {
+    # Interactive: /recommendations/generate and /refresh
+    "unified_generation": CLAUDE_MAX_CONCURRENCY,
+    # Pipeline auxiliaries
+    "briefing": max(1, CLAUDE_MAX_CONCURRENCY // 4),
+    "price_verification": max(1, CLAUDE_MAX_CONCURRENCY // 4),
+    "claude_search": max(1, CLAUDE_MAX_CONCURRENCY // 4),
+    # Background: QStash-triggered idea generation and the
+    # notification-triggered pipeline (see background_claude_calls)
+    "idea_generation": max(1, CLAUDE_MAX_CONCURRENCY // 8),
+    "notification_generation": max(1, CLAUDE_MAX_CONCURRENCY // 4),
+}
+DEFAULT_CALL_SITE_LIMIT = max(1, CLAUDE_MAX_CONCURRENCY // 8)
+
+# Sites that draw on the whole global pool; every other site shares the
+# remaining CLAUDE_MAX_CONCURRENCY - INTERACTIVE_RESERVED_SLOTS slots
+INTERACTIVE_CALL_SITES = frozenset({"unified_generation"})
+INTERACTIVE_RESERVED_SLOTS = max(1, CLAUDE_MAX_CONCURRENCY // 4)
+
+# Interactive call site -> the site used for it under background_claude_calls()
+BACKGROUND_CALL_SITES: dict[str, str] = {
+    "unified_generation": "notification_generation",
+}
+
+# Upstream name Claude calls are recorded under (app.core.pipeline_metrics)
+CLAUDE_UPSTREAM = "anthropic"
+
+# Connection pool for the shared client. Generation requests are long-lived,
+# so keep one connection per permitted in-flight request.
+CLAUDE_HTTP_LIMITS = httpx.Limits(
+    max_connections=CLAUDE_MAX_CONCURRENCY,
+    max_keepalive_connections=CLAUDE_MAX_CONCURRENCY,
+    keepalive_expiry=60.0,
+)
+
+# ===================================================================
+# Provider state
+# ===================================================================
+
+# The client and semaphores are bound to the event loop that created them;
+# they are rebuilt if a different loop (e.g. a new test loop) asks for them.
+_client: Optional[AsyncAnthropic] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_global_semaphore: Optional[asyncio.Semaphore] = None
+_shared_semaphore: Optional[asyncio.Semaphore] = None  # non-interactive sub-pool
+_site_semaphores: dict[str, asyncio.Semaphore] = {}
+_limiter_loop: Optional[asyncio.AbstractEventLoop] = None
+_in_flight: dict[str, int] = {}
+
+_background: ContextVar[bool] = ContextVar("claude_background", default=False)
+
+
+def _current_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _shared_client() -> AsyncAnthropic:
+    """Return the process-wide AsyncAnthropic, creating it on first use."""
+    global _client, _client_loop
+    loop = _current_loop()
+    if _client is None or _client_loop is not loop:
+        _client = AsyncAnthropic(
+            api_key=ANTHROPIC_API_KEY,
+            http_client=DefaultAsyncHttpxClient(limits=CLAUDE_HTTP_LIMITS),
+        )
+        _client_loop = loop
+    return _client
+
+
+def _shared_limit() -> int:
+    """Slots non-interactive call sites may hold between them."""
+    return max(1, CLAUDE_MAX_CONCURRENCY - INTERACTIVE_RESERVED_SLOTS)
+
+
+def _semaphores(call_site: str) -> list[asyncio.Semaphore]:
+    """
+    The semaphores a `call_site` request acquires, in order, for the
+    running loop: its site's, the non-interactive sub-pool (unless
+    interactive), then the global one.
+    """
+    global _global_semaphore, _shared_semaphore, _limiter_loop
+    loop = asyncio.get_running_loop()
+    if _global_semaphore is None or _limiter_loop is not loop:
+        _global_semaphore = asyncio.Semaphore(CLAUDE_MAX_CONCURRENCY)
+        _shared_semaphore = asyncio.Semaphore(_shared_limit())
+        _site_semaphores.clear()
+        _limiter_loop = loop
+    site = _site_semaphores.get(call_site)
+    if site is None:
+        site = asyncio.Semaphore(CALL_SITE_LIMITS.get(call_site, DEFAULT_CALL_SITE_LIMIT))
+        _site_semaphores[call_site] = site
+    if call_site in INTERACTIVE_CALL_SITES:
+        return [site, _global_semaphore]
+    return [site, _shared_semaphore, _global_semaphore]
+
+
+@asynccontextmanager
+async def claude_slot(call_site: str) -> AsyncIterator[None]:
+    """
+    Hold one Claude concurrency slot for `call_site`.
+
+    The narrower semaphores are acquired first, so requests queued behind
+    their site's cap or the sub-pool don't tie up global slots.
+    """
+    async with AsyncExitStack() as stack:
+        for semaphore in _semaphores(call_site):
+            await stack.enter_async_context(semaphore)
+        _in_flight[call_site] = _in_flight.get(call_site, 0) + 1
+        try:
+            yield
+        finally:
+            _in_flight[call_site] -= 1
+
+
+# ===================================================================
+# Call-site views
+# ===================================================================
+
+class _LimitedMessages:
+    """messages resource whose requests run inside a claude_slot."""
+
+    def __init__(self, messages: Any, call_site: str) -> None:
+        self._messages = messages
+        self._call_site = call_site
+
+    async def create(self, **kwargs: Any) -> Any:
+        async with claude_slot(self._call_site):
+            start = time.perf_counter()
+            try:
+                response = await self._messages.create(**kwargs)
+            except Exception:
+                record_call(CLAUDE_UPSTREAM, time.perf_counter() - start, error=True)
+                raise
+            record_call(CLAUDE_UPSTREAM, time.perf_counter() - start)
+            record_claude_usage(self._call_site, getattr(response, "usage", None))
+            return response
+
+    @asynccontextmanager
+    async def stream(self, **kwargs: Any) -> AsyncIterator[Any]:
+        """Streaming messages.stream(); the slot is held until the stream closes."""
+        async with claude_slot(self._call_site):
+            start = time.perf_counter()
+            failed = False
+            stream = None
+            try:
+                async with self._messages.stream(**kwargs) as stream:
+                    yield stream
+            except Exception:
+                failed = True
+                raise
+            finally:
+                record_call(CLAUDE_UPSTREAM, time.perf_counter() - start, error=failed)
+                record_claude_usage(self._call_site, _stream_usage(stream))
+
+
+def _stream_usage(stream: Any) -> Any:
+    """Token usage so far of a (possibly abandoned) message stream, if known."""
+    if stream is None:
+        return None
+    try:
+        return stream.current_message_snapshot.usage
+    except Exception:
+        return None  # closed before the message started
+
+
+class ClaudeClient:
+    """A call site's view of the shared AsyncAnthropic client."""
+
+    def __init__(self, client: AsyncAnthropic, call_site: str) -> None:
+        self.call_site = call_site
+        self.messages = _LimitedMessages(client.messages, call_site)
+
+
+def get_claude_client(call_site: str) -> ClaudeClient:
+    """
+    Return the shared Claude client, limited for `call_site`.
+
+    Inside background_claude_calls(), interactive sites are replaced by
+    their BACKGROUND_CALL_SITES counterpart.
+
+    Args:
+        call_site: A key of CALL_SITE_LIMITS (unknown sites get
+                   DEFAULT_CALL_SITE_LIMIT).
+    """
+    if _background.get():
+        call_site = BACKGROUND_CALL_SITES.get(call_site, call_site)
+    return ClaudeClient(_shared_client(), call_site)
+
+
+@contextmanager
+def background_claude_calls() -> Iterator[None]:
+    """
+    Treat Claude calls made inside the block (including tasks it spawns,
+    e.g. LangGraph nodes) as background traffic.
+    """
+    token = _background.set(True)
+    try:
+        yield
+    finally:
+        _background.reset(token)
+
+
+def get_claude_concurrency_stats() -> dict:
+    """In-flight requests per call site, with the configured limits."""
+    return {
+        "max_concurrency": CLAUDE_MAX_CONCURRENCY,
+        "non_interactive_limit": _shared_limit(),
+        "in_flight": dict(_in_flight),
+        "call_site_limits": dict(CALL_SITE_LIMITS),
+    }
+
+
+async def close_claude_client() -> None:
+    """Close the shared client's connections. Called on application shutdown."""
+    global _client, _client_loop
+    client, _client, _client_loop = _client, None, None
+    if client is not None:
+        try:
+            await client.close()
+        except Exception as exc:
+            logger.warning("Failed to close Claude client: %s", exc)
+
+
+def _reset_claude_limiter() -> None:
+    """
+    Drop the semaphores and in-flight counters so they are rebuilt from the
+    current limits on next use.
+
+    Used by tests after changing CLAUDE_MAX_CONCURRENCY or
+    CALL_SITE_LIMITS. Not intended for production use.
+    """
+    global _global_semaphore, _shared_semaphore, _limiter_loop
+    _global_semaphore = None
+    _shared_semaphore = None
+    _limiter_loop = None
+    _site_semaphores.clear()
+    _in_flight.clear()
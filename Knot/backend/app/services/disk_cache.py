@@ -0,0 +1,168 @@
+"""
+Disk Cache — Small SQLite key/value store with per-entry expiry.
+
+A persistence tier for in-process caches whose entries are expensive to
+recompute (query embeddings, upstream search results), so hits survive a
+restart or deploy. Values are stored as JSON text; callers pick the TTL
+per write.
+
+The database runs in WAL mode with a busy timeout, so every worker on a
+host can share one file. Any SQLite or filesystem error is logged and
+treated as a miss (or a skipped write): the disk tier is an optimization
+and must never fail the request that consults it.
+
+Methods are synchronous; call them via asyncio.to_thread() from async code.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from app.core.metrics import CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+# ===================================================================
+# Configuration
+# ===================================================================
+
+# Expired rows are purged, and the row cap enforced, every N writes
+_PRUNE_EVERY_WRITES = 256
+
+# How long (ms) a statement waits on another worker's lock before failing
+_BUSY_TIMEOUT_MS = 2000
+
+
+class SQLiteTTLCache:
+    """Thread-safe SQLite-backed cache of JSON values with per-entry expiry."""
+
+    def __init__(self, path: str, table: str, max_rows: int) -> None:
+        if not table.isidentifier():
+            raise ValueError(f"Invalid cache table name: {table!r}")
+        self.path = path
+        self.table = table
+        self.max_rows = max_rows
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use. Caller holds self._lock."""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path,
+                timeout=_BUSY_TIMEOUT_MS / 1000,
+                check_same_thread=False,
+                isolation_level=None,  # autocommit; each statement is atomic
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA busy_timeout={_BUSY_TIMEOUT_MS}")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_expires_at "
+                f"ON {self.table} (expires_at)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the unexpired value stored for `key`, or None."""
+        with self._lock:
+            try:
+                row = self._connect().execute(
+                    f"SELECT value FROM {self.table} WHERE key = ? AND expires_at > ?",
+                    (key, time.time()),
+                ).fetchone()
+            except (sqlite3.Error, OSError) as exc:
+                self.errors += 1
+                logger.warning("Disk cache %s read failed: %s", self.table, exc)
+                CACHE_LOOKUPS.inc(self.table, "disk", "error")
+                return None
+            if row is None:
+                self.misses += 1
+                CACHE_LOOKUPS.inc(self.table, "disk", "miss")
+                return None
+            try:
+                value = json.loads(row[0])
+            except ValueError as exc:
+                # Corrupt row (e.g. a torn write): drop it and treat as a miss
+                self.errors += 1
+                logger.warning("Disk cache %s row unreadable: %s", self.table, exc)
+                CACHE_LOOKUPS.inc(self.table, "disk", "error")
+                try:
+                    self._connect().execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                except (sqlite3.Error, OSError):
+                    pass
+                return None
+            self.hits += 1
+        CACHE_LOOKUPS.inc(self.table, "disk", "hit")
+        return value
+
+    def put(self, key: str, value: Any, ttl: float) -> None:
+        """Store `value` (JSON-serializable, not None) for `ttl` seconds."""
+        payload = json.dumps(value, separators=(",", ":"))
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) "
+                    "VALUES (?, ?, ?)",
+                    (key, payload, time.time() + ttl),
+                )
+                self._writes += 1
+                if self._writes % _PRUNE_EVERY_WRITES == 0:
+                    self._prune(conn)
+            except (sqlite3.Error, OSError) as exc:
+                self.errors += 1
+                logger.warning("Disk cache %s write failed: %s", self.table, exc)
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        """Drop expired rows, then the soonest-to-expire rows over max_rows."""
+        conn.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (time.time(),))
+        conn.execute(
+            f"DELETE FROM {self.table} WHERE key IN ("
+            f"SELECT key FROM {self.table} ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,),
+        )
+
+    def clear(self) -> None:
+        """Delete every row and reset the counters."""
+        with self._lock:
+            try:
+                self._connect().execute(f"DELETE FROM {self.table}")
+            except (sqlite3.Error, OSError) as exc:
+                logger.warning("Disk cache %s clear failed: %s", self.table, exc)
+            self.hits = self.misses = self.errors = 0
+
+    def close(self) -> None:
+        """Close the connection; the next call reopens it."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> dict:
+        """Counters for sizing the tier."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "path": self.path,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "errors": self.errors,
+            }
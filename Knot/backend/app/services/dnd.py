@@ -15,6 +15,7 @@ import logging
 from datetime import datetime, timedelta, timezone as tz
 from zoneinfo import ZoneInfo
 
+from app.db.async_client import run_query
 from app.db.supabase_client import get_service_client
 
 logger = logging.getLogger(__name__)
@@ -281,11 +282,10 @@ async def check_quiet_hours(user_id: str) -> tuple[bool, datetime | None, bool]:
     client = get_service_client()
 
     # Load user quiet hours settings and notification toggle
-    user_result = (
+    user_result = await run_query(
         client.table("users")
         .select("quiet_hours_start, quiet_hours_end, timezone, notifications_enabled")
         .eq("id", user_id)
-        .execute()
     )
 
     if not user_result.data:
@@ -305,11 +305,10 @@ async def check_quiet_hours(user_id: str) -> tuple[bool, datetime | None, bool]:
     vault_state = None
     vault_country = None
     if not user_timezone:
-        vault_result = (
+        vault_result = await run_query(
             client.table("partner_vaults")
             .select("location_state, location_country")
             .eq("user_id", user_id)
-            .execute()
         )
         if vault_result.data:
             vault_state = vault_result.data[0].get("location_state")
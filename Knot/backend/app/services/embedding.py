@@ -8,12 +8,45 @@ Graceful degradation: If Vertex AI credentials are not configured or
 the API call fails, returns None. The hint will still be saved with a
 NULL embedding in the database. Embeddings can be backfilled later.
 
+Query-embedding cache: hint retrieval embeds a query built from the
+vault's interests and vibes, which is identical across most of a user's
+generate/refresh calls. Embeddings are cached by a hash of the model name
+and the normalized text, in a bounded in-process LRU with a TTL and,
+when EMBEDDING_CACHE_PATH is set, a SQLite tier shared by every worker on
+the host so hits survive restarts. The memory tier holds float32 arrays
+(~3KB per entry rather than ~25KB as a list of Python floats; pgvector
+keeps float4 anyway). Failed embeddings are never cached. Hit rates are exposed via get_embedding_cache_stats().
+
+Micro-batching: cache misses go through an EmbeddingBatcher, which holds
+requests for up to EMBEDDING_BATCH_WINDOW_MS (or until
+EMBEDDING_BATCH_MAX_SIZE distinct texts are waiting) and embeds them with
+one model.get_embeddings() call, so a burst of hint submissions or a
+background job costs one round trip and one worker thread per batch
+instead of one per text.
+
 Step 4.4: Hint Submission with Embedding Generation
 """
 
 import asyncio
+import functools
+import hashlib
 import logging
-from typing import Optional
+import time
+import unicodedata
+from typing import Any, Optional, Sequence, Union
+
+import numpy as np
+
+from app.core.config import (
+    EMBEDDING_BATCH_MAX_SIZE,
+    EMBEDDING_BATCH_WINDOW_MS,
+    EMBEDDING_CACHE_MAX_ENTRIES,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_CACHE_TTL,
+)
+from app.core.pipeline_metrics import record_call
+from app.services.disk_cache import SQLiteTTLCache
+from app.services.lru_cache import MISS, VersionedLRUCache
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +54,10 @@ logger = logging.getLogger(__name__)
 EMBEDDING_MODEL_NAME = "text-embedding-004"
 EMBEDDING_DIMENSION = 768
 VERTEX_AI_LOCATION = "us-central1"
+VERTEX_UPSTREAM = "vertex"  # upstream name in app.core.pipeline_metrics
+# Significant digits written per component. pgvector stores float4 (~7.2
+# digits), so more digits only inflate the payload.
+PGVECTOR_TEXT_PRECISION = 7
 
 # --- Module-level lazy initialization ---
 _model = None
@@ -85,63 +122,329 @@ def _reset_model():
     _initialized = False
 
 
-async def generate_embedding(text: str) -> Optional[list[float]]:
+# ===================================================================
+# Query-embedding cache
+# ===================================================================
+
+_memory_cache: VersionedLRUCache[np.ndarray] = VersionedLRUCache(
+    "embeddings", EMBEDDING_CACHE_MAX_ENTRIES, EMBEDDING_CACHE_TTL,
+)
+_disk_tier: Optional[SQLiteTTLCache] = None
+_disk_tier_opened = False
+
+
+def normalize_embedding_text(text: str) -> str:
+    """Canonical form used for cache keys: NFC, whitespace collapsed and trimmed."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def _cache_key(text: str) -> str:
+    normalized = normalize_embedding_text(text)
+    return hashlib.sha256(f"{EMBEDDING_MODEL_NAME}\n{normalized}".encode("utf-8")).hexdigest()
+
+
+def _get_disk_tier() -> Optional[SQLiteTTLCache]:
+    """The SQLite tier, opened on first use; None when EMBEDDING_CACHE_PATH is unset."""
+    global _disk_tier, _disk_tier_opened
+    if not _disk_tier_opened:
+        _disk_tier_opened = True
+        if EMBEDDING_CACHE_PATH:
+            _disk_tier = SQLiteTTLCache(
+                EMBEDDING_CACHE_PATH, "embeddings", max_rows=EMBEDDING_CACHE_MAX_ENTRIES * 16,
+            )
+    return _disk_tier
+
+
+async def _get_cached_embedding(key: str) -> Optional[list[float]]:
+    """Memory tier, then disk tier (promoting disk hits into memory)."""
+    cached = _memory_cache.get(key)
+    if cached is not MISS:
+        return cached.tolist()
+    disk = _get_disk_tier()
+    if disk is None:
+        return None
+    vector = await asyncio.to_thread(disk.get, key)
+    if vector is None or len(vector) != EMBEDDING_DIMENSION:
+        return None
+    _memory_cache.put(key, np.asarray(vector, dtype=np.float32), _memory_cache.version(key))
+    return list(vector)
+
+
+async def _cache_embedding(key: str, vector: list[float]) -> None:
+    _memory_cache.put(key, np.asarray(vector, dtype=np.float32), _memory_cache.version(key))
+    disk = _get_disk_tier()
+    if disk is not None:
+        await asyncio.to_thread(disk.put, key, list(vector), EMBEDDING_CACHE_TTL)
+
+
+def get_embedding_cache_stats() -> dict:
+    """Hit/miss counters for each tier of the query-embedding cache."""
+    disk = _get_disk_tier()
+    return {
+        "memory": _memory_cache.stats(),
+        "disk": disk.stats() if disk is not None else None,
+    }
+
+
+def _reset_embedding_cache() -> None:
+    """
+    Empty the memory tier and close the disk tier, so it is reopened from
+    EMBEDDING_CACHE_PATH on next use.
+
+    Used by tests to isolate cached embeddings between cases. Not intended
+    for production use.
+    """
+    global _disk_tier, _disk_tier_opened
+    _memory_cache.clear()
+    if _disk_tier is not None:
+        _disk_tier.close()
+    _disk_tier = None
+    _disk_tier_opened = False
+
+
+# ===================================================================
+# Micro-batching
+# ===================================================================
+
+def _checked_vector(values) -> Optional[list[float]]:
+    """The embedding as a list, or None if it has the wrong dimension."""
+    if values is None or len(values) != EMBEDDING_DIMENSION:
+        logger.warning(
+            f"Expected {EMBEDDING_DIMENSION}-dimension vector, "
+            f"got {None if values is None else len(values)}"
+        )
+        return None
+    return list(values)
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent embedding requests into batched get_embeddings calls.
+
+    The first request to arrive opens a window of `window` seconds; every
+    request made during it joins the batch, which is sent when the window
+    closes or `max_batch_size` distinct texts are waiting. Duplicate texts
+    in a batch are embedded once. Bound to the event loop it is used on.
+    """
+
+    def __init__(self, max_batch_size: int, window: float) -> None:
+        self.max_batch_size = max(1, max_batch_size)
+        self.window = window
+        self._pending: dict[str, list[asyncio.Future]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task] = set()
+        self.requests = 0
+        self.batches = 0
+        self.texts = 0
+
+    async def embed(self, text: str) -> Optional[list[float]]:
+        """Embed `text` as part of the next batch; None on failure."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self._pending.setdefault(text, []).append(future)
+        self.requests += 1
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        """Send everything pending as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: dict[str, list[asyncio.Future]]) -> None:
+        texts = list(batch)
+        self.batches += 1
+        self.texts += len(texts)
+        vectors: list[Optional[list[float]]] = [None] * len(texts)
+        try:
+            vectors = await self._embed_texts(texts)
+        finally:
+            # Every caller is answered, even if the batch itself blew up
+            for text, vector in zip(texts, vectors):
+                for future in batch[text]:
+                    if not future.done():
+                        future.set_result(list(vector) if vector is not None else None)
+
+    async def _embed_texts(self, texts: list[str]) -> list[Optional[list[float]]]:
+        model = _get_model()
+        if model is None:
+            return [None] * len(texts)
+
+        start = time.perf_counter()
+        try:
+            # Run the synchronous Vertex AI call in a thread pool
+            # to avoid blocking the async event loop
+            embeddings = await asyncio.to_thread(model.get_embeddings, texts)
+        except Exception as exc:
+            record_call(VERTEX_UPSTREAM, time.perf_counter() - start, error=True)
+            if len(texts) == 1:
+                logger.warning(f"Embedding generation failed for hint: {exc}")
+                return [None]
+            # One bad text shouldn't cost its batch-mates their embeddings
+            logger.warning(
+                f"Batched embedding of {len(texts)} texts failed ({exc}); "
+                "retrying individually"
+            )
+            results = await asyncio.gather(*(self._embed_texts([t]) for t in texts))
+            return [result[0] for result in results]
+        record_call(VERTEX_UPSTREAM, time.perf_counter() - start)
+
+        if not embeddings or len(embeddings) != len(texts):
+            logger.warning(
+                f"Vertex AI returned {len(embeddings or [])} embeddings "
+                f"for {len(texts)} texts"
+            )
+            return [None] * len(texts)
+
+        return [_checked_vector(embedding.values) for embedding in embeddings]
+
+    def stats(self) -> dict:
+        """Request, batch and text counters."""
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "texts": self.texts,
+            "mean_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+_batcher: Optional[EmbeddingBatcher] = None
+_batcher_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_batcher() -> EmbeddingBatcher:
+    """The batcher for the running event loop, created on first use."""
+    global _batcher, _batcher_loop
+    loop = asyncio.get_running_loop()
+    if _batcher is None or _batcher_loop is not loop:
+        _batcher = EmbeddingBatcher(EMBEDDING_BATCH_MAX_SIZE, EMBEDDING_BATCH_WINDOW_MS / 1000)
+        _batcher_loop = loop
+    return _batcher
+
+
+def get_embedding_batch_stats() -> dict:
+    """Batching counters for the current batcher (empty before first use)."""
+    return _batcher.stats() if _batcher is not None else EmbeddingBatcher(1, 0).stats()
+
+
+def _reset_embedding_batcher() -> None:
+    """
+    Drop the batcher so it is rebuilt from EMBEDDING_BATCH_MAX_SIZE and
+    EMBEDDING_BATCH_WINDOW_MS on next use.
+
+    Used by tests after changing the batching limits. Not intended for
+    production use.
+    """
+    global _batcher, _batcher_loop
+    _batcher = None
+    _batcher_loop = None
+
+
+async def generate_embedding(text: str, *, use_cache: bool = True) -> Optional[list[float]]:
     """
     Generate a 768-dimension embedding for the given text using
     Vertex AI text-embedding-004.
 
-    Uses asyncio.to_thread() to run the synchronous Vertex AI SDK
-    call without blocking the FastAPI event loop.
+    Results are served from the query-embedding cache when the
+    normalized text was embedded before. Misses are embedded by the
+    shared EmbeddingBatcher together with any concurrent requests; the
+    synchronous Vertex AI SDK call runs via asyncio.to_thread() so it
+    doesn't block the FastAPI event loop.
 
     Args:
         text: The text to generate an embedding for.
+        use_cache: Set False for one-off texts (e.g. the hint backfill) so
+                   they don't evict cached query embeddings.
 
     Returns:
         A list of 768 floats representing the text embedding,
         or None if embedding generation fails for any reason
         (Vertex AI not configured, API error, etc.).
     """
-    model = _get_model()
-    if model is None:
-        return None
+    key = _cache_key(text)
+    if use_cache:
+        cached = await _get_cached_embedding(key)
+        if cached is not None:
+            return cached
 
-    try:
-        # Run the synchronous Vertex AI call in a thread pool
-        # to avoid blocking the async event loop
-        embeddings = await asyncio.to_thread(
-            model.get_embeddings, [text]
-        )
+    if _get_model() is None:
+        return None
 
-        if not embeddings or len(embeddings) == 0:
-            logger.warning("Vertex AI returned empty embeddings list")
-            return None
+    vector = await _get_batcher().embed(text)
+    if vector is not None and use_cache:
+        await _cache_embedding(key, vector)
+    return vector
 
-        vector = embeddings[0].values
 
-        if len(vector) != EMBEDDING_DIMENSION:
-            logger.warning(
-                f"Expected {EMBEDDING_DIMENSION}-dimension vector, "
-                f"got {len(vector)}"
-            )
-            return None
+# ===================================================================
+# pgvector serialization
+# ===================================================================
 
-        return vector
+@functools.lru_cache(maxsize=8)
+def _pgvector_format(dimension: int) -> str:
+    """printf template for one vector: "[%.7g,%.7g,...]"."""
+    return "[" + ",".join([f"%.{PGVECTOR_TEXT_PRECISION}g"] * dimension) + "]"
 
-    except Exception as exc:
-        logger.warning(f"Embedding generation failed for hint: {exc}")
-        return None
 
-
-def format_embedding_for_pgvector(embedding: list[float]) -> str:
+def format_embedding_for_pgvector(embedding: Union[Sequence[float], np.ndarray]) -> str:
     """
     Format a list of floats into a pgvector-compatible string.
 
     PostgREST expects vector values as a string: "[0.1,0.2,...,0.768]"
 
+    Components are written with PGVECTOR_TEXT_PRECISION significant digits
+    (float4 precision, which is all pgvector keeps) through one cached
+    printf template, instead of str() per float. NumPy arrays are accepted
+    directly.
+
     Args:
-        embedding: List of floats (768 dimensions).
+        embedding: List or array of floats (768 dimensions).
 
     Returns:
         A pgvector-compatible string representation.
     """
-    return "[" + ",".join(str(v) for v in embedding) + "]"
+    if isinstance(embedding, np.ndarray):
+        values = tuple(embedding.ravel().tolist())
+    else:
+        values = tuple(embedding)
+    return _pgvector_format(len(values)) % values
+
+
+def parse_pgvector_embedding(value: Any) -> Optional[np.ndarray]:
+    """
+    Decode a vector read back from the database into a float32 array.
+
+    PostgREST returns vector columns as pgvector text ("[0.1,0.2,...]");
+    lists (e.g. from an RPC returning float arrays) are accepted too.
+
+    Returns:
+        A 1-D float32 array, or None for a NULL value.
+
+    Raises:
+        ValueError: If the text is not a well-formed pgvector literal.
+    """
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        return np.asarray(value, dtype=np.float32)
+
+    text = value.strip()
+    if len(text) < 2 or text[0] != "[" or text[-1] != "]":
+        raise ValueError(f"Not a pgvector literal: {text[:32]!r}")
+    body = text[1:-1]
+    if not body.strip():
+        return np.empty(0, dtype=np.float32)
+    vector = np.fromstring(body, dtype=np.float32, sep=",")
+    if vector.size != body.count(",") + 1:
+        raise ValueError(f"Malformed pgvector literal: {text[:32]!r}")
+    return vector
@@ -0,0 +1,300 @@
+"""
+Embedding Backfill — Embeds hints that were stored with a NULL embedding.
+
+Hints are saved with hint_embedding = NULL when Vertex AI is unavailable
+(see app.services.embedding), which silently drops them from the
+match_hints() semantic path. run_embedding_backfill() repairs them:
+
+1. Load the checkpoint (the last processed hint id) from job_checkpoints
+2. Page through NULL-embedding hints in id order after the cursor
+3. Embed each page — texts are submitted concurrently (bounded) so the
+   EmbeddingBatcher packs them into large Vertex AI calls
+4. Write the page back with one backfill_hint_embeddings() RPC call
+5. Advance the checkpoint, so a crash resumes at the next page
+
+A run stops at its time budget, leaving the checkpoint for the next run
+(POST /api/v1/hints/backfill-embeddings re-queues itself via QStash).
+When the scan reaches the end, the cursor resets so hints whose embedding
+failed this pass are retried on the next one. If a whole page fails to
+embed (Vertex outage), the run stops without advancing past it.
+
+Both database objects come from migration 00028. Without it, writes fall
+back to per-row updates and the job runs without a checkpoint.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from postgrest.exceptions import APIError
+
+from app.core.config import is_vertex_ai_configured
+from app.db.async_client import run_query
+from app.db.supabase_client import get_service_client
+from app.services.embedding import format_embedding_for_pgvector, generate_embedding
+from app.services.hint_index import invalidate_hint_index
+
+logger = logging.getLogger(__name__)
+
+# ===================================================================
+# Configuration
+# ===================================================================
+
+BACKFILL_JOB_NAME = "hint_embedding_backfill"
+BACKFILL_RPC_FUNCTION = "backfill_hint_embeddings"
+CHECKPOINT_TABLE = "job_checkpoints"
+
+# Hints fetched, embedded and written per page
+BACKFILL_PAGE_SIZE = 200
+
+# Texts awaiting an embedding at once; with EMBEDDING_BATCH_MAX_SIZE=32
+# this keeps about two Vertex AI calls in flight
+BACKFILL_EMBED_CONCURRENCY = 64
+
+# Concurrent per-row updates when the bulk RPC is missing
+BACKFILL_FALLBACK_WRITE_CONCURRENCY = 8
+
+# Wall-clock budget for one run, under the QStash/HTTP request timeout
+BACKFILL_TIME_BUDGET_SECONDS = 240.0
+
+# PostgREST error codes meaning the RPC function / table does not exist
+_MISSING_FUNCTION_CODES = frozenset({"PGRST202", "42883"})
+_MISSING_TABLE_CODES = frozenset({"PGRST205", "42P01"})
+
+# Set to False once the object is found missing, so later pages skip it
+_backfill_rpc_available: bool = True
+_checkpoints_available: bool = True
+
+
+# ===================================================================
+# Checkpoints
+# ===================================================================
+
+async def _load_checkpoint(client) -> dict:
+    """Return {"cursor", "processed", "failed"} for the job (zeros if none)."""
+    global _checkpoints_available
+    empty = {"cursor": None, "processed": 0, "failed": 0}
+    if not _checkpoints_available:
+        return empty
+    try:
+        result = await run_query(
+            client.table(CHECKPOINT_TABLE)
+            .select("cursor, processed, failed")
+            .eq("job_name", BACKFILL_JOB_NAME)
+            .limit(1)
+        )
+    except APIError as exc:
+        if exc.code in _MISSING_TABLE_CODES:
+            _checkpoints_available = False
+            logger.warning(
+                "%s table not found — backfill runs without checkpoints. "
+                "Apply migration 00028 to make it resumable.",
+                CHECKPOINT_TABLE,
+            )
+            return empty
+        raise
+    if not result.data:
+        return empty
+    row = result.data[0]
+    return {
+        "cursor": row.get("cursor"),
+        "processed": row.get("processed") or 0,
+        "failed": row.get("failed") or 0,
+    }
+
+
+async def _save_checkpoint(client, checkpoint: dict) -> None:
+    """Persist the job's cursor and totals. Failures are logged, not raised."""
+    if not _checkpoints_available:
+        return
+    try:
+        await run_query(
+            client.table(CHECKPOINT_TABLE).upsert({
+                "job_name": BACKFILL_JOB_NAME,
+                "cursor": checkpoint["cursor"],
+                "processed": checkpoint["processed"],
+                "failed": checkpoint["failed"],
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+            })
+        )
+    except Exception as exc:
+        # The next run redoes at most this page; hints already written
+        # are no longer NULL, so they are skipped either way.
+        logger.warning("Failed to save backfill checkpoint: %s", exc)
+
+
+# ===================================================================
+# Paging, embedding and writing
+# ===================================================================
+
+async def _fetch_page(client, cursor: Optional[str]) -> list[dict]:
+    """The next page of NULL-embedding hints after `cursor`, in id order."""
+    query = (
+        client.table("hints")
+        .select("id, vault_id, hint_text")
+        .is_("hint_embedding", "null")
+        .order("id")
+        .limit(BACKFILL_PAGE_SIZE)
+    )
+    if cursor:
+        query = query.gt("id", cursor)
+    result = await run_query(query)
+    return result.data or []
+
+
+async def _embed_page(hints: list[dict]) -> list[Optional[list[float]]]:
+    """Embed a page of hints with at most BACKFILL_EMBED_CONCURRENCY in flight."""
+    semaphore = asyncio.Semaphore(BACKFILL_EMBED_CONCURRENCY)
+
+    async def _embed(text: str) -> Optional[list[float]]:
+        async with semaphore:
+            return await generate_embedding(text, use_cache=False)
+
+    return await asyncio.gather(*(_embed(hint["hint_text"]) for hint in hints))
+
+
+async def _write_embeddings(client, rows: list[dict]) -> int:
+    """
+    Write {"id", "embedding"} rows back to hints. One RPC call per page,
+    falling back to concurrent per-row updates. Returns rows written.
+    """
+    global _backfill_rpc_available
+    if not rows:
+        return 0
+
+    if _backfill_rpc_available:
+        try:
+            result = await run_query(client.rpc(BACKFILL_RPC_FUNCTION, {"p_rows": rows}))
+            return int(result.data or 0)
+        except APIError as exc:
+            if exc.code not in _MISSING_FUNCTION_CODES:
+                raise
+            _backfill_rpc_available = False
+            logger.warning(
+                "%s() RPC not found — writing embeddings row by row. "
+                "Apply migration 00028 to enable bulk updates.",
+                BACKFILL_RPC_FUNCTION,
+            )
+
+    semaphore = asyncio.Semaphore(BACKFILL_FALLBACK_WRITE_CONCURRENCY)
+
+    async def _update(row: dict) -> int:
+        async with semaphore:
+            result = await run_query(
+                client.table("hints")
+                .update({"hint_embedding": row["embedding"]})
+                .eq("id", row["id"])
+                .is_("hint_embedding", "null")
+            )
+            return len(result.data or [])
+
+    return sum(await asyncio.gather(*(_update(row) for row in rows)))
+
+
+# ===================================================================
+# Job
+# ===================================================================
+
+async def run_embedding_backfill(
+    time_budget: float = BACKFILL_TIME_BUDGET_SECONDS,
+) -> dict:
+    """
+    Embed NULL-embedding hints, page by page, until done or out of time.
+
+    Args:
+        time_budget: Seconds after which no new page is started.
+
+    Returns:
+        dict with status ("completed", "partial", "error" or "skipped"),
+        counts for this run (embedded, failed, pages) and the checkpoint
+        cursor. "partial" means hints remain past the cursor; run again to
+        continue.
+    """
+    if not is_vertex_ai_configured():
+        logger.warning("Vertex AI not configured — skipping embedding backfill")
+        return {"status": "skipped", "embedded": 0, "failed": 0, "pages": 0, "cursor": None}
+
+    client = get_service_client()
+    deadline = time.monotonic() + time_budget
+    checkpoint = await _load_checkpoint(client)
+    embedded = failed = pages = 0
+
+    if checkpoint["cursor"]:
+        logger.info("Resuming embedding backfill after hint %s", checkpoint["cursor"])
+
+    while True:
+        page = await _fetch_page(client, checkpoint["cursor"])
+        if not page:
+            # Reached the end: next pass starts over to retry failed hints
+            checkpoint["cursor"] = None
+            await _save_checkpoint(client, checkpoint)
+            status = "completed"
+            break
+
+        vectors = await _embed_page(page)
+        rows = [
+            {"id": hint["id"], "embedding": format_embedding_for_pgvector(vector)}
+            for hint, vector in zip(page, vectors)
+            if vector is not None
+        ]
+        if not rows:
+            # Nothing embedded — most likely Vertex AI is down. Keep the
+            # cursor so these hints are retried rather than skipped.
+            logger.warning(
+                "Embedding backfill: no embeddings for a page of %d hints — stopping",
+                len(page),
+            )
+            status = "error"
+            break
+
+        try:
+            written = await _write_embeddings(client, rows)
+        finally:
+            # Newly embedded hints join their vaults' exact-search indexes
+            for vault_id in {hint["vault_id"] for hint in page}:
+                invalidate_hint_index(vault_id)
+        page_failed = len(page) - len(rows)
+        embedded += written
+        failed += page_failed
+        pages += 1
+
+        # A short page is the last one: reset the cursor for the next pass
+        done = len(page) < BACKFILL_PAGE_SIZE
+        checkpoint["cursor"] = None if done else page[-1]["id"]
+        checkpoint["processed"] += written
+        checkpoint["failed"] += page_failed
+        await _save_checkpoint(client, checkpoint)
+
+        if done:
+            status = "completed"
+            break
+        if time.monotonic() >= deadline:
+            status = "partial"
+            break
+
+    logger.info(
+        "Embedding backfill %s: %d embedded, %d failed, %d pages (cursor=%s)",
+        status, embedded, failed, pages, checkpoint["cursor"],
+    )
+    return {
+        "status": status,
+        "embedded": embedded,
+        "failed": failed,
+        "pages": pages,
+        "cursor": checkpoint["cursor"],
+    }
+
+
+def _reset_backfill_availability() -> None:
+    """
+    Re-enable the bulk RPC and checkpoint table after they were found
+    missing.
+
+    Used by tests to restore the default state. Not intended for
+    production use.
+    """
+    global _backfill_rpc_available, _checkpoints_available
+    _backfill_rpc_available = True
+    _checkpoints_available = True
@@ -20,8 +20,10 @@ import logging
 import math
 from datetime import datetime, timezone
 
+from app.db.async_client import run_query
 from app.db.supabase_client import get_service_client
 from app.models.feedback_analysis import UserPreferencesWeights
+from app.services.vault_cache import invalidate_learned_weights
 
 logger = logging.getLogger(__name__)
 
@@ -259,12 +261,11 @@ async def analyze_user_feedback(user_id: str) -> UserPreferencesWeights | None:
     client = get_service_client()
 
     # 1. Load all feedback for this user
-    feedback_result = (
+    feedback_result = await run_query(
         client.table("recommendation_feedback")
         .select("*")
         .eq("user_id", user_id)
         .order("created_at", desc=False)
-        .execute()
     )
 
     feedback_rows = feedback_result.data or []
@@ -281,12 +282,11 @@ async def analyze_user_feedback(user_id: str) -> UserPreferencesWeights | None:
         return None
 
     # 2. Load vault data (vibes and interests)
-    vault_result = (
+    vault_result = await run_query(
         client.table("partner_vaults")
         .select("id")
         .eq("user_id", user_id)
         .limit(1)
-        .execute()
     )
     if not vault_result.data:
         logger.warning("No vault found for user %s — skipping analysis", user_id[:8])
@@ -294,19 +294,17 @@ async def analyze_user_feedback(user_id: str) -> UserPreferencesWeights | None:
 
     vault_id = vault_result.data[0]["id"]
 
-    vibes_result = (
+    vibes_result = await run_query(
         client.table("partner_vibes")
         .select("vibe_tag")
         .eq("vault_id", vault_id)
-        .execute()
     )
     vault_vibes = [v["vibe_tag"] for v in (vibes_result.data or [])]
 
-    interests_result = (
+    interests_result = await run_query(
         client.table("partner_interests")
         .select("interest_category, interest_type")
         .eq("vault_id", vault_id)
-        .execute()
     )
     vault_likes = [
         i["interest_category"]
@@ -316,11 +314,10 @@ async def analyze_user_feedback(user_id: str) -> UserPreferencesWeights | None:
 
     # 3. Load recommendation details for each feedback entry
     rec_ids = list({fb["recommendation_id"] for fb in feedback_rows})
-    recommendations_result = (
+    recommendations_result = await run_query(
         client.table("recommendations")
         .select("id, recommendation_type, title, description")
         .in_("id", rec_ids)
-        .execute()
     )
     rec_lookup: dict[str, dict] = {
         r["id"]: r for r in (recommendations_result.data or [])
@@ -445,9 +442,10 @@ async def upsert_user_weights(weights: UserPreferencesWeights) -> None:
     }
 
     try:
-        client.table("user_preferences_weights").upsert(
+        await run_query(client.table("user_preferences_weights").upsert(
             row, on_conflict="user_id",
-        ).execute()
+        ))
+        invalidate_learned_weights(weights.user_id)
         logger.info(
             "Upserted weights for user %s (feedback_count=%d)",
             weights.user_id[:8], weights.feedback_count,
@@ -486,10 +484,9 @@ async def run_feedback_analysis(
         user_ids = [target_user_id]
     else:
         # Get distinct user_ids from recommendation_feedback
-        feedback_result = (
+        feedback_result = await run_query(
             client.table("recommendation_feedback")
             .select("user_id")
-            .execute()
         )
         if not feedback_result.data:
             return {
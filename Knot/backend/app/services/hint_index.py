@@ -0,0 +1,160 @@
+"""
+Hint Index — Exact in-process vector search over one vault's hints.
+
+match_hints() ranks hints with the global HNSW index on hint_embedding and
+then filters by vault_id. With many vaults, most approximate neighbours
+belong to other vaults and are discarded after the scan, wasting work and
+sometimes returning fewer than MAX_HINTS rows. A vault holds only tens to
+hundreds of hints, so an exact scan is cheap: this module keeps, per
+vault, a float32 NumPy matrix of L2-normalized hint embeddings and ranks a
+query with one matrix-vector product.
+
+Indexes are cached in a VersionedLRUCache keyed by vault_id. Hint create,
+delete and embedding backfill call invalidate_hint_index(); the version
+stamp keeps a load racing one of those writes from caching a stale
+matrix. Invalidation is per process, so another worker's copy can be
+stale for up to HINT_INDEX_TTL seconds.
+
+Vaults with more than HINT_INDEX_MAX_HINTS hints are cached as
+"too large" and stay on the match_hints() RPC.
+
+Used by app.agents.hint_retrieval when HINT_SEARCH_MODE is "exact".
+"""
+
+from typing import Any, Optional
+
+import numpy as np
+
+from app.services.embedding import parse_pgvector_embedding
+from app.services.lru_cache import VersionedLRUCache
+
+# ===================================================================
+# Configuration
+# ===================================================================
+
+HINT_INDEX_MAX_VAULTS = 256
+HINT_INDEX_TTL = 300  # seconds — bounds cross-worker staleness
+HINT_INDEX_MAX_HINTS = 2000
+
+# Hint columns kept alongside the matrix (everything but the embedding)
+HINT_INDEX_COLUMNS = ("id", "hint_text", "source", "is_used", "created_at")
+
+
+class VaultHintIndex:
+    """Immutable snapshot of one vault's embedded hints."""
+
+    __slots__ = ("rows", "matrix")
+
+    def __init__(self, rows: list[dict], matrix: np.ndarray) -> None:
+        self.rows = rows  # hint columns, aligned with matrix rows
+        self.matrix = matrix  # (n, dim) float32, rows L2-normalized
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def search(
+        self,
+        query: list[float],
+        max_count: int,
+        threshold: float = 0.0,
+    ) -> list[tuple[dict, float]]:
+        """
+        Rank hints by cosine similarity to `query`.
+
+        Returns up to `max_count` (row, similarity) pairs with similarity
+        >= `threshold`, most similar first — the same contract as
+        match_hints().
+        """
+        if not self.rows or max_count <= 0:
+            return []
+        q = np.asarray(query, dtype=np.float32)
+        norm = float(np.linalg.norm(q))
+        if norm == 0.0:
+            return []
+
+        scores = self.matrix @ (q / norm)
+        candidates = np.flatnonzero(scores >= threshold)
+        if candidates.size > max_count:
+            top = np.argpartition(-scores[candidates], max_count - 1)[:max_count]
+            candidates = candidates[top]
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self.rows[i], float(scores[i])) for i in order]
+
+
+def build_hint_index(rows: list[dict]) -> VaultHintIndex:
+    """
+    Build an index from hints rows that include hint_embedding.
+
+    Rows without an embedding (or with a zero vector, which has no cosine
+    similarity) are left out, as match_hints() leaves them out.
+    """
+    kept: list[dict] = []
+    vectors: list[np.ndarray] = []
+    for row in rows:
+        vector = parse_pgvector_embedding(row.get("hint_embedding"))
+        if vector is None or not vector.size:
+            continue
+        kept.append({column: row.get(column) for column in HINT_INDEX_COLUMNS})
+        vectors.append(vector)
+
+    if not vectors:
+        return VaultHintIndex([], np.empty((0, 0), dtype=np.float32))
+
+    matrix = np.stack(vectors)
+    norms = np.linalg.norm(matrix, axis=1)
+    nonzero = norms > 0
+    if not nonzero.all():
+        kept = [row for row, ok in zip(kept, nonzero) if ok]
+        matrix, norms = matrix[nonzero], norms[nonzero]
+    matrix /= norms[:, None]
+    return VaultHintIndex(kept, matrix)
+
+
+# ===================================================================
+# Cache
+# ===================================================================
+
+# Values are a VaultHintIndex, or None for a vault too large to index
+_index_cache: VersionedLRUCache[Optional[VaultHintIndex]] = VersionedLRUCache(
+    "hint_index", HINT_INDEX_MAX_VAULTS, HINT_INDEX_TTL,
+)
+
+
+def hint_index_version(vault_id: str) -> int:
+    """Version stamp to capture before loading a vault's hints."""
+    return _index_cache.version(vault_id)
+
+
+def get_cached_hint_index(vault_id: str) -> Any:
+    """Return the vault's cached index, None if too large to index, or MISS."""
+    return _index_cache.get(vault_id)
+
+
+def cache_hint_index(
+    vault_id: str,
+    index: Optional[VaultHintIndex],
+    version: int,
+) -> None:
+    """Cache a freshly built index (or None: too large; see hint_index_version)."""
+    _index_cache.put(vault_id, index, version)
+
+
+def invalidate_hint_index(vault_id: str) -> None:
+    """Drop the vault's index. Call after any write to its hints."""
+    _index_cache.invalidate(vault_id)
+
+
+def get_hint_index_stats() -> dict:
+    """Hit/miss/eviction counters for the hint index cache."""
+    return _index_cache.stats()
+
+
+def _reset_hint_index_cache() -> None:
+    """
+    Drop every cached index and counter.
+
+    Used by tests to isolate cached indexes between cases. Not intended
+    for production use.
+    """
+    _index_cache.clear()
+
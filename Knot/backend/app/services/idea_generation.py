@@ -14,13 +14,13 @@ import logging
 import uuid
 from typing import Any, Optional
 
-from anthropic import AsyncAnthropic
 
+from app.services.claude_client import get_claude_client
 from app.services.llm_tuning import fast_generation_params
 from app.services.text_cleanup import humanize_tags, truncate_prose
 
 from app.agents.state import RelevantHint, VaultData
-from app.core.config import ANTHROPIC_API_KEY, is_anthropic_configured
+from app.core.config import is_anthropic_configured
 
 logger = logging.getLogger(__name__)
 
@@ -302,7 +302,7 @@ async def generate_ideas(
         logger.warning("Anthropic API key not configured — skipping idea generation")
         return []
 
-    client = AsyncAnthropic(api_key=ANTHROPIC_API_KEY)
+    client = get_claude_client("idea_generation")
     user_prompt = _build_user_prompt(vault_data, hints, occasion_type, count, category)
 
     logger.info(
@@ -30,6 +30,7 @@ from app.core.config import (
     AMAZON_SECRET_KEY,
     is_amazon_configured,
 )
+from app.core.http_clients import upstream_client
 
 logger = logging.getLogger(__name__)
 
@@ -293,7 +294,7 @@ class AmazonService:
         host = "webservices.amazon.com"
         payload_str = json.dumps(payload)
 
-        async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
+        async with upstream_client("amazon", timeout=DEFAULT_TIMEOUT) as client:
             for retry in range(MAX_RETRIES):
                 try:
                     # Generate fresh timestamp for each attempt
@@ -18,15 +18,16 @@ import uuid
 from typing import Any, Optional
 
 import httpx
-from anthropic import AsyncAnthropic
 
 from app.agents.state import UNLIMITED_BUDGET_MAX_CENTS
+from app.services.claude_client import get_claude_client
 from app.services.llm_tuning import fast_generation_params
 from app.core.config import (
-    ANTHROPIC_API_KEY,
     BRAVE_SEARCH_API_KEY,
     is_claude_search_configured,
 )
+from app.core.http_clients import upstream_client
+from app.services.brave_limiter import BraveQueueTimeout, brave_get
 
 logger = logging.getLogger(__name__)
 
@@ -166,23 +167,20 @@ async def _brave_search(
         "search_lang": "en",
     }
 
-    async with httpx.AsyncClient(timeout=BRAVE_TIMEOUT) as client:
+    async with upstream_client("brave", timeout=BRAVE_TIMEOUT) as client:
         for retry in range(MAX_RETRIES):
             try:
-                response = await client.get(
+                # 429s are waited out (and retried) by the shared limiter
+                response = await brave_get(
+                    client,
                     BRAVE_SEARCH_URL,
                     headers=headers,
                     params=params,
                 )
 
                 if response.status_code == 429:
-                    delay = 2 ** retry
-                    logger.warning(
-                        "Brave Search rate limited (429), retrying in %ds",
-                        delay,
-                    )
-                    await asyncio.sleep(delay)
-                    continue
+                    logger.warning("Brave Search still rate limited (429), giving up")
+                    return []
 
                 response.raise_for_status()
                 data = response.json()
@@ -207,6 +205,10 @@ async def _brave_search(
                     await asyncio.sleep(1)
                 continue
 
+            except BraveQueueTimeout as exc:
+                logger.warning("Brave Search skipped: %s", exc)
+                return []
+
             except httpx.HTTPError as exc:
                 logger.error("Brave Search error: %s", exc)
                 return []
@@ -312,7 +314,7 @@ async def _extract_candidates_with_claude(
     if not search_results:
         return []
 
-    client = AsyncAnthropic(api_key=ANTHROPIC_API_KEY)
+    client = get_claude_client("claude_search")
 
     prompt = _build_extraction_prompt(
         search_results, search_type, interests, vibes,
@@ -22,6 +22,7 @@ from typing import Any, Optional
 import httpx
 
 from app.core.config import FIRECRAWL_API_KEY, is_firecrawl_configured
+from app.core.http_clients import upstream_client
 
 logger = logging.getLogger(__name__)
 
@@ -437,7 +438,7 @@ class CuratedContentService:
             "formats": ["markdown"],
         }
 
-        async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
+        async with upstream_client("firecrawl", timeout=DEFAULT_TIMEOUT) as client:
             for retry in range(MAX_RETRIES):
                 try:
                     response = await client.post(
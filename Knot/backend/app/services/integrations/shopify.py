@@ -26,6 +26,7 @@ from app.core.config import (
     SHOPIFY_STOREFRONT_TOKEN,
     is_shopify_configured,
 )
+from app.core.http_clients import upstream_client
 
 logger = logging.getLogger(__name__)
 
@@ -248,7 +249,7 @@ class ShopifyService:
             "variables": variables,
         }
 
-        async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
+        async with upstream_client("shopify", timeout=DEFAULT_TIMEOUT) as client:
             for retry in range(MAX_RETRIES):
                 try:
                     response = await client.post(
@@ -22,6 +22,7 @@ from typing import Any, Optional
 import httpx
 
 from app.core.config import TICKETMASTER_API_KEY, is_ticketmaster_configured
+from app.core.http_clients import upstream_client
 from app.services.integrations.yelp import COUNTRY_CURRENCY_MAP
 
 logger = logging.getLogger(__name__)
@@ -152,7 +153,7 @@ class TicketmasterService:
 
         Returns parsed JSON dict. Returns empty response on any error.
         """
-        async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
+        async with upstream_client("ticketmaster", timeout=DEFAULT_TIMEOUT) as client:
             for retry in range(MAX_RETRIES):
                 try:
                     response = await client.get(
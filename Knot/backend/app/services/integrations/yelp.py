@@ -20,6 +20,7 @@ from typing import Any, Optional
 import httpx
 
 from app.core.config import YELP_API_KEY, is_yelp_configured
+from app.core.http_clients import upstream_client
 
 logger = logging.getLogger(__name__)
 
@@ -173,7 +174,7 @@ class YelpService:
             "Accept": "application/json",
         }
 
-        async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
+        async with upstream_client("yelp", timeout=DEFAULT_TIMEOUT) as client:
             for retry in range(MAX_RETRIES):
                 try:
                     response = await client.get(
@@ -0,0 +1,116 @@
+"""
+Incremental JSON Array Parser — Emit array elements as a stream arrives.
+
+Claude returns recommendations as one top-level JSON array. When the response
+is streamed, waiting for the closing bracket before calling json.loads()
+throws away the head start: the first object is usually complete seconds
+before the last. JSONArrayStreamParser is fed text deltas and returns each
+top-level element the moment its closing brace (or bracket) arrives.
+
+It tracks only what is needed to find element boundaries — nesting depth and
+whether the cursor is inside a string (with backslash escapes) — and hands
+each complete element to json.loads(). Anything before the opening bracket
+(a markdown code fence, a stray "json" tag) is ignored, as is anything after
+the closing bracket.
+
+Scalar top-level elements (numbers, strings, literals) are skipped — callers
+only expect objects.
+"""
+
+import json
+from typing import Any
+
+
+class JSONArrayStreamParser:
+    """
+    Feed text chunks of a JSON array; get back each element once complete.
+
+    Usage:
+        parser = JSONArrayStreamParser()
+        async for delta in stream.text_stream:
+            for element in parser.feed(delta):
+                handle(element)
+    """
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._pos = 0  # next index of _buffer to scan
+        self._started = False  # seen the opening "["
+        self._finished = False  # seen the matching "]"
+        self._depth = 0  # nesting depth inside the top-level array
+        self._in_string = False
+        self._escaped = False
+        self._element_start: int | None = None
+        self.errors = 0  # elements that closed but failed to parse
+
+    @property
+    def finished(self) -> bool:
+        """True once the top-level array's closing bracket has been seen."""
+        return self._finished
+
+    def feed(self, chunk: str) -> list[Any]:
+        """
+        Consume a chunk of text.
+
+        Returns:
+            The top-level elements completed by this chunk, in order.
+            Elements that are not valid JSON are dropped and counted in
+            `errors`.
+        """
+        if self._finished or not chunk:
+            return []
+        self._buffer += chunk
+        completed: list[Any] = []
+
+        buf = self._buffer
+        i = self._pos
+        n = len(buf)
+        while i < n:
+            ch = buf[i]
+
+            if not self._started:
+                if ch == "[":
+                    self._started = True
+                i += 1
+                continue
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                i += 1
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                if self._depth == 0:
+                    self._element_start = i
+                self._depth += 1
+            elif ch in "}]":
+                if self._depth == 0:
+                    # "]" closing the top-level array
+                    self._finished = True
+                    i += 1
+                    break
+                self._depth -= 1
+                if self._depth == 0 and self._element_start is not None:
+                    raw = buf[self._element_start:i + 1]
+                    self._element_start = None
+                    try:
+                        completed.append(json.loads(raw))
+                    except json.JSONDecodeError:
+                        self.errors += 1
+            i += 1
+
+        # Drop everything before the element in progress so the buffer only
+        # ever holds one partial element.
+        keep_from = self._element_start if self._element_start is not None else i
+        self._buffer = buf[keep_from:]
+        self._pos = i - keep_from
+        if self._element_start is not None:
+            self._element_start = 0
+        return completed
@@ -0,0 +1,127 @@
+"""
+LRU Cache — thread-safe bounded in-process cache with TTLs and version stamps.
+
+VersionedLRUCache backs the in-process caches (vaults and learned weights,
+query embeddings, hint indexes, Brave search results, merchant pages):
+
+- bounded: least recently used entries are evicted past max_entries
+- per-entry TTL, which bounds cross-worker staleness
+- version stamps: a loader captures version(key) before reading the
+  source and passes it to put(); invalidate(key) bumps the version, so a
+  read racing a write can never re-cache stale data
+- hit/miss/eviction/invalidation counters via stats(), for sizing; hits,
+  misses and evictions also feed the app.core.metrics cache collectors
+
+get() returns MISS rather than None on a miss so None can be cached.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Generic, TypeVar
+
+from app.core.metrics import CACHE_EVICTIONS, CACHE_LOOKUPS
+
+# Version stamps outlive entries (an in-flight load needs them after the
+# entry is evicted) but are bounded too, at this many per cache entry.
+# A key whose stamp was pruned reads as the highest pruned version rather
+# than 0, so a load that captured 0 before the key was invalidated still
+# fails its version check.
+VERSIONS_PER_ENTRY = 4
+
+V = TypeVar("V")
+
+# Sentinel distinguishing "not cached" from a cached None
+MISS: Any = object()
+
+
+class VersionedLRUCache(Generic[V]):
+    """Thread-safe bounded LRU with per-key TTL and version stamps."""
+
+    def __init__(self, name: str, max_entries: int, ttl: float) -> None:
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[V, float]] = OrderedDict()
+        self._versions: OrderedDict[str, int] = OrderedDict()
+        self._next_version = 1
+        self._pruned_floor = 0  # highest version stamp pruned so far
+        self._max_versions = max_entries * VERSIONS_PER_ENTRY
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def version(self, key: str) -> int:
+        """Current version stamp of `key`; capture it before loading."""
+        with self._lock:
+            return self._versions.get(key, self._pruned_floor)
+
+    def get(self, key: str) -> V:
+        """Return the cached value for `key`, or MISS."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                value = entry[0]
+            else:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                value = MISS
+        CACHE_LOOKUPS.inc(self.name, "memory", "miss" if value is MISS else "hit")
+        return value
+
+    def put(self, key: str, value: V, version: int) -> bool:
+        """
+        Store `value` if `key` has not been invalidated since `version`
+        was captured. Returns whether the value was stored.
+        """
+        evicted = 0
+        with self._lock:
+            if self._versions.get(key, self._pruned_floor) != version:
+                return False
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+            self.evictions += evicted
+        if evicted:
+            CACHE_EVICTIONS.inc(self.name, amount=evicted)
+        return True
+
+    def invalidate(self, key: str) -> None:
+        """Drop `key` and bump its version so in-flight loads aren't stored."""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._versions[key] = self._next_version
+            self._versions.move_to_end(key)
+            self._next_version += 1
+            while len(self._versions) > self._max_versions:
+                _, pruned = self._versions.popitem(last=False)
+                self._pruned_floor = max(self._pruned_floor, pruned)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop all entries, version stamps and counters."""
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self) -> dict:
+        """Counters and occupancy for sizing the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
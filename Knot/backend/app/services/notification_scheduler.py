@@ -15,6 +15,7 @@ import logging
 from datetime import date, datetime, time, timedelta, timezone
 
 from app.core.config import WEBHOOK_BASE_URL, is_qstash_configured
+from app.db.async_client import run_query
 from app.db.supabase_client import get_service_client
 from app.services.qstash import publish_to_qstash
 
@@ -199,10 +200,9 @@ async def schedule_milestone_notifications(
         }
 
         try:
-            result = (
+            result = await run_query(
                 client.table("notification_queue")
                 .insert(row)
-                .execute()
             )
             notification_row = result.data[0]
             created_notifications.append(notification_row)
@@ -0,0 +1,209 @@
+"""
+Page Cache — URL-keyed cache of merchant page fetches for availability checks.
+
+app.agents.availability GETs and parses every candidate URL on every
+pipeline run, then asks Claude for its price, even when the same
+Amazon/Etsy/Ticketmaster page was verified minutes ago for another user.
+This module caches, per URL, what verification learnt:
+
+- whether the page is available, and its extracted text
+- the page's validators (ETag / Last-Modified)
+- the price Claude extracted from that text, once known
+
+Entries are served as-is for PAGE_CACHE_FRESH_TTL seconds. After that a
+stale entry with validators is revalidated with If-None-Match /
+If-Modified-Since; a 304 refreshes it (text and price included) without a
+download, parse or Claude call. Dead pages (4xx other than 408/425/429) are
+negatively cached for PAGE_CACHE_NEGATIVE_TTL; timeouts, connection
+errors and 5xx responses are not cached.
+
+Page text is capped at MAX_PAGE_CONTENT_CHARS by the extractor, so
+PAGE_CACHE_MAX_ENTRIES bounds memory (~8KB per entry). Counters are
+exposed via get_page_cache_stats().
+"""
+
+import dataclasses
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from app.core.metrics import CACHE_OUTCOMES
+from app.services.lru_cache import MISS, VersionedLRUCache
+
+# ===================================================================
+# Configuration
+# ===================================================================
+
+PAGE_CACHE_MAX_ENTRIES = 2048
+PAGE_CACHE_FRESH_TTL = 600  # seconds served without contacting the merchant
+PAGE_CACHE_NEGATIVE_TTL = 300  # seconds a dead URL is remembered
+PAGE_CACHE_RETENTION = 6 * 3600  # seconds a stale entry is kept for revalidation
+
+# Client errors that say nothing about the page itself
+_TRANSIENT_4XX = frozenset({408, 425, 429})
+
+
+@dataclass(frozen=True)
+class CachedPage:
+    """What one fetch of a URL established."""
+
+    available: bool
+    text: str
+    checked_at: float  # wall clock of the last fetch or revalidation
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    # {"price_cents": int | None, "verified": bool} from Claude, once known
+    price: Optional[dict] = None
+
+    def is_fresh(self, now: float) -> bool:
+        ttl = PAGE_CACHE_FRESH_TTL if self.available else PAGE_CACHE_NEGATIVE_TTL
+        return now - self.checked_at < ttl
+
+    @property
+    def can_revalidate(self) -> bool:
+        return self.available and bool(self.etag or self.last_modified)
+
+
+_cache: VersionedLRUCache[CachedPage] = VersionedLRUCache(
+    "merchant_pages", PAGE_CACHE_MAX_ENTRIES, PAGE_CACHE_RETENTION,
+)
+
+_counters_lock = threading.Lock()
+_counters = {
+    "fresh_hits": 0,
+    "negative_hits": 0,
+    "revalidated": 0,
+    "changed": 0,
+    "misses": 0,
+    "price_hits": 0,
+}
+
+
+def record_page_cache_event(event: str) -> None:
+    """Count a lookup outcome (a key of the stats counters)."""
+    with _counters_lock:
+        _counters[event] += 1
+    CACHE_OUTCOMES.inc(_cache.name, event)
+
+
+# ===================================================================
+# Lookup and store
+# ===================================================================
+
+def page_cache_version(url: str) -> int:
+    """Version stamp to capture before fetching `url`."""
+    return _cache.version(url)
+
+
+def get_cached_page(url: str) -> Optional[CachedPage]:
+    """The cached entry for `url` (fresh or stale), or None."""
+    entry = _cache.get(url)
+    if entry is MISS:
+        return None
+    if not entry.available and not entry.is_fresh(time.time()):
+        return None  # an expired negative entry has nothing to revalidate
+    return entry
+
+
+def conditional_headers(entry: Optional[CachedPage]) -> dict[str, str]:
+    """If-None-Match / If-Modified-Since for revalidating `entry`."""
+    if entry is None or not entry.can_revalidate:
+        return {}
+    headers = {}
+    if entry.etag:
+        headers["If-None-Match"] = entry.etag
+    if entry.last_modified:
+        headers["If-Modified-Since"] = entry.last_modified
+    return headers
+
+
+def _header(headers: Any, name: str) -> Optional[str]:
+    value = headers.get(name) if headers is not None else None
+    return value if isinstance(value, str) and value else None
+
+
+def cache_page(
+    url: str,
+    available: bool,
+    text: str,
+    version: int,
+    headers: Any = None,
+) -> None:
+    """Cache a fresh fetch of `url` (see page_cache_version)."""
+    _cache.put(url, CachedPage(
+        available=available,
+        text=text,
+        checked_at=time.time(),
+        etag=_header(headers, "etag"),
+        last_modified=_header(headers, "last-modified"),
+    ), version)
+
+
+def mark_revalidated(url: str, entry: CachedPage, version: int) -> None:
+    """A 304 confirmed `entry` is current: restart its freshness window."""
+    _cache.put(url, dataclasses.replace(entry, checked_at=time.time()), version)
+
+
+def is_cacheable_failure(status_code: int) -> bool:
+    """True for statuses that mean the page is gone, not a passing fault."""
+    return 400 <= status_code < 500 and status_code not in _TRANSIENT_4XX
+
+
+# ===================================================================
+# Prices
+# ===================================================================
+
+def get_cached_price(url: Optional[str]) -> Optional[dict]:
+    """Claude's price result for the page currently cached at `url`, or None."""
+    if not url:
+        return None
+    entry = _cache.get(url)
+    if entry is MISS or not entry.available or entry.price is None:
+        return None
+    record_page_cache_event("price_hits")
+    return dict(entry.price)
+
+
+def cache_price(url: Optional[str], result: dict) -> None:
+    """Attach a price result to the cached page it was extracted from."""
+    if not url:
+        return
+    entry = _cache.get(url)
+    if entry is MISS or not entry.available:
+        return
+    price = {
+        "price_cents": result.get("price_cents"),
+        "verified": bool(result.get("verified", False)),
+    }
+    _cache.put(url, dataclasses.replace(entry, price=price), _cache.version(url))
+
+
+# ===================================================================
+# Stats
+# ===================================================================
+
+def get_page_cache_stats() -> dict:
+    """Lookup outcomes plus occupancy of the page cache."""
+    with _counters_lock:
+        outcomes = dict(_counters)
+    served = outcomes["fresh_hits"] + outcomes["negative_hits"] + outcomes["revalidated"]
+    lookups = served + outcomes["changed"] + outcomes["misses"]
+    return {
+        **outcomes,
+        "hit_rate": round(served / lookups, 4) if lookups else 0.0,
+        "memory": _cache.stats(),
+    }
+
+
+def _reset_page_cache() -> None:
+    """
+    Drop every cached page and zero the counters.
+
+    Used by tests to isolate cached pages between cases. Not intended for
+    production use.
+    """
+    _cache.clear()
+    with _counters_lock:
+        for event in _counters:
+            _counters[event] = 0
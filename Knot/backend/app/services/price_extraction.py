@@ -0,0 +1,434 @@
+"""
+Price Extraction — Deterministic price reading from structured page data.
+
+app.agents.availability used to send every verified page to Claude just to
+read its price, a multi-second Sonnet call on most pipeline runs. Many
+merchant pages already publish the price in machine-readable form:
+
+- schema.org JSON-LD: Offer / AggregateOffer (price, lowPrice,
+  priceSpecification), nested under Product, Event, @graph, ...
+- microdata: itemprop="price" / "lowPrice" / "priceCurrency"
+- OpenGraph: product:price:amount / og:price:amount (+ :currency)
+
+extract_price() reads those fields from the text the availability
+extractor produced ("Price Meta:" and "Structured Data:" lines), converts
+the amount to US cents and scores how far the result can be trusted.
+Pages it can't resolve with at least PRICE_MIN_CONFIDENCE go to Claude as
+before. The same rules as the Claude prompt apply: a range resolves to its
+lower end and other currencies are converted to USD. Converted prices use
+the approximate rates in _USD_PER_UNIT and are never reported as verified.
+"""
+
+import json
+import re
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import Any, Iterator, Optional
+
+__all__ = [
+    "PRICE_MIN_CONFIDENCE",
+    "PRICE_VERIFIED_CONFIDENCE",
+    "ExtractedPrice",
+    "extract_price",
+]
+
+# ===================================================================
+# Configuration
+# ===================================================================
+
+PRICE_MIN_CONFIDENCE = 0.7  # below this the page goes to Claude
+PRICE_VERIFIED_CONFIDENCE = 0.9  # at or above this the price is "verified"
+MAX_PRICE_CENTS = 100_000_000  # $1M — larger amounts are parse errors
+
+# Base confidence per source: JSON-LD is the most deliberate markup,
+# OpenGraph tags are the most often left stale by themes
+_SOURCE_CONFIDENCE = {"jsonld": 0.95, "microdata": 0.9, "opengraph": 0.85}
+
+_AGREEMENT_BONUS = 0.03  # per other source reporting the same price
+_CONFLICT_PENALTY = 0.3  # another source reports a different price
+_MISSING_CURRENCY_PENALTY = 0.3  # no currency at all: USD is a guess
+_SYMBOL_CURRENCY_PENALTY = 0.1  # currency inferred from a "$"/"£"/"€"
+_CONVERSION_PENALTY = 0.15  # converted with an approximate rate
+_VARIANT_PENALTY = 0.05  # several offer prices (variants / tiers)
+
+# Approximate USD value of one unit of each currency. Hand-maintained:
+# close enough for a price estimate, which is all a converted price is.
+_USD_PER_UNIT = {
+    "USD": Decimal("1"),
+    "EUR": Decimal("1.08"),
+    "GBP": Decimal("1.27"),
+    "CAD": Decimal("0.73"),
+    "AUD": Decimal("0.66"),
+    "NZD": Decimal("0.60"),
+    "CHF": Decimal("1.12"),
+    "JPY": Decimal("0.0067"),
+    "CNY": Decimal("0.14"),
+    "INR": Decimal("0.012"),
+    "MXN": Decimal("0.058"),
+    "SEK": Decimal("0.095"),
+    "NOK": Decimal("0.093"),
+    "DKK": Decimal("0.145"),
+    "SGD": Decimal("0.74"),
+    "HKD": Decimal("0.128"),
+    "KRW": Decimal("0.00074"),
+    "BRL": Decimal("0.18"),
+}
+
+_CURRENCY_SYMBOLS = {"$": "USD", "US$": "USD", "€": "EUR", "£": "GBP", "¥": "JPY", "₹": "INR"}
+_CURRENCY_ALIASES = {"US DOLLAR": "USD", "DOLLAR": "USD", "EURO": "EUR"}
+
+# A space (or no-break space) groups thousands only when exactly three
+# digits follow, so "1 299,00" is one number but "$5 2-pack" is two
+_NUMBER_PATTERN = (
+    r"(?:\d{1,3}(?:[ \u00a0\u202f]\d{3}(?!\d))+(?:[.,]\d+)*|\d+(?:[.,]\d+)*)"
+)
+_SYMBOL_PATTERN = r"(?:US\$|[$€£¥₹])"
+_NUMBER = re.compile(_NUMBER_PATTERN)
+_SYMBOL = re.compile(_SYMBOL_PATTERN)
+_SYMBOL_NUMBER = re.compile(
+    rf"{_SYMBOL_PATTERN}\s*({_NUMBER_PATTERN})|({_NUMBER_PATTERN})\s*{_SYMBOL_PATTERN}"
+)
+# Bare numbers only, optionally a range, optionally with a currency code
+_RANGE = re.compile(
+    rf"(?:[A-Z]{{3}}\s*)?{_NUMBER_PATTERN}(?:\s*(?:-|–|—|to)\s*{_NUMBER_PATTERN})*"
+    r"(?:\s*[A-Z]{3})?"
+)
+
+# Section labels written by app.agents.availability._PageTextExtractor
+_PRICE_META_LABEL = "Price Meta: "
+_STRUCTURED_DATA_LABEL = "Structured Data: "
+_PAGE_TEXT_LABEL = "\nPage Text: "
+
+_JSON = json.JSONDecoder()
+_NEXT_BLOCK = re.compile(r"\n\s*[\[{]")
+
+
+@dataclass(frozen=True)
+class ExtractedPrice:
+    """A price read from a page's structured data."""
+
+    price_cents: int
+    currency: str  # currency the page quoted, before conversion
+    confidence: float  # 0..1
+    source: str  # "jsonld", "microdata" or "opengraph"
+
+    @property
+    def verified(self) -> bool:
+        return self.confidence >= PRICE_VERIFIED_CONFIDENCE
+
+    def as_result(self) -> dict[str, Any]:
+        """The {"price_cents", "verified"} shape Claude's extraction returns."""
+        return {"price_cents": self.price_cents, "verified": self.verified}
+
+
+@dataclass(frozen=True)
+class _Quote:
+    """One price field: an amount, what we know of its currency, and its source."""
+
+    amount: Decimal
+    currency: Optional[str]
+    currency_from_symbol: bool
+    source: str
+
+
+# ===================================================================
+# Parsing helpers
+# ===================================================================
+
+def _parse_number(text: str) -> Optional[Decimal]:
+    """
+    Parse one number written with either decimal convention.
+
+    schema.org mandates "1299.00", but merchants also publish "1,299.00",
+    "1.299,00" and "49,99". With both separators the last one is the
+    decimal point; a repeated separator, or one followed by exactly three
+    digits, groups thousands. `text` is one _NUMBER match, so any spaces
+    in it are thousands separators.
+    """
+    text = re.sub(r"\s", "", text).strip(".,")
+    if not text:
+        return None
+    if "," in text and "." in text:
+        decimal_sep = "," if text.rfind(",") > text.rfind(".") else "."
+        thousands_sep = "." if decimal_sep == "," else ","
+        text = text.replace(thousands_sep, "").replace(decimal_sep, ".")
+    elif "," in text or text.count(".") > 1:
+        sep = "," if "," in text else "."
+        groups = text.split(sep)
+        if all(len(group) == 3 for group in groups[1:]):
+            text = "".join(groups)  # 1,299 / 1.299.000
+        elif len(groups) == 2:
+            text = ".".join(groups)  # 49,99
+        else:
+            return None
+    try:
+        return Decimal(text)
+    except InvalidOperation:
+        return None
+
+
+def _parse_amounts(value: Any) -> tuple[list[Decimal], Optional[str]]:
+    """
+    The amounts in a price field, plus any currency symbol written with them.
+
+    "45.00 - 189.50" yields both ends of the range. When the field has a
+    currency symbol, only numbers written next to one are amounts ("$5
+    2-pack" is $5). Without one, a field with other numbers in it ("49.99
+    2 pack") yields nothing, since which number is the price is a guess.
+    """
+    if isinstance(value, bool):
+        return [], None
+    if isinstance(value, (int, float)):
+        try:
+            return [Decimal(str(value))], None
+        except InvalidOperation:
+            return [], None
+    if not isinstance(value, str):
+        return [], None
+    symbol = _SYMBOL.search(value)
+    if symbol:
+        numbers = [m.group(1) or m.group(2) for m in _SYMBOL_NUMBER.finditer(value)]
+    else:
+        numbers = _NUMBER.findall(value)
+        if len(numbers) > 1 and not _RANGE.fullmatch(value.strip()):
+            return [], None
+    amounts = [
+        amount for amount in map(_parse_number, numbers)
+        if amount is not None
+    ]
+    return amounts, _CURRENCY_SYMBOLS.get(symbol.group()) if symbol else None
+
+
+def _normalize_currency(value: Any) -> Optional[str]:
+    """An ISO 4217 code from a priceCurrency-style field, or None."""
+    if not isinstance(value, str):
+        return None
+    code = value.strip().upper()
+    if code in _CURRENCY_SYMBOLS:
+        return _CURRENCY_SYMBOLS[code]
+    code = _CURRENCY_ALIASES.get(code, code)
+    return code if re.fullmatch(r"[A-Z]{3}", code) else None
+
+
+def _quotes(
+    value: Any,
+    currency: Any,
+    source: str,
+) -> list[_Quote]:
+    amounts, symbol_currency = _parse_amounts(value)
+    code = _normalize_currency(currency)
+    return [
+        _Quote(
+            amount=amount,
+            currency=code or symbol_currency,
+            currency_from_symbol=code is None and symbol_currency is not None,
+            source=source,
+        )
+        for amount in amounts
+    ]
+
+
+# ===================================================================
+# Sources
+# ===================================================================
+
+def _iter_json_values(section: str) -> Iterator[Any]:
+    """Decode the newline-separated JSON-LD blocks of a section. A block that
+    doesn't parse (invalid markup, or cut off at MAX_PAGE_CONTENT_CHARS) is
+    skipped."""
+    pos = 0
+    while pos < len(section):
+        while pos < len(section) and section[pos].isspace():
+            pos += 1
+        if pos >= len(section):
+            return
+        try:
+            value, pos = _JSON.raw_decode(section, pos)
+        except ValueError:
+            next_block = _NEXT_BLOCK.search(section, pos + 1)
+            if next_block is None:
+                return
+            pos = next_block.start()
+            continue
+        yield value
+
+
+def _types(node: dict) -> set[str]:
+    raw = node.get("@type")
+    values = raw if isinstance(raw, list) else [raw]
+    return {v.rsplit("/", 1)[-1].lower() for v in values if isinstance(v, str)}
+
+
+def _offer_quotes(offer: dict) -> list[_Quote]:
+    """Prices stated by one Offer / AggregateOffer node."""
+    currency = offer.get("priceCurrency")
+    if "lowPrice" in offer:
+        return _quotes(offer["lowPrice"], currency, "jsonld")
+    if "price" in offer:
+        return _quotes(offer["price"], currency, "jsonld")
+    spec = offer.get("priceSpecification")
+    specs = spec if isinstance(spec, list) else [spec]
+    quotes: list[_Quote] = []
+    for item in specs:
+        if isinstance(item, dict) and "price" in item:
+            quotes += _quotes(item["price"], item.get("priceCurrency", currency), "jsonld")
+    return quotes
+
+
+def _jsonld_quotes(value: Any, in_offers: bool = False, depth: int = 0) -> list[_Quote]:
+    """Walk a JSON-LD document for Offer-like nodes."""
+    if depth > 12:
+        return []
+    if isinstance(value, list):
+        quotes: list[_Quote] = []
+        for item in value:
+            quotes += _jsonld_quotes(item, in_offers, depth + 1)
+        return quotes
+    if not isinstance(value, dict):
+        return []
+
+    types = _types(value)
+    if in_offers or types & {"offer", "aggregateoffer"}:
+        quotes = _offer_quotes(value)
+        if quotes:
+            return quotes
+    quotes = []
+    for key, child in value.items():
+        if isinstance(child, (dict, list)):
+            quotes += _jsonld_quotes(child, key == "offers", depth + 1)
+    return quotes
+
+
+def _price_meta_fields(text: str) -> dict[str, str]:
+    fields: dict[str, str] = {}
+    for pair in text.split("; "):
+        key, sep, value = pair.partition("=")
+        if sep:
+            fields[key.strip()] = value.strip()
+    return fields
+
+
+def _meta_quotes(fields: dict[str, str]) -> list[_Quote]:
+    """OpenGraph and microdata quotes from the "Price Meta:" fields."""
+    quotes: list[_Quote] = []
+    for prefix in ("product:price", "og:price"):
+        if f"{prefix}:amount" in fields:
+            quotes += _quotes(
+                fields[f"{prefix}:amount"], fields.get(f"{prefix}:currency"), "opengraph",
+            )
+            break
+    itemprops = {key[len("itemprop:"):].lower(): value
+                 for key, value in fields.items() if key.startswith("itemprop:")}
+    price = itemprops.get("lowprice") or itemprops.get("price")
+    if price is not None:
+        quotes += _quotes(price, itemprops.get("pricecurrency"), "microdata")
+    return quotes
+
+
+def _sections(page_text: str) -> tuple[str, str]:
+    """(price meta line, structured data section) of an extractor result."""
+    meta = ""
+    structured = ""
+    for line in page_text.split("\n"):
+        if line.startswith(_PRICE_META_LABEL):
+            meta = line[len(_PRICE_META_LABEL):]
+            break
+    start = page_text.find(_STRUCTURED_DATA_LABEL)
+    if start != -1 and (start == 0 or page_text[start - 1] == "\n"):
+        start += len(_STRUCTURED_DATA_LABEL)
+        end = page_text.find(_PAGE_TEXT_LABEL, start)
+        structured = page_text[start:end if end != -1 else len(page_text)]
+    return meta, structured
+
+
+# ===================================================================
+# Scoring
+# ===================================================================
+
+def _to_usd_cents(amount: Decimal, currency: str) -> Optional[int]:
+    rate = _USD_PER_UNIT.get(currency)
+    if rate is None:
+        return None
+    cents = int((amount * rate * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+    return cents if 0 < cents <= MAX_PRICE_CENTS else None
+
+
+def _score_source(quotes: list[_Quote]) -> Optional[ExtractedPrice]:
+    """The lowest price one source states, with its confidence."""
+    best: Optional[tuple[int, _Quote]] = None
+    prices: set[int] = set()
+    for quote in quotes:
+        cents = _to_usd_cents(quote.amount, quote.currency or "USD")
+        if cents is None:
+            continue
+        prices.add(cents)
+        if best is None or cents < best[0]:
+            best = (cents, quote)
+    if best is None:
+        return None
+
+    cents, quote = best
+    confidence = _SOURCE_CONFIDENCE[quote.source]
+    if quote.currency is None:
+        confidence -= _MISSING_CURRENCY_PENALTY
+    elif quote.currency_from_symbol:
+        confidence -= _SYMBOL_CURRENCY_PENALTY
+    if quote.currency not in (None, "USD"):
+        confidence -= _CONVERSION_PENALTY
+    if len(prices) > 1:
+        confidence -= _VARIANT_PENALTY
+    return ExtractedPrice(
+        price_cents=cents,
+        currency=quote.currency or "USD",
+        confidence=confidence,
+        source=quote.source,
+    )
+
+
+def extract_price(page_text: str) -> Optional[ExtractedPrice]:
+    """
+    Read a page's price from its structured data.
+
+    Args:
+        page_text: Output of app.agents.availability._extract_text_from_html
+                   (or a cached copy of it).
+
+    Returns:
+        The price in US cents with a confidence score, or None when the page
+        states no usable price or the result is below PRICE_MIN_CONFIDENCE
+        (conflicting sources, no currency, an unknown currency, ...).
+    """
+    if not page_text:
+        return None
+    meta, structured = _sections(page_text)
+    quotes = _meta_quotes(_price_meta_fields(meta)) if meta else []
+    for document in _iter_json_values(structured):
+        quotes += _jsonld_quotes(document)
+    if not quotes:
+        return None
+
+    by_source: dict[str, list[_Quote]] = {}
+    for quote in quotes:
+        by_source.setdefault(quote.source, []).append(quote)
+    results = [r for r in map(_score_source, by_source.values()) if r is not None]
+    if not results:
+        return None
+
+    best = max(results, key=lambda r: r.confidence)
+    confidence = best.confidence
+    for other in results:
+        if other is best:
+            continue
+        if other.price_cents == best.price_cents:
+            confidence += _AGREEMENT_BONUS
+        else:
+            confidence -= _CONFLICT_PENALTY
+    confidence = round(min(confidence, 0.99), 2)
+    if confidence < PRICE_MIN_CONFIDENCE:
+        return None
+    return ExtractedPrice(
+        price_cents=best.price_cents,
+        currency=best.currency,
+        confidence=confidence,
+        source=best.source,
+    )
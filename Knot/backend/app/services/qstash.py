@@ -16,7 +16,6 @@ import hashlib
 import logging
 from typing import Any
 
-import httpx
 import jwt
 
 from app.core.config import (
@@ -25,6 +24,7 @@ from app.core.config import (
     UPSTASH_QSTASH_TOKEN,
     UPSTASH_QSTASH_URL,
 )
+from app.core.http_clients import upstream_client
 
 logger = logging.getLogger(__name__)
 
@@ -190,7 +190,7 @@ async def publish_to_qstash(
 
     publish_url = f"{UPSTASH_QSTASH_URL}/v2/publish/{destination_url}"
 
-    async with httpx.AsyncClient() as client:
+    async with upstream_client("qstash") as client:
         response = await client.post(
             publish_url,
             headers=headers,
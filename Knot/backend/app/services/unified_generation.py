@@ -16,10 +16,11 @@ Step 15.1: Unified AI Recommendation System
 import json
 import logging
 import uuid
+from collections.abc import AsyncIterator
 from typing import Any, Optional
 
-from anthropic import AsyncAnthropic
-
+from app.services.claude_client import get_claude_client
+from app.services.json_stream import JSONArrayStreamParser
 from app.services.llm_tuning import fast_generation_params
 from app.services.text_cleanup import (
     humanize_tags,
@@ -28,6 +29,12 @@ from app.services.text_cleanup import (
     truncate_prose,
 )
 
+from app.agents.budget import (
+    CAPPED_RETRIES,
+    GENERATION_RETRY_MIN_SECONDS,
+    has_budget,
+    note_degradation,
+)
 from app.agents.state import (
     UNLIMITED_BUDGET_MAX_CENTS,
     BudgetRange,
@@ -37,7 +44,8 @@ from app.agents.state import (
     RelevantHint,
     VaultData,
 )
-from app.core.config import ANTHROPIC_API_KEY, is_anthropic_configured
+from app.core.config import is_anthropic_configured
+from app.core.pipeline_metrics import RETRY, count_event
 
 logger = logging.getLogger(__name__)
 
@@ -448,6 +456,18 @@ def _normalize_recommendation(
 # Main generation function
 # ======================================================================
 
+def _can_retry(deadline: Optional[float], vault_id: str) -> bool:
+    """Whether the latency budget leaves room for another generation attempt."""
+    if has_budget(deadline, GENERATION_RETRY_MIN_SECONDS):
+        return True
+    logger.warning(
+        "Skipping unified generation retry for vault %s — latency budget nearly spent",
+        vault_id,
+    )
+    note_degradation(CAPPED_RETRIES)
+    return False
+
+
 async def generate_unified_recommendations(
     vault_data: VaultData,
     hints: list[RelevantHint],
@@ -458,6 +478,7 @@ async def generate_unified_recommendations(
     excluded_descriptions: list[str] | None = None,
     vibe_override: list[str] | None = None,
     rejection_reason: Optional[str] = None,
+    deadline: Optional[float] = None,
 ) -> list[CandidateRecommendation]:
     """
     Generate 3 personalized recommendations using Claude.
@@ -476,6 +497,8 @@ async def generate_unified_recommendations(
         excluded_descriptions: Previously shown description snippets.
         vibe_override: Optional session-scoped vibe override.
         rejection_reason: Optional reason from refresh (adjusts generation).
+        deadline: Pipeline deadline (app.agents.budget); retries are skipped
+            once too little time remains for another call.
 
     Returns:
         Up to GENERATION_TARGET CandidateRecommendation objects (the first
@@ -487,7 +510,7 @@ async def generate_unified_recommendations(
         logger.warning("Anthropic API key not configured — skipping unified generation")
         return []
 
-    client = AsyncAnthropic(api_key=ANTHROPIC_API_KEY)
+    client = get_claude_client("unified_generation")
     user_prompt = _build_user_prompt(
         vault_data=vault_data,
         hints=hints,
@@ -510,6 +533,10 @@ async def generate_unified_recommendations(
     best_recs: list[CandidateRecommendation] = []
 
     for attempt in range(MAX_RETRIES + 1):
+        if attempt:
+            if not _can_retry(deadline, vault_data.vault_id):
+                break
+            count_event(RETRY)
         try:
             response = await client.messages.create(
                 model=CLAUDE_MODEL,
@@ -610,3 +637,144 @@ async def generate_unified_recommendations(
         vault_data.vault_id,
     )
     return []
+
+
+# ======================================================================
+# Streaming generation
+# ======================================================================
+
+async def stream_unified_recommendations(
+    vault_data: VaultData,
+    hints: list[RelevantHint],
+    occasion_type: str,
+    budget_range: BudgetRange,
+    milestone_context: Optional[MilestoneContext] = None,
+    excluded_titles: list[str] | None = None,
+    excluded_descriptions: list[str] | None = None,
+    vibe_override: list[str] | None = None,
+    rejection_reason: Optional[str] = None,
+    deadline: Optional[float] = None,
+) -> AsyncIterator[CandidateRecommendation]:
+    """
+    Streaming variant of generate_unified_recommendations.
+
+    Streams Claude's response through an incremental JSON-array parser and
+    yields each recommendation the moment its object closes and validates,
+    so URL resolution for the first card can overlap with generation of the
+    rest. Takes the same arguments as generate_unified_recommendations.
+
+    An attempt that errors, or ends with fewer than PRIMARY_RECOMMENDATION_COUNT
+    valid cards, is retried up to MAX_RETRIES times. Cards already yielded are
+    kept; a retry's cards are only yielded if their title is new. Because every
+    yielded object closed and validated on its own, a max_tokens stop keeps the
+    cards completed before the cut-off rather than discarding the attempt.
+
+    Yields:
+        Up to GENERATION_TARGET CandidateRecommendation objects in the order
+        Claude produced them (the first PRIMARY_RECOMMENDATION_COUNT are the
+        shown cards). Yields nothing if Claude is not configured or every
+        attempt fails.
+    """
+    if not is_anthropic_configured():
+        logger.warning("Anthropic API key not configured — skipping unified generation")
+        return
+
+    client = get_claude_client("unified_generation")
+    user_prompt = _build_user_prompt(
+        vault_data=vault_data,
+        hints=hints,
+        occasion_type=occasion_type,
+        budget_range=budget_range,
+        milestone_context=milestone_context,
+        excluded_titles=excluded_titles,
+        excluded_descriptions=excluded_descriptions,
+        vibe_override=vibe_override,
+        rejection_reason=rejection_reason,
+    )
+
+    logger.info(
+        "Streaming unified recommendations for vault %s (occasion: %s, excluded: %d)",
+        vault_data.vault_id, occasion_type, len(excluded_titles or []),
+    )
+
+    yielded = 0
+    seen_titles: set[str] = set()
+
+    for attempt in range(MAX_RETRIES + 1):
+        if attempt:
+            if not _can_retry(deadline, vault_data.vault_id):
+                break
+            count_event(RETRY)
+        parser = JSONArrayStreamParser()
+        try:
+            async with client.messages.stream(
+                model=CLAUDE_MODEL,
+                max_tokens=CLAUDE_MAX_TOKENS,
+                system=UNIFIED_SYSTEM_PROMPT,
+                messages=[{"role": "user", "content": user_prompt}],
+                # Keep generation fast — see app/services/llm_tuning.py.
+                **fast_generation_params(CLAUDE_MODEL),
+            ) as stream:
+                async for delta in stream.text_stream:
+                    for raw_rec in parser.feed(delta):
+                        if not _validate_recommendation(raw_rec):
+                            logger.debug(
+                                "Skipping invalid recommendation: %s",
+                                raw_rec.get("title", "?") if isinstance(raw_rec, dict) else "?",
+                            )
+                            continue
+                        title_key = str(raw_rec["title"]).strip().lower()
+                        if title_key in seen_titles:
+                            continue
+                        seen_titles.add(title_key)
+
+                        yielded += 1
+                        yield _normalize_recommendation(raw_rec, vault_data)
+                        if yielded >= GENERATION_TARGET:
+                            return
+
+                final_message = await stream.get_final_message()
+
+            if getattr(final_message, "stop_reason", None) == "max_tokens":
+                logger.warning(
+                    "Claude stream truncated at max_tokens=%d (attempt %d/%d) — "
+                    "keeping %d completed recommendations for vault %s",
+                    CLAUDE_MAX_TOKENS, attempt + 1, MAX_RETRIES + 1,
+                    yielded, vault_data.vault_id,
+                )
+            if parser.errors:
+                logger.warning(
+                    "Claude stream contained %d unparseable objects (attempt %d/%d)",
+                    parser.errors, attempt + 1, MAX_RETRIES + 1,
+                )
+
+        except Exception as exc:
+            logger.error(
+                "Streaming unified generation failed (attempt %d/%d): %s",
+                attempt + 1, MAX_RETRIES + 1, exc,
+            )
+
+        if yielded >= PRIMARY_RECOMMENDATION_COUNT:
+            logger.info(
+                "Streamed %d valid recommendations for vault %s",
+                yielded, vault_data.vault_id,
+            )
+            return
+
+        logger.warning(
+            "Only %d valid recommendations streamed (attempt %d/%d) — "
+            "retrying for a full set of %d",
+            yielded, attempt + 1, MAX_RETRIES + 1,
+            PRIMARY_RECOMMENDATION_COUNT,
+        )
+
+    if yielded:
+        logger.warning(
+            "Unified generation never reached 3 for vault %s — streamed best %d",
+            vault_data.vault_id, yielded,
+        )
+    else:
+        logger.error(
+            "Unified generation exhausted all retries for vault %s",
+            vault_data.vault_id,
+        )
@@ -0,0 +1,168 @@
+"""
+Vault Cache — Versioned in-process LRU cache of partner profile data.
+
+Partner vaults and learned preference weights change rarely (onboarding,
+vault edits, the weekly feedback-analysis job) but every generate, refresh,
+notification and idea request reloads them. This module caches, per user:
+
+- VaultData and vault_id (populated by load_vault_data)
+- the bare vault_id (populated by vault_loader.load_vault_id)
+- UserPreferencesWeights, including "no weights yet" (load_learned_weights)
+
+Every write path calls invalidate_vault() / invalidate_learned_weights().
+Each key carries a version stamp (app.services.lru_cache) that invalidation
+bumps: a load captures the version before querying and its result is only
+stored if the version is unchanged, so a read racing a write can never
+re-cache stale data.
+
+Invalidation is per process. With multiple workers, another worker's copy
+stays stale until it ages out after VAULT_CACHE_TTL seconds.
+
+Hit/miss/eviction counters are exposed via get_vault_cache_stats().
+"""
+
+import copy
+from typing import Any, Optional
+
+from app.agents.state import VaultData
+from app.models.feedback_analysis import UserPreferencesWeights
+from app.services.lru_cache import MISS, VersionedLRUCache
+
+# ===================================================================
+# Configuration
+# ===================================================================
+
+VAULT_CACHE_MAX_ENTRIES = 1024
+VAULT_CACHE_TTL = 300  # seconds — bounds cross-worker staleness
+
+
+# Module-level caches, keyed by user_id
+_vault_data_cache: VersionedLRUCache[tuple[VaultData, str]] = VersionedLRUCache(
+    "vault_data", VAULT_CACHE_MAX_ENTRIES, VAULT_CACHE_TTL,
+)
+_vault_id_cache: VersionedLRUCache[str] = VersionedLRUCache(
+    "vault_id", VAULT_CACHE_MAX_ENTRIES, VAULT_CACHE_TTL,
+)
+_weights_cache: VersionedLRUCache[Optional[UserPreferencesWeights]] = VersionedLRUCache(
+    "learned_weights", VAULT_CACHE_MAX_ENTRIES, VAULT_CACHE_TTL,
+)
+
+
+# ===================================================================
+# VaultData
+# ===================================================================
+
+def vault_data_version(user_id: str) -> int:
+    """Version stamp to capture before loading a vault from the database."""
+    return _vault_data_cache.version(user_id)
+
+
+def get_cached_vault_data(user_id: str) -> Optional[tuple[VaultData, str]]:
+    """
+    Return a private copy of the user's cached (VaultData, vault_id), or
+    None on a miss. Callers may mutate the copy freely.
+    """
+    cached = _vault_data_cache.get(user_id)
+    if cached is MISS:
+        return None
+    vault_data, vault_id = cached
+    return vault_data.model_copy(deep=True), vault_id
+
+
+def cache_vault_data(
+    user_id: str,
+    vault_data: VaultData,
+    vault_id: str,
+    version: int,
+) -> None:
+    """Cache a freshly loaded vault (see vault_data_version)."""
+    if _vault_data_cache.put(user_id, (vault_data.model_copy(deep=True), vault_id), version):
+        _vault_id_cache.put(user_id, vault_id, _vault_id_cache.version(user_id))
+
+
+# ===================================================================
+# Vault ID
+# ===================================================================
+
+def vault_id_version(user_id: str) -> int:
+    """Version stamp to capture before looking up a vault_id."""
+    return _vault_id_cache.version(user_id)
+
+
+def get_cached_vault_id(user_id: str) -> Optional[str]:
+    """Return the user's cached vault_id, or None on a miss."""
+    cached = _vault_id_cache.get(user_id)
+    return None if cached is MISS else cached
+
+
+def cache_vault_id(user_id: str, vault_id: str, version: int) -> None:
+    """Cache a vault_id looked up from partner_vaults (see vault_id_version)."""
+    _vault_id_cache.put(user_id, vault_id, version)
+
+
+# ===================================================================
+# Learned weights
+# ===================================================================
+
+def learned_weights_version(user_id: str) -> int:
+    """Version stamp to capture before loading learned weights."""
+    return _weights_cache.version(user_id)
+
+
+def get_cached_learned_weights(user_id: str) -> Any:
+    """
+    Return the user's cached weights — None meaning "no weights yet" — or
+    MISS if nothing is cached.
+    """
+    cached = _weights_cache.get(user_id)
+    if cached is MISS or cached is None:
+        return cached
+    return cached.model_copy(deep=True)
+
+
+def cache_learned_weights(
+    user_id: str,
+    weights: Optional[UserPreferencesWeights],
+    version: int,
+) -> None:
+    """Cache loaded weights, or None for a user without any."""
+    _weights_cache.put(user_id, copy.deepcopy(weights), version)
+
+
+# ===================================================================
+# Invalidation & metrics
+# ===================================================================
+
+def invalidate_vault(user_id: str) -> None:
+    """
+    Drop the user's cached vault and vault_id.
+
+    Call after any write to partner_vaults, its child tables or
+    partner_milestones — vault create/update, milestone CRUD, account
+    reset/deletion.
+    """
+    _vault_data_cache.invalidate(user_id)
+    _vault_id_cache.invalidate(user_id)
+
+
+def invalidate_learned_weights(user_id: str) -> None:
+    """Drop the user's cached learned weights (after upsert_user_weights)."""
+    _weights_cache.invalidate(user_id)
+
+
+def get_vault_cache_stats() -> dict:
+    """Per-cache hit/miss/eviction counters, keyed by cache name."""
+    return {
+        cache.name: cache.stats()
+        for cache in (_vault_data_cache, _vault_id_cache, _weights_cache)
+    }
+
+
+def _reset_vault_caches() -> None:
+    """
+    Clear all vault caches and their counters.
+
+    Used by tests to isolate cache state. Not intended for production use.
+    """
+    for cache in (_vault_data_cache, _vault_id_cache, _weights_cache):
+        cache.clear()
@@ -6,10 +6,21 @@ recommendations API and the notification processing endpoint.
 
 Step 7.3: Extract vault loading into a shared service.
 Step 10.3: Added load_learned_weights for personalized recommendation scoring.
+
+load_vault_data reads the whole vault through the get_partner_vault() RPC
+(one round trip), falling back to per-table queries when it is unavailable.
+load_vault_id looks up just the vault_id for routes that need nothing else.
+Vaults, vault ids and learned weights are served from the versioned in-process cache
+in app.services.vault_cache when possible. load_concurrently runs the
+independent per-request loads that follow the vault lookup in one round.
 """
 
+import asyncio
 import logging
-from typing import Optional
+from collections.abc import Awaitable
+from typing import Any, Optional
+
+from postgrest.exceptions import APIError
 
 from app.agents.state import (
     BudgetRange,
@@ -17,8 +28,21 @@ from app.agents.state import (
     VaultBudget,
     VaultData,
 )
+from app.db.async_client import run_query
 from app.db.supabase_client import get_service_client
 from app.models.feedback_analysis import UserPreferencesWeights
+from app.services.vault_cache import (
+    MISS,
+    cache_learned_weights,
+    cache_vault_data,
+    cache_vault_id,
+    get_cached_learned_weights,
+    get_cached_vault_data,
+    get_cached_vault_id,
+    learned_weights_version,
+    vault_data_version,
+    vault_id_version,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -27,12 +51,29 @@ logger = logging.getLogger(__name__)
 # Vault Data Loading
 # ===================================================================
 
+# Postgres function returning the vault and all child rows as one JSONB
+# document (migration 00027).
+VAULT_RPC_FUNCTION = "get_partner_vault"
+
+# PostgREST error codes meaning the RPC function does not exist
+# (PGRST202: not in the schema cache; 42883: undefined_function).
+_MISSING_FUNCTION_CODES = frozenset({"PGRST202", "42883"})
+
+# Set to False once the RPC is found to be missing, so later loads go
+# straight to the per-table fallback instead of failing the RPC each time.
+_vault_rpc_available: bool = True
+
+
 async def load_vault_data(user_id: str) -> tuple[VaultData, str]:
     """
     Load complete vault data for a user.
 
-    Queries partner_vaults, partner_interests, partner_vibes,
-    partner_budgets, and partner_love_languages tables.
+    Served from the vault cache when possible. Otherwise calls the
+    get_partner_vault() RPC, which returns partner_vaults and its
+    partner_interests, partner_vibes, partner_budgets and
+    partner_love_languages rows in a single round trip, and caches the
+    result. Falls back to per-table queries (child tables loaded
+    concurrently) if the RPC is missing or fails.
 
     Args:
         user_id: The user's UUID.
@@ -43,17 +84,72 @@ async def load_vault_data(user_id: str) -> tuple[VaultData, str]:
     Raises:
         ValueError: If no vault is found for the user.
     """
+    cached = get_cached_vault_data(user_id)
+    if cached is not None:
+        return cached
+
+    version = vault_data_version(user_id)
+    vault_data, vault_id = await _fetch_vault_data(user_id)
+    cache_vault_data(user_id, vault_data, vault_id, version)
+    return vault_data, vault_id
+
+
+async def _fetch_vault_data(user_id: str) -> tuple[VaultData, str]:
+    """Load a vault from the database: RPC first, per-table fallback."""
+    global _vault_rpc_available
     client = get_service_client()
 
+    if _vault_rpc_available:
+        try:
+            result = await run_query(
+                client.rpc(VAULT_RPC_FUNCTION, {"p_user_id": user_id})
+            )
+        except APIError as exc:
+            if exc.code in _MISSING_FUNCTION_CODES:
+                _vault_rpc_available = False
+                logger.warning(
+                    "%s() RPC not found — loading vaults with per-table queries. "
+                    "Apply migration 00027 to enable single-round-trip loading.",
+                    VAULT_RPC_FUNCTION,
+                )
+            else:
+                logger.warning(
+                    "%s() RPC failed for user %s: %s — falling back to per-table queries",
+                    VAULT_RPC_FUNCTION, user_id[:8], exc,
+                )
+        except Exception as exc:
+            logger.warning(
+                "%s() RPC failed for user %s: %s — falling back to per-table queries",
+                VAULT_RPC_FUNCTION, user_id[:8], exc,
+            )
+        else:
+            document = result.data
+            if not document:
+                raise ValueError(f"No partner vault found for user {user_id[:8]}...")
+            return _build_vault_data(
+                document["vault"],
+                interests=document.get("interests") or [],
+                vibes=document.get("vibes") or [],
+                budgets=document.get("budgets") or [],
+                love_languages=document.get("love_languages") or [],
+            )
+
+    return await _load_vault_data_by_table(client, user_id)
+
+
+async def _load_vault_data_by_table(client, user_id: str) -> tuple[VaultData, str]:
+    """
+    Fallback vault loader: one query for the vault, then the four child
+    tables concurrently (two round trips of latency instead of five).
+    """
     # 1. Load the vault (ORDER BY created_at ensures consistent selection
     # if a user somehow has multiple vault rows — e.g. from dev testing)
-    vault_result = (
+    vault_result = await run_query(
         client.table("partner_vaults")
         .select("*")
         .eq("user_id", user_id)
         .order("created_at", desc=False)
         .limit(1)
-        .execute()
     )
 
     if not vault_result.data:
@@ -63,52 +159,71 @@ async def load_vault_data(user_id: str) -> tuple[VaultData, str]:
     vault_id = vault["id"]
 
     # 2. Load all related data
-    interests_result = (
-        client.table("partner_interests")
-        .select("interest_type, interest_category")
-        .eq("vault_id", vault_id)
-        .execute()
+    (
+        interests_result,
+        vibes_result,
+        budgets_result,
+        love_languages_result,
+    ) = await asyncio.gather(
+        run_query(
+            client.table("partner_interests")
+            .select("interest_type, interest_category")
+            .eq("vault_id", vault_id)
+        ),
+        run_query(
+            client.table("partner_vibes")
+            .select("vibe_tag")
+            .eq("vault_id", vault_id)
+        ),
+        run_query(
+            client.table("partner_budgets")
+            .select("occasion_type, min_amount, max_amount, currency")
+            .eq("vault_id", vault_id)
+        ),
+        run_query(
+            client.table("partner_love_languages")
+            .select("language, priority")
+            .eq("vault_id", vault_id)
+        ),
     )
 
-    vibes_result = (
-        client.table("partner_vibes")
-        .select("vibe_tag")
-        .eq("vault_id", vault_id)
-        .execute()
+    return _build_vault_data(
+        vault,
+        interests=interests_result.data or [],
+        vibes=vibes_result.data or [],
+        budgets=budgets_result.data or [],
+        love_languages=love_languages_result.data or [],
     )
 
-    budgets_result = (
-        client.table("partner_budgets")
-        .select("occasion_type, min_amount, max_amount, currency")
-        .eq("vault_id", vault_id)
-        .execute()
-    )
 
-    love_languages_result = (
-        client.table("partner_love_languages")
-        .select("language, priority")
-        .eq("vault_id", vault_id)
-        .execute()
-    )
+def _build_vault_data(
+    vault: dict,
+    interests: list[dict],
+    vibes: list[dict],
+    budgets: list[dict],
+    love_languages: list[dict],
+) -> tuple[VaultData, str]:
+    """Assemble VaultData from the vault row and its child rows."""
+    vault_id = vault["id"]
 
     # Parse interests into likes/dislikes
     likes = [
         row["interest_category"]
-        for row in (interests_result.data or [])
+        for row in interests
         if row["interest_type"] == "like"
     ]
     dislikes = [
         row["interest_category"]
-        for row in (interests_result.data or [])
+        for row in interests
         if row["interest_type"] == "dislike"
     ]
 
-    vibes = [row["vibe_tag"] for row in (vibes_result.data or [])]
+    vibe_tags = [row["vibe_tag"] for row in vibes]
 
     # Parse love languages
     primary_ll = ""
     secondary_ll = ""
-    for row in (love_languages_result.data or []):
+    for row in love_languages:
         if row["priority"] == 1:
             primary_ll = row["language"]
         elif row["priority"] == 2:
@@ -122,7 +237,7 @@ async def load_vault_data(user_id: str) -> tuple[VaultData, str]:
             max_amount=row["max_amount"],
             currency=row.get("currency", "USD"),
         )
-        for row in (budgets_result.data or [])
+        for row in budgets
     ]
 
     vault_data = VaultData(
@@ -135,7 +250,7 @@ async def load_vault_data(user_id: str) -> tuple[VaultData, str]:
         location_country=vault.get("location_country", "US"),
         interests=likes,
         dislikes=dislikes,
-        vibes=vibes,
+        vibes=vibe_tags,
         primary_love_language=primary_ll,
         secondary_love_language=secondary_ll,
         budgets=vault_budgets,
@@ -144,6 +259,54 @@ async def load_vault_data(user_id: str) -> tuple[VaultData, str]:
     return vault_data, vault_id
 
 
+def _reset_vault_rpc_availability() -> None:
+    """
+    Re-enable the get_partner_vault() RPC after it was found missing.
+
+    Used by tests to restore the default state. Not intended for
+    production use.
+    """
+    global _vault_rpc_available
+    _vault_rpc_available = True
+
+
+# ===================================================================
+# Vault ID Lookup
+# ===================================================================
+
+async def load_vault_id(client, user_id: str) -> Optional[str]:
+    """
+    Look up the user's vault_id, served from the vault cache when possible.
+
+    Routes that only need the id use this instead of load_vault_data. A
+    cached id is shared with load_vault_data, which primes it too.
+
+    Args:
+        client: Supabase client to query on a miss.
+        user_id: The user's UUID.
+
+    Returns:
+        The vault_id, or None if the user has no vault. Database errors
+        propagate to the caller.
+    """
+    cached = get_cached_vault_id(user_id)
+    if cached is not None:
+        return cached
+
+    version = vault_id_version(user_id)
+    result = await run_query(
+        client.table("partner_vaults")
+        .select("id")
+        .eq("user_id", user_id)
+        .limit(1)
+    )
+    if not result.data:
+        return None
+    vault_id = result.data[0]["id"]
+    cache_vault_id(user_id, vault_id, version)
+    return vault_id
+
+
 # ===================================================================
 # Milestone Context Loading
 # ===================================================================
@@ -164,12 +327,11 @@ async def load_milestone_context(
     """
     client = get_service_client()
 
-    milestone_result = (
+    milestone_result = await run_query(
         client.table("partner_milestones")
         .select("*")
         .eq("id", milestone_id)
         .eq("vault_id", vault_id)
-        .execute()
     )
 
     if not milestone_result.data:
@@ -231,6 +393,8 @@ async def load_learned_weights(user_id: str) -> Optional[UserPreferencesWeights]
 
     Returns None if no weights exist (new user or insufficient feedback)
     or if the query fails (graceful degradation — no personalization applied).
+    Results, including "no weights", are cached until upsert_user_weights
+    invalidates them; failures are not cached.
 
     Args:
         user_id: The user's UUID.
@@ -238,18 +402,23 @@ async def load_learned_weights(user_id: str) -> Optional[UserPreferencesWeights]
     Returns:
         UserPreferencesWeights if found, None otherwise.
     """
+    cached = get_cached_learned_weights(user_id)
+    if cached is not MISS:
+        return cached
+
+    version = learned_weights_version(user_id)
     try:
         client = get_service_client()
-        result = (
+        result = await run_query(
             client.table("user_preferences_weights")
             .select("user_id, vibe_weights, interest_weights, type_weights, love_language_weights, feedback_count")
             .eq("user_id", user_id)
             .limit(1)
-            .execute()
         )
 
         if not result.data:
             logger.debug("No learned weights found for user %s", user_id[:8])
+            cache_learned_weights(user_id, None, version)
             return None
 
         row = result.data[0]
@@ -266,6 +435,7 @@ async def load_learned_weights(user_id: str) -> Optional[UserPreferencesWeights]
             "Loaded learned weights for user %s (feedback_count=%d)",
             user_id[:8], weights.feedback_count,
         )
+        cache_learned_weights(user_id, weights, version)
         return weights
 
     except Exception as exc:
@@ -275,3 +445,50 @@ async def load_learned_weights(user_id: str) -> Optional[UserPreferencesWeights]
             user_id[:8], exc,
         )
         return None
+
+
+# ===================================================================
+# Concurrent Context Loading
+# ===================================================================
+
+async def load_concurrently(
+    loads: dict[str, Awaitable[Any]],
+    fallbacks: Optional[dict[str, Any]] = None,
+) -> dict[str, Any]:
+    """
+    Await independent context loads concurrently, isolating failures.
+
+    Once the vault ID is known, the remaining per-request loads (milestone,
+    learned weights, exclusion history, ...) don't depend on each other, so
+    they run as one round of concurrent queries instead of a chain.
+
+    Args:
+        loads: Awaitables keyed by name.
+        fallbacks: Values for optional loads. If an optional load raises,
+                   the error is logged and its fallback is used instead. A
+                   load without a fallback is required: its exception is
+                   re-raised, but only after every other load has finished.
+
+    Returns:
+        Results keyed by the same names as `loads`.
+    """
+    fallbacks = fallbacks or {}
+    names = list(loads)
+    results = await asyncio.gather(*loads.values(), return_exceptions=True)
+
+    loaded: dict[str, Any] = {}
+    failure: Optional[BaseException] = None
+    for name, result in zip(names, results):
+        if not isinstance(result, BaseException):
+            loaded[name] = result
+        elif name in fallbacks and isinstance(result, Exception):
+            logger.warning(
+                "Context load '%s' failed: %s — using fallback", name, result,
+            )
+            loaded[name] = fallbacks[name]
+        elif failure is None:
+            failure = result
+
+    if failure is not None:
+        raise failure
+    return loaded
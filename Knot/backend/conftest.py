@@ -34,6 +34,7 @@ Run the live integration suite:  pytest --integration   (or KNOT_RUN_INTEGRATION
 """
 
 import os
+from unittest.mock import AsyncMock, patch
 
 import pytest
 
@@ -82,3 +83,95 @@ def pytest_collection_modifyitems(config, items):
             item.add_marker(pytest.mark.integration)
             if not enabled:
                 item.add_marker(skip_integration)
+
+
+@pytest.fixture(autouse=True)
+def _reset_in_process_caches():
+    """Start every test with empty in-process caches so a vault, vault_id,
+    embedding, hint index, Brave search or merchant page cached from one
+    test's mocks never leaks into the next, and Brave rate-limit state and
+    pipeline and Prometheus metrics start fresh."""
+    from app.core.metrics import _reset_metrics
+    from app.core.pipeline_metrics import _reset_pipeline_metrics
+    from app.services.brave_cache import _reset_brave_cache
+    from app.services.brave_limiter import _reset_brave_limiter
+    from app.services.embedding import _reset_embedding_cache
+    from app.services.hint_index import _reset_hint_index_cache
+    from app.services.page_cache import _reset_page_cache
+    from app.services.vault_cache import _reset_vault_caches
+
+    _reset_vault_caches()
+    _reset_embedding_cache()
+    _reset_hint_index_cache()
+    _reset_brave_cache()
+    _reset_brave_limiter()
+    _reset_page_cache()
+    _reset_pipeline_metrics()
+    _reset_metrics()
+    yield
+    _reset_vault_caches()
+    _reset_embedding_cache()
+    _reset_hint_index_cache()
+    _reset_brave_cache()
+    _reset_brave_limiter()
+    _reset_page_cache()
+    _reset_pipeline_metrics()
+    _reset_metrics()
+
+
+# ======================================================================
+# Recommendation-pipeline fixtures, shared by the pipeline and streaming
+# endpoint tests
+# ======================================================================
+
+@pytest.fixture
+def mock_embedding():
+    """Mock Vertex AI embedding to return None (forces chronological fallback)."""
+    with patch(
+        "app.agents.hint_retrieval.generate_embedding",
+        new_callable=AsyncMock,
+        return_value=None,
+    ) as m:
+        yield m
+
+
+@pytest.fixture
+def mock_hint_db():
+    """Mock Supabase hint queries to return empty results."""
+    mock_client = AsyncMock()
+    mock_response = AsyncMock()
+    mock_response.data = []
+
+    mock_table = AsyncMock()
+    mock_table.select.return_value = mock_table
+    mock_table.eq.return_value = mock_table
+    mock_table.order.return_value = mock_table
+    mock_table.limit.return_value = mock_table
+    mock_table.execute.return_value = mock_response
+
+    mock_client.table.return_value = mock_table
+
+    with patch(
+        "app.agents.hint_retrieval.get_service_client",
+        return_value=mock_client,
+    ):
+        yield mock_client
+
+
+@pytest.fixture
+def mock_url_check():
+    """
+    Make URL resolution + availability succeed without real HTTP: every purchasable
+    resolves to a dummy real page and every page fetch reports available. This keeps
+    purchasables on the happy path (no swap), so the graph tests exercise wiring.
+    """
+    with patch(
+        "app.agents.url_resolution._search_for_purchase_url",
+        new_callable=AsyncMock,
+        return_value="https://merchant.example.com/product/123",
+    ), patch(
+        "app.agents.availability._fetch_page",
+        new_callable=AsyncMock,
+        return_value=(True, ""),
+    ) as fetch_m:
+        yield fetch_m
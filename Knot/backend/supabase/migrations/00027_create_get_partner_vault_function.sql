@@ -0,0 +1,98 @@
+-- ============================================================
+-- Migration 00027: Create get_partner_vault() RPC Function
+-- Single-round-trip vault loading for the recommendation pipeline
+-- ============================================================
+--
+-- app.services.vault_loader.load_vault_data used to issue five sequential
+-- PostgREST queries (partner_vaults, partner_interests, partner_vibes,
+-- partner_budgets, partner_love_languages) on every generate, refresh,
+-- notification-processing and background idea-generation run.
+--
+-- get_partner_vault(p_user_id) returns the user's vault row and all of
+-- its child rows as a single JSONB document:
+--
+--   {
+--     "vault":          { ...partner_vaults row... },
+--     "interests":      [{"interest_type": ..., "interest_category": ...}],
+--     "vibes":          [{"vibe_tag": ...}],
+--     "budgets":        [{"occasion_type": ..., "min_amount": ...,
+--                         "max_amount": ..., "currency": ...}],
+--     "love_languages": [{"language": ..., "priority": ...}]
+--   }
+--
+-- Returns NULL when the user has no vault. If a user somehow has multiple
+-- vault rows (e.g. from dev testing) the oldest one is returned, matching
+-- the previous ORDER BY created_at ASC LIMIT 1 query.
+--
+-- Prerequisites:
+--   - 00003 through 00008 (partner_vaults and its child tables)
+--
+-- Notes:
+--   - SECURITY INVOKER (the default): callers see only the rows RLS lets
+--     them see. The backend calls it with the service role.
+--   - The backend falls back to per-table queries if this function is
+--     missing, so deploying the code before the migration is safe.
+--
+-- Run this in the Supabase SQL Editor:
+--   Dashboard → SQL Editor → New Query → Paste & Run
+
+-- ============================================================
+-- 1. Create get_partner_vault function
+-- ============================================================
+CREATE OR REPLACE FUNCTION public.get_partner_vault(p_user_id UUID)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'vault', to_jsonb(v),
+        'interests', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                'interest_type', i.interest_type,
+                'interest_category', i.interest_category
+            ))
+            FROM public.partner_interests i
+            WHERE i.vault_id = v.id
+        ), '[]'::jsonb),
+        'vibes', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('vibe_tag', vb.vibe_tag))
+            FROM public.partner_vibes vb
+            WHERE vb.vault_id = v.id
+        ), '[]'::jsonb),
+        'budgets', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                'occasion_type', b.occasion_type,
+                'min_amount', b.min_amount,
+                'max_amount', b.max_amount,
+                'currency', b.currency
+            ))
+            FROM public.partner_budgets b
+            WHERE b.vault_id = v.id
+        ), '[]'::jsonb),
+        'love_languages', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                'language', ll.language,
+                'priority', ll.priority
+            ))
+            FROM public.partner_love_languages ll
+            WHERE ll.vault_id = v.id
+        ), '[]'::jsonb)
+    )
+    FROM public.partner_vaults v
+    WHERE v.user_id = p_user_id
+    ORDER BY v.created_at ASC
+    LIMIT 1;
+$$;
+
+COMMENT ON FUNCTION public.get_partner_vault IS 'Returns the user''s partner vault with interests, vibes, budgets and love languages as one JSONB document (NULL if no vault). Used by the recommendation pipeline to load a vault in a single round trip.';
+
+-- Backend-only: the service role calls it on behalf of users.
+REVOKE EXECUTE ON FUNCTION public.get_partner_vault(UUID) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.get_partner_vault(UUID) TO service_role;
+
+-- ============================================================
+-- 2. Verify migration
+-- ============================================================
+SELECT routine_name, data_type
+FROM information_schema.routines
+WHERE routine_schema = 'public' AND routine_name = 'get_partner_vault';
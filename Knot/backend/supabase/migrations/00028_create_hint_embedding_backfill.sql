@@ -0,0 +1,86 @@
+-- ============================================================
+-- Migration 00028: Hint Embedding Backfill Support
+-- Checkpoint table + bulk-update RPC for the NULL-embedding backfill job
+-- ============================================================
+--
+-- Hints are saved with hint_embedding = NULL when Vertex AI is unavailable
+-- (see app.services.embedding), which drops them from match_hints()
+-- semantic search. POST /api/v1/hints/backfill-embeddings
+-- (app.services.embedding_backfill) pages through those hints, embeds them
+-- and writes the vectors back.
+--
+-- This migration adds:
+--
+--   job_checkpoints — one row per resumable background job, holding the
+--     keyset cursor (last processed hint id) and running totals, so a
+--     crashed or timed-out run resumes where it left off.
+--
+--   backfill_hint_embeddings(p_rows JSONB) — writes a page of embeddings
+--     in one statement. p_rows is a JSON array of
+--       {"id": "<hint uuid>", "embedding": "[0.1,0.2,...]"}
+--     Only rows whose embedding is still NULL are updated; returns the
+--     number of rows updated.
+--
+-- Prerequisites:
+--   - 00009 (hints table, pgvector)
+--
+-- Notes:
+--   - Both objects are backend-only (service role). RLS is enabled on
+--     job_checkpoints with no policies, so only the service role sees it.
+--   - The backend falls back to per-row updates if the function is
+--     missing and runs without checkpoints if the table is missing, so
+--     deploying the code before the migration is safe.
+--
+-- Run this in the Supabase SQL Editor:
+--   Dashboard → SQL Editor → New Query → Paste & Run
+
+-- ============================================================
+-- 1. Create job_checkpoints table
+-- ============================================================
+CREATE TABLE IF NOT EXISTS public.job_checkpoints (
+    job_name    TEXT PRIMARY KEY,
+    cursor      TEXT,
+    processed   INTEGER NOT NULL DEFAULT 0,
+    failed      INTEGER NOT NULL DEFAULT 0,
+    updated_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+COMMENT ON TABLE public.job_checkpoints IS 'Progress of resumable background jobs (e.g. the hint embedding backfill). Backend-only.';
+COMMENT ON COLUMN public.job_checkpoints.cursor IS 'Keyset cursor of the last processed row; NULL starts from the beginning.';
+
+ALTER TABLE public.job_checkpoints ENABLE ROW LEVEL SECURITY;
+
+-- ============================================================
+-- 2. Create backfill_hint_embeddings function
+-- ============================================================
+CREATE OR REPLACE FUNCTION public.backfill_hint_embeddings(p_rows JSONB)
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    WITH updated AS (
+        UPDATE public.hints h
+        SET hint_embedding = (r->>'embedding')::vector(768)
+        FROM jsonb_array_elements(p_rows) AS r
+        WHERE h.id = (r->>'id')::uuid
+          AND h.hint_embedding IS NULL
+        RETURNING h.id
+    )
+    SELECT count(*)::integer FROM updated;
+$$;
+
+COMMENT ON FUNCTION public.backfill_hint_embeddings IS 'Bulk-writes hint embeddings for hints whose embedding is still NULL. Used by the embedding backfill job.';
+
+REVOKE EXECUTE ON FUNCTION public.backfill_hint_embeddings(JSONB) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.backfill_hint_embeddings(JSONB) TO service_role;
+
+-- ============================================================
+-- 3. Verify migration
+-- ============================================================
+SELECT routine_name, data_type
+FROM information_schema.routines
+WHERE routine_schema = 'public' AND routine_name = 'backfill_hint_embeddings';
+
+SELECT column_name, data_type
+FROM information_schema.columns
+WHERE table_schema = 'public' AND table_name = 'job_checkpoints'
+ORDER BY ordinal_position;
@@ -487,7 +487,7 @@ class TestSendPushNotification:
         mock_client.__aenter__ = AsyncMock(return_value=mock_client)
         mock_client.__aexit__ = AsyncMock(return_value=False)
 
-        with patch("app.services.apns.httpx.AsyncClient", return_value=mock_client):
+        with patch("app.core.http_clients.httpx.AsyncClient", return_value=mock_client):
             result = await send_push_notification(
                 "abc123device", {"aps": {"alert": "test"}}
             )
@@ -514,7 +514,7 @@ class TestSendPushNotification:
         mock_client.__aenter__ = AsyncMock(return_value=mock_client)
         mock_client.__aexit__ = AsyncMock(return_value=False)
 
-        with patch("app.services.apns.httpx.AsyncClient", return_value=mock_client):
+        with patch("app.core.http_clients.httpx.AsyncClient", return_value=mock_client):
             result = await send_push_notification(
                 "abc123device", {"aps": {"alert": "test"}}
             )
@@ -540,7 +540,7 @@ class TestSendPushNotification:
         mock_client.__aenter__ = AsyncMock(return_value=mock_client)
         mock_client.__aexit__ = AsyncMock(return_value=False)
 
-        with patch("app.services.apns.httpx.AsyncClient", return_value=mock_client):
+        with patch("app.core.http_clients.httpx.AsyncClient", return_value=mock_client):
             await send_push_notification("abc123", {"aps": {}})
 
         call_args = mock_client.post.call_args
@@ -566,7 +566,7 @@ class TestSendPushNotification:
         mock_client.__aenter__ = AsyncMock(return_value=mock_client)
         mock_client.__aexit__ = AsyncMock(return_value=False)
 
-        with patch("app.services.apns.httpx.AsyncClient", return_value=mock_client):
+        with patch("app.core.http_clients.httpx.AsyncClient", return_value=mock_client):
             await send_push_notification("abc123", {"aps": {}})
 
         call_args = mock_client.post.call_args
@@ -593,7 +593,7 @@ class TestSendPushNotification:
         mock_client.__aenter__ = AsyncMock(return_value=mock_client)
         mock_client.__aexit__ = AsyncMock(return_value=False)
 
-        with patch("app.services.apns.httpx.AsyncClient", return_value=mock_client):
+        with patch("app.core.http_clients.httpx.AsyncClient", return_value=mock_client):
             result = await send_push_notification("bad-token", {"aps": {}})
 
         assert result["success"] is False
@@ -620,7 +620,7 @@ class TestSendPushNotification:
         mock_client.__aenter__ = AsyncMock(return_value=mock_client)
         mock_client.__aexit__ = AsyncMock(return_value=False)
 
-        with patch("app.services.apns.httpx.AsyncClient", return_value=mock_client):
+        with patch("app.core.http_clients.httpx.AsyncClient", return_value=mock_client):
             result = await send_push_notification("device123", {"aps": {}})
 
         assert result["success"] is False
@@ -647,7 +647,7 @@ class TestSendPushNotification:
         mock_client.__aenter__ = AsyncMock(return_value=mock_client)
         mock_client.__aexit__ = AsyncMock(return_value=False)
 
-        with patch("app.services.apns.httpx.AsyncClient", return_value=mock_client):
+        with patch("app.core.http_clients.httpx.AsyncClient", return_value=mock_client):
             result = await send_push_notification("old-token", {"aps": {}})
 
         assert result["success"] is False
@@ -674,10 +674,11 @@ class TestSendPushNotification:
         mock_client.__aexit__ = AsyncMock(return_value=False)
 
         mock_constructor = MagicMock(return_value=mock_client)
-        with patch("app.services.apns.httpx.AsyncClient", mock_constructor):
+        with patch("app.core.http_clients.httpx.AsyncClient", mock_constructor):
             await send_push_notification("abc123", {"aps": {}})
 
-        mock_constructor.assert_called_once_with(http2=True)
+        mock_constructor.assert_called_once()
+        assert mock_constructor.call_args.kwargs["http2"] is True
 
     @pytest.mark.asyncio
     @patch("app.services.apns.APNS_KEY_ID", "KEY123")
@@ -698,7 +699,7 @@ class TestSendPushNotification:
         mock_client.__aenter__ = AsyncMock(return_value=mock_client)
         mock_client.__aexit__ = AsyncMock(return_value=False)
 
-        with patch("app.services.apns.httpx.AsyncClient", return_value=mock_client):
+        with patch("app.core.http_clients.httpx.AsyncClient", return_value=mock_client):
             await send_push_notification("abc123", {"aps": {}})
 
         call_kwargs = mock_client.post.call_args[1]
@@ -724,7 +725,7 @@ class TestSendPushNotification:
         mock_client.__aenter__ = AsyncMock(return_value=mock_client)
         mock_client.__aexit__ = AsyncMock(return_value=False)
 
-        with patch("app.services.apns.httpx.AsyncClient", return_value=mock_client):
+        with patch("app.core.http_clients.httpx.AsyncClient", return_value=mock_client):
             await send_push_notification("abc123", {"aps": {}})
 
         call_kwargs = mock_client.post.call_args[1]
@@ -3,7 +3,8 @@ Step 5.7 / 14.1 Verification: Availability Verification & Price Enrichment Node
 
 Tests that the verify_availability LangGraph node:
 1. Verifies URLs of the 3 selected recommendations via HTTP GET (with page content)
-2. Replaces unavailable recommendations with next-best candidates from the pool
+2. Replaces unavailable recommendations with next-best candidates from the pool,
+   except while Brave is throttling lookups
 3. Verifies prices from page content via Claude extraction
 4. Handles edge cases (all unavailable, empty input, Claude failures)
 5. Returns result compatible with RecommendationState update
@@ -24,12 +25,14 @@ Prerequisites:
 Run with: pytest tests/test_availability_node.py -v
 """
 
+import asyncio
 import json
 import uuid
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import httpx
 
+from app.agents.budget import BRAVE_THROTTLED
 from app.agents.state import (
     BudgetRange,
     CandidateRecommendation,
@@ -47,6 +50,7 @@ from app.agents.availability import (
     _verify_prices_with_claude,
     verify_availability,
 )
+from app.services.brave_limiter import BraveThrottled
 
 
 # ======================================================================
@@ -160,15 +164,18 @@ def _make_candidate(
 class TestFetchPage:
     """Verify _fetch_page returns availability and page content."""
 
+    @staticmethod
+    def _client(handler) -> httpx.AsyncClient:
+        """An httpx client whose requests are answered by `handler`."""
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
     async def test_200_html_returns_content(self):
         """A 200 OK with HTML content returns (True, extracted_text)."""
-        response = AsyncMock()
-        response.status_code = 200
-        response.headers = {"content-type": "text/html; charset=utf-8"}
-        response.text = "<html><title>Test Product</title><body><p>$49.99</p></body></html>"
-
-        client = AsyncMock(spec=httpx.AsyncClient)
-        client.get = AsyncMock(return_value=response)
+        client = self._client(lambda request: httpx.Response(
+            200,
+            headers={"content-type": "text/html; charset=utf-8"},
+            text="<html><title>Test Product</title><body><p>$49.99</p></body></html>",
+        ))
 
         is_available, content = await _fetch_page("https://example.com/product", client)
         assert is_available is True
@@ -177,13 +184,9 @@ class TestFetchPage:
 
     async def test_200_non_html_returns_empty_content(self):
         """A 200 OK with non-HTML content returns (True, '')."""
-        response = AsyncMock()
-        response.status_code = 200
-        response.headers = {"content-type": "application/pdf"}
-        response.text = "%PDF-1.4"
-
-        client = AsyncMock(spec=httpx.AsyncClient)
-        client.get = AsyncMock(return_value=response)
+        client = self._client(lambda request: httpx.Response(
+            200, headers={"content-type": "application/pdf"}, content=b"%PDF-1.4",
+        ))
 
         is_available, content = await _fetch_page("https://example.com/file.pdf", client)
         assert is_available is True
@@ -191,12 +194,9 @@ class TestFetchPage:
 
     async def test_404_returns_false(self):
         """A 404 returns (False, '')."""
-        response = AsyncMock()
-        response.status_code = 404
-        response.headers = {"content-type": "text/html"}
-
-        client = AsyncMock(spec=httpx.AsyncClient)
-        client.get = AsyncMock(return_value=response)
+        client = self._client(lambda request: httpx.Response(
+            404, headers={"content-type": "text/html"},
+        ))
 
         is_available, content = await _fetch_page("https://example.com/gone", client)
         assert is_available is False
@@ -204,10 +204,12 @@ class TestFetchPage:
 
     async def test_timeout_returns_false(self):
         """A timeout returns (False, '')."""
-        client = AsyncMock(spec=httpx.AsyncClient)
-        client.get = AsyncMock(side_effect=httpx.TimeoutException("timed out"))
+        def _timeout(request):
+            raise httpx.TimeoutException("timed out")
 
-        is_available, content = await _fetch_page("https://example.com/slow", client)
+        is_available, content = await _fetch_page(
+            "https://example.com/slow", self._client(_timeout),
+        )
         assert is_available is False
         assert content == ""
 
@@ -318,7 +320,7 @@ class TestVerifyPricesWithClaude:
 
         with patch("app.core.config.is_claude_search_configured", return_value=True), \
              patch("app.core.config.ANTHROPIC_API_KEY", "test-key"), \
-             patch("anthropic.AsyncAnthropic", return_value=mock_client):
+             patch("app.agents.availability.get_claude_client", return_value=mock_client):
             results = await _verify_prices_with_claude([(c1, "Page with $49.99")])
 
         assert "id-1" in results
@@ -343,7 +345,7 @@ class TestVerifyPricesWithClaude:
 
         with patch("app.core.config.is_claude_search_configured", return_value=True), \
              patch("app.core.config.ANTHROPIC_API_KEY", "test-key"), \
-             patch("anthropic.AsyncAnthropic", return_value=mock_client):
+             patch("app.agents.availability.get_claude_client", return_value=mock_client):
             results = await _verify_prices_with_claude([(c1, "Page content")])
 
         assert results == {}
@@ -360,7 +362,7 @@ class TestVerifyPricesWithClaude:
 
         with patch("app.core.config.is_claude_search_configured", return_value=True), \
              patch("app.core.config.ANTHROPIC_API_KEY", "test-key"), \
-             patch("anthropic.AsyncAnthropic", return_value=mock_client):
+             patch("app.agents.availability.get_claude_client", return_value=mock_client):
             results = await _verify_prices_with_claude([(c1, "Page content")])
 
         assert results == {}
@@ -384,7 +386,7 @@ class TestVerifyPricesWithClaude:
 
         with patch("app.core.config.is_claude_search_configured", return_value=True), \
              patch("app.core.config.ANTHROPIC_API_KEY", "test-key"), \
-             patch("anthropic.AsyncAnthropic", return_value=mock_client):
+             patch("app.agents.availability.get_claude_client", return_value=mock_client):
             results = await _verify_prices_with_claude([(c1, "Page content")])
 
         assert "id-1" in results
@@ -409,7 +411,7 @@ class TestVerifyPricesWithClaude:
 
         with patch("app.core.config.is_claude_search_configured", return_value=True), \
              patch("app.core.config.ANTHROPIC_API_KEY", "test-key"), \
-             patch("anthropic.AsyncAnthropic", return_value=mock_client):
+             patch("app.agents.availability.get_claude_client", return_value=mock_client):
             results = await _verify_prices_with_claude([
                 (c1, "Page 1"), (c2, "Page 2"), (c3, "Page 3"),
             ])
@@ -747,6 +749,85 @@ class TestVerifyAvailability:
         assert kept.is_idea is True
         assert mock_resolve.call_count == MAX_REPLACEMENT_ATTEMPTS
 
+    async def test_throttled_slot_kept_without_swaps(self):
+        """
+        A card URL resolution left unresolved because Brave was throttling is
+        kept (as a linkless idea card), not swapped: a throttled search says
+        nothing about whether it is bookable, and swaps would hit the same limit.
+        """
+        original = _make_candidate(
+            title="Throttled A", candidate_id="a", final_score=5.0,
+        ).model_copy(update={"external_url": None})
+        backup = _make_candidate(title="Backup B", candidate_id="b", final_score=4.0)
+        idea = _make_candidate(
+            title="Spare Idea", candidate_id="idea-z", rec_type="idea",
+            final_score=3.0, is_idea=True,
+        ).model_copy(update={"external_url": None})
+        state = _make_state(
+            final_three=[original], filtered=[original, backup, idea],
+        ).model_copy(update={"url_throttled_ids": ["a"]})
+
+        mock_resolve = AsyncMock(return_value=None)
+        with patch("app.agents.availability._fetch_page", new_callable=AsyncMock) as mock_fetch, \
+             patch("app.agents.availability._resolve_and_verify", mock_resolve):
+            result = await verify_availability(state)
+
+        kept = result["final_three"][0]
+        assert kept.id == "a"
+        assert kept.is_idea is True
+        assert kept.external_url is None
+        mock_fetch.assert_not_called()
+        mock_resolve.assert_not_called()
+
+    async def test_throttled_backup_lookup_stops_swaps(self):
+        """Once Brave throttles a backup lookup, later slots don't search."""
+        selected = [
+            _make_candidate(title="Dead A", candidate_id="a", final_score=5.0),
+            _make_candidate(title="Dead B", candidate_id="b", final_score=4.5),
+        ]
+        backups = [
+            _make_candidate(title=f"Backup {i}", candidate_id=f"backup-{i}", final_score=4.0 - i)
+            for i in range(4)
+        ]
+        state = _make_state(final_three=selected, filtered=selected + backups)
+
+        mock_resolve = AsyncMock(side_effect=BraveThrottled("429"))
+        with patch("app.agents.availability.AVAILABILITY_SPECULATIVE_SWAPS", False), \
+             patch("app.agents.availability._fetch_page", new_callable=AsyncMock) as mock_fetch, \
+             patch("app.agents.availability._resolve_and_verify", mock_resolve):
+            mock_fetch.return_value = (False, "")
+            result = await verify_availability(state)
+
+        assert len(result["final_three"]) == 2
+        assert mock_resolve.call_count == 1
+        assert result["degradations"] == [BRAVE_THROTTLED]
+
+    async def test_throttled_speculative_lookup_starts_no_more(self):
+        selected = [
+            _make_candidate(title="Dead A", candidate_id="a", final_score=5.0),
+            _make_candidate(title="Dead B", candidate_id="b", final_score=4.5),
+        ]
+        backups = [
+            _make_candidate(title=f"Backup {i}", candidate_id=f"backup-{i}", final_score=4.0 - i)
+            for i in range(2 * MAX_REPLACEMENT_ATTEMPTS)
+        ]
+        state = _make_state(final_three=selected, filtered=selected + backups)
+
+        async def mock_fetch(url, client):
+            if url.endswith("/b"):
+                await asyncio.sleep(0.05)  # slot B fails after A's spares throttled
+            return (False, "")
+
+        mock_resolve = AsyncMock(side_effect=BraveThrottled("429"))
+        with patch("app.agents.availability.AVAILABILITY_SPECULATIVE_SWAPS", True), \
+             patch("app.agents.availability._fetch_page", side_effect=mock_fetch), \
+             patch("app.agents.availability._resolve_and_verify", mock_resolve):
+            result = await verify_availability(state)
+
+        assert len(result["final_three"]) == 2
+        assert mock_resolve.call_count == MAX_REPLACEMENT_ATTEMPTS
+        assert result["degradations"] == [BRAVE_THROTTLED]
+
     async def test_backup_url_resolved_before_swap(self):
         """
         Backups from the pool are NOT pre-resolved, so a swap must resolve the
@@ -0,0 +1,291 @@
+"""
+Tests for the Brave Search result cache (app.services.brave_cache).
+
+Covers:
+1. Memory tier — repeat and near-identical queries skip Brave, negative
+   entries, failures (429, timeouts) not cached, separate TTLs, search
+   language in the key
+2. Disk tier — positive and negative hits survive a restart (memory
+   reset), expired rows ignored, unusable path degrades to memory-only
+3. Stats — lookup outcomes and per-tier counters
+4. Benchmark — repeated queries vs. a Brave stub with fixed latency
+
+Brave is replaced with a fake httpx client; the disk tier uses tmp_path.
+
+Run with: pytest tests/test_brave_cache.py -v
+"""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.agents.url_resolution import _search_for_purchase_url
+from app.services import brave_cache
+from app.services.brave_cache import (
+    _reset_brave_cache,
+    get_brave_cache_stats,
+    get_cached_search_result,
+    normalize_search_query,
+)
+from app.services.brave_limiter import BraveThrottled
+from app.services.lru_cache import MISS
+
+TICKET_URL = "https://www.ticketmaster.com/event/the-fonda-123"
+
+
+class _FakeResponse:
+    def __init__(self, results: list[dict], status_code: int = 200):
+        self.status_code = status_code
+        self.headers = {"Retry-After": "0"} if status_code == 429 else {}
+        self._data = {"web": {"results": results}}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise httpx.HTTPStatusError(
+                "error", request=httpx.Request("GET", "https://brave"), response=None,
+            )
+
+    def json(self):
+        return self._data
+
+
+class _FakeBrave:
+    """Stands in for httpx.AsyncClient; counts searches by query."""
+
+    def __init__(self, results=None, status_code=200, error=None, latency=0.0):
+        self.results = [{"url": TICKET_URL}] if results is None else results
+        self.status_code = status_code
+        self.error = error
+        self.latency = latency
+        self.queries: list[str] = []
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def get(self, url, headers=None, params=None):
+        self.queries.append(params["q"])
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.error is not None:
+            raise self.error
+        return _FakeResponse(self.results, self.status_code)
+
+
+@pytest.fixture
+def brave():
+    """Configure Brave and route its client to a _FakeBrave."""
+    fake = _FakeBrave()
+    with patch("app.agents.url_resolution.is_brave_search_configured", return_value=True), \
+         patch("app.agents.url_resolution.httpx.AsyncClient", fake):
+        yield fake
+
+
+@pytest.fixture
+def disk_path(tmp_path):
+    path = str(tmp_path / "cache" / "brave.sqlite3")
+    with patch("app.services.brave_cache.BRAVE_CACHE_PATH", path):
+        _reset_brave_cache()
+        yield path
+    _reset_brave_cache()
+
+
+# ===================================================================
+# 1. Memory tier
+# ===================================================================
+
+class TestMemoryTier:
+    """Repeat searches are served without calling Brave."""
+
+    async def test_repeat_query_skips_brave(self, brave):
+        first = await _search_for_purchase_url("the fonda theatre tickets")
+        second = await _search_for_purchase_url("the fonda theatre tickets")
+
+        assert first == second == TICKET_URL
+        assert len(brave.queries) == 1
+
+    async def test_near_identical_queries_share_entry(self, brave):
+        await _search_for_purchase_url("The Fonda  Theatre tickets ")
+        await _search_for_purchase_url("the fonda theatre TICKETS")
+        assert len(brave.queries) == 1
+
+        await _search_for_purchase_url("the fonda theatre tickets los angeles")
+        assert len(brave.queries) == 2
+
+    def test_normalization_form(self):
+        assert normalize_search_query("  Café\tAu  LAIT ") == "café au lait"
+
+    async def test_no_usable_result_cached_as_negative(self, brave):
+        brave.results = [{"url": "https://www.google.com/search?q=x"}]
+
+        assert await _search_for_purchase_url("pastry class") is None
+        assert await _search_for_purchase_url("pastry class") is None
+
+        assert len(brave.queries) == 1
+        assert get_brave_cache_stats()["negative_hits"] == 1
+
+    async def test_negative_entries_expire_sooner(self, brave):
+        brave.results = []
+        await _search_for_purchase_url("pastry class")
+        await _search_for_purchase_url("fonda tickets")
+
+        with patch.object(brave_cache._negative_cache, "ttl", 0):
+            await _search_for_purchase_url("pastry class")
+        assert len(brave.queries) == 3
+
+        brave.results = [{"url": TICKET_URL}]
+        await _search_for_purchase_url("the fonda")
+        with patch.object(brave_cache._negative_cache, "ttl", 0):
+            await _search_for_purchase_url("the fonda")  # positive: still cached
+        assert len(brave.queries) == 4
+
+    async def test_rate_limit_not_cached(self, brave):
+        brave.status_code = 429
+        with pytest.raises(BraveThrottled):
+            await _search_for_purchase_url("the fonda")
+
+        brave.status_code = 200
+        assert await _search_for_purchase_url("the fonda") == TICKET_URL
+        assert len(brave.queries) == 3  # the limiter retried the 429 once
+
+    @pytest.mark.parametrize("error", [
+        httpx.ReadTimeout("timed out"),
+        httpx.ConnectError("refused"),
+    ])
+    async def test_failures_not_cached(self, brave, error):
+        brave.error = error
+        assert await _search_for_purchase_url("the fonda") is None
+
+        brave.error = None
+        assert await _search_for_purchase_url("the fonda") == TICKET_URL
+        assert len(brave.queries) == 2
+
+    async def test_search_language_in_key(self, brave):
+        await _search_for_purchase_url("the fonda")
+        assert await get_cached_search_result("the fonda", "en") == TICKET_URL
+        assert await get_cached_search_result("the fonda", "fr") is MISS
+
+    async def test_unconfigured_brave_bypasses_cache(self, brave):
+        await _search_for_purchase_url("the fonda")
+        with patch(
+            "app.agents.url_resolution.is_brave_search_configured", return_value=False,
+        ):
+            assert await _search_for_purchase_url("the fonda") is None
+
+
+# ===================================================================
+# 2. Disk tier
+# ===================================================================
+
+class TestDiskTier:
+    """Cached searches survive a restart when BRAVE_CACHE_PATH is set."""
+
+    async def test_positive_hit_survives_restart(self, brave, disk_path):
+        await _search_for_purchase_url("the fonda")
+
+        _reset_brave_cache()  # new process: memory gone, disk kept
+        assert await _search_for_purchase_url("the fonda") == TICKET_URL
+
+        assert len(brave.queries) == 1
+        assert get_brave_cache_stats()["disk"]["hits"] == 1
+
+    async def test_negative_hit_survives_restart(self, brave, disk_path):
+        brave.results = []
+        await _search_for_purchase_url("pastry class")
+
+        _reset_brave_cache()
+        assert await _search_for_purchase_url("pastry class") is None
+        assert await _search_for_purchase_url("pastry class") is None  # promoted
+
+        assert len(brave.queries) == 1
+        stats = get_brave_cache_stats()
+        assert stats["negative_hits"] == 2
+        assert stats["disk"]["hits"] == 1
+
+    async def test_expired_rows_ignored(self, brave, disk_path):
+        brave.results = []
+        with patch("app.services.brave_cache.BRAVE_CACHE_NEGATIVE_TTL", -1):
+            await _search_for_purchase_url("pastry class")
+        _reset_brave_cache()
+        await _search_for_purchase_url("pastry class")
+
+        assert len(brave.queries) == 2
+
+    async def test_unusable_path_degrades_to_memory(self, brave, tmp_path):
+        blocker = tmp_path / "not-a-dir"
+        blocker.write_text("")
+        with patch("app.services.brave_cache.BRAVE_CACHE_PATH", str(blocker / "db.sqlite3")):
+            _reset_brave_cache()
+            assert await _search_for_purchase_url("the fonda") == TICKET_URL
+            assert await _search_for_purchase_url("the fonda") == TICKET_URL
+            stats = get_brave_cache_stats()
+            _reset_brave_cache()
+
+        assert len(brave.queries) == 1
+        assert stats["hits"] == 1
+        assert stats["disk"]["errors"] >= 1
+
+
+# ===================================================================
+# 3. Stats
+# ===================================================================
+
+class TestCacheStats:
+    """Lookup outcomes and per-tier counters for sizing the cache."""
+
+    async def test_hit_rate(self, brave):
+        for _ in range(3):
+            await _search_for_purchase_url("the fonda")
+        brave.results = []
+        for _ in range(2):
+            await _search_for_purchase_url("pastry class")
+
+        stats = get_brave_cache_stats()
+        assert (stats["hits"], stats["negative_hits"], stats["misses"]) == (2, 1, 2)
+        assert stats["hit_rate"] == 0.6
+        assert stats["memory"]["positive"]["size"] == 1
+        assert stats["memory"]["negative"]["size"] == 1
+        assert stats["disk"] is None
+
+
+# ===================================================================
+# 4. Benchmark: cached vs. uncached searches
+# ===================================================================
+
+class TestBraveCacheBenchmark:
+    async def test_repeated_queries_faster_than_brave(self, brave):
+        """
+        30 searches over 5 distinct queries, as a run with swaps produces,
+        against a stub with 20ms per call — well under a real Brave round
+        trip, so the speedup is a lower bound.
+        """
+        brave.latency = 0.02
+        queries = [f"concert tickets venue {i % 5}" for i in range(30)]
+
+        start = time.perf_counter()
+        for query in queries:
+            await _search_for_purchase_url(query)
+        cached_s = time.perf_counter() - start
+        cached_calls = len(brave.queries)
+
+        brave.queries.clear()
+        start = time.perf_counter()
+        for query in queries:
+            _reset_brave_cache()
+            await _search_for_purchase_url(query)
+        uncached_s = time.perf_counter() - start
+
+        print(f"  cached={cached_s * 1000:.0f}ms ({cached_calls} calls), "
+              f"uncached={uncached_s * 1000:.0f}ms ({len(brave.queries)} calls), "
+              f"{uncached_s / cached_s:.1f}x")
+        assert cached_calls == 5
+        assert len(brave.queries) == 30
+        assert cached_s < uncached_s / 2
@@ -0,0 +1,361 @@
+"""
+Tests for the process-wide Brave rate limiter (app.services.brave_limiter).
+
+Covers:
+1. Token bucket — bursts up to capacity then the refill rate, FIFO
+   order, queue timeouts
+2. Backoff — Retry-After (seconds and HTTP-date) pauses every caller,
+   exponential backoff without it, rate halved on 429 and recovered on
+   success, one retry within the queue timeout
+3. Callers — URL resolution and the Claude search service share one
+   bucket; a queue timeout reads as a failed (uncached) search
+4. Simulated rate-limited server — concurrent searches from both callers
+   against a stub enforcing its own limit
+
+Brave is replaced with stub httpx clients; no network access.
+
+Run with: pytest tests/test_brave_limiter.py -v
+"""
+
+import asyncio
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.agents.url_resolution import _search_for_purchase_url
+from app.services import brave_limiter
+from app.services.brave_cache import get_cached_search_result
+from app.services.brave_limiter import (
+    AdaptiveTokenBucket,
+    BraveQueueTimeout,
+    BraveThrottled,
+    _parse_retry_after,
+    brave_get,
+    get_brave_limiter_stats,
+)
+from app.services.integrations.claude_search_service import _brave_search
+from app.services.lru_cache import MISS
+
+TICKET_URL = "https://www.ticketmaster.com/event/the-fonda-123"
+
+
+class _Response:
+    def __init__(self, status_code: int = 200, retry_after: str | None = None):
+        self.status_code = status_code
+        self.headers = {"Retry-After": retry_after} if retry_after is not None else {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise httpx.HTTPStatusError(
+                "error", request=httpx.Request("GET", "https://brave"), response=None,
+            )
+
+    def json(self):
+        return {"web": {"results": [{"url": TICKET_URL, "title": "Tickets"}]}}
+
+
+class _ScriptedClient:
+    """Returns scripted responses in order (then 200s), recording call times."""
+
+    def __init__(self, *responses: _Response):
+        self.responses = list(responses)
+        self.calls: list[float] = []
+
+    async def get(self, url, **kwargs):
+        self.calls.append(time.monotonic())
+        return self.responses.pop(0) if self.responses else _Response()
+
+
+class _RateLimitedServer:
+    """
+    Stands in for httpx.AsyncClient in front of a Brave API that allows
+    `capacity` requests at once, refilled at `rate` per second, and
+    answers 429 + Retry-After beyond that.
+    """
+
+    def __init__(self, rate: float, capacity: int, retry_after: str = "0.2"):
+        self.rate = rate
+        self.capacity = capacity
+        self.retry_after = retry_after
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.ok = 0
+        self.rejected = 0
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def get(self, url, **kwargs):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        await asyncio.sleep(0.005)  # network round trip
+        if self.tokens < 1:
+            self.rejected += 1
+            return _Response(429, self.retry_after)
+        self.tokens -= 1
+        self.ok += 1
+        return _Response()
+
+
+@pytest.fixture
+def bucket():
+    """Install a fresh bucket with test-sized limits; yields a factory."""
+    patches = []
+
+    def _install(rate: float = 100.0, capacity: int = 5) -> AdaptiveTokenBucket:
+        new = AdaptiveTokenBucket(rate, capacity)
+        p = patch("app.services.brave_limiter._bucket", new)
+        p.start()
+        patches.append(p)
+        return new
+
+    yield _install
+    for p in patches:
+        p.stop()
+
+
+@pytest.fixture
+def brave_configured():
+    with patch("app.agents.url_resolution.is_brave_search_configured", return_value=True):
+        yield
+
+
+# ===================================================================
+# 1. Token bucket
+# ===================================================================
+
+class TestTokenBucket:
+    """Bursts up to capacity, then the refill rate; FIFO; bounded waits."""
+
+    async def test_burst_then_refill_rate(self, bucket):
+        b = bucket(rate=50.0, capacity=5)
+
+        start = time.monotonic()
+        for _ in range(15):
+            await b.acquire(timeout=5)
+        elapsed = time.monotonic() - start
+
+        # 5 immediate, 10 more at 50/s
+        assert 0.18 <= elapsed < 1.0
+        assert b.granted == 15
+
+    async def test_waiters_served_in_arrival_order(self, bucket):
+        b = bucket(rate=50.0, capacity=1)
+        order: list[int] = []
+
+        async def _take(i: int):
+            await b.acquire(timeout=5)
+            order.append(i)
+
+        await asyncio.gather(*(_take(i) for i in range(8)))
+        assert order == list(range(8))
+
+    async def test_queue_timeout_raises(self, bucket):
+        b = bucket(rate=2.0, capacity=1)
+        await b.acquire(timeout=1)
+
+        start = time.monotonic()
+        with pytest.raises(BraveQueueTimeout):
+            await b.acquire(timeout=0.1)  # next token in 0.5s
+        assert time.monotonic() - start < 0.1  # fails fast, doesn't sleep
+        assert b.timeouts == 1
+
+    async def test_queued_waiter_times_out(self, bucket):
+        b = bucket(rate=2.0, capacity=1)
+        await b.acquire(timeout=1)
+        holder = asyncio.create_task(b.acquire(timeout=5))  # holds the queue 0.5s
+        await asyncio.sleep(0)
+
+        with pytest.raises(BraveQueueTimeout):
+            await b.acquire(timeout=0.05)
+        await holder
+        assert b.waiting == 0
+
+
+# ===================================================================
+# 2. Backoff
+# ===================================================================
+
+class TestBackoff:
+    """A 429 pauses and slows every caller; successes recover the rate."""
+
+    @pytest.mark.parametrize("value,expected", [
+        ("2", 2.0), ("0.5", 0.5), (" 3 ", 3.0), ("-1", 0.0), (None, None), ("soon", None),
+    ])
+    def test_parse_retry_after_seconds(self, value, expected):
+        assert _parse_retry_after(value) == expected
+
+    def test_parse_retry_after_http_date(self):
+        when = datetime.now(timezone.utc) + timedelta(seconds=30)
+        assert 28 <= _parse_retry_after(format_datetime(when, usegmt=True)) <= 30
+
+    async def test_retry_after_honoured_and_retried(self, bucket):
+        b = bucket(rate=100.0, capacity=5)
+        client = _ScriptedClient(_Response(429, "0.2"))
+
+        response = await brave_get(client, "https://brave")
+
+        assert response.status_code == 200
+        assert len(client.calls) == 2
+        assert client.calls[1] - client.calls[0] >= 0.2
+        assert b.throttled == 1
+        assert get_brave_limiter_stats()["effective_rate_per_second"] < 100.0
+
+    async def test_pause_applies_to_every_caller(self, bucket):
+        bucket(rate=100.0, capacity=5)
+        throttled = _ScriptedClient(_Response(429, "0.2"))
+        other = _ScriptedClient()
+
+        first = asyncio.create_task(brave_get(throttled, "https://brave"))
+        await asyncio.sleep(0.01)  # first call has been answered with 429
+        start = time.monotonic()
+        await brave_get(other, "https://brave")
+
+        assert other.calls[0] - start >= 0.15
+        await first
+
+    async def test_backoff_without_retry_after_doubles(self, bucket):
+        b = bucket()
+        assert b.record_throttle(None) == 1.0
+        assert b.record_throttle(None) == 2.0
+        assert b.record_throttle(None) == 4.0
+        b.record_success()
+        assert b.record_throttle(None) == 1.0
+
+    async def test_rate_halves_and_recovers(self, bucket):
+        b = bucket(rate=100.0)
+        b.record_throttle(0)
+        b.record_throttle(0)
+        assert b.effective_rate == 25.0
+
+        for _ in range(30):
+            b.record_success()
+        assert b.effective_rate == 100.0
+
+        for _ in range(10):
+            b.record_throttle(0)
+        assert b.effective_rate == 100.0 * brave_limiter.MIN_RATE_FACTOR
+
+    async def test_gives_up_when_pause_exceeds_queue_timeout(self, bucket):
+        bucket()
+        client = _ScriptedClient(_Response(429, "10"))
+
+        start = time.monotonic()
+        response = await brave_get(client, "https://brave", queue_timeout=1.0)
+
+        assert response.status_code == 429
+        assert len(client.calls) == 1
+        assert time.monotonic() - start < 0.5
+
+    async def test_retries_once(self, bucket):
+        bucket()
+        client = _ScriptedClient(_Response(429, "0"), _Response(429, "0"), _Response())
+
+        response = await brave_get(client, "https://brave")
+
+        assert response.status_code == 429
+        assert len(client.calls) == 2
+
+
+# ===================================================================
+# 3. Callers
+# ===================================================================
+
+class TestCallers:
+    """Every Brave call site draws from the same bucket."""
+
+    async def test_url_resolution_and_claude_search_share_bucket(
+        self, bucket, brave_configured,
+    ):
+        b = bucket()
+        server = _RateLimitedServer(rate=1000.0, capacity=100)
+        with patch("app.agents.url_resolution.httpx.AsyncClient", server):
+            await _search_for_purchase_url("the fonda")
+            await _brave_search("ceramic ramen bowls")
+
+        assert b.granted == 2
+        assert server.ok == 2
+
+    async def test_queue_timeout_is_an_uncached_failure(self, bucket, brave_configured):
+        b = bucket(rate=1.0, capacity=1)
+        await b.acquire(timeout=1)
+        server = _RateLimitedServer(rate=1000.0, capacity=100)
+
+        with patch("app.agents.url_resolution.httpx.AsyncClient", server), \
+             patch("app.services.brave_limiter.BRAVE_QUEUE_TIMEOUT", 0.05):
+            with pytest.raises(BraveThrottled):
+                await _search_for_purchase_url("the fonda")
+            assert await _brave_search("ceramic ramen bowls") == []
+
+        assert server.ok == 0
+        assert await get_cached_search_result("the fonda", "en") is MISS
+        assert b.timeouts == 2
+
+
+# ===================================================================
+# 4. Simulated rate-limited server
+# ===================================================================
+
+class TestRateLimitedServer:
+    """
+    40 concurrent searches, split across both callers, against a stub that
+    allows a burst of 5 and 20 requests/second.
+    """
+
+    async def _burst(self, server) -> list:
+        with patch("app.agents.url_resolution.httpx.AsyncClient", server):
+            results = await asyncio.gather(
+                *(_search_for_purchase_url(f"venue tickets {i}") for i in range(20)),
+                *(_brave_search(f"gift idea {i}") for i in range(20)),
+                return_exceptions=True,
+            )
+        # URL resolution reports a throttled search as BraveThrottled
+        return [None if isinstance(r, BraveThrottled) else r for r in results]
+
+    async def test_sized_limiter_avoids_429s(self, bucket, brave_configured):
+        bucket(rate=18.0, capacity=5)
+        server = _RateLimitedServer(rate=20.0, capacity=5)
+
+        results = await self._burst(server)
+
+        assert server.rejected == 0
+        assert server.ok == 40
+        assert all(results[:20]) and all(results[20:])
+
+    async def test_oversized_limiter_adapts(self, bucket, brave_configured):
+        """Configured 5x above the server's limit: 429s slow every caller."""
+        b = bucket(rate=100.0, capacity=5)
+        server = _RateLimitedServer(rate=20.0, capacity=5, retry_after="0.1")
+
+        results = await self._burst(server)
+
+        succeeded = sum(1 for r in results if r)
+        print(f"  ok={server.ok} rejected={server.rejected} "
+              f"effective_rate={b.effective_rate:.1f}/s succeeded={succeeded}/40")
+        assert b.throttled >= 1
+        assert b.effective_rate < 100.0
+        # The rate limit is learnt: most searches still succeed
+        assert succeeded >= 30
+
+    async def test_without_limiter_many_429s(self, bucket, brave_configured):
+        """Baseline: an effectively unlimited bucket and no backoff."""
+        bucket(rate=1e9, capacity=1_000_000)
+        server = _RateLimitedServer(rate=20.0, capacity=5, retry_after="0")
+
+        with patch("app.services.brave_limiter.BRAVE_RATE_LIMIT_RETRIES", 0):
+            results = await self._burst(server)
+
+        print(f"  unlimited: ok={server.ok} rejected={server.rejected}")
+        assert server.rejected >= 30
+        assert sum(1 for r in results if r) <= 10
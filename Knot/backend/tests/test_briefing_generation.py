@@ -143,7 +143,7 @@ class TestGenerateMilestoneBriefing:
 
     @pytest.mark.asyncio
     @patch("app.services.briefing_generation.is_anthropic_configured", return_value=True)
-    @patch("app.services.briefing_generation.AsyncAnthropic")
+    @patch("app.services.briefing_generation.get_claude_client")
     async def test_successful_generation(self, mock_anthropic_cls, mock_config):
         mock_response = MagicMock()
         mock_response.content = [MagicMock(text=json.dumps({
@@ -170,7 +170,7 @@ class TestGenerateMilestoneBriefing:
 
     @pytest.mark.asyncio
     @patch("app.services.briefing_generation.is_anthropic_configured", return_value=True)
-    @patch("app.services.briefing_generation.AsyncAnthropic")
+    @patch("app.services.briefing_generation.get_claude_client")
     async def test_filters_invalid_hint_ids(self, mock_anthropic_cls, mock_config):
         mock_response = MagicMock()
         mock_response.content = [MagicMock(text=json.dumps({
@@ -195,7 +195,7 @@ class TestGenerateMilestoneBriefing:
 
     @pytest.mark.asyncio
     @patch("app.services.briefing_generation.is_anthropic_configured", return_value=True)
-    @patch("app.services.briefing_generation.AsyncAnthropic")
+    @patch("app.services.briefing_generation.get_claude_client")
     async def test_truncates_long_snippet(self, mock_anthropic_cls, mock_config):
         mock_response = MagicMock()
         mock_response.content = [MagicMock(text=json.dumps({
@@ -219,7 +219,7 @@ class TestGenerateMilestoneBriefing:
 
     @pytest.mark.asyncio
     @patch("app.services.briefing_generation.is_anthropic_configured", return_value=True)
-    @patch("app.services.briefing_generation.AsyncAnthropic")
+    @patch("app.services.briefing_generation.get_claude_client")
     async def test_handles_invalid_json(self, mock_anthropic_cls, mock_config):
         mock_response = MagicMock()
         mock_response.content = [MagicMock(text="not valid json at all")]
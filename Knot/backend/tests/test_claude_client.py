@@ -0,0 +1,283 @@
+"""
+Tests for the shared Claude client provider (app.services.claude_client).
+
+Covers:
+1. One process-wide AsyncAnthropic is reused by every call site
+2. The global in-flight limit (CLAUDE_MAX_CONCURRENCY)
+3. Per-call-site limits — background idea generation can't starve
+   interactive unified generation, and every non-interactive site
+   saturated at once still leaves interactive calls a reserved slot
+4. Background pipeline runs — inside background_claude_calls(), unified
+   generation is capped as notification_generation, leaving interactive
+   generation unblocked
+
+All tests run offline with a fake messages resource.
+
+Run with: pytest tests/test_claude_client.py -v
+"""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.services import claude_client
+from app.services.claude_client import (
+    ClaudeClient,
+    background_claude_calls,
+    get_claude_client,
+    get_claude_concurrency_stats,
+)
+
+
+class _FakeMessages:
+    """messages resource that sleeps and records peak concurrency."""
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.latency)
+            return {"model": kwargs.get("model")}
+        finally:
+            self.active -= 1
+
+
+class _FakeAnthropic:
+    def __init__(self, messages: _FakeMessages):
+        self.messages = messages
+
+
+@pytest.fixture
+def limits():
+    """Small limits: global 4 (1 reserved for interactive), interactive 4,
+    background ideas/notifications 1."""
+    with patch.object(claude_client, "CLAUDE_MAX_CONCURRENCY", 4), \
+         patch.object(claude_client, "INTERACTIVE_RESERVED_SLOTS", 1), \
+         patch.dict(claude_client.CALL_SITE_LIMITS, {
+             "unified_generation": 4,
+             "idea_generation": 1,
+             "notification_generation": 1,
+             "briefing": 2,
+         }):
+        claude_client._reset_claude_limiter()
+        yield
+    claude_client._reset_claude_limiter()
+
+
+# ===================================================================
+# 1. Shared client
+# ===================================================================
+
+class TestSharedClient:
+    """All call sites share one pooled AsyncAnthropic."""
+
+    async def test_same_underlying_client_for_every_call_site(self):
+        a = get_claude_client("unified_generation")
+        b = get_claude_client("briefing")
+        c = get_claude_client("unified_generation")
+
+        assert a.messages._messages is b.messages._messages
+        assert a.messages._messages is c.messages._messages
+        assert a.call_site == "unified_generation"
+        assert b.call_site == "briefing"
+
+    async def test_client_constructed_once(self):
+        with patch("app.services.claude_client.AsyncAnthropic") as mock_cls, \
+             patch.object(claude_client, "_client", None):
+            for _ in range(5):
+                get_claude_client("unified_generation")
+
+        assert mock_cls.call_count == 1
+        assert "http_client" in mock_cls.call_args.kwargs
+
+    async def test_close_resets_client(self):
+        get_claude_client("briefing")
+        await claude_client.close_claude_client()
+        assert claude_client._client is None
+
+
+# ===================================================================
+# 2. Global limit
+# ===================================================================
+
+class TestGlobalLimit:
+    """No more than CLAUDE_MAX_CONCURRENCY requests in flight."""
+
+    async def test_global_semaphore_caps_in_flight_requests(self, limits):
+        messages = _FakeMessages()
+        client = ClaudeClient(_FakeAnthropic(messages), "unified_generation")
+
+        await asyncio.gather(*(client.messages.create(model="m") for _ in range(12)))
+
+        assert messages.calls == 12
+        assert messages.peak == 4
+
+    async def test_in_flight_counter_returns_to_zero(self, limits):
+        messages = _FakeMessages(latency=0.01)
+        client = ClaudeClient(_FakeAnthropic(messages), "briefing")
+        await asyncio.gather(*(client.messages.create(model="m") for _ in range(3)))
+
+        stats = get_claude_concurrency_stats()
+        assert stats["in_flight"]["briefing"] == 0
+        assert stats["max_concurrency"] == 4
+
+    async def test_slot_released_on_error(self, limits):
+        class _Failing:
+            async def create(self, **kwargs):
+                raise RuntimeError("overloaded")
+
+        client = ClaudeClient(_FakeAnthropic(_Failing()), "idea_generation")
+        for _ in range(3):
+            with pytest.raises(RuntimeError):
+                await client.messages.create(model="m")
+
+        assert get_claude_concurrency_stats()["in_flight"]["idea_generation"] == 0
+
+
+# ===================================================================
+# 3. Per-call-site limits
+# ===================================================================
+
+class TestCallSiteLimits:
+    """Background call sites are capped below the global limit."""
+
+    async def test_background_site_capped(self, limits):
+        messages = _FakeMessages()
+        client = ClaudeClient(_FakeAnthropic(messages), "idea_generation")
+
+        await asyncio.gather(*(client.messages.create(model="m") for _ in range(4)))
+
+        assert messages.peak == 1
+
+    async def test_background_burst_does_not_starve_interactive(self, limits):
+        latency = 0.05
+        background = _FakeMessages(latency)
+        interactive = _FakeMessages(latency)
+        ideas = ClaudeClient(_FakeAnthropic(background), "idea_generation")
+        generate = ClaudeClient(_FakeAnthropic(interactive), "unified_generation")
+
+        # 20 queued background jobs would take 20 * latency serialized
+        burst = asyncio.gather(*(ideas.messages.create(model="m") for _ in range(20)))
+        await asyncio.sleep(0)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(generate.messages.create(model="m") for _ in range(3)))
+        interactive_s = time.perf_counter() - start
+
+        await burst
+
+        # 3 interactive calls fit in the 3 global slots ideas can't take
+        assert interactive_s < latency * 2.5, (
+            f"Interactive calls waited {interactive_s * 1000:.0f}ms behind background work"
+        )
+        assert background.peak == 1
+
+    async def test_unknown_call_site_gets_default_limit(self, limits):
+        with patch.object(claude_client, "DEFAULT_CALL_SITE_LIMIT", 2):
+            messages = _FakeMessages()
+            client = ClaudeClient(_FakeAnthropic(messages), "some_new_feature")
+            await asyncio.gather(*(client.messages.create(model="m") for _ in range(6)))
+
+        assert messages.peak == 2
+
+    async def test_saturated_non_interactive_sites_leave_interactive_a_slot(self):
+        """Per-site caps that add up past the pool still leave reserved room."""
+        latency = 0.05
+        background = _FakeMessages(latency)
+        interactive = _FakeMessages(latency)
+        sites = {"briefing": 2, "price_verification": 2, "claude_search": 2,
+                 "idea_generation": 2, "notification_generation": 2}
+        with patch.object(claude_client, "CLAUDE_MAX_CONCURRENCY", 4), \
+             patch.object(claude_client, "INTERACTIVE_RESERVED_SLOTS", 1), \
+             patch.object(claude_client, "DEFAULT_CALL_SITE_LIMIT", 2), \
+             patch.dict(claude_client.CALL_SITE_LIMITS, sites):
+            claude_client._reset_claude_limiter()
+            burst = asyncio.gather(*(
+                ClaudeClient(_FakeAnthropic(background), site).messages.create(model="m")
+                for site in [*sites, "some_new_feature"]
+                for _ in range(4)
+            ))
+            await asyncio.sleep(0)
+
+            generate = ClaudeClient(_FakeAnthropic(interactive), "unified_generation")
+            start = time.perf_counter()
+            await generate.messages.create(model="m")
+            interactive_s = time.perf_counter() - start
+            await burst
+        claude_client._reset_claude_limiter()
+
+        # Caps add up to 12 on a pool of 4; the sub-pool holds them to 3
+        assert background.peak == 3
+        assert interactive_s < latency * 1.5, (
+            f"Interactive call waited {interactive_s * 1000:.0f}ms for a slot"
+        )
+
+
+# ===================================================================
+# 4. Background pipeline runs
+# ===================================================================
+
+class TestBackgroundCalls:
+    """The notification-triggered pipeline uses a capped call site."""
+
+    @pytest.fixture(autouse=True)
+    def _fake_shared_client(self):
+        with patch(
+            "app.services.claude_client._shared_client",
+            return_value=_FakeAnthropic(_FakeMessages()),
+        ):
+            yield
+
+    async def test_unified_generation_remapped_in_background(self):
+        assert get_claude_client("unified_generation").call_site == "unified_generation"
+        with background_claude_calls():
+            assert get_claude_client("unified_generation").call_site == "notification_generation"
+            # Sites without a background counterpart are unchanged
+            assert get_claude_client("briefing").call_site == "briefing"
+        assert get_claude_client("unified_generation").call_site == "unified_generation"
+
+    async def test_background_mode_reaches_spawned_tasks(self):
+        async def _site():
+            return get_claude_client("unified_generation").call_site
+
+        with background_claude_calls():
+            site = await asyncio.create_task(_site())
+        assert site == "notification_generation"
+
+    async def test_saturating_background_generation_leaves_interactive_unblocked(self, limits):
+        latency = 0.05
+        background = _FakeMessages(latency)
+        interactive = _FakeMessages(latency)
+
+        async def _notification_run():
+            # What the webhook's pipeline does: ask for the unified site
+            client = get_claude_client("unified_generation")
+            client.messages._messages = background
+            return await client.messages.create(model="m")
+
+        with background_claude_calls():
+            burst = asyncio.gather(*(_notification_run() for _ in range(20)))
+        await asyncio.sleep(0)
+
+        generate = get_claude_client("unified_generation")
+        generate.messages._messages = interactive
+        start = time.perf_counter()
+        await asyncio.gather(*(generate.messages.create(model="m") for _ in range(3)))
+        interactive_s = time.perf_counter() - start
+
+        await burst
+
+        assert interactive_s < latency * 2.5, (
+            f"Interactive calls waited {interactive_s * 1000:.0f}ms behind notifications"
+        )
+        assert background.peak == 1
+        assert interactive.peak == 3
@@ -272,8 +272,7 @@ class TestClaudeExtraction:
         mock_client = AsyncMock()
         mock_client.messages.create = AsyncMock(return_value=mock_response)
 
-        with patch("app.services.integrations.claude_search_service.ANTHROPIC_API_KEY", "test-key"), \
-             patch("app.services.integrations.claude_search_service.AsyncAnthropic", return_value=mock_client):
+        with patch("app.services.integrations.claude_search_service.get_claude_client", return_value=mock_client):
             results = await _extract_candidates_with_claude(
                 search_results=[{"title": "Test", "url": "https://example.com", "description": "Test desc", "extra_snippets": []}],
                 search_type="gift",
@@ -297,8 +296,7 @@ class TestClaudeExtraction:
         mock_client = AsyncMock()
         mock_client.messages.create = AsyncMock(return_value=mock_response)
 
-        with patch("app.services.integrations.claude_search_service.ANTHROPIC_API_KEY", "test-key"), \
-             patch("app.services.integrations.claude_search_service.AsyncAnthropic", return_value=mock_client):
+        with patch("app.services.integrations.claude_search_service.get_claude_client", return_value=mock_client):
             results = await _extract_candidates_with_claude(
                 search_results=[{"title": "Test", "url": "https://example.com", "description": "Test", "extra_snippets": []}],
                 search_type="gift",
@@ -319,8 +317,7 @@ class TestClaudeExtraction:
         mock_client = AsyncMock()
         mock_client.messages.create = AsyncMock(return_value=mock_response)
 
-        with patch("app.services.integrations.claude_search_service.ANTHROPIC_API_KEY", "test-key"), \
-             patch("app.services.integrations.claude_search_service.AsyncAnthropic", return_value=mock_client):
+        with patch("app.services.integrations.claude_search_service.get_claude_client", return_value=mock_client):
             results = await _extract_candidates_with_claude(
                 search_results=[{"title": "Test", "url": "https://example.com", "description": "Test", "extra_snippets": []}],
                 search_type="gift",
@@ -338,8 +335,7 @@ class TestClaudeExtraction:
         mock_client = AsyncMock()
         mock_client.messages.create = AsyncMock(side_effect=RuntimeError("API error"))
 
-        with patch("app.services.integrations.claude_search_service.ANTHROPIC_API_KEY", "test-key"), \
-             patch("app.services.integrations.claude_search_service.AsyncAnthropic", return_value=mock_client):
+        with patch("app.services.integrations.claude_search_service.get_claude_client", return_value=mock_client):
             results = await _extract_candidates_with_claude(
                 search_results=[{"title": "Test", "url": "https://example.com", "description": "Test", "extra_snippets": []}],
                 search_type="gift",
@@ -487,8 +483,7 @@ class TestClaudeSearchServiceFlow:
 
         with patch("app.services.integrations.claude_search_service.is_claude_search_configured", return_value=True), \
              patch("app.services.integrations.claude_search_service.httpx.AsyncClient", return_value=mock_http_client), \
-             patch("app.services.integrations.claude_search_service.ANTHROPIC_API_KEY", "test-key"), \
-             patch("app.services.integrations.claude_search_service.AsyncAnthropic", return_value=mock_anthropic):
+             patch("app.services.integrations.claude_search_service.get_claude_client", return_value=mock_anthropic):
             service = ClaudeSearchService()
             results = await service.search(
                 interests=["Cooking", "Travel"],
@@ -524,8 +519,7 @@ class TestClaudeSearchServiceFlow:
 
         with patch("app.services.integrations.claude_search_service.is_claude_search_configured", return_value=True), \
              patch("app.services.integrations.claude_search_service.httpx.AsyncClient", return_value=mock_http_client), \
-             patch("app.services.integrations.claude_search_service.ANTHROPIC_API_KEY", "test-key"), \
-             patch("app.services.integrations.claude_search_service.AsyncAnthropic", return_value=mock_anthropic):
+             patch("app.services.integrations.claude_search_service.get_claude_client", return_value=mock_anthropic):
             service = ClaudeSearchService()
             results = await service.search(
                 interests=["Cooking"],
@@ -0,0 +1,265 @@
+"""
+Tests for concurrent pre-pipeline context loading.
+
+Covers:
+1. load_concurrently — results by name, optional loads fall back on
+   failure, required failures re-raised only after every load finishes
+2. Generate — milestone, learned weights and exclusion history load in one
+   round after the vault lookup; a failed optional load doesn't sink the
+   request; a missing milestone is still a 404
+3. Refresh — rejected recs, weights and history in one round, then the
+   occasion lookup and feedback inserts in a second
+
+Each mocked load sleeps for one simulated round trip, so the timing tests
+compare the pre-pipeline phase against the serial chain it replaced.
+
+Run with: pytest tests/test_context_loading.py -v
+"""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.agents.state import MilestoneContext, VaultData
+from app.api import recommendations as recommendations_api
+from app.models.recommendations import (
+    RecommendationGenerateRequest,
+    RecommendationRefreshRequest,
+)
+from app.services.vault_loader import load_concurrently
+
+USER_ID = "user-context-001"
+VAULT_ID = "vault-context-001"
+ROUND_TRIP = 0.05
+
+
+def _vault_data() -> VaultData:
+    return VaultData(
+        vault_id=VAULT_ID,
+        partner_name="Alex",
+        interests=["Cooking", "Travel", "Music", "Art", "Hiking"],
+        dislikes=["Gaming", "Cars", "Skiing", "Karaoke", "Surfing"],
+        vibes=["quiet_luxury", "romantic"],
+        primary_love_language="quality_time",
+        secondary_love_language="receiving_gifts",
+        budgets=[],
+    )
+
+
+def _milestone() -> MilestoneContext:
+    return MilestoneContext(
+        id="milestone-context-001",
+        milestone_type="birthday",
+        milestone_name="Alex's Birthday",
+        milestone_date="2000-03-15",
+        recurrence="yearly",
+        budget_tier="major_milestone",
+        days_until=10,
+    )
+
+
+def _delayed(value=None, *, error: Exception | None = None, delay: float = ROUND_TRIP):
+    """AsyncMock that takes one simulated round trip, then returns or raises."""
+    async def _run(*args, **kwargs):
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return value
+    return AsyncMock(side_effect=_run)
+
+
+@pytest.fixture
+def generate_loads():
+    """Patch every generate-endpoint load with a one-round-trip delay."""
+    mocks = {
+        "load_vault_data": _delayed((_vault_data(), VAULT_ID)),
+        "load_milestone_context": _delayed(_milestone()),
+        "load_learned_weights": _delayed(None),
+        "_load_recent_titles": _delayed(["Old Title"]),
+        "_load_recent_descriptions": _delayed(["Old description"]),
+        "get_service_client": MagicMock(),
+    }
+    patches = [
+        patch(f"app.api.recommendations.{name}", mock) for name, mock in mocks.items()
+    ]
+    for p in patches:
+        p.start()
+    yield mocks
+    for p in patches:
+        p.stop()
+
+
+@pytest.fixture
+def refresh_loads():
+    """Patch every refresh-endpoint load with a one-round-trip delay."""
+    rejected = [
+        {"id": "rec-1", "milestone_id": "milestone-pipe-001"},
+        {"id": "rec-2", "milestone_id": "milestone-pipe-001"},
+    ]
+    mocks = {
+        "load_vault_data": _delayed((_vault_data(), VAULT_ID)),
+        "_load_rejected_recommendations": _delayed(rejected),
+        "load_learned_weights": _delayed(None),
+        "_load_recent_titles": _delayed(["Old Title"]),
+        "_load_recent_descriptions": _delayed(["Old description"]),
+        "_load_occasion_type": _delayed("major_milestone"),
+        "_store_refresh_feedback": _delayed(None),
+        "get_service_client": MagicMock(),
+    }
+    patches = [
+        patch(f"app.api.recommendations.{name}", mock) for name, mock in mocks.items()
+    ]
+    for p in patches:
+        p.start()
+    yield mocks
+    for p in patches:
+        p.stop()
+
+
+# ===================================================================
+# 1. load_concurrently
+# ===================================================================
+
+class TestLoadConcurrently:
+    """Concurrent loads with per-item failure isolation."""
+
+    async def test_runs_loads_concurrently(self):
+        start = time.perf_counter()
+        result = await load_concurrently({
+            "a": _delayed(1)(),
+            "b": _delayed(2)(),
+            "c": _delayed(3)(),
+        })
+        elapsed = time.perf_counter() - start
+
+        assert result == {"a": 1, "b": 2, "c": 3}
+        assert elapsed < ROUND_TRIP * 2
+
+    async def test_optional_failure_uses_fallback(self):
+        result = await load_concurrently(
+            {"weights": _delayed(error=RuntimeError("db down"))(), "titles": _delayed(["x"])()},
+            fallbacks={"weights": None},
+        )
+        assert result == {"weights": None, "titles": ["x"]}
+
+    async def test_required_failure_raised_after_others_finish(self):
+        finished: list[str] = []
+
+        async def _slow_ok():
+            await asyncio.sleep(ROUND_TRIP * 2)
+            finished.append("slow")
+            return "ok"
+
+        with pytest.raises(RuntimeError, match="milestone query failed"):
+            await load_concurrently({
+                "milestone": _delayed(error=RuntimeError("milestone query failed"))(),
+                "slow": _slow_ok(),
+            })
+        assert finished == ["slow"]
+
+
+# ===================================================================
+# 2. Generate
+# ===================================================================
+
+class TestGenerateContext:
+    """Generate loads its context in one round after the vault lookup."""
+
+    async def test_one_round_after_vault_lookup(self, generate_loads):
+        payload = RecommendationGenerateRequest(
+            milestone_id="milestone-pipe-001", occasion_type="major_milestone",
+        )
+
+        start = time.perf_counter()
+        state, vault_id = await recommendations_api._build_generate_state(payload, USER_ID)
+        elapsed = time.perf_counter() - start
+
+        # Vault lookup + one concurrent round; the old chain was 5 round trips
+        assert elapsed < ROUND_TRIP * 3, f"Pre-pipeline phase took {elapsed * 1000:.0f}ms"
+        assert vault_id == VAULT_ID
+        assert state.milestone_context.milestone_name == "Alex's Birthday"
+        assert state.excluded_titles == ["Old Title"]
+        assert state.excluded_descriptions == ["Old description"]
+
+    async def test_failed_optional_load_does_not_fail_request(self, generate_loads):
+        generate_loads["load_learned_weights"].side_effect = RuntimeError("weights down")
+        generate_loads["_load_recent_titles"].side_effect = RuntimeError("titles down")
+
+        state, _ = await recommendations_api._build_generate_state(
+            RecommendationGenerateRequest(
+                milestone_id="milestone-pipe-001", occasion_type="major_milestone",
+            ),
+            USER_ID,
+        )
+
+        assert state.learned_weights is None
+        assert state.excluded_titles == []
+        assert state.excluded_descriptions == ["Old description"]
+        assert state.milestone_context is not None
+
+    async def test_missing_milestone_still_404(self, generate_loads):
+        generate_loads["load_milestone_context"].side_effect = None
+        generate_loads["load_milestone_context"].return_value = None
+
+        with pytest.raises(HTTPException) as exc_info:
+            await recommendations_api._build_generate_state(
+                RecommendationGenerateRequest(
+                    milestone_id="missing", occasion_type="major_milestone",
+                ),
+                USER_ID,
+            )
+        assert exc_info.value.status_code == 404
+
+    async def test_no_milestone_skips_lookup(self, generate_loads):
+        state, _ = await recommendations_api._build_generate_state(
+            RecommendationGenerateRequest(occasion_type="just_because"), USER_ID,
+        )
+        assert state.milestone_context is None
+        generate_loads["load_milestone_context"].assert_not_called()
+
+
+# ===================================================================
+# 3. Refresh
+# ===================================================================
+
+class TestRefreshContext:
+    """Refresh loads its context in two concurrent rounds after the vault."""
+
+    def _payload(self) -> RecommendationRefreshRequest:
+        return RecommendationRefreshRequest(
+            rejected_recommendation_ids=["rec-1", "rec-2"],
+            rejection_reason="too_expensive",
+        )
+
+    async def test_two_rounds_after_vault_lookup(self, refresh_loads):
+        start = time.perf_counter()
+        state, vault_id = await recommendations_api._build_refresh_state(
+            self._payload(), USER_ID,
+        )
+        elapsed = time.perf_counter() - start
+
+        # Vault + (rejected/weights/history) + (occasion/feedback); was 8 serial
+        assert elapsed < ROUND_TRIP * 4.5, f"Pre-pipeline phase took {elapsed * 1000:.0f}ms"
+        assert vault_id == VAULT_ID
+        assert state.occasion_type == "major_milestone"
+        assert state.rejection_reason == "too_expensive"
+        assert refresh_loads["_store_refresh_feedback"].await_count == 2
+
+    async def test_occasion_lookup_failure_falls_back(self, refresh_loads):
+        refresh_loads["_load_occasion_type"].side_effect = RuntimeError("milestones down")
+
+        state, _ = await recommendations_api._build_refresh_state(self._payload(), USER_ID)
+
+        assert state.occasion_type == "just_because"
+
+    async def test_unknown_rejected_recs_404(self, refresh_loads):
+        refresh_loads["_load_rejected_recommendations"].side_effect = None
+        refresh_loads["_load_rejected_recommendations"].return_value = []
+
+        with pytest.raises(HTTPException) as exc_info:
+            await recommendations_api._build_refresh_state(self._payload(), USER_ID)
+        assert exc_info.value.status_code == 404
+        refresh_loads["_store_refresh_feedback"].assert_not_called()
@@ -0,0 +1,475 @@
+"""
+Tests for the NULL-embedding hint backfill job.
+
+Covers:
+1. Paging — every NULL-embedding hint embedded, one bulk write per page,
+   already-embedded hints untouched, cursor reset at the end
+2. Resumability — runs resume from the checkpoint, a crash mid-run
+   resumes at the failed page, the time budget ends a run as "partial"
+3. Failures — failed texts counted and retried next pass, a page with no
+   embeddings stops the run without skipping it, bounded concurrency
+4. Fallbacks — per-row updates without the bulk RPC, no checkpoint
+   without the job_checkpoints table
+5. POST /api/v1/hints/backfill-embeddings — signature check, requeue,
+   retryable failures are 5xx
+
+Runs offline against an in-memory stand-in for the Supabase client.
+
+Run with: pytest tests/test_embedding_backfill.py -v
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from postgrest.exceptions import APIError
+
+from app.main import app
+from app.services import embedding_backfill
+from app.services.embedding_backfill import (
+    BACKFILL_JOB_NAME,
+    _reset_backfill_availability,
+    run_embedding_backfill,
+)
+
+
+# ---------------------------------------------------------------------------
+# In-memory Supabase stand-in
+# ---------------------------------------------------------------------------
+
+class _Query:
+    """Records a PostgREST builder chain; executed by _FakeDB.execute."""
+
+    def __init__(self, db: "_FakeDB", table: str) -> None:
+        self.db = db
+        self.table = table
+        self.op = "select"
+        self.payload = None
+        self.filters: list[tuple] = []
+        self.limit_n = None
+
+    def select(self, *_args, **_kwargs):
+        return self
+
+    def update(self, payload):
+        self.op, self.payload = "update", payload
+        return self
+
+    def upsert(self, payload):
+        self.op, self.payload = "upsert", payload
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(("eq", column, value))
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(("gt", column, value))
+        return self
+
+    def is_(self, column, value):
+        self.filters.append(("is", column, value))
+        return self
+
+    def order(self, *_args, **_kwargs):
+        return self
+
+    def limit(self, n):
+        self.limit_n = n
+        return self
+
+
+class _Rpc:
+    def __init__(self, name: str, params: dict) -> None:
+        self.name = name
+        self.params = params
+
+
+class _FakeDB:
+    """hints and job_checkpoints tables, plus the backfill RPC."""
+
+    def __init__(self, n_hints: int, embedded: set[int] = frozenset()) -> None:
+        self.hints = {
+            f"hint-{i:03d}": {
+                "id": f"hint-{i:03d}",
+                "vault_id": f"vault-{i % 2}",
+                "hint_text": f"hint text {i}",
+                "hint_embedding": "[0]" if i in embedded else None,
+            }
+            for i in range(n_hints)
+        }
+        self.checkpoints: dict[str, dict] = {}
+        self.rpc_calls = 0
+        self.row_updates = 0
+        self.rpc_missing = False
+        self.checkpoints_missing = False
+        self.fail_rpc_on_call: int | None = None
+
+    # --- client surface ---
+    def table(self, name):
+        return _Query(self, name)
+
+    def rpc(self, name, params):
+        return _Rpc(name, params)
+
+    # --- run_query ---
+    async def execute(self, query):
+        if isinstance(query, _Rpc):
+            return self._run_rpc(query)
+        if query.table == "job_checkpoints":
+            return self._run_checkpoints(query)
+        return self._run_hints(query)
+
+    def _run_rpc(self, rpc: _Rpc):
+        if self.rpc_missing:
+            raise APIError({"code": "PGRST202", "message": "function not found"})
+        self.rpc_calls += 1
+        if self.fail_rpc_on_call == self.rpc_calls:
+            raise RuntimeError("connection reset")
+        updated = 0
+        for row in rpc.params["p_rows"]:
+            hint = self.hints[row["id"]]
+            if hint["hint_embedding"] is None:
+                hint["hint_embedding"] = row["embedding"]
+                updated += 1
+        return MagicMock(data=updated)
+
+    def _run_checkpoints(self, query: _Query):
+        if self.checkpoints_missing:
+            raise APIError({"code": "PGRST205", "message": "table not found"})
+        if query.op == "upsert":
+            self.checkpoints[query.payload["job_name"]] = dict(query.payload)
+            return MagicMock(data=[query.payload])
+        job = dict((c, v) for _, c, v in query.filters)["job_name"]
+        row = self.checkpoints.get(job)
+        return MagicMock(data=[row] if row else [])
+
+    def _run_hints(self, query: _Query):
+        rows = sorted(self.hints.values(), key=lambda h: h["id"])
+        for kind, column, value in query.filters:
+            if kind == "eq":
+                rows = [r for r in rows if r[column] == value]
+            elif kind == "gt":
+                rows = [r for r in rows if r[column] > value]
+            elif kind == "is":
+                rows = [r for r in rows if r[column] is None]
+        if query.op == "update":
+            for row in rows:
+                row.update(query.payload)
+                self.row_updates += 1
+            return MagicMock(data=[dict(r) for r in rows])
+        if query.limit_n is not None:
+            rows = rows[: query.limit_n]
+        return MagicMock(data=[
+            {"id": r["id"], "vault_id": r["vault_id"], "hint_text": r["hint_text"]} for r in rows
+        ])
+
+    # --- assertions ---
+    def null_ids(self) -> list[str]:
+        return sorted(h["id"] for h in self.hints.values() if h["hint_embedding"] is None)
+
+    @property
+    def cursor(self):
+        return self.checkpoints.get(BACKFILL_JOB_NAME, {}).get("cursor")
+
+
+def _fake_embedding(fail_texts: set[str] = frozenset()):
+    async def _embed(text, use_cache=True):
+        assert use_cache is False
+        return None if text in fail_texts else [0.5] * 768
+    return AsyncMock(side_effect=_embed)
+
+
+@pytest.fixture
+def backfill():
+    """Patch the job onto a fresh _FakeDB; yields a factory for the DB."""
+    state = {}
+
+    def _setup(n_hints=7, embedded=frozenset(), fail_texts=frozenset()):
+        db = _FakeDB(n_hints, embedded)
+        state["db"] = db
+        state["embed"] = _fake_embedding(fail_texts)
+        for p in (
+            patch("app.services.embedding_backfill.get_service_client", return_value=db),
+            patch("app.services.embedding_backfill.run_query", side_effect=db.execute),
+            patch("app.services.embedding_backfill.generate_embedding", state["embed"]),
+            patch("app.services.embedding_backfill.is_vertex_ai_configured", return_value=True),
+            patch("app.services.embedding_backfill.BACKFILL_PAGE_SIZE", 3),
+        ):
+            p.start()
+            state.setdefault("patches", []).append(p)
+        return db
+
+    _reset_backfill_availability()
+    yield _setup
+    for p in state.get("patches", []):
+        p.stop()
+    _reset_backfill_availability()
+
+
+# ===================================================================
+# 1. Paging
+# ===================================================================
+
+class TestBackfillPaging:
+    """Every NULL-embedding hint is embedded with one write per page."""
+
+    async def test_embeds_all_null_hints(self, backfill):
+        db = backfill(n_hints=7)
+
+        result = await run_embedding_backfill()
+
+        assert result["status"] == "completed"
+        assert result["embedded"] == 7
+        assert result["pages"] == 3  # 3 + 3 + 1
+        assert db.rpc_calls == 3
+        assert db.null_ids() == []
+        assert db.cursor is None  # next pass starts over
+
+    async def test_invalidates_written_vaults_hint_indexes(self, backfill):
+        backfill(n_hints=4)
+        with patch("app.services.embedding_backfill.invalidate_hint_index") as invalidate:
+            await run_embedding_backfill()
+        assert {c.args[0] for c in invalidate.call_args_list} == {"vault-0", "vault-1"}
+
+    async def test_already_embedded_hints_untouched(self, backfill):
+        db = backfill(n_hints=5, embedded={1, 3})
+
+        result = await run_embedding_backfill()
+
+        assert result["embedded"] == 3
+        assert db.hints["hint-001"]["hint_embedding"] == "[0]"
+
+    async def test_nothing_to_do(self, backfill):
+        db = backfill(n_hints=3, embedded={0, 1, 2})
+
+        result = await run_embedding_backfill()
+
+        assert result == {
+            "status": "completed", "embedded": 0, "failed": 0, "pages": 0, "cursor": None,
+        }
+        assert db.rpc_calls == 0
+
+    async def test_vertex_not_configured_skips(self, backfill):
+        db = backfill()
+        with patch(
+            "app.services.embedding_backfill.is_vertex_ai_configured", return_value=False,
+        ):
+            result = await run_embedding_backfill()
+        assert result["status"] == "skipped"
+        assert len(db.null_ids()) == 7
+
+
+# ===================================================================
+# 2. Resumability
+# ===================================================================
+
+class TestBackfillResume:
+    """Progress is checkpointed after every page."""
+
+    async def test_resumes_after_checkpoint(self, backfill):
+        db = backfill(n_hints=7)
+        db.checkpoints[BACKFILL_JOB_NAME] = {
+            "job_name": BACKFILL_JOB_NAME, "cursor": "hint-002", "processed": 3, "failed": 0,
+        }
+
+        result = await run_embedding_backfill()
+
+        assert result["embedded"] == 4
+        assert db.null_ids() == ["hint-000", "hint-001", "hint-002"]
+        assert db.checkpoints[BACKFILL_JOB_NAME]["processed"] == 7
+
+    async def test_crash_resumes_at_failed_page(self, backfill):
+        db = backfill(n_hints=7)
+        db.fail_rpc_on_call = 2
+
+        with pytest.raises(RuntimeError):
+            await run_embedding_backfill()
+        assert db.cursor == "hint-002"  # page 1 committed, page 2 not
+
+        embed = embedding_backfill.generate_embedding
+        embed.reset_mock()
+        result = await run_embedding_backfill()
+
+        assert result["status"] == "completed"
+        assert db.null_ids() == []
+        # Page 1 was not embedded again
+        assert "hint text 0" not in [c.args[0] for c in embed.await_args_list]
+
+    async def test_time_budget_ends_run_as_partial(self, backfill):
+        db = backfill(n_hints=7)
+
+        result = await run_embedding_backfill(time_budget=0)
+
+        assert result["status"] == "partial"
+        assert result["pages"] == 1
+        assert result["cursor"] == db.cursor == "hint-002"
+
+        result = await run_embedding_backfill()
+        assert result["status"] == "completed"
+        assert db.null_ids() == []
+
+
+# ===================================================================
+# 3. Failures
+# ===================================================================
+
+class TestBackfillFailures:
+    """Individual failures don't block the backfill; outages don't skip hints."""
+
+    async def test_failed_texts_counted_and_left_null(self, backfill):
+        db = backfill(n_hints=4, fail_texts={"hint text 1"})
+
+        result = await run_embedding_backfill()
+
+        assert result["embedded"] == 3
+        assert result["failed"] == 1
+        assert db.null_ids() == ["hint-001"]
+
+    async def test_page_without_embeddings_stops_run(self, backfill):
+        db = backfill(n_hints=7, fail_texts={f"hint text {i}" for i in range(7)})
+
+        result = await run_embedding_backfill()
+
+        assert result["status"] == "error"
+        assert db.cursor is None  # not advanced past the unembedded page
+        assert embedding_backfill.generate_embedding.await_count == 3
+
+    async def test_embedding_concurrency_bounded(self, backfill):
+        backfill(n_hints=3)
+        in_flight = peak = 0
+
+        async def _slow(text, use_cache=True):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return [0.5] * 768
+
+        with patch("app.services.embedding_backfill.generate_embedding", side_effect=_slow), \
+             patch("app.services.embedding_backfill.BACKFILL_EMBED_CONCURRENCY", 2):
+            await run_embedding_backfill()
+
+        assert peak == 2
+
+
+# ===================================================================
+# 4. Fallbacks without migration 00028
+# ===================================================================
+
+class TestBackfillFallbacks:
+    """The job still works before migration 00028 is applied."""
+
+    async def test_row_updates_without_rpc(self, backfill):
+        db = backfill(n_hints=4)
+        db.rpc_missing = True
+
+        result = await run_embedding_backfill()
+
+        assert result["embedded"] == 4
+        assert db.row_updates == 4
+        assert db.null_ids() == []
+
+    async def test_runs_without_checkpoint_table(self, backfill):
+        db = backfill(n_hints=4)
+        db.checkpoints_missing = True
+
+        result = await run_embedding_backfill()
+
+        assert result["status"] == "completed"
+        assert db.null_ids() == []
+
+
+# ===================================================================
+# 5. Endpoint
+# ===================================================================
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def _run_result(status="completed", cursor=None):
+    return {"status": status, "embedded": 3, "failed": 0, "pages": 1, "cursor": cursor}
+
+
+class TestBackfillEndpoint:
+    """POST /api/v1/hints/backfill-embeddings (QStash webhook)."""
+
+    URL = "/api/v1/hints/backfill-embeddings"
+
+    def test_invalid_signature_rejected(self, client):
+        with patch("app.core.config.is_qstash_configured", return_value=True), \
+             patch(
+                 "app.services.qstash.verify_qstash_signature",
+                 side_effect=ValueError("bad signature"),
+             ), \
+             patch("app.api.hints.run_embedding_backfill", new_callable=AsyncMock) as run:
+            resp = client.post(self.URL, content=b"{}")
+
+        assert resp.status_code == 401
+        run.assert_not_called()
+
+    def test_partial_run_requeues(self, client):
+        with patch("app.core.config.is_qstash_configured", return_value=True), \
+             patch("app.core.config.WEBHOOK_BASE_URL", "https://api.example.com"), \
+             patch("app.services.qstash.verify_qstash_signature"), \
+             patch(
+                 "app.api.hints.run_embedding_backfill",
+                 new_callable=AsyncMock,
+                 return_value=_run_result("partial", cursor="hint-199"),
+             ), \
+             patch("app.services.qstash.publish_to_qstash", new_callable=AsyncMock) as publish:
+            resp = client.post(self.URL, content=b"{}", headers={"Upstash-Signature": "sig"})
+
+        assert resp.status_code == 200
+        assert resp.json()["requeued"] is True
+        kwargs = publish.await_args.kwargs
+        assert kwargs["destination_url"] == "https://api.example.com/api/v1/hints/backfill-embeddings"
+        assert kwargs["deduplication_id"] == "hint-embedding-backfill-hint-199"
+
+    def test_completed_run_not_requeued(self, client):
+        with patch("app.core.config.is_qstash_configured", return_value=True), \
+             patch("app.core.config.WEBHOOK_BASE_URL", "https://api.example.com"), \
+             patch("app.services.qstash.verify_qstash_signature"), \
+             patch(
+                 "app.api.hints.run_embedding_backfill",
+                 new_callable=AsyncMock,
+                 return_value=_run_result(),
+             ), \
+             patch("app.services.qstash.publish_to_qstash", new_callable=AsyncMock) as publish:
+            resp = client.post(self.URL, content=b"{}")
+
+        assert resp.json()["status"] == "completed"
+        assert resp.json()["requeued"] is False
+        publish.assert_not_called()
+
+    def test_job_failure_is_500(self, client):
+        with patch("app.core.config.is_qstash_configured", return_value=True), \
+             patch("app.services.qstash.verify_qstash_signature"), \
+             patch(
+                 "app.api.hints.run_embedding_backfill",
+                 new_callable=AsyncMock,
+                 side_effect=RuntimeError("db down"),
+             ):
+            resp = client.post(self.URL, content=b"{}")
+
+        assert resp.status_code == 500
+
+    def test_vertex_outage_is_503(self, client):
+        with patch("app.core.config.is_qstash_configured", return_value=True), \
+             patch("app.core.config.WEBHOOK_BASE_URL", "https://api.example.com"), \
+             patch("app.services.qstash.verify_qstash_signature"), \
+             patch(
+                 "app.api.hints.run_embedding_backfill",
+                 new_callable=AsyncMock,
+                 return_value=_run_result("error", cursor="hint-199"),
+             ), \
+             patch("app.services.qstash.publish_to_qstash", new_callable=AsyncMock) as publish:
+            resp = client.post(self.URL, content=b"{}")
+
+        # QStash retries non-2xx responses; the checkpoint is kept
+        assert resp.status_code == 503
+        publish.assert_not_called()
@@ -0,0 +1,198 @@
+"""
+Tests for embedding micro-batching in app.services.embedding.
+
+Covers:
+1. Coalescing — concurrent generate_embedding calls share one
+   get_embeddings call, split at EMBEDDING_BATCH_MAX_SIZE, duplicates
+   embedded once, each caller gets its own vector
+2. Failures — a failed batch is retried text by text, malformed responses
+   and wrong dimensions resolve to None, Vertex not configured
+3. Benchmark — a burst of embeddings against a stub model with fixed
+   per-call latency, batched vs. one call per text
+
+Vertex AI is replaced with a stub model.
+
+Run with: pytest tests/test_embedding_batcher.py -v
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.services.embedding import (
+    EMBEDDING_DIMENSION,
+    _reset_embedding_batcher,
+    generate_embedding,
+    get_embedding_batch_stats,
+)
+
+
+class _StubModel:
+    """Vertex TextEmbeddingModel stand-in: fixed latency per call, one vector per text."""
+
+    def __init__(self, latency: float = 0.0, fail_on: str | None = None) -> None:
+        self.latency = latency
+        self.fail_on = fail_on
+        self.calls: list[list[str]] = []
+        self._lock = threading.Lock()
+
+    def get_embeddings(self, texts: list[str]):
+        with self._lock:
+            self.calls.append(list(texts))
+        time.sleep(self.latency)
+        if self.fail_on in texts:
+            raise RuntimeError("400 text too long")
+        return [MagicMock(values=[float(len(t))] * EMBEDDING_DIMENSION) for t in texts]
+
+
+@pytest.fixture
+def batching(request):
+    """Patch the batching limits (max_size, window_ms) and rebuild the batcher."""
+    max_size, window_ms = getattr(request, "param", (32, 5))
+    with patch("app.services.embedding.EMBEDDING_BATCH_MAX_SIZE", max_size), \
+         patch("app.services.embedding.EMBEDDING_BATCH_WINDOW_MS", window_ms):
+        _reset_embedding_batcher()
+        yield
+    _reset_embedding_batcher()
+
+
+def _use_model(model):
+    return patch("app.services.embedding._get_model", return_value=model)
+
+
+# ===================================================================
+# 1. Coalescing
+# ===================================================================
+
+class TestCoalescing:
+    """Concurrent requests are embedded together."""
+
+    async def test_concurrent_calls_share_one_batch(self, batching):
+        model = _StubModel()
+        texts = [f"hint {'x' * i}" for i in range(10)]
+        with _use_model(model):
+            vectors = await asyncio.gather(*(generate_embedding(t) for t in texts))
+
+        assert len(model.calls) == 1
+        assert model.calls[0] == texts
+        # Each caller gets the vector for its own text
+        assert [v[0] for v in vectors] == [float(len(t)) for t in texts]
+
+    @pytest.mark.parametrize("batching", [(4, 50)], indirect=True)
+    async def test_full_batch_sent_without_waiting(self, batching):
+        model = _StubModel()
+        with _use_model(model):
+            start = time.perf_counter()
+            await asyncio.gather(*(generate_embedding(f"t{i}") for i in range(8)))
+            elapsed = time.perf_counter() - start
+
+        assert [len(c) for c in model.calls] == [4, 4]
+        assert elapsed < 0.05  # never waited out the 50ms window
+
+    async def test_duplicate_texts_embedded_once(self, batching):
+        model = _StubModel()
+        with _use_model(model):
+            a, b = await asyncio.gather(generate_embedding("hiking"), generate_embedding("hiking"))
+
+        assert model.calls == [["hiking"]]
+        assert a == b and a is not b
+
+    async def test_sequential_calls_are_not_delayed_into_one_batch(self, batching):
+        model = _StubModel()
+        with _use_model(model):
+            await generate_embedding("first")
+            await generate_embedding("second")
+        assert model.calls == [["first"], ["second"]]
+
+    async def test_stats(self, batching):
+        with _use_model(_StubModel()):
+            await asyncio.gather(*(generate_embedding(f"t{i}") for i in range(6)))
+            await generate_embedding("t6")
+
+        stats = get_embedding_batch_stats()
+        assert stats["requests"] == 7
+        assert stats["batches"] == 2
+        assert stats["mean_batch_size"] == 3.5
+
+
+# ===================================================================
+# 2. Failures
+# ===================================================================
+
+class TestBatchFailures:
+    """A bad batch degrades to per-text results, never an exception."""
+
+    async def test_failed_batch_retried_individually(self, batching):
+        model = _StubModel(fail_on="poison")
+        with _use_model(model):
+            vectors = await asyncio.gather(
+                generate_embedding("good one"),
+                generate_embedding("poison"),
+                generate_embedding("good two"),
+            )
+
+        assert vectors[1] is None
+        assert vectors[0] is not None and vectors[2] is not None
+        assert len(model.calls) == 4  # the batch, then each text alone
+
+    async def test_short_response_resolves_none(self, batching):
+        model = MagicMock()
+        model.get_embeddings.return_value = [MagicMock(values=[0.0] * EMBEDDING_DIMENSION)]
+        with _use_model(model):
+            vectors = await asyncio.gather(generate_embedding("a"), generate_embedding("b"))
+        assert vectors == [None, None]
+
+    async def test_wrong_dimension_resolves_none(self, batching):
+        model = MagicMock()
+        model.get_embeddings.return_value = [
+            MagicMock(values=[0.0] * EMBEDDING_DIMENSION),
+            MagicMock(values=[0.0] * 3),
+        ]
+        with _use_model(model):
+            a, b = await asyncio.gather(generate_embedding("a"), generate_embedding("b"))
+        assert a is not None and b is None
+
+    async def test_not_configured_returns_none(self, batching):
+        with _use_model(None):
+            assert await generate_embedding("hiking") is None
+        assert get_embedding_batch_stats()["requests"] == 0
+
+
+# ===================================================================
+# 3. Benchmark: batched vs. one call per text
+# ===================================================================
+
+class TestBatchingBenchmark:
+    @pytest.mark.parametrize("batching", [(32, 5)], indirect=True)
+    async def test_burst_throughput(self, batching):
+        """
+        64 concurrent embeddings against a stub with 20ms per call. One call
+        per text is bounded by the thread pool; batching needs two calls.
+        The call counts are the contract; the timing bound is loose because
+        the default executor is shared with the rest of the suite.
+        """
+        n = 64
+        model = _StubModel(latency=0.02)
+        with _use_model(model):
+            start = time.perf_counter()
+            await asyncio.gather(*(generate_embedding(f"batched {i}") for i in range(n)))
+            batched_s = time.perf_counter() - start
+        batched_calls = len(model.calls)
+
+        model = _StubModel(latency=0.02)
+        with _use_model(model), patch("app.services.embedding.EMBEDDING_BATCH_MAX_SIZE", 1):
+            _reset_embedding_batcher()
+            start = time.perf_counter()
+            await asyncio.gather(*(generate_embedding(f"single {i}") for i in range(n)))
+            single_s = time.perf_counter() - start
+        single_calls = len(model.calls)
+
+        print(f"  batched={batched_s * 1000:.0f}ms ({batched_calls} calls), "
+              f"unbatched={single_s * 1000:.0f}ms ({single_calls} calls), "
+              f"{single_s / batched_s:.1f}x")
+        assert batched_calls == 2
+        assert single_calls == n
+        assert batched_s < single_s
@@ -0,0 +1,209 @@
+"""
+Tests for the query-embedding cache in app.services.embedding.
+
+Covers:
+1. Memory tier — repeat texts skip Vertex AI, normalization, failures not
+   cached, TTL expiry, LRU bound, float32 storage
+2. Disk tier — hits survive a process restart (memory reset), expired rows
+   ignored, unusable path degrades to memory-only, corrupt rows dropped
+3. Stats — per-tier hit rates
+
+Vertex AI is replaced with a stub model; the disk tier uses tmp_path.
+
+Run with: pytest tests/test_embedding_cache.py -v
+"""
+
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from app.services import embedding
+from app.services.embedding import (
+    EMBEDDING_DIMENSION,
+    _reset_embedding_cache,
+    generate_embedding,
+    get_embedding_cache_stats,
+    normalize_embedding_text,
+)
+
+
+def _vector(seed: float) -> list[float]:
+    return [seed] * EMBEDDING_DIMENSION
+
+
+@pytest.fixture
+def stub_model():
+    """A Vertex model stub returning a distinct vector per call."""
+    model = MagicMock()
+    model.get_embeddings.side_effect = lambda texts: [
+        MagicMock(values=_vector(float(model.get_embeddings.call_count)))
+    ]
+    with patch("app.services.embedding._get_model", return_value=model):
+        yield model
+
+
+@pytest.fixture
+def disk_path(tmp_path):
+    path = str(tmp_path / "cache" / "embeddings.sqlite3")
+    with patch("app.services.embedding.EMBEDDING_CACHE_PATH", path):
+        _reset_embedding_cache()
+        yield path
+    _reset_embedding_cache()
+
+
+# ===================================================================
+# 1. Memory tier
+# ===================================================================
+
+class TestMemoryTier:
+    """Repeat query texts are served without calling Vertex AI."""
+
+    async def test_repeat_text_skips_model(self, stub_model):
+        first = await generate_embedding("hiking, cooking, romantic")
+        second = await generate_embedding("hiking, cooking, romantic")
+
+        assert first == second == _vector(1.0)
+        assert stub_model.get_embeddings.call_count == 1
+
+    async def test_normalized_text_shares_entry(self, stub_model):
+        await generate_embedding("hiking,  cooking\n")
+        await generate_embedding("  hiking, cooking")
+        assert stub_model.get_embeddings.call_count == 1
+
+        await generate_embedding("Hiking, cooking")  # case is significant
+        assert stub_model.get_embeddings.call_count == 2
+
+    def test_normalization_form(self):
+        assert normalize_embedding_text("café  au\tlait ") == "café au lait"
+
+    async def test_failures_not_cached(self, stub_model):
+        stub_model.get_embeddings.side_effect = [
+            RuntimeError("quota"),
+            [MagicMock(values=_vector(0.5))],
+        ]
+        assert await generate_embedding("hiking") is None
+        assert await generate_embedding("hiking") == _vector(0.5)
+        assert stub_model.get_embeddings.call_count == 2
+
+    async def test_returned_vector_is_a_copy(self, stub_model):
+        vector = await generate_embedding("hiking")
+        vector[0] = 99.0
+        assert (await generate_embedding("hiking"))[0] == 1.0
+
+    async def test_entries_expire(self, stub_model):
+        await generate_embedding("hiking")
+        with patch.object(embedding._memory_cache, "ttl", 0):
+            await generate_embedding("hiking")
+        assert stub_model.get_embeddings.call_count == 2
+
+    async def test_bounded_lru(self, stub_model):
+        with patch.object(embedding._memory_cache, "max_entries", 2):
+            for text in ("a", "b", "a", "c"):
+                await generate_embedding(text)
+            await generate_embedding("a")  # recently used, kept
+            await generate_embedding("b")  # evicted by "c"
+
+        assert stub_model.get_embeddings.call_count == 4
+        assert embedding._memory_cache.stats()["evictions"] >= 1
+
+    async def test_stored_as_float32(self, stub_model):
+        await generate_embedding("hiking")
+        stored = embedding._memory_cache.get(embedding._cache_key("hiking"))
+
+        assert stored.dtype == np.float32
+        assert stored.nbytes == EMBEDDING_DIMENSION * 4
+        cached = await generate_embedding("hiking")
+        assert type(cached) is list and type(cached[0]) is float
+
+
+# ===================================================================
+# 2. Disk tier
+# ===================================================================
+
+class TestDiskTier:
+    """Cached embeddings survive a restart when EMBEDDING_CACHE_PATH is set."""
+
+    async def test_hit_survives_restart(self, stub_model, disk_path):
+        original = await generate_embedding("hiking, cooking")
+
+        _reset_embedding_cache()  # new process: memory gone, disk kept
+        again = await generate_embedding("hiking, cooking")
+
+        assert again == original
+        assert stub_model.get_embeddings.call_count == 1
+        stats = get_embedding_cache_stats()
+        assert stats["disk"]["hits"] == 1
+
+    async def test_disk_hit_promoted_to_memory(self, stub_model, disk_path):
+        await generate_embedding("hiking")
+        _reset_embedding_cache()
+        await generate_embedding("hiking")
+        await generate_embedding("hiking")
+
+        stats = get_embedding_cache_stats()
+        assert stats["disk"]["hits"] == 1
+        assert stats["memory"]["hits"] == 1
+
+    async def test_expired_rows_ignored(self, stub_model, disk_path):
+        with patch("app.services.embedding.EMBEDDING_CACHE_TTL", -1):
+            await generate_embedding("hiking")
+        _reset_embedding_cache()
+        await generate_embedding("hiking")
+
+        assert stub_model.get_embeddings.call_count == 2
+
+    async def test_served_without_vertex(self, stub_model, disk_path):
+        vector = await generate_embedding("hiking")
+        _reset_embedding_cache()
+
+        with patch("app.services.embedding._get_model", return_value=None):
+            assert await generate_embedding("hiking") == vector
+
+    async def test_unusable_path_degrades_to_memory(self, stub_model, tmp_path):
+        blocker = tmp_path / "not-a-dir"
+        blocker.write_text("")
+        with patch(
+            "app.services.embedding.EMBEDDING_CACHE_PATH", str(blocker / "db.sqlite3"),
+        ):
+            _reset_embedding_cache()
+            assert await generate_embedding("hiking") == _vector(1.0)
+            assert await generate_embedding("hiking") == _vector(1.0)
+            stats = get_embedding_cache_stats()
+            _reset_embedding_cache()
+
+        assert stub_model.get_embeddings.call_count == 1
+        assert stats["memory"]["hits"] == 1
+        assert stats["disk"]["errors"] >= 1
+
+    async def test_corrupt_row_dropped(self, stub_model, disk_path):
+        await generate_embedding("hiking")
+        _reset_embedding_cache()
+        disk = embedding._get_disk_tier()
+        disk._connect().execute(f"UPDATE {disk.table} SET value = '[0.5, 0.'")
+
+        assert await generate_embedding("hiking") == _vector(2.0)
+        row_count = disk._connect().execute(f"SELECT COUNT(*) FROM {disk.table}").fetchone()[0]
+        stats = get_embedding_cache_stats()
+
+        assert stats["disk"]["errors"] == 1
+        assert stats["disk"]["hits"] == 0
+        assert row_count == 1  # replaced by the fresh embedding
+
+
+# ===================================================================
+# 3. Stats
+# ===================================================================
+
+class TestCacheStats:
+    """Per-tier counters for sizing the cache."""
+
+    async def test_memory_hit_rate(self, stub_model):
+        for _ in range(4):
+            await generate_embedding("hiking")
+
+        stats = get_embedding_cache_stats()
+        assert stats["memory"]["hits"] == 3
+        assert stats["memory"]["misses"] == 1
+        assert stats["memory"]["hit_rate"] == 0.75
+        assert stats["disk"] is None
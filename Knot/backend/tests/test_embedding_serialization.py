@@ -0,0 +1,185 @@
+"""
+Tests for pgvector embedding serialization (app.services.embedding).
+
+Covers:
+1. format_embedding_for_pgvector — fixed-precision text, lists and NumPy
+   arrays encode identically, payload size vs. str() per float
+2. parse_pgvector_embedding — pgvector text, lists, NULL, malformed input
+3. Round trip — values within float4 precision, cosine ranking preserved
+4. Benchmark — encode/decode throughput vs. the previous implementation
+
+Run with: pytest tests/test_embedding_serialization.py -v
+"""
+
+import json
+import random
+import time
+
+import numpy as np
+import pytest
+
+from app.services.embedding import (
+    EMBEDDING_DIMENSION,
+    format_embedding_for_pgvector,
+    parse_pgvector_embedding,
+)
+
+
+def _random_embedding(seed: int = 11) -> list[float]:
+    """A unit-ish embedding with the spread of real Vertex AI output."""
+    rng = random.Random(seed)
+    return [rng.gauss(0.0, 0.036) for _ in range(EMBEDDING_DIMENSION)]
+
+
+def _legacy_format(embedding: list[float]) -> str:
+    """The previous encoder: repr-precision str() per float."""
+    return "[" + ",".join(str(x) for x in embedding) + "]"
+
+
+def _legacy_parse(value: str) -> np.ndarray:
+    """The previous decoder: json.loads, then a float32 array."""
+    return np.asarray(json.loads(value), dtype=np.float32)
+
+
+def _cosine(a, b) -> float:
+    a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    return float(a @ b / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+# ===================================================================
+# 1. Encoding
+# ===================================================================
+
+class TestFormatEmbedding:
+    def test_fixed_precision_components(self):
+        result = format_embedding_for_pgvector([0.1, 1 / 3, -2.5e-5, 0.0])
+        assert result == "[0.1,0.3333333,-2.5e-05,0]"
+
+    def test_numpy_array_matches_list(self):
+        embedding = _random_embedding()
+        as_list = format_embedding_for_pgvector(embedding)
+        assert format_embedding_for_pgvector(np.asarray(embedding)) == as_list
+        assert format_embedding_for_pgvector(
+            np.asarray(embedding, dtype=np.float32)
+        ) == format_embedding_for_pgvector(np.float32(embedding).tolist())
+
+    def test_output_is_valid_json_array(self):
+        embedding = _random_embedding()
+        values = json.loads(format_embedding_for_pgvector(embedding))
+        assert len(values) == EMBEDDING_DIMENSION
+
+    def test_payload_smaller_than_str_per_float(self):
+        embedding = _random_embedding()
+        compact = len(format_embedding_for_pgvector(embedding))
+        legacy = len(_legacy_format(embedding))
+        print(f"  payload: {compact} chars vs {legacy} ({compact / legacy:.0%})")
+        assert compact < legacy * 0.65
+
+
+# ===================================================================
+# 2. Decoding
+# ===================================================================
+
+class TestParseEmbedding:
+    def test_parses_pgvector_text(self):
+        vector = parse_pgvector_embedding("[0.5,-1,2e-3]")
+        assert vector.dtype == np.float32
+        np.testing.assert_allclose(vector, [0.5, -1.0, 0.002], rtol=1e-6)
+
+    def test_tolerates_whitespace(self):
+        vector = parse_pgvector_embedding(" [0.5, 0.25] ")
+        np.testing.assert_array_equal(vector, [0.5, 0.25])
+
+    def test_accepts_lists(self):
+        vector = parse_pgvector_embedding([0.5, 0.25])
+        assert vector.dtype == np.float32
+        np.testing.assert_array_equal(vector, [0.5, 0.25])
+
+    def test_null_is_none(self):
+        assert parse_pgvector_embedding(None) is None
+
+    def test_empty_vector(self):
+        assert parse_pgvector_embedding("[]").size == 0
+
+    @pytest.mark.parametrize("value", ["0.5,0.25", "[0.5,,0.25]", "[0.5,abc]", "["])
+    def test_malformed_text_raises(self, value):
+        with pytest.raises(ValueError):
+            parse_pgvector_embedding(value)
+
+
+# ===================================================================
+# 3. Round trip
+# ===================================================================
+
+class TestRoundTrip:
+    def test_within_float4_precision(self):
+        embedding = np.asarray(_random_embedding(), dtype=np.float64)
+        decoded = parse_pgvector_embedding(format_embedding_for_pgvector(embedding))
+
+        assert decoded.shape == (EMBEDDING_DIMENSION,)
+        # pgvector stores float4 (24-bit mantissa, rel. error ~6e-8); 7
+        # significant digits add at most 5e-7 relative error on top
+        np.testing.assert_allclose(decoded, embedding, rtol=1e-6, atol=0)
+
+    def test_cosine_similarity_preserved(self):
+        query = _random_embedding(seed=1)
+        hints = [_random_embedding(seed=s) for s in range(2, 42)]
+        round_tripped = [
+            parse_pgvector_embedding(format_embedding_for_pgvector(h)) for h in hints
+        ]
+
+        exact = [_cosine(query, h) for h in hints]
+        decoded = [_cosine(query, h) for h in round_tripped]
+
+        assert max(abs(a - b) for a, b in zip(exact, decoded)) < 1e-6
+        assert np.argsort(exact).tolist() == np.argsort(decoded).tolist()
+
+    def test_legacy_text_still_parses(self):
+        """Rows written by the previous encoder decode the same way."""
+        embedding = _random_embedding()
+        np.testing.assert_array_equal(
+            parse_pgvector_embedding(_legacy_format(embedding)),
+            np.asarray(embedding, dtype=np.float32),
+        )
+
+
+# ===================================================================
+# 4. Benchmark: encode/decode throughput
+# ===================================================================
+
+class TestSerializationBenchmark:
+    N = 300
+
+    def _time(self, fn, arg) -> float:
+        """Best-of-3 microseconds per call."""
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            for _ in range(self.N):
+                fn(arg)
+            best = min(best, (time.perf_counter() - start) / self.N)
+        return best * 1e6
+
+    def test_encode_faster_than_str_per_float(self):
+        embedding = _random_embedding()
+        array = np.asarray(embedding, dtype=np.float32)
+
+        new_us = self._time(format_embedding_for_pgvector, embedding)
+        array_us = self._time(format_embedding_for_pgvector, array)
+        legacy_us = self._time(_legacy_format, embedding)
+
+        print(f"  encode: {new_us:.0f}us (ndarray {array_us:.0f}us) vs "
+              f"{legacy_us:.0f}us ({legacy_us / new_us:.1f}x)")
+        assert new_us < legacy_us / 1.5
+
+    def test_decode_throughput(self):
+        text = format_embedding_for_pgvector(_random_embedding())
+
+        new_us = self._time(parse_pgvector_embedding, text)
+        legacy_us = self._time(_legacy_parse, text)
+
+        print(f"  decode: {new_us:.0f}us vs json.loads {legacy_us:.0f}us "
+              f"({legacy_us / new_us:.1f}x)")
+        # Parsing straight to float32 skips the list of Python floats;
+        # generous bound so scheduler noise can't fail the suite
+        assert new_us < legacy_us * 1.5
@@ -0,0 +1,346 @@
+"""
+Tests for exact in-process hint search (app.services.hint_index).
+
+Covers:
+1. VaultHintIndex.search — same ranking as a brute-force cosine scan,
+   threshold and max_count, hints without usable embeddings left out
+2. Hint retrieval — the vault's matrix is loaded once and reused, full
+   MAX_HINTS results, fallback to match_hints() for large vaults (sized
+   by a count-only query, so their embeddings are never fetched), load
+   failures and HINT_SEARCH_MODE="rpc"
+3. Invalidation — hint create and delete drop the vault's cached index
+4. Benchmark — warm exact search vs. the match_hints() RPC path
+
+All database calls are mocked.
+
+Run with: pytest tests/test_hint_index.py -v
+"""
+
+import asyncio
+import math
+import random
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+
+from app.agents.hint_retrieval import MAX_HINTS, _semantic_search
+from app.api import hints as hints_api
+from app.models.hints import HintCreateRequest
+from app.services.hint_index import (
+    build_hint_index,
+    cache_hint_index,
+    get_cached_hint_index,
+    get_hint_index_stats,
+    hint_index_version,
+)
+from app.services.lru_cache import MISS
+
+VAULT_ID = "vault-index-001"
+DIM = 768
+
+
+def _random_vector(rng: random.Random) -> list[float]:
+    return [rng.uniform(-1, 1) for _ in range(DIM)]
+
+
+def _hint_rows(n: int, seed: int = 7, as_text: bool = True) -> list[dict]:
+    """Hint rows as PostgREST returns them (embedding as pgvector text)."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        vector = _random_vector(rng)
+        rows.append({
+            "id": f"hint-{i:03d}",
+            "hint_text": f"hint {i}",
+            "source": "text_input",
+            "is_used": False,
+            "created_at": "2026-01-01T00:00:00+00:00",
+            "hint_embedding": "[" + ",".join(str(v) for v in vector) + "]" if as_text else vector,
+        })
+    return rows
+
+
+def _brute_force(rows: list[dict], query: list[float], k: int) -> list[tuple[str, float]]:
+    def cosine(a, b):
+        dot = sum(x * y for x, y in zip(a, b))
+        return dot / (math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b)))
+
+    scored = [(row["id"], cosine(row["hint_embedding"], query)) for row in rows]
+    return sorted(scored, key=lambda item: -item[1])[:k]
+
+
+def _table_result(client: MagicMock, rows: list[dict]) -> MagicMock:
+    """What a table() query returns: the count for head queries, else `rows`."""
+    if client.table.return_value.select.call_args.kwargs.get("head"):
+        return MagicMock(data=[], count=len(rows))
+    return MagicMock(data=rows, count=None)
+
+
+def _mock_hints_db(rows: list[dict], rpc_rows: list[dict] | None = None, delay: float = 0.0):
+    """Patch hint_retrieval's client: table() queries return `rows`, rpc() `rpc_rows`."""
+    client = MagicMock()
+
+    async def _run(query):
+        if delay:
+            await asyncio.sleep(delay)
+        if query is client.rpc.return_value:
+            return MagicMock(data=rpc_rows or [])
+        return _table_result(client, rows)
+
+    builder = client.table.return_value
+    builder.select.return_value = builder
+    builder.eq.return_value = builder
+    builder.limit.return_value = builder
+    return (
+        patch("app.agents.hint_retrieval.get_service_client", return_value=client),
+        patch("app.agents.hint_retrieval.run_query", side_effect=_run),
+        client,
+    )
+
+
+# ===================================================================
+# 1. VaultHintIndex.search
+# ===================================================================
+
+class TestVaultHintIndex:
+    """Exact cosine ranking over one vault's matrix."""
+
+    def test_matches_brute_force_ranking(self):
+        rows = _hint_rows(60, as_text=False)
+        query = _random_vector(random.Random(99))
+        index = build_hint_index(rows)
+
+        results = index.search(query, max_count=10)
+
+        expected = _brute_force(rows, query, 10)
+        assert [row["id"] for row, _ in results] == [hint_id for hint_id, _ in expected]
+        for (_, got), (_, want) in zip(results, expected):
+            assert got == pytest.approx(want, abs=1e-5)
+
+    def test_decodes_pgvector_text(self):
+        index = build_hint_index(_hint_rows(3))
+        assert len(index) == 3
+        assert index.matrix.dtype == np.float32
+        assert np.allclose(np.linalg.norm(index.matrix, axis=1), 1.0, atol=1e-5)
+        assert "hint_embedding" not in index.rows[0]
+
+    def test_threshold_and_max_count(self):
+        rows = [
+            {"id": "same", "hint_text": "a", "hint_embedding": [1.0, 0.0]},
+            {"id": "close", "hint_text": "b", "hint_embedding": [1.0, 0.2]},
+            {"id": "orthogonal", "hint_text": "c", "hint_embedding": [0.0, 1.0]},
+            {"id": "opposite", "hint_text": "d", "hint_embedding": [-1.0, 0.0]},
+        ]
+        index = build_hint_index(rows)
+
+        assert [r["id"] for r, _ in index.search([1.0, 0.0], 10, threshold=0.5)] == [
+            "same", "close",
+        ]
+        assert [r["id"] for r, _ in index.search([1.0, 0.0], 1)] == ["same"]
+        assert index.search([1.0, 0.0], 10)[0][1] == pytest.approx(1.0)
+
+    def test_unusable_embeddings_left_out(self):
+        rows = [
+            {"id": "null", "hint_text": "a", "hint_embedding": None},
+            {"id": "zero", "hint_text": "b", "hint_embedding": [0.0, 0.0]},
+            {"id": "ok", "hint_text": "c", "hint_embedding": [0.3, 0.4]},
+        ]
+        index = build_hint_index(rows)
+        assert [r["id"] for r in index.rows] == ["ok"]
+
+    def test_empty_vault_and_zero_query(self):
+        assert build_hint_index([]).search([1.0, 0.0], 10) == []
+        index = build_hint_index([{"id": "a", "hint_text": "a", "hint_embedding": [1.0, 0.0]}])
+        assert index.search([0.0, 0.0], 10) == []
+
+
+# ===================================================================
+# 2. Hint retrieval (exact mode)
+# ===================================================================
+
+class TestExactSemanticSearch:
+    """_semantic_search serves vaults from the cached matrix."""
+
+    async def test_loads_vault_once(self):
+        rows = _hint_rows(25)
+        query = _random_vector(random.Random(1))
+        table_patch, run_patch, client = _mock_hints_db(rows)
+        with table_patch, run_patch as run:
+            first = await _semantic_search(VAULT_ID, query)
+            second = await _semantic_search(VAULT_ID, query)
+
+        assert run.await_count == 2  # count, then embeddings; second search is cached
+        client.table.return_value.eq.assert_called_with("vault_id", VAULT_ID)
+        client.rpc.assert_not_called()
+        assert len(first) == MAX_HINTS
+        assert [h.id for h in first] == [h.id for h in second]
+        assert first[0].similarity_score >= first[-1].similarity_score
+        assert get_hint_index_stats()["hits"] == 1
+
+    async def test_large_vault_uses_rpc(self):
+        rpc_rows = [{"id": "rpc-1", "hint_text": "from rpc", "similarity": 0.9}]
+        table_patch, run_patch, client = _mock_hints_db(_hint_rows(4), rpc_rows)
+        with table_patch, run_patch, \
+             patch("app.agents.hint_retrieval.HINT_INDEX_MAX_HINTS", 3):
+            hints = await _semantic_search(VAULT_ID, [0.1] * DIM)
+            again = await _semantic_search(VAULT_ID, [0.1] * DIM)
+
+        assert [h.id for h in hints] == [h.id for h in again] == ["rpc-1"]
+        # Cached as "too large", so the second search skips the table load
+        assert get_cached_hint_index(VAULT_ID) is None
+        assert client.table.call_count == 1
+        # Only the count query ran; no embeddings were fetched
+        client.table.return_value.select.assert_called_once_with(
+            "id", count="exact", head=True,
+        )
+
+    async def test_vault_grown_past_count_uses_rpc(self):
+        rpc_rows = [{"id": "rpc-1", "hint_text": "from rpc", "similarity": 0.9}]
+        client = MagicMock()
+
+        async def _run(query):
+            if query is client.rpc.return_value:
+                return MagicMock(data=rpc_rows)
+            if client.table.return_value.select.call_args.kwargs.get("head"):
+                return MagicMock(data=[], count=3)
+            return MagicMock(data=_hint_rows(4))  # hints landed after the count
+
+        with patch("app.agents.hint_retrieval.get_service_client", return_value=client), \
+             patch("app.agents.hint_retrieval.run_query", side_effect=_run), \
+             patch("app.agents.hint_retrieval.HINT_INDEX_MAX_HINTS", 3):
+            hints = await _semantic_search(VAULT_ID, [0.1] * DIM)
+
+        assert [h.id for h in hints] == ["rpc-1"]
+        assert get_cached_hint_index(VAULT_ID) is None
+
+    async def test_load_failure_falls_back_to_rpc(self):
+        rpc_rows = [{"id": "rpc-1", "hint_text": "from rpc", "similarity": 0.9}]
+        client = MagicMock()
+
+        async def _run(query):
+            if query is client.rpc.return_value:
+                return MagicMock(data=rpc_rows)
+            raise RuntimeError("statement timeout")
+
+        with patch("app.agents.hint_retrieval.get_service_client", return_value=client), \
+             patch("app.agents.hint_retrieval.run_query", side_effect=_run):
+            hints = await _semantic_search(VAULT_ID, [0.1] * DIM)
+
+        assert [h.id for h in hints] == ["rpc-1"]
+        assert get_cached_hint_index(VAULT_ID) is MISS
+
+    async def test_rpc_mode(self):
+        rpc_rows = [{"id": "rpc-1", "hint_text": "from rpc", "similarity": 0.9}]
+        table_patch, run_patch, client = _mock_hints_db(_hint_rows(5), rpc_rows)
+        with table_patch, run_patch, \
+             patch("app.agents.hint_retrieval.HINT_SEARCH_MODE", "rpc"):
+            hints = await _semantic_search(VAULT_ID, [0.1] * DIM)
+
+        assert [h.id for h in hints] == ["rpc-1"]
+        client.table.assert_not_called()
+
+    async def test_invalidated_during_load_not_cached(self):
+        rows = _hint_rows(3, as_text=False)
+        table_patch, _, client = _mock_hints_db(rows)
+
+        async def _load_then_write(query):
+            hints_api.invalidate_hint_index(VAULT_ID)  # a hint lands mid-load
+            return _table_result(client, rows)
+
+        with table_patch, patch(
+            "app.agents.hint_retrieval.run_query", side_effect=_load_then_write,
+        ):
+            hints = await _semantic_search(VAULT_ID, rows[0]["hint_embedding"])
+
+        assert hints[0].id == "hint-000"
+        assert get_cached_hint_index(VAULT_ID) is MISS
+
+
+# ===================================================================
+# 3. Invalidation on hint writes
+# ===================================================================
+
+def _cache_index_for_vault():
+    cache_hint_index(VAULT_ID, build_hint_index(_hint_rows(2)), hint_index_version(VAULT_ID))
+    assert get_cached_hint_index(VAULT_ID) is not MISS
+
+
+class TestHintWriteInvalidation:
+    """Creating or deleting a hint drops the vault's cached index."""
+
+    async def test_create_hint_invalidates(self):
+        _cache_index_for_vault()
+        created = {
+            "id": "hint-new", "hint_text": "She wants a record player",
+            "source": "text_input", "is_used": False,
+            "created_at": "2026-01-01T00:00:00+00:00",
+        }
+        run = AsyncMock(side_effect=[
+            MagicMock(data=[{"id": VAULT_ID}]),
+            MagicMock(data=[created]),
+        ])
+        with patch("app.api.hints.get_service_client", return_value=MagicMock()), \
+             patch("app.api.hints.run_query", run), \
+             patch("app.api.hints.generate_embedding", new_callable=AsyncMock, return_value=None), \
+             patch("app.core.config.is_qstash_configured", return_value=False):
+            await hints_api.create_hint(
+                HintCreateRequest(hint_text="She wants a record player"), user_id="user-1",
+            )
+
+        assert get_cached_hint_index(VAULT_ID) is MISS
+
+    async def test_delete_hint_invalidates(self):
+        _cache_index_for_vault()
+        run = AsyncMock(side_effect=[
+            MagicMock(data=[{"id": VAULT_ID}]),
+            MagicMock(data=[{"id": "hint-000"}]),
+            MagicMock(data=[]),
+        ])
+        with patch("app.api.hints.get_service_client", return_value=MagicMock()), \
+             patch("app.api.hints.run_query", run):
+            await hints_api.delete_hint("hint-000", user_id="user-1")
+
+        assert get_cached_hint_index(VAULT_ID) is MISS
+
+
+# ===================================================================
+# 4. Benchmark: exact search vs. the match_hints() RPC
+# ===================================================================
+
+class TestExactSearchBenchmark:
+    async def test_warm_exact_search_faster_than_rpc(self):
+        """
+        A 300-hint vault. The RPC stub adds 10ms per call, well under a real
+        PostgREST round trip plus HNSW scan, so the speedup is a lower bound.
+        """
+        n = 30
+        rows = _hint_rows(300)
+        rpc_rows = [
+            {"id": r["id"], "hint_text": r["hint_text"], "similarity": 0.5}
+            for r in rows[:MAX_HINTS]
+        ]
+        rng = random.Random(3)
+        queries = [_random_vector(rng) for _ in range(n)]
+
+        table_patch, run_patch, _ = _mock_hints_db(rows, rpc_rows, delay=0.01)
+        with table_patch, run_patch:
+            start = time.perf_counter()
+            await _semantic_search(VAULT_ID, queries[0])
+            cold_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            for query in queries:
+                assert len(await _semantic_search(VAULT_ID, query)) == MAX_HINTS
+            exact_ms = (time.perf_counter() - start) * 1000 / n
+
+            with patch("app.agents.hint_retrieval.HINT_SEARCH_MODE", "rpc"):
+                start = time.perf_counter()
+                for query in queries:
+                    await _semantic_search(VAULT_ID, query)
+                rpc_ms = (time.perf_counter() - start) * 1000 / n
+
+        print(f"  exact={exact_ms:.3f}ms/query (cold load {cold_ms:.1f}ms), "
+              f"rpc={rpc_ms:.3f}ms/query ({rpc_ms / exact_ms:.0f}x)")
+        assert exact_ms < rpc_ms / 5
@@ -901,7 +901,7 @@ class TestEmbeddingWithMock:
             )
 
         assert resp.status_code == 201
-        mock_embedding.assert_called_once_with("She wants a spa day")
+        mock_embedding.assert_called_once_with("She wants a spa day", use_cache=False)
         print("  generate_embedding() called with exact hint text")
 
     def test_stripped_text_used_for_embedding(
@@ -919,7 +919,7 @@ class TestEmbeddingWithMock:
 
         assert resp.status_code == 201
         # Pydantic strips whitespace, so the embedding should receive stripped text
-        mock_embedding.assert_called_once_with("She wants flowers")
+        mock_embedding.assert_called_once_with("She wants flowers", use_cache=False)
         print("  Stripped text passed to embedding service")
 
 
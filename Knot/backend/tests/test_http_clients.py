@@ -0,0 +1,184 @@
+"""
+Tests for the application-lifetime HTTP client registry (app.core.http_clients).
+
+Covers:
+1. Connection reuse — while the registry is open, repeated calls to the
+   same upstream share one keep-alive TCP connection; the per-call
+   fallback opens a new connection every time
+2. Per-upstream configuration (pool limits, keep-alive, HTTP/2, timeouts)
+3. Lifecycle — the FastAPI lifespan opens and closes the registry
+
+The reuse tests run against a tiny local HTTP/1.1 server that counts
+accepted TCP connections, so they exercise real sockets without network
+access.
+
+Run with: pytest tests/test_http_clients.py -v
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import http_clients
+from app.core.http_clients import (
+    UPSTREAMS,
+    close_http_clients,
+    http_clients_open,
+    open_http_clients,
+    upstream_client,
+)
+
+
+class _KeepAliveServer:
+    """Minimal HTTP/1.1 keep-alive server that counts TCP connections."""
+
+    def __init__(self):
+        self.connections = 0
+        self.requests = 0
+        self._server: asyncio.AbstractServer | None = None
+
+    async def __aenter__(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._server.close()
+        await self._server.wait_closed()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/"
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                if not head:
+                    break
+                self.requests += 1
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Length: 2\r\n"
+                    b"Connection: keep-alive\r\n\r\nok"
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+
+@pytest.fixture
+async def registry():
+    """An open registry, closed again after the test."""
+    await open_http_clients()
+    yield
+    await close_http_clients()
+
+
+# ===================================================================
+# 1. Connection reuse
+# ===================================================================
+
+class TestConnectionReuse:
+    """Shared clients keep connections alive across calls."""
+
+    async def test_shared_client_reuses_one_connection(self, registry):
+        async with _KeepAliveServer() as server:
+            for _ in range(5):
+                async with upstream_client("brave") as client:
+                    response = await client.get(server.url)
+                    assert response.text == "ok"
+
+        assert server.requests == 5
+        assert server.connections == 1
+
+    async def test_per_call_fallback_opens_new_connections(self):
+        assert not http_clients_open()
+        async with _KeepAliveServer() as server:
+            for _ in range(5):
+                async with upstream_client("brave") as client:
+                    await client.get(server.url)
+
+        assert server.requests == 5
+        assert server.connections == 5
+
+    async def test_same_client_object_across_calls(self, registry):
+        async with upstream_client("qstash") as first:
+            pass
+        async with upstream_client("qstash") as second:
+            pass
+
+        assert first is second
+        assert not first.is_closed  # leaving the context doesn't close it
+
+    async def test_upstreams_get_separate_clients(self, registry):
+        async with upstream_client("brave") as brave:
+            pass
+        async with upstream_client("merchants") as merchants:
+            pass
+
+        assert brave is not merchants
+
+    async def test_close_releases_clients(self):
+        await open_http_clients()
+        async with upstream_client("supabase") as client:
+            pass
+        await close_http_clients()
+
+        assert client.is_closed
+        assert not http_clients_open()
+
+
+# ===================================================================
+# 2. Per-upstream configuration
+# ===================================================================
+
+class TestUpstreamConfig:
+    """Each upstream has its own pool limits, keep-alive and timeout."""
+
+    def test_required_upstreams_configured(self):
+        for name in ("brave", "supabase", "qstash", "apns", "merchants"):
+            assert name in UPSTREAMS
+
+    def test_apns_uses_http2(self):
+        kwargs = http_clients._client_kwargs("apns", None)
+        assert kwargs["http2"] is True
+
+    def test_pool_limits_applied(self):
+        config = UPSTREAMS["merchants"]
+        limits = http_clients._client_kwargs("merchants", None)["limits"]
+        assert isinstance(limits, httpx.Limits)
+        assert limits.max_connections == config.max_connections
+        assert limits.max_keepalive_connections == config.max_keepalive_connections
+        assert limits.keepalive_expiry == config.keepalive_expiry
+
+    def test_explicit_timeout_overrides_default(self):
+        assert http_clients._client_kwargs("yelp", 3.0)["timeout"] == 3.0
+        assert http_clients._client_kwargs("firecrawl", None)["timeout"] == 15.0
+
+    async def test_unknown_upstream_rejected(self):
+        with pytest.raises(KeyError):
+            async with upstream_client("not-an-upstream"):
+                pass
+
+
+# ===================================================================
+# 3. Application lifecycle
+# ===================================================================
+
+class TestLifespan:
+    """The FastAPI lifespan hook owns the registry."""
+
+    def test_lifespan_opens_and_closes_registry(self):
+        from app.main import app
+
+        assert not http_clients_open()
+        with TestClient(app) as client:
+            assert http_clients_open()
+            assert client.get("/health").status_code == 200
+        assert not http_clients_open()
@@ -0,0 +1,524 @@
+"""
+Tests for the recommendation pipeline's end-to-end latency budget
+(app.agents.budget, RecommendationState.deadline).
+
+Covers:
+1. Budget helpers — deadlines, remaining time, degradation collection
+2. Runners — the deadline is stamped once per run; a caller's deadline is kept
+3. Generation — Claude retries stop once the budget can't cover another call
+4. Briefing — skipped when the budget is low, dropped at the deadline
+5. URL resolution — skipped when the budget is low, cut off at the deadline
+6. Availability — failing slots fall back to ideas instead of swaps; the
+   Claude price call is skipped or cut off
+7. Full pipeline — slowed stubs everywhere still finish near the deadline,
+   and degradations from both branches reach the final state and the API
+   response
+
+Claude, Brave and merchant pages are replaced with slowed stubs; no network
+access.
+
+Run with: pytest tests/test_latency_budget.py -v
+"""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.agents.availability import verify_availability
+from app.agents.briefing_node import generate_briefing
+from app.agents.budget import (
+    CAPPED_RETRIES,
+    IDEAS_INSTEAD_OF_SWAPS,
+    SKIPPED_BRIEFING,
+    SKIPPED_PRICE_VERIFICATION,
+    SKIPPED_URL_RESOLUTION,
+    collect_degradations,
+    has_budget,
+    note_degradation,
+    pipeline_deadline,
+    remaining,
+)
+from app.agents.pipeline import (
+    run_recommendation_pipeline,
+    stream_recommendation_pipeline,
+)
+from app.agents.state import (
+    BudgetRange,
+    CandidateRecommendation,
+    MilestoneContext,
+    RecommendationState,
+    VaultData,
+)
+from app.agents.unified_generation_node import generate_unified
+from app.agents.url_resolution import resolve_purchase_urls
+from app.models.recommendations import RecommendationGenerateResponse
+from app.services.unified_generation import (
+    MAX_RETRIES,
+    generate_unified_recommendations,
+    stream_unified_recommendations,
+)
+
+SLOW = 5.0  # seconds a stalled stub would take; far past any test deadline
+
+
+def _candidate(
+    cid: str,
+    url: str | None = None,
+    is_idea: bool = False,
+    final_score: float = 1.0,
+) -> CandidateRecommendation:
+    return CandidateRecommendation(
+        id=cid,
+        source="unified",
+        type="idea" if is_idea else "gift",
+        title=f"Card {cid}",
+        description="A recommendation",
+        price_cents=None if is_idea else 5000,
+        external_url=url,
+        merchant_name=None if is_idea else "Shop",
+        search_query=None if is_idea else f"buy {cid}",
+        is_idea=is_idea,
+        final_score=final_score,
+    )
+
+
+def _state(
+    seconds_left: float | None = None,
+    selected: list[CandidateRecommendation] | None = None,
+    backups: list[CandidateRecommendation] | None = None,
+    with_milestone: bool = False,
+) -> RecommendationState:
+    return RecommendationState(
+        vault_data=VaultData(
+            vault_id="vault-latency-budget",
+            partner_name="Alex",
+            relationship_tenure_months=24,
+            cohabitation_status="living_together",
+            location_city="Austin",
+            location_state="TX",
+            location_country="US",
+            interests=["Cooking", "Travel", "Music", "Art", "Hiking"],
+            dislikes=["Gaming", "Cars", "Skiing", "Karaoke", "Surfing"],
+            vibes=["quiet_luxury"],
+            primary_love_language="quality_time",
+            secondary_love_language="receiving_gifts",
+            budgets=[],
+        ),
+        occasion_type="just_because",
+        budget_range=BudgetRange(min_amount=2000, max_amount=10000),
+        milestone_context=MilestoneContext(
+            id="milestone-budget-001",
+            milestone_type="birthday",
+            milestone_name="Alex's Birthday",
+            milestone_date="2000-03-15",
+            recurrence="yearly",
+            budget_tier="major_milestone",
+            days_until=10,
+        ) if with_milestone else None,
+        final_three=selected or [],
+        filtered_recommendations=backups or [],
+        deadline=None if seconds_left is None else time.monotonic() + seconds_left,
+    )
+
+
+async def _stall(*args, **kwargs):
+    await asyncio.sleep(SLOW)
+
+
+# ===================================================================
+# 1. Budget helpers
+# ===================================================================
+
+class TestBudgetHelpers:
+    def test_disabled_budget_has_no_deadline(self):
+        assert pipeline_deadline(0) is None
+        assert remaining(None) is None
+        assert has_budget(None, 1_000_000)
+
+    def test_deadline_and_remaining(self):
+        deadline = pipeline_deadline(30)
+        assert 29 < remaining(deadline) <= 30
+        assert has_budget(deadline, 10)
+        assert not has_budget(deadline, 31)
+
+    def test_remaining_never_negative(self):
+        assert remaining(time.monotonic() - 5) == 0.0
+
+    def test_collects_unique_degradations_in_order(self):
+        with collect_degradations() as collected:
+            note_degradation(SKIPPED_BRIEFING)
+            note_degradation(CAPPED_RETRIES)
+            note_degradation(SKIPPED_BRIEFING)
+        assert collected == [SKIPPED_BRIEFING, CAPPED_RETRIES]
+
+    def test_note_outside_collector_is_ignored(self):
+        note_degradation(SKIPPED_BRIEFING)  # no error, nothing to collect into
+
+
+# ===================================================================
+# 2. Runners
+# ===================================================================
+
+class TestRunners:
+    async def test_run_stamps_deadline(self):
+        with patch("app.agents.pipeline.recommendation_graph") as graph, \
+             patch("app.agents.budget.PIPELINE_LATENCY_BUDGET_SECONDS", 30):
+            graph.ainvoke = AsyncMock(return_value={"final_three": []})
+            await run_recommendation_pipeline(_state())
+
+        sent = graph.ainvoke.await_args.args[0]
+        assert 29 < remaining(sent.deadline) <= 30
+
+    async def test_caller_deadline_kept(self):
+        state = _state(seconds_left=7)
+        with patch("app.agents.pipeline.recommendation_graph") as graph:
+            graph.ainvoke = AsyncMock(return_value={"final_three": []})
+            await run_recommendation_pipeline(state)
+
+        assert graph.ainvoke.await_args.args[0].deadline == state.deadline
+
+    async def test_budget_disabled(self):
+        with patch("app.agents.pipeline.recommendation_graph") as graph, \
+             patch("app.agents.budget.PIPELINE_LATENCY_BUDGET_SECONDS", 0):
+            graph.ainvoke = AsyncMock(return_value={"final_three": []})
+            await run_recommendation_pipeline(_state())
+
+        assert graph.ainvoke.await_args.args[0].deadline is None
+
+    async def test_stream_stamps_deadline(self):
+        seen = []
+
+        async def _astream(state, **kwargs):
+            seen.append(state)
+            yield "values", {"final_three": []}
+
+        with patch("app.agents.pipeline.recommendation_graph") as graph:
+            graph.astream = _astream
+            [item async for item in stream_recommendation_pipeline(_state())]
+
+        assert seen[0].deadline is not None
+
+
+# ===================================================================
+# 3. Generation retries
+# ===================================================================
+
+def _failing_claude() -> AsyncMock:
+    """A Claude client whose every generation attempt fails."""
+    bad = MagicMock()
+    bad.content = [MagicMock(text="not valid json {{")]
+    client = AsyncMock()
+    client.messages.create = AsyncMock(return_value=bad)
+    client.messages.stream = MagicMock(side_effect=RuntimeError("overloaded"))
+    return client
+
+
+class TestGenerationRetries:
+    @pytest.fixture
+    def claude(self):
+        client = _failing_claude()
+        with patch("app.services.unified_generation.get_claude_client", return_value=client), \
+             patch("app.services.unified_generation.is_anthropic_configured", return_value=True):
+            yield client
+
+    async def _generate(self, deadline):
+        state = _state()
+        return await generate_unified_recommendations(
+            vault_data=state.vault_data,
+            hints=[],
+            occasion_type="just_because",
+            budget_range=state.budget_range,
+            deadline=deadline,
+        )
+
+    async def test_retries_capped_near_deadline(self, claude):
+        with collect_degradations() as collected:
+            assert await self._generate(time.monotonic() + 1) == []
+
+        assert claude.messages.create.await_count == 1
+        assert collected == [CAPPED_RETRIES]
+
+    async def test_all_retries_without_deadline(self, claude):
+        with collect_degradations() as collected:
+            await self._generate(None)
+
+        assert claude.messages.create.await_count == MAX_RETRIES + 1
+        assert collected == []
+
+    async def test_streaming_retries_capped(self, claude):
+        state = _state()
+        with collect_degradations() as collected:
+            cards = [c async for c in stream_unified_recommendations(
+                vault_data=state.vault_data,
+                hints=[],
+                occasion_type="just_because",
+                budget_range=state.budget_range,
+                deadline=time.monotonic() + 1,
+            )]
+
+        assert cards == []
+        assert claude.messages.stream.call_count == 1
+        assert collected == [CAPPED_RETRIES]
+
+    async def test_node_reports_capped_retries(self, claude):
+        with patch("app.agents.unified_generation_node.UNIFIED_GENERATION_STREAMING", False):
+            result = await generate_unified(_state(seconds_left=1))
+
+        assert result["error"]
+        assert result["degradations"] == [CAPPED_RETRIES]
+
+
+# ===================================================================
+# 4. Briefing
+# ===================================================================
+
+class TestBriefing:
+    async def test_skipped_when_budget_low(self):
+        briefing = AsyncMock()
+        with patch("app.agents.briefing_node.generate_milestone_briefing", briefing):
+            result = await generate_briefing(_state(seconds_left=1, with_milestone=True))
+
+        briefing.assert_not_awaited()
+        assert result == {"degradations": [SKIPPED_BRIEFING]}
+
+    async def test_dropped_at_deadline(self):
+        with patch("app.agents.briefing_node.generate_milestone_briefing", side_effect=_stall), \
+             patch("app.agents.briefing_node.BRIEFING_MIN_SECONDS", 0):
+            start = time.perf_counter()
+            result = await generate_briefing(_state(seconds_left=0.2, with_milestone=True))
+            elapsed = time.perf_counter() - start
+
+        assert result == {"degradations": [SKIPPED_BRIEFING]}
+        assert elapsed < 0.5
+
+    async def test_runs_normally_with_budget(self):
+        briefing = AsyncMock(return_value=MagicMock(
+            briefing_text="Alex's birthday is in 10 days.",
+            briefing_snippet="Birthday in 10 days",
+            hint_ids_referenced=[],
+        ))
+        with patch("app.agents.briefing_node.generate_milestone_briefing", briefing):
+            result = await generate_briefing(_state(seconds_left=30, with_milestone=True))
+
+        assert result["briefing_text"] == "Alex's birthday is in 10 days."
+        assert "degradations" not in result
+
+
+# ===================================================================
+# 5. URL resolution
+# ===================================================================
+
+class TestUrlResolution:
+    async def test_skipped_when_budget_low(self):
+        resolve = AsyncMock()
+        with patch("app.agents.url_resolution.resolve_candidate_url", resolve):
+            result = await resolve_purchase_urls(
+                _state(seconds_left=1, selected=[_candidate("a")]),
+            )
+
+        resolve.assert_not_awaited()
+        assert result["degradations"] == [SKIPPED_URL_RESOLUTION]
+        assert result["final_three"][0].external_url is None
+
+    async def test_ideas_only_needs_no_budget(self):
+        result = await resolve_purchase_urls(
+            _state(seconds_left=0, selected=[_candidate("idea", is_idea=True)]),
+        )
+        assert "degradations" not in result
+
+    async def test_cut_off_at_deadline(self):
+        async def _resolve(candidate):
+            if candidate.id == "slow":
+                await _stall()
+            return candidate.model_copy(update={"external_url": "https://shop.example.com/a"})
+
+        with patch("app.agents.url_resolution.resolve_candidate_url", side_effect=_resolve), \
+             patch("app.agents.url_resolution.URL_RESOLUTION_MIN_SECONDS", 0):
+            start = time.perf_counter()
+            result = await resolve_purchase_urls(
+                _state(seconds_left=0.2, selected=[_candidate("fast"), _candidate("slow")]),
+            )
+            elapsed = time.perf_counter() - start
+
+        urls = [c.external_url for c in result["final_three"]]
+        assert urls == ["https://shop.example.com/a", None]
+        assert result["degradations"] == [SKIPPED_URL_RESOLUTION]
+        assert elapsed < 0.5
+
+
+# ===================================================================
+# 6. Availability
+# ===================================================================
+
+class _PageStubs:
+    """Merchant pages (alive unless listed dead) and a recorded backup lookup."""
+
+    def __init__(self, dead: set[str] = frozenset()):
+        self.dead = dead
+        self.resolved: list[str] = []
+
+    async def fetch(self, url, client):
+        return url not in self.dead, "Title: Item\nPage Text: $50"
+
+    async def resolve(self, candidate, client):
+        self.resolved.append(candidate.id)
+        return candidate.model_copy(
+            update={"external_url": f"https://shop.example.com/{candidate.id}"},
+        ), ""
+
+    async def run(self, state, claude, speculative=True, swap_min=None):
+        patches = [
+            patch("app.agents.availability.AVAILABILITY_SPECULATIVE_SWAPS", speculative),
+            patch("app.agents.availability._fetch_page", side_effect=self.fetch),
+            patch("app.agents.availability._resolve_and_verify", side_effect=self.resolve),
+            patch("app.agents.availability._verify_prices_with_claude", claude),
+        ]
+        if swap_min is not None:
+            patches.append(patch("app.agents.availability.SWAP_MIN_SECONDS", swap_min))
+        for p in patches:
+            p.start()
+        try:
+            start = time.perf_counter()
+            result = await verify_availability(state)
+            return result, time.perf_counter() - start
+        finally:
+            for p in patches:
+                p.stop()
+
+
+class TestAvailability:
+    @pytest.mark.parametrize("speculative", [True, False])
+    async def test_idea_instead_of_swap_when_budget_low(self, speculative):
+        stubs = _PageStubs(dead={"https://shop.example.com/dead"})
+        state = _state(
+            seconds_left=1,
+            selected=[_candidate("a", url="https://shop.example.com/dead")],
+            backups=[_candidate("b0", final_score=3.0), _candidate("idea", is_idea=True)],
+        )
+
+        result, _ = await stubs.run(state, AsyncMock(return_value={}), speculative)
+
+        assert [c.id for c in result["final_three"]] == ["idea"]
+        assert stubs.resolved == []
+        assert result["degradations"] == [IDEAS_INSTEAD_OF_SWAPS]
+
+    async def test_swaps_with_budget(self):
+        stubs = _PageStubs(dead={"https://shop.example.com/dead"})
+        state = _state(
+            seconds_left=30,
+            selected=[_candidate("a", url="https://shop.example.com/dead")],
+            backups=[_candidate("b0", final_score=3.0), _candidate("idea", is_idea=True)],
+        )
+
+        result, _ = await stubs.run(state, AsyncMock(return_value={}))
+
+        assert [c.id for c in result["final_three"]] == ["b0"]
+        assert "degradations" not in result
+
+    async def test_swap_lookup_cut_off_at_deadline(self):
+        stubs = _PageStubs(dead={"https://shop.example.com/dead"})
+        stubs.resolve = AsyncMock(side_effect=_stall)
+        state = _state(
+            seconds_left=0.2,
+            selected=[_candidate("a", url="https://shop.example.com/dead")],
+            backups=[_candidate("b0", final_score=3.0), _candidate("idea", is_idea=True)],
+        )
+
+        result, elapsed = await stubs.run(state, AsyncMock(return_value={}), swap_min=0)
+
+        assert [c.id for c in result["final_three"]] == ["idea"]
+        assert result["degradations"] == [IDEAS_INSTEAD_OF_SWAPS]
+        assert elapsed < 0.5
+
+    async def test_price_verification_skipped_when_budget_low(self):
+        claude = AsyncMock(return_value={})
+        state = _state(seconds_left=1, selected=[_candidate("a", url="https://shop.example.com/a")])
+
+        result, _ = await _PageStubs().run(state, claude)
+
+        assert claude.await_args.args[0] == []
+        assert result["degradations"] == [SKIPPED_PRICE_VERIFICATION]
+        assert result["final_three"][0].price_confidence == "unknown"
+
+    async def test_price_verification_cut_off_at_deadline(self):
+        state = _state(seconds_left=0.2, selected=[_candidate("a", url="https://shop.example.com/a")])
+
+        with patch("app.agents.availability.PRICE_VERIFICATION_MIN_SECONDS", 0):
+            result, elapsed = await _PageStubs().run(state, AsyncMock(side_effect=_stall))
+
+        assert result["degradations"] == [SKIPPED_PRICE_VERIFICATION]
+        assert elapsed < 0.5
+
+    async def test_no_degradation_without_deadline(self):
+        claude = AsyncMock(return_value={})
+        state = _state(selected=[_candidate("a", url="https://shop.example.com/a")])
+
+        result, _ = await _PageStubs().run(state, claude)
+
+        assert len(claude.await_args.args[0]) == 1
+        assert "degradations" not in result
+
+
+# ===================================================================
+# 7. Full pipeline
+# ===================================================================
+
+class TestFullPipeline:
+    async def test_slowed_stubs_finish_within_budget(self):
+        """Every optional step stalls; the run still ends near its deadline."""
+        cards = [
+            _candidate("a", url="https://shop.example.com/dead", final_score=3.0),
+            _candidate("b", url="https://shop.example.com/b", final_score=2.0),
+            _candidate("c", is_idea=True),
+            _candidate("spare", final_score=1.5),
+            _candidate("spare-idea", is_idea=True, final_score=1.0),
+        ]
+
+        async def _stream(**kwargs):
+            for card in cards:
+                yield card
+
+        async def _fetch(url, client):
+            return url != "https://shop.example.com/dead", "Title: Item"
+
+        async def _resolve(candidate):
+            return candidate
+
+        with patch("app.agents.hint_retrieval.generate_embedding", new=AsyncMock(return_value=None)), \
+             patch("app.agents.hint_retrieval.get_service_client", return_value=MagicMock()), \
+             patch("app.agents.hint_retrieval.run_query",
+                   new=AsyncMock(return_value=MagicMock(data=[]))), \
+             patch("app.agents.unified_generation_node.stream_unified_recommendations",
+                   MagicMock(side_effect=_stream)), \
+             patch("app.agents.unified_generation_node.UNIFIED_GENERATION_STREAMING", True), \
+             patch("app.agents.unified_generation_node.resolve_candidate_url",
+                   side_effect=_resolve), \
+             patch("app.agents.briefing_node.generate_milestone_briefing", side_effect=_stall), \
+             patch("app.agents.briefing_node.BRIEFING_MIN_SECONDS", 0), \
+             patch("app.agents.availability._fetch_page", side_effect=_fetch), \
+             patch("app.agents.availability._resolve_and_verify", side_effect=_stall), \
+             patch("app.agents.availability._verify_prices_with_claude", side_effect=_stall), \
+             patch("app.agents.availability.SWAP_MIN_SECONDS", 0), \
+             patch("app.agents.availability.PRICE_VERIFICATION_MIN_SECONDS", 0):
+            start = time.perf_counter()
+            result = await run_recommendation_pipeline(
+                _state(seconds_left=0.3, with_milestone=True),
+            )
+            elapsed = time.perf_counter() - start
+
+        assert elapsed < 1.0
+        assert [c.id for c in result["final_three"]] == ["spare-idea", "b", "c"]
+        assert set(result["degradations"]) == {
+            SKIPPED_BRIEFING, IDEAS_INSTEAD_OF_SWAPS, SKIPPED_PRICE_VERIFICATION,
+        }
+        assert result.get("briefing_text") is None
+
+        response = RecommendationGenerateResponse(
+            recommendations=[],
+            count=0,
+            occasion_type="just_because",
+            degradations=result["degradations"],
+        )
+        assert response.model_dump()["degradations"] == result["degradations"]
@@ -0,0 +1,373 @@
+"""
+Tests for in-process Supabase JWT verification (app.core.security).
+
+Verifies that:
+1. HS256 tokens signed with the project secret are accepted without a network call
+2. Expired, wrong-audience, wrong-issuer, tampered, and wrong-secret tokens are
+   rejected with 401 without a network call
+3. ES256 tokens are verified against the cached JWKS, which is refreshed on an
+   unknown kid (rotation) before falling back to /auth/v1/user; concurrent
+   requests share one in-flight refresh
+4. Unknown signing keys fall back to the remote /auth/v1/user endpoint
+5. Validated tokens are served from the TTL cache (never past their exp)
+6. Local verification is substantially faster than the remote round trip
+
+All tests are offline — tokens are minted locally and the remote endpoint is
+replaced by an httpx.MockTransport.
+
+Run with: pytest tests/test_local_jwt_verification.py -v
+"""
+
+import asyncio
+import time
+import uuid
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.core import security
+from app.core.security import get_current_user_id
+
+TEST_SUPABASE_URL = "https://test-project.supabase.co"
+TEST_JWT_SECRET = "test-project-jwt-secret-with-at-least-32-bytes"
+TEST_KID = "test-key-1"
+
+# The real httpx.AsyncClient, captured before any test patches it.
+_RealAsyncClient = httpx.AsyncClient
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _claims(user_id: str | None = None, **overrides) -> dict:
+    now = int(time.time())
+    claims = {
+        "sub": user_id or str(uuid.uuid4()),
+        "aud": "authenticated",
+        "iss": f"{TEST_SUPABASE_URL}/auth/v1",
+        "role": "authenticated",
+        "iat": now,
+        "exp": now + 3600,
+        "session_id": uuid.uuid4().hex,  # keeps every minted token unique
+    }
+    claims.update(overrides)
+    return claims
+
+
+def _hs256_token(secret: str = TEST_JWT_SECRET, **overrides) -> str:
+    return jwt.encode(_claims(**overrides), secret, algorithm="HS256")
+
+
+def _credentials(token: str) -> HTTPAuthorizationCredentials:
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def _remote_transport(user_id: str = "remote-user", delay: float = 0.0) -> httpx.MockTransport:
+    """Stand-in for Supabase Auth's /auth/v1/user endpoint."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if delay:
+            await asyncio.sleep(delay)
+        if request.url.path == "/auth/v1/user":
+            return httpx.Response(200, json={"id": user_id})
+        return httpx.Response(404)
+
+    return httpx.MockTransport(handler)
+
+
+def _patch_remote(transport: httpx.MockTransport):
+    return patch(
+        "app.core.security.httpx.AsyncClient",
+        lambda *args, **kwargs: _RealAsyncClient(transport=transport),
+    )
+
+
+@pytest.fixture(autouse=True)
+def _local_mode():
+    """Run every test in local mode against a fake project with clean caches."""
+    security._reset_verification_caches()
+    with patch.object(security, "SUPABASE_URL", TEST_SUPABASE_URL), \
+         patch.object(security, "SUPABASE_JWT_SECRET", TEST_JWT_SECRET), \
+         patch.object(security, "SUPABASE_JWT_VERIFICATION", "local"):
+        yield
+    security._reset_verification_caches()
+
+
+@pytest.fixture
+def es256_key():
+    """An EC P-256 key pair plus the JWKS document that publishes it."""
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    public_jwk = jwt.algorithms.ECAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    public_jwk.update({"kid": TEST_KID, "alg": "ES256", "use": "sig"})
+    return private_key, {"keys": [public_jwk]}
+
+
+def _es256_token(private_key, kid: str = TEST_KID, **overrides) -> str:
+    return jwt.encode(
+        _claims(**overrides), private_key, algorithm="ES256", headers={"kid": kid},
+    )
+
+
+# ===================================================================
+# 1. HS256 project secret
+# ===================================================================
+
+class TestHS256Verification:
+    async def test_valid_token_verified_without_network(self):
+        user_id = str(uuid.uuid4())
+        token = _hs256_token(user_id=user_id)
+
+        with patch("app.core.security._verify_remotely", new_callable=AsyncMock) as remote:
+            result = await get_current_user_id(_credentials(token))
+
+        assert result == user_id
+        remote.assert_not_awaited()
+
+    async def test_expired_token_rejected(self):
+        past = int(time.time()) - 3600
+        token = _hs256_token(iat=past - 3600, exp=past)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user_id(_credentials(token))
+        assert exc_info.value.status_code == 401
+
+    async def test_wrong_audience_rejected(self):
+        token = _hs256_token(aud="anon")
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user_id(_credentials(token))
+        assert exc_info.value.status_code == 401
+
+    async def test_wrong_issuer_rejected(self):
+        token = _hs256_token(iss="https://other-project.supabase.co/auth/v1")
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user_id(_credentials(token))
+        assert exc_info.value.status_code == 401
+
+    async def test_missing_sub_rejected(self):
+        token = _hs256_token(sub="")
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user_id(_credentials(token))
+        assert exc_info.value.status_code == 401
+
+    async def test_garbage_token_rejected(self):
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user_id(_credentials("not-a-jwt"))
+        assert exc_info.value.status_code == 401
+
+    async def test_wrong_secret_rejected_without_network(self):
+        """A forged HS256 token is rejected locally, not sent to Supabase Auth."""
+        token = _hs256_token(secret="a-different-secret-that-is-32-bytes-long")
+
+        with patch("app.core.security._verify_remotely", new_callable=AsyncMock) as remote:
+            with pytest.raises(HTTPException) as exc_info:
+                await get_current_user_id(_credentials(token))
+
+        assert exc_info.value.status_code == 401
+        remote.assert_not_awaited()
+
+    async def test_no_secret_configured_falls_back_to_remote(self):
+        token = _hs256_token()
+
+        with patch.object(security, "SUPABASE_JWT_SECRET", ""), \
+             _patch_remote(_remote_transport(user_id="remote-user")):
+            result = await get_current_user_id(_credentials(token))
+
+        assert result == "remote-user"
+
+    async def test_remote_mode_always_calls_supabase(self):
+        token = _hs256_token()
+
+        with patch.object(security, "SUPABASE_JWT_VERIFICATION", "remote"), \
+             _patch_remote(_remote_transport(user_id="remote-user")):
+            result = await get_current_user_id(_credentials(token))
+
+        assert result == "remote-user"
+
+    async def test_missing_credentials_still_401(self):
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user_id(None)
+        assert exc_info.value.status_code == 401
+
+
+# ===================================================================
+# 2. ES256 / JWKS
+# ===================================================================
+
+class TestJWKSVerification:
+    async def test_valid_es256_token_verified(self, es256_key):
+        private_key, jwks = es256_key
+        user_id = str(uuid.uuid4())
+
+        with patch("app.core.security._fetch_jwks", new_callable=AsyncMock, return_value=jwks) as fetch, \
+             patch("app.core.security._verify_remotely", new_callable=AsyncMock) as remote:
+            result = await get_current_user_id(_credentials(_es256_token(private_key, user_id=user_id)))
+            # A second, different token reuses the cached key set.
+            await get_current_user_id(_credentials(_es256_token(private_key)))
+
+        assert result == user_id
+        assert fetch.await_count == 1
+        remote.assert_not_awaited()
+
+    async def test_tampered_es256_token_rejected(self, es256_key):
+        private_key, jwks = es256_key
+        header, payload, signature = _es256_token(private_key).split(".")
+        forged_payload = _es256_token(private_key, sub="someone-else").split(".")[1]
+        forged = ".".join([header, forged_payload, signature])
+
+        with patch("app.core.security._fetch_jwks", new_callable=AsyncMock, return_value=jwks):
+            with pytest.raises(HTTPException) as exc_info:
+                await get_current_user_id(_credentials(forged))
+        assert exc_info.value.status_code == 401
+
+    async def test_rotated_key_picked_up_on_unknown_kid(self, es256_key):
+        """A kid missing from the cached set triggers one refetch (rate-limited)."""
+        old_key, old_jwks = es256_key
+        new_key = ec.generate_private_key(ec.SECP256R1())
+        new_jwk = jwt.algorithms.ECAlgorithm.to_jwk(new_key.public_key(), as_dict=True)
+        new_jwk.update({"kid": "test-key-2", "alg": "ES256", "use": "sig"})
+        rotated_jwks = {"keys": old_jwks["keys"] + [new_jwk]}
+
+        fetch = AsyncMock(side_effect=[old_jwks, rotated_jwks])
+        with patch("app.core.security._fetch_jwks", fetch), \
+             patch.object(security, "JWKS_MIN_REFRESH_INTERVAL", 0):
+            await get_current_user_id(_credentials(_es256_token(old_key)))
+            user_id = await get_current_user_id(
+                _credentials(_es256_token(new_key, kid="test-key-2", sub="rotated-user")),
+            )
+
+        assert user_id == "rotated-user"
+        assert fetch.await_count == 2
+
+    async def test_unknown_kid_falls_back_to_remote(self, es256_key):
+        _, jwks = es256_key
+        stranger = ec.generate_private_key(ec.SECP256R1())
+        token = _es256_token(stranger, kid="unknown-kid")
+
+        with patch("app.core.security._fetch_jwks", new_callable=AsyncMock, return_value=jwks), \
+             _patch_remote(_remote_transport(user_id="remote-user")):
+            result = await get_current_user_id(_credentials(token))
+
+        assert result == "remote-user"
+
+    async def test_concurrent_cold_start_shares_one_fetch(self, es256_key):
+        """Requests arriving mid-fetch wait for it instead of going remote."""
+        private_key, jwks = es256_key
+
+        async def _slow_fetch():
+            await asyncio.sleep(0.05)
+            return jwks
+
+        fetch = AsyncMock(side_effect=_slow_fetch)
+        with patch("app.core.security._fetch_jwks", fetch), \
+             patch("app.core.security._verify_remotely", new_callable=AsyncMock) as remote:
+            results = await asyncio.gather(*(
+                get_current_user_id(_credentials(_es256_token(private_key, sub=f"user-{i}")))
+                for i in range(10)
+            ))
+
+        assert results == [f"user-{i}" for i in range(10)]
+        assert fetch.await_count == 1
+        remote.assert_not_awaited()
+
+    async def test_concurrent_unknown_kid_refreshes_once(self, es256_key):
+        _, jwks = es256_key
+        stranger = ec.generate_private_key(ec.SECP256R1())
+        fetch = AsyncMock(return_value=jwks)
+
+        with patch("app.core.security._fetch_jwks", fetch), \
+             _patch_remote(_remote_transport(user_id="remote-user")):
+            await asyncio.gather(*(
+                get_current_user_id(_credentials(_es256_token(stranger, kid="unknown-kid")))
+                for _ in range(5)
+            ))
+
+        assert fetch.await_count == 1
+
+    async def test_jwks_fetch_failure_falls_back_to_remote(self, es256_key):
+        private_key, _ = es256_key
+        failing = AsyncMock(side_effect=httpx.ConnectError("unreachable"))
+
+        with patch("app.core.security._fetch_jwks", failing), \
+             _patch_remote(_remote_transport(user_id="remote-user")):
+            result = await get_current_user_id(_credentials(_es256_token(private_key)))
+
+        assert result == "remote-user"
+
+
+# ===================================================================
+# 3. Validated-token cache
+# ===================================================================
+
+class TestTokenCache:
+    async def test_remote_validation_is_cached(self):
+        token = _hs256_token()
+        calls = {"n": 0}
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            calls["n"] += 1
+            return httpx.Response(200, json={"id": "remote-user"})
+
+        with patch.object(security, "SUPABASE_JWT_SECRET", ""), \
+             _patch_remote(httpx.MockTransport(handler)):
+            for _ in range(5):
+                assert await get_current_user_id(_credentials(token)) == "remote-user"
+
+        assert calls["n"] == 1
+
+    async def test_cache_entry_never_outlives_token(self):
+        security._remember_token("k", "user", exp=time.time() - 1)
+        assert security._get_cached_user_id("k") is None
+
+    async def test_cache_is_bounded(self):
+        with patch.object(security, "TOKEN_CACHE_MAX_ENTRIES", 3):
+            for i in range(5):
+                security._remember_token(f"k{i}", f"user{i}", exp=None)
+
+        assert len(security._token_cache) == 3
+        assert security._get_cached_user_id("k0") is None
+        assert security._get_cached_user_id("k4") == "user4"
+
+
+# ===================================================================
+# 4. Benchmark: local verification vs. the /auth/v1/user round trip
+# ===================================================================
+
+class TestVerificationBenchmark:
+    async def test_local_verification_faster_than_remote(self):
+        """
+        Compare per-request cost of in-process verification against the
+        previous path (a fresh httpx client + /auth/v1/user round trip). The
+        remote stub adds only 5ms of simulated latency — far less than a real
+        Supabase round trip — so the measured speedup is a lower bound.
+        """
+        n = 50
+        local_tokens = [_hs256_token() for _ in range(n)]
+        remote_tokens = [_hs256_token() for _ in range(n)]
+
+        start = time.perf_counter()
+        for token in local_tokens:
+            await get_current_user_id(_credentials(token))
+        local_ms = (time.perf_counter() - start) * 1000 / n
+
+        with patch.object(security, "SUPABASE_JWT_VERIFICATION", "remote"), \
+             _patch_remote(_remote_transport(delay=0.005)):
+            start = time.perf_counter()
+            for token in remote_tokens:
+                await get_current_user_id(_credentials(token))
+            remote_ms = (time.perf_counter() - start) * 1000 / n
+
+        print(f"  local={local_ms:.3f}ms/token, remote={remote_ms:.3f}ms/token "
+              f"({remote_ms / local_ms:.0f}x)")
+        assert local_ms < remote_ms / 2, (
+            f"Local verification ({local_ms:.3f}ms) should be well under the "
+            f"remote path ({remote_ms:.3f}ms)"
+        )
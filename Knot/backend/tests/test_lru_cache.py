@@ -0,0 +1,119 @@
+"""
+Tests for the bounded, versioned in-process cache (app.services.lru_cache).
+
+Covers:
+1. VersionedLRUCache mechanics — LRU eviction, TTL expiry, version stamps,
+   caching None, counters, thread safety
+2. Version-stamp bookkeeping is bounded relative to max_entries
+
+Run with: pytest tests/test_lru_cache.py -v
+"""
+
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from app.services.lru_cache import MISS, VERSIONS_PER_ENTRY, VersionedLRUCache
+
+
+# ===================================================================
+# 1. Cache mechanics
+# ===================================================================
+
+class TestVersionedLRUCache:
+    """Core cache mechanics."""
+
+    def test_evicts_least_recently_used(self):
+        cache = VersionedLRUCache("t", max_entries=2, ttl=60)
+        cache.put("a", 1, cache.version("a"))
+        cache.put("b", 2, cache.version("b"))
+        assert cache.get("a") == 1  # "a" is now most recent
+        cache.put("c", 3, cache.version("c"))
+
+        assert cache.get("b") is MISS
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_entries_expire_after_ttl(self):
+        cache = VersionedLRUCache("t", max_entries=10, ttl=30)
+        with patch("app.services.lru_cache.time.monotonic", return_value=1000.0):
+            cache.put("a", 1, cache.version("a"))
+        with patch("app.services.lru_cache.time.monotonic", return_value=1029.0):
+            assert cache.get("a") == 1
+        with patch("app.services.lru_cache.time.monotonic", return_value=1031.0):
+            assert cache.get("a") is MISS
+
+    def test_stale_version_is_not_stored(self):
+        """A load that raced an invalidation must not repopulate the cache."""
+        cache = VersionedLRUCache("t", max_entries=10, ttl=60)
+        version = cache.version("a")
+        cache.invalidate("a")
+
+        assert cache.put("a", "stale", version) is False
+        assert cache.get("a") is MISS
+        assert cache.put("a", "fresh", cache.version("a")) is True
+
+    def test_caches_none_values(self):
+        cache = VersionedLRUCache("t", max_entries=10, ttl=60)
+        cache.put("a", None, cache.version("a"))
+        assert cache.get("a") is None
+
+    def test_stats_hit_rate(self):
+        cache = VersionedLRUCache("t", max_entries=10, ttl=60)
+        cache.put("a", 1, cache.version("a"))
+        cache.get("a")
+        cache.get("a")
+        cache.get("b")
+        stats = cache.stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == pytest.approx(0.6667, abs=1e-3)
+        assert stats["size"] == 1
+
+    def test_thread_safe_under_concurrent_access(self):
+        cache = VersionedLRUCache("t", max_entries=50, ttl=60)
+
+        def worker(n):
+            for i in range(500):
+                key = f"k{(n * 7 + i) % 80}"
+                cache.put(key, i, cache.version(key))
+                cache.get(key)
+                if i % 10 == 0:
+                    cache.invalidate(key)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert cache.stats()["size"] <= 50
+
+
+# ===================================================================
+# 2. Version-stamp bookkeeping
+# ===================================================================
+
+class TestVersionBookkeeping:
+    def test_tracked_versions_bounded_per_cache(self):
+        cache = VersionedLRUCache("t", max_entries=5, ttl=60)
+        for i in range(100):
+            cache.invalidate(f"k{i}")
+        assert len(cache._versions) == 5 * VERSIONS_PER_ENTRY
+
+    def test_pruned_stamp_still_fails_load_that_captured_zero(self):
+        """A load started before the key was ever invalidated must not store
+        after the key's stamp is pruned."""
+        cache = VersionedLRUCache("t", max_entries=1, ttl=60)
+        version = cache.version("a")
+        assert version == 0
+
+        cache.invalidate("a")
+        for i in range(VERSIONS_PER_ENTRY):
+            cache.invalidate(f"k{i}")
+        assert "a" not in cache._versions
+
+        assert cache.put("a", "stale", version) is False
+        assert cache.put("a", "fresh", cache.version("a")) is True
@@ -0,0 +1,542 @@
+"""
+Tests for the Prometheus metrics (app.core.metrics) and GET /metrics.
+
+Covers:
+1. Exposition — counters, gauges and histograms render in the Prometheus
+   text format (cumulative buckets, +Inf, _sum/_count, label escaping)
+2. Multiple workers — snapshots in METRICS_MULTIPROC_DIR are merged:
+   counters and histograms summed (exited workers included), gauges only
+   from live workers; exited workers' files folded into one aggregate
+   exactly once; a reused pid keeps the old file's totals; unreadable
+   files skipped
+3. Route latency — MetricsMiddleware labels requests with the route
+   template and status; unmatched paths and failing handlers are bounded
+4. Supabase queries — run_query records table and operation, and errors
+5. Upstreams, pipeline and caches — record_call and Vertex AI embedding
+   calls feed the upstream histograms; run/node wall time, events and
+   tokens are exported; in-flight run/node gauges rise and fall; cache
+   lookups and evictions are exported per cache and tier
+6. Event-loop lag — the monitor notices a blocked loop
+7. Endpoint — content type, METRICS_BEARER_TOKEN gating
+
+No network access: Supabase queries are stub request builders and the
+Vertex AI model is a MagicMock.
+
+Run with: pytest tests/test_metrics.py -v
+"""
+
+import asyncio
+import json
+import os
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.core import metrics
+from app.core.metrics import (
+    DB_QUERIES,
+    EVENT_LOOP_LAG,
+    PIPELINE_RUNS_IN_FLIGHT,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsMiddleware,
+    render_metrics,
+    start_metrics_monitor,
+    stop_metrics_monitor,
+)
+from app.core.pipeline_metrics import (
+    RETRY,
+    count_event,
+    instrument_node,
+    pipeline_run,
+    record_call,
+    record_claude_usage,
+)
+from app.db.async_client import run_query
+from app.main import app
+from app.services.brave_cache import get_cached_search_result
+from app.services.disk_cache import SQLiteTTLCache
+from app.services.embedding import _reset_embedding_batcher, generate_embedding
+from app.services.lru_cache import VersionedLRUCache
+
+
+@pytest.fixture
+def scratch_metrics():
+    """Register throwaway metrics; removed from the registry afterwards."""
+    created = []
+
+    def _make(cls, name, *args, **kwargs):
+        metric = cls(name, "Test metric.", *args, **kwargs)
+        created.append(name)
+        return metric
+
+    yield _make
+    for name in created:
+        metrics._registry.pop(name, None)
+
+
+def _sample(text: str, series: str) -> float | None:
+    """Value of one exposition line, e.g. 'name{a="b"}', or None if absent."""
+    for line in text.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+class _Query:
+    """A supabase-py request builder stand-in."""
+
+    def __init__(self, method: str, path: str, prefer: str = "", fail: bool = False):
+        self.request = SimpleNamespace(
+            http_method=method,
+            path=httpx.URL(f"https://project.supabase.co/rest/v1{path}"),
+            headers=httpx.Headers({"prefer": prefer} if prefer else {}),
+        )
+        self.fail = fail
+
+    def execute(self):
+        if self.fail:
+            raise RuntimeError("PGRST116")
+        return SimpleNamespace(data=[])
+
+
+# ===================================================================
+# 1. Exposition
+# ===================================================================
+
+class TestExposition:
+    def test_histogram_buckets_are_cumulative(self, scratch_metrics):
+        histogram = scratch_metrics(Histogram, "test_seconds", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, "/a")
+
+        text = render_metrics()
+
+        assert "# TYPE test_seconds histogram" in text
+        assert _sample(text, 'test_seconds_bucket{route="/a",le="0.1"}') == 2
+        assert _sample(text, 'test_seconds_bucket{route="/a",le="1.0"}') == 3
+        assert _sample(text, 'test_seconds_bucket{route="/a",le="+Inf"}') == 4
+        assert _sample(text, 'test_seconds_count{route="/a"}') == 4
+        assert _sample(text, 'test_seconds_sum{route="/a"}') == pytest.approx(3.65)
+
+    def test_counter_gauge_and_escaping(self, scratch_metrics):
+        counter = scratch_metrics(Counter, "test_total", ("name",))
+        gauge = scratch_metrics(Gauge, "test_gauge")
+        counter.inc('say "hi"\\n')
+        counter.inc('say "hi"\\n', amount=2)
+        gauge.set(0.25)
+
+        text = render_metrics()
+
+        assert _sample(text, r'test_total{name="say \"hi\"\\n"}') == 3
+        assert _sample(text, "test_gauge") == 0.25
+
+    def test_every_metric_declared(self):
+        text = render_metrics()
+        for name in (
+            "knot_http_request_duration_seconds",
+            "knot_db_query_duration_seconds",
+            "knot_db_query_errors_total",
+            "knot_upstream_request_duration_seconds",
+            "knot_upstream_request_errors_total",
+            "knot_event_loop_lag_seconds",
+            "knot_pipeline_run_duration_seconds",
+            "knot_pipeline_node_duration_seconds",
+            "knot_pipeline_events_total",
+            "knot_claude_tokens_total",
+            "knot_pipeline_runs_in_flight",
+            "knot_pipeline_nodes_in_flight",
+            "knot_cache_lookups_total",
+            "knot_cache_evictions_total",
+            "knot_cache_outcomes_total",
+        ):
+            assert f"# TYPE {name} " in text
+
+
+# ===================================================================
+# 2. Multiple workers
+# ===================================================================
+
+def _dead_pid() -> int:
+    pid = 4_000_000
+    while metrics._pid_alive(pid):
+        pid += 1
+    return pid
+
+
+class TestMultipleWorkers:
+    @pytest.fixture
+    def multiproc_dir(self, tmp_path):
+        with patch("app.core.metrics.METRICS_MULTIPROC_DIR", str(tmp_path)):
+            yield tmp_path
+
+    def _write_worker(self, directory, pid, samples):
+        (directory / f"{pid}.json").write_text(json.dumps({"pid": pid, "metrics": samples}))
+
+    def test_counters_and_histograms_summed_gauges_live_only(
+        self, multiproc_dir, scratch_metrics,
+    ):
+        counter = scratch_metrics(Counter, "test_total", ("name",))
+        histogram = scratch_metrics(Histogram, "test_seconds", buckets=(1.0,))
+        gauge = scratch_metrics(Gauge, "test_in_flight")
+        counter.inc("a")
+        histogram.observe(0.5)
+        gauge.set(1)
+
+        live, dead = os.getppid(), _dead_pid()
+        for pid in (live, dead):
+            self._write_worker(multiproc_dir, pid, {
+                "test_total": [[["a"], 2.0]],
+                "test_seconds": [[[], [[1, 1], 2.5]]],
+                "test_in_flight": [[[], 5.0]],
+            })
+
+        text = render_metrics()
+
+        assert _sample(text, 'test_total{name="a"}') == 5
+        assert _sample(text, 'test_seconds_bucket{le="1.0"}') == 3
+        assert _sample(text, "test_seconds_count") == 5
+        assert _sample(text, "test_in_flight") == 6  # the exited worker's 5 is dropped
+        assert (multiproc_dir / f"{os.getpid()}.json").exists()
+
+    def test_exited_workers_folded_once(self, multiproc_dir, scratch_metrics):
+        counter = scratch_metrics(Counter, "test_total")
+        gauge = scratch_metrics(Gauge, "test_in_flight")
+        counter.inc()
+        gauge.set(1)
+        first, second = _dead_pid(), _dead_pid() + 1
+        while metrics._pid_alive(second):
+            second += 1
+        self._write_worker(multiproc_dir, first, {
+            "test_total": [[[], 2.0]], "test_in_flight": [[[], 3.0]],
+        })
+
+        text = render_metrics()
+        assert _sample(text, "test_total") == 3
+        assert _sample(text, "test_in_flight") == 1  # only the live worker's gauge
+        assert not (multiproc_dir / f"{first}.json").exists()
+        aggregate = json.loads((multiproc_dir / metrics.AGGREGATE_FILE).read_text())
+        assert "test_in_flight" not in aggregate["metrics"]
+
+        self._write_worker(multiproc_dir, second, {"test_total": [[[], 4.0]]})
+        assert _sample(render_metrics(), "test_total") == 7
+        assert _sample(render_metrics(), "test_total") == 7
+        assert sorted(p.name for p in multiproc_dir.glob("*.json")) == sorted(
+            [metrics.AGGREGATE_FILE, f"{os.getpid()}.json"]
+        )
+
+    def test_reused_pid_keeps_previous_totals(self, multiproc_dir, scratch_metrics):
+        counter = scratch_metrics(Counter, "test_total")
+        # Left by an exited worker that had this process's pid
+        self._write_worker(multiproc_dir, os.getpid(), {"test_total": [[[], 5.0]]})
+        counter.inc()
+
+        with patch("app.core.metrics._snapshot_pid", None):
+            metrics.write_snapshot()
+            text = render_metrics()
+
+        assert _sample(text, "test_total") == 6
+
+    def test_max_gauge(self, multiproc_dir, scratch_metrics):
+        gauge = scratch_metrics(Gauge, "test_lag", merge="max")
+        gauge.set(0.01)
+        self._write_worker(multiproc_dir, os.getppid(), {"test_lag": [[[], 0.3]]})
+
+        assert _sample(render_metrics(), "test_lag") == 0.3
+
+    def test_unreadable_and_foreign_files_skipped(self, multiproc_dir, scratch_metrics):
+        counter = scratch_metrics(Counter, "test_total")
+        counter.inc()
+        (multiproc_dir / "12345.json").write_text("{not json")
+        (multiproc_dir / "notes.txt").write_text("hello")
+        self._write_worker(multiproc_dir, os.getppid(), {
+            "test_total": [[[], 1.0]],
+            "test_removed_metric": [[[], 9.0]],
+        })
+
+        text = render_metrics()
+
+        assert _sample(text, "test_total") == 2
+        assert "test_removed_metric" not in text
+
+
+# ===================================================================
+# 3. Route latency
+# ===================================================================
+
+class TestMiddleware:
+    @pytest.fixture
+    def client(self):
+        test_app = FastAPI()
+        test_app.add_middleware(MetricsMiddleware)
+
+        @test_app.get("/items/{item_id}")
+        async def _item(item_id: str):
+            if item_id == "missing":
+                raise HTTPException(status_code=404)
+            return {"id": item_id}
+
+        @test_app.get("/boom")
+        async def _boom():
+            raise RuntimeError("boom")
+
+        return TestClient(test_app, raise_server_exceptions=False)
+
+    def test_route_template_and_status(self, client):
+        for item_id in ("a", "b", "missing"):
+            client.get(f"/items/{item_id}")
+
+        text = render_metrics()
+
+        series = 'knot_http_request_duration_seconds_count{method="GET",route="/items/{item_id}",status="%s"}'
+        assert _sample(text, series % "200") == 2
+        assert _sample(text, series % "404") == 1
+
+    def test_unmatched_paths_and_methods_bounded(self, client):
+        client.get("/no/such/path")
+        client.request("BREW", "/items/a")
+
+        text = render_metrics()
+
+        assert _sample(
+            text,
+            'knot_http_request_duration_seconds_count{method="GET",route="unmatched",status="404"}',
+        ) == 1
+        assert _sample(
+            text,
+            'knot_http_request_duration_seconds_count{method="OTHER",route="/items/{item_id}",status="405"}',
+        ) == 1
+
+    def test_failing_handler_recorded_as_500(self, client):
+        assert client.get("/boom").status_code == 500
+        assert _sample(
+            render_metrics(),
+            'knot_http_request_duration_seconds_count{method="GET",route="/boom",status="500"}',
+        ) == 1
+
+    def test_app_is_instrumented(self):
+        TestClient(app).get("/health")
+        assert _sample(
+            render_metrics(),
+            'knot_http_request_duration_seconds_count{method="GET",route="/health",status="200"}',
+        ) == 1
+
+
+# ===================================================================
+# 4. Supabase queries
+# ===================================================================
+
+class TestQueries:
+    async def test_table_and_operation(self):
+        await run_query(_Query("GET", "/hints"))
+        await run_query(_Query("GET", "/hints"))
+        await run_query(_Query("POST", "/vaults", prefer="resolution=merge-duplicates"))
+        await run_query(_Query("PATCH", "/users"))
+        await run_query(_Query("POST", "/rpc/match_hints"))
+
+        text = render_metrics()
+
+        for labels, count in (
+            ('table="hints",operation="select"', 2),
+            ('table="vaults",operation="upsert"', 1),
+            ('table="users",operation="update"', 1),
+            ('table="match_hints",operation="rpc"', 1),
+        ):
+            assert _sample(text, f"knot_db_query_duration_seconds_count{{{labels}}}") == count
+
+    async def test_errors_counted(self):
+        with pytest.raises(RuntimeError):
+            await run_query(_Query("DELETE", "/hints", fail=True))
+
+        text = render_metrics()
+
+        labels = '{table="hints",operation="delete"}'
+        assert _sample(text, f"knot_db_query_errors_total{labels}") == 1
+        assert _sample(text, f"knot_db_query_duration_seconds_count{labels}") == 1
+
+    async def test_unrecognised_builder(self):
+        query = MagicMock()
+        await run_query(query)
+        query.execute.assert_called_once()
+        assert DB_QUERIES._samples.keys() == {("unknown", "unknown")}
+
+
+# ===================================================================
+# 5. Upstreams, pipeline and caches
+# ===================================================================
+
+class TestUpstreamsAndPipeline:
+    def test_record_call_feeds_upstream_metrics(self):
+        record_call("brave", 0.2)
+        record_call("brave", 0.3, error=True)
+        record_call("apns", 0.01)
+
+        text = render_metrics()
+
+        assert _sample(text, 'knot_upstream_request_duration_seconds_count{upstream="brave"}') == 2
+        assert _sample(text, 'knot_upstream_request_errors_total{upstream="brave"}') == 1
+        assert _sample(text, 'knot_upstream_request_duration_seconds_count{upstream="apns"}') == 1
+
+    async def test_vertex_embedding_calls_recorded(self):
+        model = MagicMock()
+        model.get_embeddings.return_value = [SimpleNamespace(values=[0.1] * 768)]
+        _reset_embedding_batcher()
+
+        with patch("app.services.embedding._get_model", return_value=model):
+            assert await generate_embedding("ceramics", use_cache=False) is not None
+            model.get_embeddings.side_effect = RuntimeError("quota")
+            assert await generate_embedding("pottery", use_cache=False) is None
+
+        text = render_metrics()
+
+        assert _sample(text, 'knot_upstream_request_duration_seconds_count{upstream="vertex"}') == 2
+        assert _sample(text, 'knot_upstream_request_errors_total{upstream="vertex"}') == 1
+
+    async def test_in_flight_gauges(self):
+        seen = {}
+
+        async def _node(state):
+            seen["runs"] = _sample(render_metrics(), "knot_pipeline_runs_in_flight")
+            seen["nodes"] = _sample(
+                render_metrics(), 'knot_pipeline_nodes_in_flight{node="resolve_urls"}',
+            )
+            return {}
+
+        with pipeline_run("vault-metrics") as run:
+            await instrument_node("resolve_urls", _node)(None)
+            run.finish({})
+
+        assert seen == {"runs": 1, "nodes": 1}
+        text = render_metrics()
+        assert _sample(text, "knot_pipeline_runs_in_flight") == 0
+        assert _sample(text, 'knot_pipeline_nodes_in_flight{node="resolve_urls"}') == 0
+
+    async def test_run_gauge_released_on_failure(self):
+        with pytest.raises(RuntimeError):
+            with pipeline_run("vault-metrics"):
+                raise RuntimeError("boom")
+        assert PIPELINE_RUNS_IN_FLIGHT._samples[()] == 0
+
+    async def test_run_node_event_and_token_metrics(self):
+        async def _node(state):
+            count_event(RETRY)
+            record_claude_usage("unified_generation", SimpleNamespace(
+                input_tokens=1200, output_tokens=300,
+            ))
+            return {}
+
+        with pipeline_run("vault-metrics") as run:
+            await instrument_node("generate_unified", _node)(None)
+            run.finish({})
+
+        text = render_metrics()
+        assert _sample(text, 'knot_pipeline_run_duration_seconds_count{outcome="ok"}') == 1
+        assert _sample(
+            text, 'knot_pipeline_node_duration_seconds_count{node="generate_unified"}',
+        ) == 1
+        assert _sample(
+            text, 'knot_pipeline_events_total{node="generate_unified",event="retries"}',
+        ) == 1
+        assert _sample(
+            text, 'knot_claude_tokens_total{call_site="unified_generation",kind="input"}',
+        ) == 1200
+
+
+class TestCaches:
+    def test_memory_lookups_and_evictions(self):
+        cache = VersionedLRUCache("test_cache", max_entries=1, ttl=60)
+        cache.get("a")
+        cache.put("a", 1, cache.version("a"))
+        cache.get("a")
+        cache.put("b", 2, cache.version("b"))  # evicts "a"
+
+        text = render_metrics()
+
+        assert _sample(
+            text, 'knot_cache_lookups_total{cache="test_cache",tier="memory",result="hit"}',
+        ) == 1
+        assert _sample(
+            text, 'knot_cache_lookups_total{cache="test_cache",tier="memory",result="miss"}',
+        ) == 1
+        assert _sample(text, 'knot_cache_evictions_total{cache="test_cache"}') == 1
+
+    def test_disk_lookups(self, tmp_path):
+        disk = SQLiteTTLCache(str(tmp_path / "cache.sqlite3"), "test_rows", max_rows=10)
+        disk.get("a")
+        disk.put("a", [1, 2], ttl=60)
+        disk.get("a")
+        disk.close()
+
+        text = render_metrics()
+
+        for result in ("hit", "miss"):
+            assert _sample(
+                text, f'knot_cache_lookups_total{{cache="test_rows",tier="disk",result="{result}"}}',
+            ) == 1
+
+    async def test_lookup_outcomes(self):
+        await get_cached_search_result("gift shop austin", "en")
+
+        assert _sample(
+            render_metrics(), 'knot_cache_outcomes_total{cache="brave_results",outcome="misses"}',
+        ) == 1
+
+
+# ===================================================================
+# 6. Event-loop lag
+# ===================================================================
+
+class TestEventLoopLag:
+    async def test_blocked_loop_measured(self):
+        with patch("app.core.metrics.LOOP_LAG_INTERVAL", 0.01):
+            start_metrics_monitor()
+            await asyncio.sleep(0.02)
+            time.sleep(0.1)  # block the loop
+            await asyncio.sleep(0.05)
+            await stop_metrics_monitor()
+
+        counts, _ = EVENT_LOOP_LAG._samples[()]
+        assert sum(counts) >= 2
+        text = render_metrics()
+        assert _sample(text, 'knot_event_loop_lag_seconds_bucket{le="0.05"}') < sum(counts)
+        assert _sample(text, "knot_event_loop_lag_last_seconds") is not None
+
+    async def test_shutdown_writes_final_snapshot(self, tmp_path):
+        with patch("app.core.metrics.METRICS_MULTIPROC_DIR", str(tmp_path)):
+            start_metrics_monitor()
+            await stop_metrics_monitor()
+        assert json.loads((tmp_path / f"{os.getpid()}.json").read_text())["pid"] == os.getpid()
+
+
+# ===================================================================
+# 7. Endpoint
+# ===================================================================
+
+class TestEndpoint:
+    def test_open_without_token(self):
+        record_call("qstash", 0.05)
+        with patch("app.core.security.METRICS_BEARER_TOKEN", ""):
+            response = TestClient(app).get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert _sample(
+            response.text, 'knot_upstream_request_duration_seconds_count{upstream="qstash"}',
+        ) == 1
+
+    def test_bearer_token_required_when_set(self):
+        client = TestClient(app)
+        with patch("app.core.security.METRICS_BEARER_TOKEN", "scrape-me"):
+            assert client.get("/metrics").status_code == 401
+            assert client.get(
+                "/metrics", headers={"Authorization": "Bearer nope"},
+            ).status_code == 401
+            assert client.get(
+                "/metrics", headers={"Authorization": "Bearer scrape-me"},
+            ).status_code == 200
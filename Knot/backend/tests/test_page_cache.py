@@ -0,0 +1,410 @@
+"""
+Tests for the merchant page cache (app.services.page_cache) in availability
+verification.
+
+Covers:
+1. Fresh entries — served without a request or parse
+2. Revalidation — stale entries send If-None-Match / If-Modified-Since; a
+   304 reuses the text, a 200 replaces it, no validators means a full GET
+3. Negative caching — dead pages remembered for the negative TTL;
+   transient failures (429, 5xx, timeouts) never cached
+4. Prices — a cached page's Claude price is reused by verify_availability
+   until the page changes
+5. Bounds and stats — LRU bound, lookup outcomes
+6. Benchmark — repeated verification of the same pages vs. no cache
+
+Merchant sites are replaced with a fake httpx client.
+
+Run with: pytest tests/test_page_cache.py -v
+"""
+
+import asyncio
+import time
+import uuid
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from app.agents.availability import _fetch_page, verify_availability
+from app.agents.state import BudgetRange, CandidateRecommendation, RecommendationState, VaultData
+from app.services import page_cache
+from app.services.page_cache import _reset_page_cache, get_page_cache_stats
+
+PRODUCT_URL = "https://www.etsy.com/listing/123/ceramic-ramen-bowls"
+PRODUCT_HTML = (
+    "<html><head><title>Ceramic Ramen Bowls</title></head>"
+    "<body><p>Handmade set of two.</p><p>$49.99</p></body></html>"
+)
+
+
+def _response(status_code: int, text: str = "", headers: dict | None = None) -> httpx.Response:
+    return httpx.Response(
+        status_code,
+        headers={"content-type": "text/html; charset=utf-8", **(headers or {})},
+        text=text,
+    )
+
+
+class _Merchant:
+    """
+    Fake merchant sites. Pages carry an optional ETag / Last-Modified and
+    answer a matching conditional GET with 304.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.pages: dict[str, dict] = {}
+        self.latency = latency
+        self.requests: list[tuple[str, dict]] = []
+
+    def add(self, url, html=PRODUCT_HTML, status=200, etag=None, last_modified=None):
+        self.pages[url] = {
+            "html": html, "status": status, "etag": etag, "last_modified": last_modified,
+        }
+
+    @asynccontextmanager
+    async def stream(self, method, url, follow_redirects=True, headers=None):
+        yield await self._respond(url, headers or {})
+
+    async def _respond(self, url, headers):
+        self.requests.append((url, headers))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        page = self.pages[url]
+        if isinstance(page["status"], Exception):
+            raise page["status"]
+        validators = {}
+        if page["etag"]:
+            validators["etag"] = page["etag"]
+        if page["last_modified"]:
+            validators["last-modified"] = page["last_modified"]
+        if page["status"] == 200 and (
+            (page["etag"] and headers.get("If-None-Match") == page["etag"])
+            or (page["last_modified"]
+                and headers.get("If-Modified-Since") == page["last_modified"])
+        ):
+            return _response(304, "", validators)
+        return _response(page["status"], page["html"], validators)
+
+
+@pytest.fixture
+def merchant():
+    site = _Merchant()
+    site.add(PRODUCT_URL, etag='"v1"', last_modified="Wed, 14 Oct 2026 08:00:00 GMT")
+    return site
+
+
+@pytest.fixture
+def stale():
+    """Make every cached page stale (but still held for revalidation)."""
+    with patch("app.services.page_cache.PAGE_CACHE_FRESH_TTL", -1):
+        yield
+
+
+# ===================================================================
+# 1. Fresh entries
+# ===================================================================
+
+class TestFreshEntries:
+    """Recently verified pages are served from memory."""
+
+    async def test_fresh_hit_skips_request_and_parse(self, merchant):
+        first = await _fetch_page(PRODUCT_URL, merchant)
+        with patch("app.agents.availability._extract_text_from_html") as extract:
+            second = await _fetch_page(PRODUCT_URL, merchant)
+
+        assert first == second
+        assert first[0] is True and "$49.99" in first[1]
+        assert len(merchant.requests) == 1
+        extract.assert_not_called()
+
+    async def test_first_request_is_unconditional(self, merchant):
+        await _fetch_page(PRODUCT_URL, merchant)
+        _, headers = merchant.requests[0]
+        assert "If-None-Match" not in headers
+        assert "If-Modified-Since" not in headers
+
+
+# ===================================================================
+# 2. Revalidation
+# ===================================================================
+
+class TestRevalidation:
+    """Stale entries are revalidated with a conditional GET."""
+
+    async def test_304_reuses_text(self, merchant, stale):
+        available, text = await _fetch_page(PRODUCT_URL, merchant)
+
+        with patch("app.agents.availability._extract_text_from_html") as extract:
+            again = await _fetch_page(PRODUCT_URL, merchant)
+
+        assert again == (available, text)
+        extract.assert_not_called()
+        _, headers = merchant.requests[1]
+        assert headers["If-None-Match"] == '"v1"'
+        assert headers["If-Modified-Since"] == "Wed, 14 Oct 2026 08:00:00 GMT"
+        assert get_page_cache_stats()["revalidated"] == 1
+
+    async def test_304_restarts_freshness(self, merchant):
+        await _fetch_page(PRODUCT_URL, merchant)
+        with patch("app.services.page_cache.PAGE_CACHE_FRESH_TTL", -1):
+            await _fetch_page(PRODUCT_URL, merchant)  # revalidated
+        await _fetch_page(PRODUCT_URL, merchant)  # fresh again
+
+        assert len(merchant.requests) == 2
+
+    async def test_changed_page_replaces_text(self, merchant, stale):
+        await _fetch_page(PRODUCT_URL, merchant)
+        merchant.add(PRODUCT_URL, html=PRODUCT_HTML.replace("$49.99", "$39.99"), etag='"v2"')
+
+        available, text = await _fetch_page(PRODUCT_URL, merchant)
+
+        assert available is True
+        assert "$39.99" in text
+        assert page_cache.get_cached_page(PRODUCT_URL).etag == '"v2"'
+        assert get_page_cache_stats()["changed"] == 1
+
+    async def test_last_modified_only(self, merchant, stale):
+        merchant.add(PRODUCT_URL, last_modified="Wed, 14 Oct 2026 08:00:00 GMT")
+        await _fetch_page(PRODUCT_URL, merchant)
+        await _fetch_page(PRODUCT_URL, merchant)
+
+        _, headers = merchant.requests[1]
+        assert "If-None-Match" not in headers
+        assert get_page_cache_stats()["revalidated"] == 1
+
+    async def test_no_validators_means_full_get(self, merchant, stale):
+        merchant.add(PRODUCT_URL)
+        await _fetch_page(PRODUCT_URL, merchant)
+        await _fetch_page(PRODUCT_URL, merchant)
+
+        _, headers = merchant.requests[1]
+        assert "If-None-Match" not in headers and "If-Modified-Since" not in headers
+        assert get_page_cache_stats()["changed"] == 1
+
+    async def test_stale_entry_fetch_failure_reports_unavailable(self, merchant, stale):
+        await _fetch_page(PRODUCT_URL, merchant)
+        merchant.add(PRODUCT_URL, status=httpx.ConnectError("refused"))
+
+        assert await _fetch_page(PRODUCT_URL, merchant) == (False, "")
+
+
+# ===================================================================
+# 3. Negative caching
+# ===================================================================
+
+class TestNegativeCaching:
+    """Dead pages are remembered briefly; transient failures are not."""
+
+    @pytest.mark.parametrize("status", [404, 410, 403])
+    async def test_dead_page_cached(self, merchant, status):
+        merchant.add(PRODUCT_URL, status=status)
+
+        assert await _fetch_page(PRODUCT_URL, merchant) == (False, "")
+        assert await _fetch_page(PRODUCT_URL, merchant) == (False, "")
+
+        assert len(merchant.requests) == 1
+        assert get_page_cache_stats()["negative_hits"] == 1
+
+    async def test_negative_entry_expires(self, merchant):
+        merchant.add(PRODUCT_URL, status=404)
+        await _fetch_page(PRODUCT_URL, merchant)
+
+        merchant.add(PRODUCT_URL)
+        with patch("app.services.page_cache.PAGE_CACHE_NEGATIVE_TTL", -1):
+            available, _ = await _fetch_page(PRODUCT_URL, merchant)
+
+        assert available is True
+        assert len(merchant.requests) == 2
+
+    async def test_negative_ttl_independent_of_fresh_ttl(self, merchant):
+        merchant.add(PRODUCT_URL, status=404)
+        await _fetch_page(PRODUCT_URL, merchant)
+        with patch("app.services.page_cache.PAGE_CACHE_FRESH_TTL", -1):
+            await _fetch_page(PRODUCT_URL, merchant)
+        assert len(merchant.requests) == 1
+
+    @pytest.mark.parametrize("status", [
+        429, 408, 500, 503, httpx.ReadTimeout("slow"), httpx.ConnectError("refused"),
+    ])
+    async def test_transient_failures_not_cached(self, merchant, status):
+        merchant.add(PRODUCT_URL, status=status)
+        assert await _fetch_page(PRODUCT_URL, merchant) == (False, "")
+
+        merchant.add(PRODUCT_URL)
+        available, _ = await _fetch_page(PRODUCT_URL, merchant)
+        assert available is True
+        assert len(merchant.requests) == 2
+
+
+# ===================================================================
+# 4. Prices
+# ===================================================================
+
+def _candidate(url: str, cid: str) -> CandidateRecommendation:
+    return CandidateRecommendation(
+        id=cid,
+        source="unified",
+        type="gift",
+        title=f"Gift {cid}",
+        description="A gift",
+        price_cents=5000,
+        external_url=url,
+        merchant_name="Etsy",
+        final_score=1.0,
+    )
+
+
+def _state(candidates: list[CandidateRecommendation]) -> RecommendationState:
+    return RecommendationState(
+        vault_data=VaultData(
+            vault_id="vault-page-cache",
+            partner_name="Alex",
+            relationship_tenure_months=24,
+            cohabitation_status="living_together",
+            location_city="Austin",
+            location_state="TX",
+            location_country="US",
+            interests=["Cooking", "Travel", "Music", "Art", "Hiking"],
+            dislikes=["Gaming", "Cars", "Skiing", "Karaoke", "Surfing"],
+            vibes=["quiet_luxury"],
+            primary_love_language="quality_time",
+            secondary_love_language="receiving_gifts",
+            budgets=[],
+        ),
+        occasion_type="just_because",
+        budget_range=BudgetRange(min_amount=2000, max_amount=10000),
+        final_three=candidates,
+        filtered_recommendations=candidates,
+    )
+
+
+def _patch_merchant_client(site: _Merchant):
+    @asynccontextmanager
+    async def _client(*args, **kwargs):
+        yield site
+    return patch("app.agents.availability.upstream_client", _client)
+
+
+class TestCachedPrices:
+    """Claude's price for an unchanged page is reused across runs."""
+
+    async def _run(self, site, claude):
+        candidates = [_candidate(PRODUCT_URL, "a")]
+        with _patch_merchant_client(site), \
+             patch("app.agents.availability._verify_prices_with_claude", claude):
+            result = await verify_availability(_state(candidates))
+        return result["final_three"][0]
+
+    def _claude(self, cents: int) -> AsyncMock:
+        async def _verify(items):
+            return {c.id: {"id": c.id, "price_cents": cents, "verified": True} for c, _ in items}
+        return AsyncMock(side_effect=_verify)
+
+    async def test_price_reused_for_unchanged_page(self, merchant, stale):
+        claude = self._claude(4999)
+        first = await self._run(merchant, claude)
+        second = await self._run(merchant, claude)  # revalidated: 304
+
+        assert first.price_cents == second.price_cents == 4999
+        assert second.price_confidence == "verified"
+        assert claude.await_args_list[1].args[0] == []  # nothing sent to Claude
+        assert get_page_cache_stats()["price_hits"] == 1
+
+    async def test_changed_page_is_repriced(self, merchant, stale):
+        await self._run(merchant, self._claude(4999))
+        merchant.add(PRODUCT_URL, html=PRODUCT_HTML.replace("$49.99", "$39.99"), etag='"v2"')
+
+        claude = self._claude(3999)
+        result = await self._run(merchant, claude)
+
+        assert result.price_cents == 3999
+        assert len(claude.await_args.args[0]) == 1
+
+    async def test_failed_extraction_not_cached(self, merchant):
+        await self._run(merchant, AsyncMock(return_value={}))
+
+        claude = self._claude(4999)
+        result = await self._run(merchant, claude)
+
+        assert result.price_cents == 4999
+        assert len(claude.await_args.args[0]) == 1
+
+
+# ===================================================================
+# 5. Bounds and stats
+# ===================================================================
+
+class TestBoundsAndStats:
+    async def test_bounded_lru(self, merchant):
+        urls = [f"https://shop.example.com/p/{i}" for i in range(4)]
+        for url in urls:
+            merchant.add(url)
+
+        with patch.object(page_cache._cache, "max_entries", 2):
+            for url in urls:
+                await _fetch_page(url, merchant)
+            await _fetch_page(urls[0], merchant)  # evicted: fetched again
+
+        assert len(merchant.requests) == 5
+        assert get_page_cache_stats()["memory"]["size"] == 2
+
+    async def test_hit_rate(self, merchant, stale):
+        merchant.add("https://shop.example.com/gone", status=404)
+        await _fetch_page(PRODUCT_URL, merchant)  # miss
+        await _fetch_page(PRODUCT_URL, merchant)  # revalidated
+        await _fetch_page("https://shop.example.com/gone", merchant)  # miss
+        await _fetch_page("https://shop.example.com/gone", merchant)  # negative hit
+
+        stats = get_page_cache_stats()
+        assert stats["misses"] == 2
+        assert stats["revalidated"] == 1
+        assert stats["negative_hits"] == 1
+        assert stats["hit_rate"] == 0.5
+
+
+# ===================================================================
+# 6. Benchmark: cached vs. uncached verification
+# ===================================================================
+
+class TestPageCacheBenchmark:
+    async def test_repeated_verification_faster(self):
+        """
+        10 pipeline runs over the same 3 product pages (~60KB of HTML each)
+        against merchants answering in 30ms — fast for a real merchant
+        site, so the speedup is a lower bound.
+        """
+        site = _Merchant(latency=0.03)
+        body = "".join(f"<div class='review'><p>Review {i}: lovely.</p></div>" for i in range(1200))
+        urls = [f"https://shop.example.com/p/{uuid.uuid4()}" for _ in range(3)]
+        for url in urls:
+            site.add(url, html=PRODUCT_HTML.replace("</body>", body + "</body>"), etag='"v1"')
+
+        async def _runs() -> float:
+            start = time.perf_counter()
+            for _ in range(10):
+                await asyncio.gather(*(_fetch_page(url, site) for url in urls))
+            return time.perf_counter() - start
+
+        cached_s = await _runs()
+        cached_requests = len(site.requests)
+
+        site.requests.clear()
+        with patch("app.services.page_cache.PAGE_CACHE_FRESH_TTL", -1):
+            revalidated_s = await _runs()
+
+        site.requests.clear()
+        uncached_s = 0.0
+        for _ in range(10):
+            _reset_page_cache()
+            start = time.perf_counter()
+            await asyncio.gather(*(_fetch_page(url, site) for url in urls))
+            uncached_s += time.perf_counter() - start
+
+        print(f"  fresh={cached_s * 1000:.0f}ms ({cached_requests} requests), "
+              f"revalidated={revalidated_s * 1000:.0f}ms, "
+              f"uncached={uncached_s * 1000:.0f}ms ({uncached_s / cached_s:.1f}x)")
+        assert cached_requests == 3
+        assert cached_s < uncached_s / 3
+        assert revalidated_s < uncached_s
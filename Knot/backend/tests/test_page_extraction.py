@@ -0,0 +1,348 @@
+"""
+Tests for bounded page downloads and early-exit HTML extraction in
+availability verification (app.agents.availability).
+
+Covers:
+1. Extractor parity — on saved merchant pages (tests/fixtures/merchant_pages)
+   the incremental extractor keeps the title, meta description, JSON-LD and
+   price text the previous full BeautifulSoup parse kept; output does not
+   depend on how the page is split into chunks
+2. Early exit — parsing stops once the text budget is full; JSON-LD after
+   that point (or split across chunks) is still found by scanning
+3. Streaming download — the body is read only until the extractor is done
+   or MAX_PAGE_BYTES is reached; non-HTML bodies are never read; response
+   charsets are honoured
+4. Benchmark — multi-megabyte merchant pages, previous extractor vs. new
+
+Merchant sites are replaced with httpx.MockTransport; no network access.
+
+Run with: pytest tests/test_page_extraction.py -v
+"""
+
+import re
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+from bs4 import BeautifulSoup
+
+from app.agents.availability import (
+    MAX_BODY_TEXT_CHARS,
+    MAX_PAGE_BYTES,
+    MAX_PAGE_CONTENT_CHARS,
+    _extract_text_from_html,
+    _fetch_page,
+    _PageTextExtractor,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures" / "merchant_pages"
+
+# Price text a shopper (or Claude) would read on each saved page
+FIXTURE_PRICES = {
+    "amazon_product.html": "$27.50",
+    "etsy_listing.html": "64.00",
+    "ticketmaster_event.html": "45.00",
+    "shopify_product.html": "$28.00",
+    "opentable_restaurant.html": "$$$$",
+}
+
+REVIEW_BLOCK = (
+    '<div class="review"><span class="review-author">A customer</span>'
+    '<p class="review-text">Beautiful piece, arrived quickly and well packed. '
+    "My partner loved it and we would buy again.</p></div>\n"
+)
+SCRIPT_BLOCK = (
+    "<script>window.__state__=window.__state__||{};"
+    + "".join(f"__state__.k{i}={i}*2;" for i in range(200))
+    + "</script>\n"
+)
+
+
+def _fixture(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+def _padded(html: str, target_bytes: int = 3 * 1024 * 1024) -> str:
+    """`html` grown to ~target_bytes with inline scripts and reviews, as
+    large merchant pages are."""
+    half = target_bytes // 2
+    scripts = SCRIPT_BLOCK * (half // len(SCRIPT_BLOCK))
+    reviews = REVIEW_BLOCK * (half // len(REVIEW_BLOCK))
+    html = html.replace("</head>", scripts + "</head>", 1)
+    return html.replace("</body>", reviews + "</body>", 1)
+
+
+def _beautifulsoup_extract(html: str) -> str:
+    """The previous extractor: a full BeautifulSoup parse of the page."""
+    soup = BeautifulSoup(html, "html.parser")
+
+    def _is_jsonld(tag) -> bool:
+        return (tag.get("type") or "").strip().lower() == "application/ld+json"
+
+    jsonld_text = "\n".join(
+        [s.get_text() for s in soup.find_all("script") if _is_jsonld(s)][:3]
+    ).strip()
+    title = soup.title.get_text().strip() if soup.title else ""
+    meta_tag = soup.find("meta", attrs={"name": re.compile(r"^description$", re.IGNORECASE)})
+    meta_desc = (meta_tag.get("content") or "").strip() if meta_tag else ""
+    for tag in soup.find_all(["script", "style"]):
+        if tag.name == "script" and _is_jsonld(tag):
+            continue
+        tag.decompose()
+    body_text = re.sub(r"\s+", " ", soup.get_text(" ")).strip()
+
+    parts = []
+    if title:
+        parts.append(f"Title: {title}")
+    if meta_desc:
+        parts.append(f"Meta: {meta_desc}")
+    if jsonld_text:
+        parts.append(f"Structured Data: {jsonld_text}")
+    if body_text:
+        parts.append(f"Page Text: {body_text[:4000]}")
+    return "\n".join(parts)[:MAX_PAGE_CONTENT_CHARS]
+
+
+def _section(text: str, label: str) -> str:
+    """The line of extractor output starting with `label`."""
+    for line in text.split("\n"):
+        if line.startswith(label):
+            return line
+    return ""
+
+
+class _CountingStream(httpx.AsyncByteStream):
+    """A response body delivered in chunks, counting the bytes read."""
+
+    def __init__(self, body: bytes, chunk_size: int = 16 * 1024):
+        self.body = body
+        self.chunk_size = chunk_size
+        self.sent = 0
+
+    async def __aiter__(self):
+        for start in range(0, len(self.body), self.chunk_size):
+            chunk = self.body[start:start + self.chunk_size]
+            self.sent += len(chunk)
+            yield chunk
+
+
+def _client(body: bytes, content_type: str = "text/html; charset=utf-8"):
+    """(client, stream): an httpx client serving `body` for every URL."""
+    stream = _CountingStream(body)
+    client = httpx.AsyncClient(transport=httpx.MockTransport(
+        lambda request: httpx.Response(
+            200, headers={"content-type": content_type}, stream=stream,
+        )
+    ))
+    return client, stream
+
+
+# ===================================================================
+# 1. Extractor parity
+# ===================================================================
+
+class TestExtractorParity:
+    """Same price-relevant content as the previous full parse."""
+
+    @pytest.mark.parametrize("name", sorted(FIXTURE_PRICES))
+    def test_matches_previous_extractor(self, name):
+        html = _fixture(name)
+        old = _beautifulsoup_extract(html)
+        new = _extract_text_from_html(html)
+
+        for label in ("Title: ", "Meta: ", "Structured Data: "):
+            assert _section(new, label) == _section(old, label)
+        assert FIXTURE_PRICES[name] in old
+        assert FIXTURE_PRICES[name] in new
+        assert len(new) <= MAX_PAGE_CONTENT_CHARS
+
+    @pytest.mark.parametrize("name", sorted(FIXTURE_PRICES))
+    def test_chunking_does_not_change_output(self, name):
+        html = _fixture(name)
+        extractor = _PageTextExtractor()
+        for start in range(0, len(html), 1000):
+            extractor.feed(html[start:start + 1000])
+        extractor.close()
+
+        assert extractor.result() == _extract_text_from_html(html)
+
+    def test_scripts_and_styles_never_in_text(self):
+        text = _extract_text_from_html(_fixture("amazon_product.html"))
+        assert "function" not in text
+        assert "margin:" not in text
+
+    def test_entities_decoded(self):
+        text = _extract_text_from_html(_fixture("shopify_product.html"))
+        assert "Title: Beeswax Taper Candles, Pair – Hearth & Wick Co." in text
+
+
+# ===================================================================
+# 2. Early exit
+# ===================================================================
+
+class TestEarlyExit:
+    """Parsing stops at the budget; later JSON-LD is still collected."""
+
+    def test_stops_parsing_when_budget_full(self):
+        jsonld = '<script type="application/ld+json">{"offers": {"price": "%d.00"}}</script>'
+        head = "".join(jsonld % i for i in range(3))
+        html = f"<html><head>{head}</head><body>" + "<p>word</p>" * 200_000 + "</body></html>"
+
+        extractor = _PageTextExtractor()
+        extractor.feed(html)
+
+        assert extractor.done
+        assert extractor.jsonld == [
+            '{"offers": {"price": "0.00"}}',
+            '{"offers": {"price": "1.00"}}',
+            '{"offers": {"price": "2.00"}}',
+        ]
+
+    def test_jsonld_after_budget_found_by_scan(self):
+        text = _extract_text_from_html(_fixture("ticketmaster_event.html"))
+        assert '"lowPrice": "45.00"' in _section(text, "Structured Data: ")
+        assert len(_section(text, "Page Text: ")) <= len("Page Text: ") + MAX_BODY_TEXT_CHARS
+
+    def test_jsonld_split_across_chunks(self):
+        html = (
+            "<body>" + "<p>filler text</p>" * 1000
+            + '<script id="ld" type="Application/LD+JSON">{"price": "12.50"}</script></body>'
+        )
+        marker = html.index("LD+JSON")
+        extractor = _PageTextExtractor()
+        for piece in (html[:marker + 3], html[marker + 3:-20], html[-20:]):
+            extractor.feed(piece)
+        extractor.close()
+
+        assert extractor.jsonld == ['{"price": "12.50"}']
+
+    def test_jsonld_type_in_script_body_ignored_by_scan(self):
+        html = (
+            "<body>" + "<p>filler text</p>" * 1000
+            + '<script>var t = "application/ld+json";</script>'
+            + '<div data-type="application/ld+json">not a script</div></body>'
+        )
+        extractor = _PageTextExtractor()
+        extractor.feed(html)
+        extractor.close()
+        assert extractor.jsonld == []
+
+    def test_malformed_end_tag_ends_script(self):
+        html = '<script>alert(1)</script foo="bar"><p>$49.99</p><script>x()</script >ok'
+        text = _extract_text_from_html(html)
+        assert text == "Page Text: $49.99 ok"
+
+
+# ===================================================================
+# 3. Streaming download
+# ===================================================================
+
+class TestStreamingDownload:
+    """Only as much of the body as extraction needs is downloaded."""
+
+    async def test_download_stops_once_extractor_done(self):
+        jsonld = '<script type="application/ld+json">{"price": "9.99"}</script>'
+        body = (
+            "<html><head><title>Big page</title>" + jsonld * 3 + "</head><body>"
+            + "<p>Lots of product copy here.</p>" * 200_000 + "</body></html>"
+        ).encode()
+        client, stream = _client(body)
+
+        available, text = await _fetch_page("https://shop.example.com/big", client)
+
+        assert available
+        assert "Title: Big page" in text
+        assert stream.sent < 64 * 1024
+        assert stream.sent < len(body) / 50
+
+    async def test_download_capped_at_max_page_bytes(self):
+        body = ("<html><body>" + "<div>" * 2_000_000).encode()  # no text at all
+        client, stream = _client(body)
+
+        available, text = await _fetch_page("https://shop.example.com/huge", client)
+
+        assert available
+        assert text == ""
+        assert stream.sent <= MAX_PAGE_BYTES + stream.chunk_size
+
+    async def test_non_html_body_not_downloaded(self):
+        client, stream = _client(b"%PDF-1.4" + b"\0" * 500_000, "application/pdf")
+
+        assert await _fetch_page("https://shop.example.com/catalog.pdf", client) == (True, "")
+        assert stream.sent == 0
+
+    async def test_response_charset_honoured(self):
+        body = "<title>Crème brûlée torch – €35</title>".encode("cp1252")
+        client, _ = _client(body, "text/html; charset=windows-1252")
+
+        _, text = await _fetch_page("https://shop.example.com/torch", client)
+        assert "Title: Crème brûlée torch – €35" in text
+
+    async def test_multibyte_character_split_across_chunks(self):
+        padding = "<script>" + "x" * (16 * 1024 - 21) + "</script>"
+        body = (padding + "<p>€35</p>").encode()  # € spans the first two chunks
+        client, _ = _client(body)
+
+        _, text = await _fetch_page("https://shop.example.com/split", client)
+        assert body.index("€".encode()) == 16 * 1024 - 1
+        assert text == "Page Text: €35"
+
+    async def test_unknown_charset_falls_back_to_utf8(self):
+        client, _ = _client("<p>€35</p>".encode(), "text/html; charset=x-unknown")
+
+        _, text = await _fetch_page("https://shop.example.com/odd", client)
+        assert text == "Page Text: €35"
+
+    async def test_read_timeout_is_a_failed_fetch(self):
+        class _Stalls(httpx.AsyncByteStream):
+            async def __aiter__(self):
+                yield b"<html><body><p>$49.99"
+                raise httpx.ReadTimeout("timed out")
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(
+                200, headers={"content-type": "text/html"}, stream=_Stalls(),
+            )
+        ))
+
+        assert await _fetch_page("https://shop.example.com/slow", client) == (False, "")
+
+
+# ===================================================================
+# 4. Benchmark: previous extractor vs. early-exit extractor
+# ===================================================================
+
+class TestExtractionBenchmark:
+    def test_large_pages_faster(self):
+        """
+        Each saved merchant page grown to ~3MB with inline scripts and
+        reviews — the size of a real product page with its review section.
+        """
+        pages = {name: _padded(_fixture(name)) for name in sorted(FIXTURE_PRICES)}
+
+        start = time.perf_counter()
+        old = {name: _beautifulsoup_extract(html) for name, html in pages.items()}
+        old_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        new = {name: _extract_text_from_html(html) for name, html in pages.items()}
+        new_s = time.perf_counter() - start
+
+        mb = sum(len(html) for html in pages.values()) / 1e6
+        print(f"  {len(pages)} pages, {mb:.1f}MB: beautifulsoup={old_s * 1000:.0f}ms "
+              f"early-exit={new_s * 1000:.0f}ms, {old_s / new_s:.0f}x")
+        for name in pages:
+            assert _section(new[name], "Title: ") == _section(old[name], "Title: ")
+            assert FIXTURE_PRICES[name] in new[name]
+        assert new_s < old_s / 5
+
+    async def test_large_page_fetch_reads_a_fraction(self):
+        html = _padded(_fixture("etsy_listing.html"))
+        client, stream = _client(html.encode())
+
+        _, text = await _fetch_page("https://www.etsy.com/listing/1288451032", client)
+
+        print(f"  read {stream.sent / 1024:.0f}KB of {len(html) / 1024:.0f}KB")
+        assert '"price": "64.00"' in text
+        assert stream.sent <= MAX_PAGE_BYTES + stream.chunk_size
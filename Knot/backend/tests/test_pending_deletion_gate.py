@@ -6,6 +6,12 @@ get_active_user_id must return HTTP 410 Gone with a body containing the
 ISO timestamp. This lets the iOS client surface the PendingDeletionView
 before any other API call.
 
+The users.scheduled_deletion_at lookup is cached per user ("not pending" only
+for ACCOUNT_STATUS_ACTIVE_TTL); the offline TestAccountStatusCache tests
+verify that the account lifecycle handlers invalidate it so the 410 still
+lands on the very next request, and that other workers catch up within
+that TTL.
+
 We exercise the gate against an endpoint that uses get_active_user_id —
 GET /api/v1/users/me/notification-preferences — because it requires no
 extra fixtures beyond the user itself.
@@ -17,6 +23,12 @@ import pytest
 import time
 import uuid
 from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+from fastapi import HTTPException
+
+from app.core import security
+from app.core.security import get_active_user_id, invalidate_account_status
 
 from tests.test_account_deletion_api import (
     _create_auth_user,
@@ -97,3 +109,162 @@ class TestPendingDeletionGate:
             headers={"Authorization": f"Bearer {user_session['access_token']}"},
         )
         assert ok.status_code == 200, ok.text
+
+
+# ---------------------------------------------------------------------------
+# Offline: per-user account-status cache
+# ---------------------------------------------------------------------------
+
+class _FakeUsersDB:
+    """In-memory stand-in for the users table that counts SELECTs."""
+
+    def __init__(self, scheduled_deletion_at=None):
+        self.scheduled_deletion_at = scheduled_deletion_at
+        self.select_count = 0
+
+    def table(self, name):
+        db = self
+        query = MagicMock()
+        query.eq.return_value = query
+        pending_update = {}
+
+        def select(*_args, **_kwargs):
+            db.select_count += 1
+            return query
+
+        def update(values):
+            pending_update.update(values)
+            return query
+
+        def execute():
+            if pending_update:
+                db.scheduled_deletion_at = pending_update["scheduled_deletion_at"]
+                return MagicMock(data=[{"id": "u1"}])
+            return MagicMock(data=[{
+                "id": "u1",
+                "scheduled_deletion_at": db.scheduled_deletion_at,
+            }])
+
+        query.select.side_effect = select
+        query.update.side_effect = update
+        query.execute.side_effect = execute
+        return query
+
+
+@pytest.fixture
+def fake_users_db():
+    security._reset_verification_caches()
+    db = _FakeUsersDB()
+    with patch("app.db.supabase_client.get_service_client", return_value=db), \
+         patch("app.api.users.get_service_client", return_value=db), \
+         patch("app.api.users.is_qstash_configured", return_value=False):
+        yield db
+    security._reset_verification_caches()
+
+
+class TestAccountStatusCache:
+    async def test_repeat_requests_skip_the_db(self, fake_users_db):
+        for _ in range(5):
+            assert await get_active_user_id(user_id="u1") == "u1"
+        assert fake_users_db.select_count == 1
+
+    async def test_entry_expires_after_ttl(self, fake_users_db):
+        with patch.object(security._active_status_cache, "ttl", 0):
+            await get_active_user_id(user_id="u1")
+            await get_active_user_id(user_id="u1")
+        assert fake_users_db.select_count == 2
+
+    async def test_delete_on_another_worker_lands_within_active_ttl(self, fake_users_db):
+        """Without a local invalidation, "not pending" is only trusted briefly."""
+        clock = "app.services.lru_cache.time.monotonic"
+        with patch(clock, return_value=1000.0):
+            await get_active_user_id(user_id="u1")
+
+        # Another worker schedules the deletion; this one is never told.
+        fake_users_db.scheduled_deletion_at = "2030-01-01T00:00:00+00:00"
+        with patch(clock, return_value=1000.0 + security.ACCOUNT_STATUS_ACTIVE_TTL / 2):
+            assert await get_active_user_id(user_id="u1") == "u1"
+        with patch(clock, return_value=1000.0 + security.ACCOUNT_STATUS_ACTIVE_TTL):
+            with pytest.raises(HTTPException) as exc_info:
+                await get_active_user_id(user_id="u1")
+        assert exc_info.value.status_code == 410
+
+    async def test_pending_status_cached_for_longer(self, fake_users_db):
+        fake_users_db.scheduled_deletion_at = "2030-01-01T00:00:00+00:00"
+        clock = "app.services.lru_cache.time.monotonic"
+        for offset in (0, security.ACCOUNT_STATUS_CACHE_TTL - 1):
+            with patch(clock, return_value=1000.0 + offset):
+                with pytest.raises(HTTPException):
+                    await get_active_user_id(user_id="u1")
+        assert fake_users_db.select_count == 1
+
+    async def test_stats_count_gate_lookups(self, fake_users_db):
+        await get_active_user_id(user_id="u1")
+        await get_active_user_id(user_id="u1")
+
+        stats = security.get_account_status_cache_stats()
+        assert stats["active"]["hits"] == 1
+        assert stats["active"]["size"] == 1
+        assert stats["pending"]["size"] == 0
+
+    async def test_410_immediately_after_delete_account(self, fake_users_db):
+        from app.api.users import delete_account
+
+        # Prime the cache with the "active" status.
+        await get_active_user_id(user_id="u1")
+
+        response = await delete_account(user_id="u1")
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_active_user_id(user_id="u1")
+        assert exc_info.value.status_code == 410
+        assert exc_info.value.detail["scheduled_deletion_at"] == response.scheduled_deletion_at
+
+    async def test_gate_clears_immediately_after_restore(self, fake_users_db):
+        from app.api.users import restore_account
+
+        fake_users_db.scheduled_deletion_at = datetime.now(timezone.utc).isoformat()
+        with pytest.raises(HTTPException):
+            await get_active_user_id(user_id="u1")
+
+        await restore_account(user_id="u1")
+
+        assert await get_active_user_id(user_id="u1") == "u1"
+
+    async def test_invalidate_forces_reread(self, fake_users_db):
+        await get_active_user_id(user_id="u1")
+        invalidate_account_status("u1")
+        await get_active_user_id(user_id="u1")
+        assert fake_users_db.select_count == 2
+
+    async def test_read_in_flight_during_invalidate_not_cached(self, fake_users_db):
+        """A status read racing delete_account must not cache "not pending"."""
+        from app.db import async_client
+
+        original = async_client.run_query
+
+        async def _racing_query(query):
+            result = await original(query)  # read "not pending"...
+            fake_users_db.scheduled_deletion_at = "2030-01-01T00:00:00+00:00"
+            invalidate_account_status("u1")  # ...then the delete lands
+            return result
+
+        with patch.object(async_client, "run_query", _racing_query):
+            assert await get_active_user_id(user_id="u1") == "u1"
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_active_user_id(user_id="u1")
+        assert exc_info.value.status_code == 410
+
+    async def test_db_failure_is_500_and_not_cached(self, fake_users_db):
+        failing = MagicMock()
+        failing.table.return_value.select.return_value.eq.return_value.execute.side_effect = (
+            RuntimeError("db down")
+        )
+        with patch("app.db.supabase_client.get_service_client", return_value=failing):
+            with pytest.raises(HTTPException) as exc_info:
+                await get_active_user_id(user_id="u1")
+        assert exc_info.value.status_code == 500
+
+        assert await get_active_user_id(user_id="u1") == "u1"
+        assert fake_users_db.select_count == 1
@@ -7,6 +7,7 @@ Tests that:
 3. Recommendation pipeline completes in < 3 seconds (mocked external APIs)
 4. 100 concurrent health requests complete within acceptable time
 5. Authenticated endpoints respond under load
+6. Blocking DB round trips no longer serialize concurrent requests
 
 Prerequisites:
 - Complete Steps 0.1-12.2 (all backend infrastructure)
@@ -19,6 +20,7 @@ import time
 import uuid
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 
@@ -396,3 +398,118 @@ class TestModuleImportPerformance:
 
         assert elapsed_s < 1.0, f"Pipeline module reload took {elapsed_s:.2f}s (limit: 1s)"
         print(f"  Pipeline module reload in {elapsed_s:.2f}s")
+
+
+# ===================================================================
+# 6. Non-blocking DB Access Under Concurrent Load
+# ===================================================================
+
+# Simulated PostgREST round trip. The mock's execute() sleeps with
+# time.sleep — a real blocking call, exactly like supabase-py's sync client.
+_DB_LATENCY_S = 0.02
+_CONCURRENT_REQUESTS = 20
+
+
+def _blocking_hints_db() -> MagicMock:
+    """
+    Mock service client for GET /api/v1/hints whose every execute() blocks
+    the calling thread for _DB_LATENCY_S.
+    """
+    def make_table(name: str) -> MagicMock:
+        table = MagicMock()
+        for method in ("select", "eq", "order", "range"):
+            getattr(table, method).return_value = table
+
+        def execute():
+            time.sleep(_DB_LATENCY_S)
+            if name == "partner_vaults":
+                return MagicMock(data=[{"id": "vault-perf"}])
+            return MagicMock(data=[], count=0)
+
+        table.execute.side_effect = execute
+        return table
+
+    mock_db = MagicMock()
+    mock_db.table.side_effect = make_table
+    return mock_db
+
+
+async def _inline_run_query(query):
+    """Pre-async-layer behavior: execute() directly on the event loop."""
+    return query.execute()
+
+
+async def _concurrent_hint_listing() -> tuple[float, list[int]]:
+    """Fire _CONCURRENT_REQUESTS list-hints requests at once; return wall time."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        start = time.perf_counter()
+        responses = await asyncio.gather(
+            *(ac.get("/api/v1/hints") for _ in range(_CONCURRENT_REQUESTS))
+        )
+        elapsed = time.perf_counter() - start
+    return elapsed, [r.status_code for r in responses]
+
+
+class TestNonBlockingDBAccess:
+    """
+    Concurrent-request throughput before and after moving query execution
+    off the event loop (app.db.async_client.run_query).
+
+    The list-hints endpoint makes three sequential queries. With execute()
+    on the event loop, N concurrent requests take N * 3 round trips; with
+    run_query they overlap on the query pool.
+    """
+
+    async def test_concurrent_throughput_before_and_after(self):
+        app.dependency_overrides[get_active_user_id] = lambda: "user-perf"
+        try:
+            with patch("app.api.hints.get_service_client", return_value=_blocking_hints_db()):
+                with patch("app.api.hints.run_query", _inline_run_query):
+                    before_s, before_codes = await _concurrent_hint_listing()
+                after_s, after_codes = await _concurrent_hint_listing()
+        finally:
+            app.dependency_overrides.pop(get_active_user_id, None)
+
+        assert before_codes == [200] * _CONCURRENT_REQUESTS
+        assert after_codes == [200] * _CONCURRENT_REQUESTS
+
+        serialized_s = _CONCURRENT_REQUESTS * 3 * _DB_LATENCY_S
+        assert before_s >= serialized_s * 0.9, (
+            f"Inline execution took {before_s:.2f}s; expected it to serialize "
+            f"(~{serialized_s:.2f}s)"
+        )
+        assert after_s < before_s / 2, (
+            f"run_query took {after_s:.2f}s vs {before_s:.2f}s inline "
+            f"(expected at least 2x throughput)"
+        )
+        print(
+            f"  {_CONCURRENT_REQUESTS} concurrent requests: "
+            f"{before_s:.2f}s blocking -> {after_s:.2f}s non-blocking "
+            f"({_CONCURRENT_REQUESTS / before_s:.0f} -> {_CONCURRENT_REQUESTS / after_s:.0f} req/s)"
+        )
+
+    async def test_event_loop_stays_responsive_during_queries(self):
+        """A slow query in one request must not delay a cheap one."""
+        app.dependency_overrides[get_active_user_id] = lambda: "user-perf"
+        try:
+            with patch("app.api.hints.get_service_client", return_value=_blocking_hints_db()):
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+                    slow = asyncio.gather(
+                        *(ac.get("/api/v1/hints") for _ in range(_CONCURRENT_REQUESTS))
+                    )
+                    slow_task = asyncio.ensure_future(slow)
+                    await asyncio.sleep(0)
+                    start = time.perf_counter()
+                    health = await ac.get("/health")
+                    health_s = time.perf_counter() - start
+                    await slow_task
+        finally:
+            app.dependency_overrides.pop(get_active_user_id, None)
+
+        assert health.status_code == 200
+        # Blocking execution would queue /health behind ~60 round trips (~1.2s)
+        assert health_s < 0.25, (
+            f"/health waited {health_s * 1000:.0f}ms behind blocking queries"
+        )
@@ -15,13 +15,16 @@ Test categories:
 - Full pipeline (mocked): End-to-end tests with all external calls mocked
 - Error handling: Generation empty, API errors
 - Convenience runner: Verify run_recommendation_pipeline
+- Parallel briefing: Briefing branch overlaps the recommendation branch
 
 Run with: pytest tests/test_pipeline.py -v
 """
 
+import asyncio
 import json
+import time
 import uuid
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 
@@ -135,43 +138,18 @@ def _make_candidate(
     return CandidateRecommendation(**data)
 
 
-# ======================================================================
-# Shared fixtures
-# ======================================================================
-
-@pytest.fixture
-def mock_embedding():
-    """Mock Vertex AI embedding to return None (forces chronological fallback)."""
-    with patch(
-        "app.agents.hint_retrieval.generate_embedding",
-        new_callable=AsyncMock,
-        return_value=None,
-    ) as m:
-        yield m
-
+def _mock_stream(candidates: list[CandidateRecommendation]) -> MagicMock:
+    """Stand-in for stream_unified_recommendations yielding the given candidates."""
+    async def _stream(**kwargs):
+        for candidate in candidates:
+            yield candidate
+    return MagicMock(side_effect=_stream)
 
-@pytest.fixture
-def mock_hint_db():
-    """Mock Supabase hint queries to return empty results."""
-    mock_client = AsyncMock()
-    mock_response = AsyncMock()
-    mock_response.data = []
-
-    mock_table = AsyncMock()
-    mock_table.select.return_value = mock_table
-    mock_table.eq.return_value = mock_table
-    mock_table.order.return_value = mock_table
-    mock_table.limit.return_value = mock_table
-    mock_table.execute.return_value = mock_response
-
-    mock_client.table.return_value = mock_table
-
-    with patch(
-        "app.agents.hint_retrieval.get_service_client",
-        return_value=mock_client,
-    ):
-        yield mock_client
 
+# ======================================================================
+# Fixtures (mock_embedding, mock_hint_db and mock_url_check live in the
+# root conftest.py)
+# ======================================================================
 
 @pytest.fixture
 def mock_unified_generation():
@@ -193,9 +171,8 @@ def mock_unified_generation():
         ),
     ]
     with patch(
-        "app.agents.unified_generation_node.generate_unified_recommendations",
-        new_callable=AsyncMock,
-        return_value=candidates,
+        "app.agents.unified_generation_node.stream_unified_recommendations",
+        _mock_stream(candidates),
     ) as m:
         yield m
 
@@ -210,25 +187,6 @@ def mock_brave_search():
         yield m
 
 
-@pytest.fixture
-def mock_url_check():
-    """
-    Make URL resolution + availability succeed without real HTTP: every purchasable
-    resolves to a dummy real page and every page fetch reports available. This keeps
-    purchasables on the happy path (no swap), so the graph tests exercise wiring.
-    """
-    with patch(
-        "app.agents.url_resolution._search_for_purchase_url",
-        new_callable=AsyncMock,
-        return_value="https://merchant.example.com/product/123",
-    ), patch(
-        "app.agents.availability._fetch_page",
-        new_callable=AsyncMock,
-        return_value=(True, ""),
-    ) as fetch_m:
-        yield fetch_m
-
-
 # ======================================================================
 # Graph structure tests
 # ======================================================================
@@ -402,9 +360,8 @@ class TestPipelineErrors:
     ):
         """If unified generation returns 0 candidates, pipeline ends with error."""
         with patch(
-            "app.agents.unified_generation_node.generate_unified_recommendations",
-            new_callable=AsyncMock,
-            return_value=[],
+            "app.agents.unified_generation_node.stream_unified_recommendations",
+            _mock_stream([]),
         ):
             state = _make_state(budget_min=2000, budget_max=30000)
             result = await recommendation_graph.ainvoke(state)
@@ -475,3 +432,99 @@ class TestStateCompatibility:
         reconstructed = RecommendationState(**result)
         assert reconstructed.vault_data.vault_id == "vault-pipeline-test"
         assert len(reconstructed.final_three) == 3
+
+
+# ======================================================================
+# Parallel briefing branch
+# ======================================================================
+
+class TestParallelBriefing:
+    """The briefing branch runs concurrently with generation and URL stages."""
+
+    @staticmethod
+    def _timed_graph(
+        delays: dict[str, float],
+        log: list[tuple[str, str, float]],
+        **output_overrides: dict,
+    ):
+        """Rebuild the graph with each node replaced by a sleep of the given length."""
+        final_three = [_make_candidate(title=f"Card {i}") for i in range(3)]
+        outputs = {
+            "retrieve_relevant_hints": {"relevant_hints": []},
+            "generate_unified": {"final_three": final_three},
+            "generate_briefing": {
+                "briefing_text": "Alex's birthday is in 10 days.",
+                "briefing_snippet": "Birthday in 10 days",
+            },
+            "resolve_purchase_urls": {"final_three": final_three},
+            "verify_availability": {"final_three": final_three},
+            **output_overrides,
+        }
+        start = time.perf_counter()
+
+        def _node(name):
+            async def _run(state):
+                log.append((name, "start", time.perf_counter() - start))
+                await asyncio.sleep(delays.get(name, 0.0))
+                log.append((name, "end", time.perf_counter() - start))
+                return outputs[name]
+            return _run
+
+        patches = [
+            patch(f"app.agents.pipeline.{name}", _node(name)) for name in outputs
+        ]
+        for p in patches:
+            p.start()
+        try:
+            return build_recommendation_graph().compile()
+        finally:
+            for p in patches:
+                p.stop()
+
+    async def test_wall_clock_is_max_of_branches(self):
+        delays = {
+            "generate_unified": 0.3,
+            "generate_briefing": 0.4,
+            "resolve_purchase_urls": 0.1,
+            "verify_availability": 0.1,
+        }
+        log: list[tuple[str, str, float]] = []
+        graph = self._timed_graph(delays, log)
+
+        start = time.perf_counter()
+        result = await graph.ainvoke(_make_state())
+        elapsed = time.perf_counter() - start
+
+        recommendation_branch = 0.3 + 0.1 + 0.1
+        briefing_branch = 0.4
+        serial = recommendation_branch + briefing_branch
+        assert elapsed < max(recommendation_branch, briefing_branch) + 0.15, (
+            f"Pipeline took {elapsed:.2f}s; branches should overlap"
+        )
+        assert elapsed < serial - 0.25
+
+        # Branch results are merged into the final state
+        assert result["briefing_text"] == "Alex's birthday is in 10 days."
+        assert len(result["final_three"]) == 3
+
+    async def test_briefing_overlaps_url_stages(self):
+        log: list[tuple[str, str, float]] = []
+        graph = self._timed_graph({"generate_briefing": 0.2, "generate_unified": 0.2}, log)
+        await graph.ainvoke(_make_state())
+
+        times = {(name, phase): t for name, phase, t in log}
+        # Briefing starts alongside generation, before any URL work begins
+        assert times[("generate_briefing", "start")] < times[("resolve_purchase_urls", "start")]
+        assert times[("generate_briefing", "start")] < times[("generate_unified", "end")]
+
+    async def test_generation_failure_still_short_circuits(self):
+        log: list[tuple[str, str, float]] = []
+        graph = self._timed_graph(
+            {}, log, generate_unified={"final_three": [], "error": "boom"},
+        )
+        result = await graph.ainvoke(_make_state())
+
+        assert result["error"] == "boom"
+        ran = {name for name, _, _ in log}
+        assert "resolve_purchase_urls" not in ran
+        assert "verify_availability" not in ran
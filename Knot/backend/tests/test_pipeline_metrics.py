@@ -0,0 +1,416 @@
+"""
+Tests for per-node pipeline instrumentation (app.core.pipeline_metrics) and
+GET /api/v1/admin/pipeline-metrics.
+
+Covers:
+1. Histogram summaries — bucket counts, quantiles at bucket resolution,
+   overflow; the snapshot reads the same samples GET /metrics serves
+2. Node wrapper — wall time, events read from the node's result, failures,
+   calls attributed to the node (including tasks it spawns)
+3. Outbound calls — upstream_client transports record latency and errors;
+   the shared Claude client records calls and token usage (create and stream)
+4. Full pipeline — every graph node is instrumented; a run through mocked
+   Claude, Brave and merchant transports yields a per-request summary and
+   process histograms; short-circuits are counted
+5. Admin endpoints — disabled without ADMIN_API_TOKEN, reject a wrong
+   token, return the pipeline snapshot and the cache counters
+
+Upstreams are httpx.MockTransport handlers and fake Anthropic resources; no
+network access.
+
+Run with: pytest tests/test_pipeline_metrics.py -v
+"""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.agents.pipeline import recommendation_graph, run_recommendation_pipeline
+from app.agents.state import BudgetRange, RecommendationState, VaultData
+from app.core.http_clients import _InstrumentedTransport, upstream_client
+from app.core import metrics
+from app.core.metrics import UPSTREAM_REQUESTS, Histogram, render_metrics
+from app.core.pipeline_metrics import (
+    RETRY,
+    SHORT_CIRCUIT,
+    count_event,
+    get_pipeline_metrics,
+    instrument_node,
+    pipeline_run,
+    record_call,
+)
+from app.main import app
+from app.services.claude_client import ClaudeClient, _LimitedMessages
+
+
+def _state() -> RecommendationState:
+    return RecommendationState(
+        vault_data=VaultData(
+            vault_id="vault-metrics",
+            partner_name="Alex",
+            relationship_tenure_months=24,
+            cohabitation_status="living_together",
+            location_city="Austin",
+            location_state="TX",
+            location_country="US",
+            interests=["Cooking", "Travel", "Music", "Art", "Hiking"],
+            dislikes=["Gaming", "Cars", "Skiing", "Karaoke", "Surfing"],
+            vibes=["quiet_luxury"],
+            primary_love_language="quality_time",
+            secondary_love_language="receiving_gifts",
+            budgets=[],
+        ),
+        occasion_type="just_because",
+        budget_range=BudgetRange(min_amount=2000, max_amount=10000),
+    )
+
+
+def _usage(**tokens) -> SimpleNamespace:
+    return SimpleNamespace(
+        input_tokens=tokens.get("input", 0),
+        output_tokens=tokens.get("output", 0),
+        cache_creation_input_tokens=tokens.get("cache_write"),
+        cache_read_input_tokens=tokens.get("cache_read"),
+    )
+
+
+# ===================================================================
+# 1. Histogram
+# ===================================================================
+
+@pytest.fixture
+def histogram():
+    """A throwaway collector, removed from the registry afterwards."""
+    def _make(buckets):
+        return Histogram("test_summary_seconds", "Test metric.", buckets=buckets)
+
+    yield _make
+    metrics._registry.pop("test_summary_seconds", None)
+
+
+class TestHistogram:
+    def test_buckets_and_quantiles(self, histogram):
+        histogram = histogram((0.1, 1.0, 10.0))
+        for value in [0.05] * 50 + [0.5] * 45 + [5.0] * 5:
+            histogram.observe(value)
+
+        snapshot = histogram.summarize(*histogram.samples().values())
+        assert snapshot["count"] == 100
+        assert snapshot["buckets"] == {"0.1": 50, "1.0": 45, "10.0": 5, "+Inf": 0}
+        assert snapshot["p50"] == 0.1
+        assert snapshot["p95"] == 1.0
+        assert snapshot["p99"] == 10.0
+
+    def test_overflow_reports_largest_bound(self, histogram):
+        histogram = histogram((1.0,))
+        histogram.observe(0.5)
+        histogram.observe(42.0)
+        snapshot = histogram.summarize(*histogram.samples().values())
+        assert snapshot["buckets"]["+Inf"] == 1
+        assert snapshot["p99"] == 1.0
+
+    def test_empty(self, histogram):
+        snapshot = histogram((1.0,)).summarize()
+        assert snapshot["count"] == 0
+        assert snapshot["p99"] == 0.0
+
+    def test_snapshot_reads_prometheus_samples(self):
+        """Each call is aggregated once, in the collector /metrics serves."""
+        record_call("brave", 0.2)
+
+        assert sum(UPSTREAM_REQUESTS.samples()[("brave",)][0]) == 1
+        assert get_pipeline_metrics()["upstreams"]["brave"]["calls"] == 1
+        assert 'knot_upstream_request_duration_seconds_count{upstream="brave"} 1' in (
+            render_metrics()
+        )
+
+
+# ===================================================================
+# 2. Node wrapper
+# ===================================================================
+
+class TestInstrumentNode:
+    async def test_records_time_calls_and_events(self):
+        async def _fetch():
+            record_call("merchants", 0.02)
+
+        async def _node(state):
+            await asyncio.sleep(0.05)
+            record_call("brave", 0.01)
+            # A task the node spawns is still attributed to it
+            await asyncio.create_task(_fetch())
+            count_event(RETRY)
+            return {"degradations": ["skipped_briefing"], "error": "nope"}
+
+        with pipeline_run("vault-metrics") as run:
+            await instrument_node("verify_urls", _node)(None)
+            run.finish({"error": "nope"})
+
+        node = run.summary()["nodes"]["verify_urls"]
+        assert node["seconds"] >= 0.05
+        assert node["calls"] == {"brave": 1, "merchants": 1}
+        assert node["events"] == {RETRY: 1, "degradations": 1, "errors": 1}
+        assert run.outcome == "error"
+
+    async def test_raising_node_counts_error(self):
+        async def _node(state):
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            with pipeline_run("vault-metrics"):
+                await instrument_node("retrieve_hints", _node)(None)
+
+        metrics = get_pipeline_metrics()
+        assert metrics["runs"] == {"failed": 1}
+        assert metrics["events"]["retrieve_hints"] == {"errors": 1}
+        assert metrics["nodes"]["retrieve_hints"]["count"] == 1
+
+    async def test_calls_outside_nodes_filed_under_pipeline(self):
+        with pipeline_run("vault-metrics") as run:
+            record_call("supabase", 0.01)
+            run.finish({})
+        assert run.summary()["nodes"]["pipeline"]["calls"] == {"supabase": 1}
+
+    async def test_without_run_only_process_metrics(self):
+        async def _node(state):
+            record_call("brave", 0.01)
+            return {}
+
+        await instrument_node("resolve_urls", _node)(None)
+
+        metrics = get_pipeline_metrics()
+        assert metrics["nodes"]["resolve_urls"]["count"] == 1
+        assert metrics["upstreams"]["brave"]["calls"] == 1
+        assert metrics["recent"] == []
+
+
+# ===================================================================
+# 3. Outbound calls
+# ===================================================================
+
+class TestOutboundCalls:
+    async def test_transport_records_latency_and_errors(self):
+        statuses = iter([200, 404, 503])
+
+        def _handler(request):
+            return httpx.Response(next(statuses))
+
+        transport = _InstrumentedTransport("merchants", lambda: httpx.MockTransport(_handler))
+        async with httpx.AsyncClient(transport=transport) as client:
+            for _ in range(3):
+                await client.get("https://shop.example.com/item")
+
+        upstream = get_pipeline_metrics()["upstreams"]["merchants"]
+        assert upstream["calls"] == 3
+        assert upstream["errors"] == 1  # the 503; a 404 is an answer
+        assert upstream["seconds"]["count"] == 3
+
+    async def test_transport_records_connection_failures(self):
+        def _handler(request):
+            raise httpx.ConnectError("refused")
+
+        transport = _InstrumentedTransport("brave", lambda: httpx.MockTransport(_handler))
+        async with httpx.AsyncClient(transport=transport) as client:
+            with pytest.raises(httpx.ConnectError):
+                await client.get("https://api.search.brave.com/")
+
+        assert get_pipeline_metrics()["upstreams"]["brave"]["errors"] == 1
+
+    async def test_upstream_clients_are_instrumented(self):
+        async with upstream_client("qstash") as client:
+            assert isinstance(client._transport, _InstrumentedTransport)
+
+    async def test_claude_create_records_usage(self):
+        messages = MagicMock()
+        messages.create = AsyncMock(return_value=SimpleNamespace(
+            usage=_usage(input=1200, output=300, cache_read=1000),
+        ))
+
+        with pipeline_run("vault-metrics") as run:
+            await _LimitedMessages(messages, "briefing").create(model="m")
+            run.finish({})
+
+        assert run.summary()["tokens"] == {"input": 1200, "output": 300, "cache_read": 1000}
+        metrics = get_pipeline_metrics()
+        assert metrics["tokens"]["briefing"]["input"] == 1200
+        assert metrics["upstreams"]["anthropic"]["calls"] == 1
+
+    async def test_claude_stream_records_usage_even_when_abandoned(self):
+        stream = SimpleNamespace(current_message_snapshot=SimpleNamespace(
+            usage=_usage(input=900, output=40),
+        ))
+
+        @asynccontextmanager
+        async def _stream(**kwargs):
+            yield stream
+
+        messages = MagicMock()
+        messages.stream = _stream
+
+        async with _LimitedMessages(messages, "unified_generation").stream(model="m"):
+            pass  # consumer stops early
+
+        assert get_pipeline_metrics()["tokens"]["unified_generation"] == {
+            "input": 900, "output": 40,
+        }
+
+    async def test_claude_failure_counts_error(self):
+        messages = MagicMock()
+        messages.create = AsyncMock(side_effect=RuntimeError("overloaded"))
+
+        with pytest.raises(RuntimeError):
+            await _LimitedMessages(messages, "briefing").create(model="m")
+
+        assert get_pipeline_metrics()["upstreams"]["anthropic"]["errors"] == 1
+
+
+# ===================================================================
+# 4. Full pipeline
+# ===================================================================
+
+def _claude_body() -> str:
+    return json.dumps([
+        {
+            "title": f"Gift {i}",
+            "description": "A thoughtful gift.",
+            "recommendation_type": "gift",
+            "is_purchasable": True,
+            "merchant_name": "Etsy",
+            "price_cents": 4000,
+            "search_query": f"etsy gift {i}",
+            "personalization_note": "Picked for their love of art.",
+        }
+        for i in range(3)
+    ])
+
+
+def _upstream_handler(request: httpx.Request) -> httpx.Response:
+    if request.url.host == "api.search.brave.com":
+        query = request.url.params["q"].replace(" ", "-")
+        return httpx.Response(200, json={"web": {"results": [
+            {"url": f"https://www.etsy.com/listing/{abs(hash(query)) % 10_000}/{query}"},
+        ]}})
+    offer = {"@type": "Offer", "price": "40.00", "priceCurrency": "USD"}
+    return httpx.Response(200, headers={"content-type": "text/html"}, text=(
+        "<html><head><title>Gift</title>"
+        f'<script type="application/ld+json">{json.dumps({"@type": "Product", "offers": offer})}'
+        "</script></head><body>In stock</body></html>"
+    ))
+
+
+class TestFullPipeline:
+    def test_every_graph_node_instrumented(self):
+        for name in ("retrieve_hints", "generate_unified", "generate_briefing",
+                     "resolve_urls", "verify_urls"):
+            node = recommendation_graph.nodes[name].bound
+            assert hasattr(node.afunc or node.func, "__wrapped__"), name
+
+    async def test_run_summary_and_histograms(self):
+        anthropic = MagicMock()
+        anthropic.messages.create = AsyncMock(return_value=SimpleNamespace(
+            content=[SimpleNamespace(text=_claude_body())],
+            stop_reason="end_turn",
+            usage=_usage(input=2500, output=800, cache_read=2000),
+        ))
+
+        with patch("app.core.http_clients.httpx.AsyncHTTPTransport",
+                   lambda **kwargs: httpx.MockTransport(_upstream_handler)), \
+             patch("app.agents.hint_retrieval.generate_embedding", new=AsyncMock(return_value=None)), \
+             patch("app.agents.hint_retrieval.get_service_client", return_value=MagicMock()), \
+             patch("app.agents.hint_retrieval.run_query",
+                   new=AsyncMock(return_value=MagicMock(data=[]))), \
+             patch("app.agents.unified_generation_node.UNIFIED_GENERATION_STREAMING", False), \
+             patch("app.services.unified_generation.is_anthropic_configured", return_value=True), \
+             patch("app.services.unified_generation.get_claude_client",
+                   return_value=ClaudeClient(anthropic, "unified_generation")), \
+             patch("app.agents.url_resolution.is_brave_search_configured", return_value=True):
+            result = await run_recommendation_pipeline(_state())
+
+        assert len(result["final_three"]) == 3
+        metrics = get_pipeline_metrics()
+        assert metrics["runs"] == {"ok": 1}
+        assert metrics["pipeline_seconds"]["count"] == 1
+        assert set(metrics["nodes"]) == {
+            "retrieve_hints", "generate_unified", "generate_briefing",
+            "resolve_urls", "verify_urls",
+        }
+        assert metrics["upstreams"]["brave"]["calls"] == 3
+        assert metrics["upstreams"]["merchants"]["calls"] == 3
+
+        summary = metrics["recent"][0]
+        assert summary["vault_id"] == "vault-metrics"
+        assert summary["outcome"] == "ok"
+        assert summary["calls"] == {"anthropic": 1, "brave": 3, "merchants": 3}
+        assert summary["tokens"] == {"input": 2500, "output": 800, "cache_read": 2000}
+        assert summary["nodes"]["generate_unified"]["calls"] == {"anthropic": 1}
+        assert summary["nodes"]["resolve_urls"]["calls"] == {"brave": 3}
+        assert summary["nodes"]["verify_urls"]["calls"] == {"merchants": 3}
+
+    async def test_short_circuit_counted(self):
+        with patch("app.agents.hint_retrieval.generate_embedding", new=AsyncMock(return_value=None)), \
+             patch("app.agents.hint_retrieval.get_service_client", return_value=MagicMock()), \
+             patch("app.agents.hint_retrieval.run_query",
+                   new=AsyncMock(return_value=MagicMock(data=[]))), \
+             patch("app.agents.unified_generation_node.UNIFIED_GENERATION_STREAMING", False), \
+             patch("app.agents.unified_generation_node.generate_unified_recommendations",
+                   new=AsyncMock(return_value=[])):
+            result = await run_recommendation_pipeline(_state())
+
+        assert result["error"]
+        metrics = get_pipeline_metrics()
+        assert metrics["runs"] == {"error": 1}
+        assert metrics["events"]["generate_unified"] == {"errors": 1, SHORT_CIRCUIT: 1}
+
+
+# ===================================================================
+# 5. Admin endpoint
+# ===================================================================
+
+class TestAdminEndpoint:
+    URL = "/api/v1/admin/pipeline-metrics"
+
+    def test_disabled_without_token(self):
+        with patch("app.core.security.ADMIN_API_TOKEN", ""):
+            response = TestClient(app).get(self.URL, headers={"X-Admin-Token": "x"})
+        assert response.status_code == 403
+
+    def test_wrong_or_missing_token(self):
+        client = TestClient(app)
+        with patch("app.core.security.ADMIN_API_TOKEN", "s3cret"):
+            assert client.get(self.URL).status_code == 401
+            assert client.get(self.URL, headers={"X-Admin-Token": "nope"}).status_code == 401
+
+    def test_returns_snapshot(self):
+        with pipeline_run("vault-metrics") as run:
+            run.finish({})
+
+        with patch("app.core.security.ADMIN_API_TOKEN", "s3cret"):
+            response = TestClient(app).get(
+                self.URL, params={"recent": 5}, headers={"X-Admin-Token": "s3cret"},
+            )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["runs"] == {"ok": 1}
+        assert body["recent"][0]["vault_id"] == "vault-metrics"
+        assert "pid" in body
+
+    def test_cache_stats(self):
+        with patch("app.core.security.ADMIN_API_TOKEN", "s3cret"):
+            response = TestClient(app).get(
+                "/api/v1/admin/cache-stats", headers={"X-Admin-Token": "s3cret"},
+            )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert set(body) == {
+            "pid", "vault", "embeddings", "brave", "pages", "hint_index", "account_status",
+        }
+        assert body["vault"]["vault_data"]["hits"] == 0
+        assert body["embeddings"]["memory"]["misses"] == 0
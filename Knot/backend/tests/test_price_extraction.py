@@ -0,0 +1,359 @@
+"""
+Tests for deterministic price extraction from structured page data
+(app.services.price_extraction) and its use in availability verification.
+
+Covers:
+1. Fixture corpus — every page in tests/fixtures/price_pages and
+   tests/fixtures/merchant_pages resolves to the price in
+   price_pages/expected.json, or is left for Claude; accuracy and latency
+   over the corpus
+2. Number and currency parsing — decimal conventions, ranges, symbols,
+   quantity and other numbers next to a price, conversion to US cents
+3. Confidence — agreeing and conflicting sources, missing or converted
+   currencies, the Claude fallback threshold
+4. Page text extraction — OpenGraph and microdata price fields reach the
+   "Price Meta:" line
+5. verify_availability — pages with a structured price skip the Claude call;
+   only unresolved pages are sent to Claude
+
+Run with: pytest tests/test_price_extraction.py -v
+"""
+
+import json
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.agents.availability import _extract_text_from_html, verify_availability
+from app.agents.state import (
+    BudgetRange,
+    CandidateRecommendation,
+    RecommendationState,
+    VaultData,
+)
+from app.services.price_extraction import (
+    PRICE_MIN_CONFIDENCE,
+    PRICE_VERIFIED_CONFIDENCE,
+    _parse_amounts,
+    _parse_number,
+    extract_price,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures"
+EXPECTED = {
+    name: result
+    for name, result in json.loads(
+        (FIXTURES / "price_pages" / "expected.json").read_text(encoding="utf-8"),
+    ).items()
+    if not name.startswith("_")
+}
+
+
+def _page_text(name: str) -> str:
+    return _extract_text_from_html((FIXTURES / name).read_text(encoding="utf-8"))
+
+
+def _jsonld_page(*blocks: dict, meta: str = "") -> str:
+    scripts = "".join(
+        f'<script type="application/ld+json">{json.dumps(block)}</script>'
+        for block in blocks
+    )
+    return _extract_text_from_html(
+        f"<html><head><title>Item</title>{meta}{scripts}</head>"
+        "<body><p>Item</p></body></html>"
+    )
+
+
+def _offer(price, currency: str | None = "USD") -> dict:
+    offer = {"@type": "Offer", "price": price}
+    if currency is not None:
+        offer["priceCurrency"] = currency
+    return {"@type": "Product", "name": "Item", "offers": offer}
+
+
+# ===================================================================
+# 1. Fixture corpus
+# ===================================================================
+
+class TestFixtureCorpus:
+    """Saved pages resolve to the expected price or fall back to Claude."""
+
+    @pytest.mark.parametrize("name", sorted(EXPECTED))
+    def test_expected_result(self, name):
+        extracted = extract_price(_page_text(name))
+        result = extracted.as_result() if extracted is not None else None
+        assert result == EXPECTED[name]
+
+    def test_accuracy(self):
+        """No page gets a wrong price; most priced pages skip Claude."""
+        resolved = wrong = 0
+        for name, expected in EXPECTED.items():
+            extracted = extract_price(_page_text(name))
+            if extracted is None:
+                continue
+            resolved += 1
+            if expected is None or extracted.price_cents != expected["price_cents"]:
+                wrong += 1
+
+        assert wrong == 0
+        assert resolved == sum(1 for expected in EXPECTED.values() if expected)
+        assert resolved / len(EXPECTED) >= 0.5
+
+    def test_latency(self):
+        """Local extraction is a rounding error next to a Sonnet call."""
+        texts = [_page_text(name) for name in sorted(EXPECTED)]
+        rounds = 20
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for text in texts:
+                extract_price(text)
+        per_page_ms = (time.perf_counter() - start) * 1000 / (rounds * len(texts))
+
+        print(f"\nprice extraction: {per_page_ms:.3f}ms per page")
+        assert per_page_ms < 5
+
+
+# ===================================================================
+# 2. Number and currency parsing
+# ===================================================================
+
+class TestParsing:
+    @pytest.mark.parametrize("text, expected", [
+        ("28.00", "28.00"),
+        ("1,299.00", "1299.00"),
+        ("1.299,00", "1299.00"),
+        ("49,99", "49.99"),
+        ("1,299", "1299"),
+        ("1.299.000", "1299000"),
+        ("1 299,00", "1299.00"),
+        ("1\u00a0299\u00a0000", "1299000"),
+    ])
+    def test_decimal_conventions(self, text, expected):
+        assert str(_parse_number(text)) == expected
+
+    @pytest.mark.parametrize("text, expected", [
+        ("$5 2-pack", ["5"]),
+        ("$49.99 2 pack", ["49.99"]),
+        ("2 for $30", ["30"]),
+        ("1 299,00 € 2 tasses", ["1299.00"]),
+        ("Pack of 12 – $18.00", ["18.00"]),
+        ("$1 299.00", ["1299.00"]),
+    ])
+    def test_quantity_text_next_to_symbol_price(self, text, expected):
+        assert [str(a) for a in _parse_amounts(text)[0]] == expected
+
+    @pytest.mark.parametrize("text", ["49.99 2 pack", "12.00 3 for 30.00", "5 2-pack"])
+    def test_ambiguous_bare_numbers_ignored(self, text):
+        assert _parse_amounts(text) == ([], None)
+
+    @pytest.mark.parametrize("text, expected", [
+        ("45.00 - 189.50", ["45.00", "189.50"]),
+        ("45 to 60", ["45", "60"]),
+        ("USD 1 299.00", ["1299.00"]),
+        ("49.99 USD", ["49.99"]),
+    ])
+    def test_bare_numbers_and_ranges(self, text, expected):
+        assert [str(a) for a in _parse_amounts(text)[0]] == expected
+
+    def test_unparseable_number(self):
+        assert _parse_number("1,2,3") is None
+        assert _parse_number("..") is None
+
+    def test_range_yields_both_ends(self):
+        amounts, currency = _parse_amounts("$45.00 - $189.50")
+        assert [str(a) for a in amounts] == ["45.00", "189.50"]
+        assert currency == "USD"
+
+    def test_numeric_json_values(self):
+        assert [str(a) for a in _parse_amounts(39)[0]] == ["39"]
+        assert [str(a) for a in _parse_amounts(39.5)[0]] == ["39.5"]
+        assert _parse_amounts(True) == ([], None)
+        assert _parse_amounts(None) == ([], None)
+
+    def test_range_in_price_field_uses_lower_end(self):
+        result = extract_price(_jsonld_page(_offer("45.00 - 60.00")))
+        assert result.price_cents == 4500
+
+    def test_converted_to_usd_cents(self):
+        result = extract_price(_jsonld_page(_offer("100", "EUR")))
+        assert result.price_cents == 10800
+        assert result.currency == "EUR"
+
+    def test_zero_decimal_currency(self):
+        result = extract_price(_jsonld_page(_offer("15000", "JPY")))
+        assert result.price_cents == 10050
+
+    def test_lowercase_currency_code(self):
+        assert extract_price(_jsonld_page(_offer("10", "usd"))).price_cents == 1000
+
+    def test_implausible_amount_ignored(self):
+        assert extract_price(_jsonld_page(_offer("250000000", "USD"))) is None
+
+
+# ===================================================================
+# 3. Confidence
+# ===================================================================
+
+class TestConfidence:
+    def test_jsonld_usd_is_verified(self):
+        result = extract_price(_jsonld_page(_offer("49.99")))
+        assert result.source == "jsonld"
+        assert result.verified
+        assert result.as_result() == {"price_cents": 4999, "verified": True}
+
+    def test_agreeing_sources_raise_confidence(self):
+        single = extract_price(_jsonld_page(_offer("49.99")))
+        both = extract_price(_jsonld_page(_offer("49.99"), meta=(
+            '<meta property="og:price:amount" content="49.99">'
+            '<meta property="og:price:currency" content="USD">'
+        )))
+        assert both.confidence > single.confidence
+
+    def test_conflicting_sources_go_to_claude(self):
+        text = _jsonld_page(_offer("49.99"), meta=(
+            '<meta property="og:price:amount" content="69.99">'
+            '<meta property="og:price:currency" content="USD">'
+        ))
+        assert extract_price(text) is None
+
+    def test_converted_price_is_estimated(self):
+        result = extract_price(_jsonld_page(_offer("40", "GBP")))
+        assert PRICE_MIN_CONFIDENCE <= result.confidence < PRICE_VERIFIED_CONFIDENCE
+        assert result.as_result()["verified"] is False
+
+    def test_missing_currency_goes_to_claude(self):
+        assert extract_price(_jsonld_page(_offer("40", None))) is None
+
+    def test_variant_prices_use_lowest(self):
+        product = {"@type": "Product", "offers": [
+            {"@type": "Offer", "price": "24.00", "priceCurrency": "USD"},
+            {"@type": "Offer", "price": "18.00", "priceCurrency": "USD"},
+        ]}
+        result = extract_price(_jsonld_page(product))
+        assert result.price_cents == 1800
+        assert result.confidence < extract_price(_jsonld_page(_offer("18.00"))).confidence
+
+    def test_offers_without_type(self):
+        product = {"@type": "Product", "offers": {"price": "12.00", "priceCurrency": "USD"}}
+        assert extract_price(_jsonld_page(product)).price_cents == 1200
+
+    def test_non_offer_prices_ignored(self):
+        restaurant = {"@type": "Restaurant", "priceRange": "$$$"}
+        assert extract_price(_jsonld_page(restaurant)) is None
+
+    def test_no_structured_data(self):
+        assert extract_price("") is None
+        assert extract_price("Title: Gift\nPage Text: Only $49.99 today") is None
+
+    def test_truncated_jsonld_ignored(self):
+        text = 'Structured Data: {"@type": "Offer", "price": "12.00", "priceCur'
+        assert extract_price(text) is None
+
+
+# ===================================================================
+# 4. Page text extraction
+# ===================================================================
+
+class TestPriceMetaLine:
+    def test_opengraph_fields_kept(self):
+        text = _page_text("merchant_pages/etsy_listing.html")
+        assert "Price Meta: product:price:amount=64.00; product:price:currency=USD" in text
+
+    def test_microdata_content_and_text(self):
+        text = _page_text("price_pages/microdata_span_text.html")
+        assert "itemprop:priceCurrency=USD" in text
+        assert "itemprop:price=18.50" in text
+
+    def test_price_meta_precedes_structured_data(self):
+        text = _page_text("merchant_pages/shopify_product.html")
+        lines = [line.split(": ", 1)[0] for line in text.split("\n")]
+        assert lines.index("Price Meta") < lines.index("Page Text")
+
+    def test_empty_itemprop_does_not_capture_later_text(self):
+        text = _extract_text_from_html(
+            '<span itemprop="price"></span><p>Shipping 5.00</p>'
+        )
+        assert "Price Meta" not in text
+
+
+# ===================================================================
+# 5. verify_availability
+# ===================================================================
+
+def _candidate(cid: str) -> CandidateRecommendation:
+    return CandidateRecommendation(
+        id=cid,
+        source="unified",
+        type="gift",
+        title=f"Gift {cid}",
+        description="A gift",
+        price_cents=5000,
+        external_url=f"https://shop.example.com/{cid}",
+        merchant_name="Shop",
+        final_score=1.0,
+    )
+
+
+def _state(candidates: list[CandidateRecommendation]) -> RecommendationState:
+    return RecommendationState(
+        vault_data=VaultData(
+            vault_id="vault-price-extraction",
+            partner_name="Alex",
+            relationship_tenure_months=24,
+            cohabitation_status="living_together",
+            location_city="Austin",
+            location_state="TX",
+            location_country="US",
+            interests=["Cooking", "Travel", "Music", "Art", "Hiking"],
+            dislikes=["Gaming", "Cars", "Skiing", "Karaoke", "Surfing"],
+            vibes=["quiet_luxury"],
+            primary_love_language="quality_time",
+            secondary_love_language="receiving_gifts",
+            budgets=[],
+        ),
+        occasion_type="just_because",
+        budget_range=BudgetRange(min_amount=2000, max_amount=10000),
+        final_three=candidates,
+        filtered_recommendations=candidates,
+    )
+
+
+class TestVerifyAvailability:
+    async def _run(self, pages: dict[str, str], claude: AsyncMock):
+        async def _fetch(url, client):
+            return True, pages[url.rsplit("/", 1)[-1]]
+
+        candidates = [_candidate(cid) for cid in pages]
+        with patch("app.agents.availability._fetch_page", side_effect=_fetch), \
+             patch("app.agents.availability._verify_prices_with_claude", claude):
+            result = await verify_availability(_state(candidates))
+        return {c.id: c for c in result["final_three"]}
+
+    async def test_structured_prices_skip_claude(self):
+        claude = AsyncMock(return_value={})
+        result = await self._run({
+            "a": _page_text("merchant_pages/etsy_listing.html"),
+            "b": _page_text("price_pages/opengraph_only_gbp.html"),
+        }, claude)
+
+        assert claude.await_args.args[0] == []
+        assert (result["a"].price_cents, result["a"].price_confidence) == (6400, "verified")
+        assert (result["b"].price_cents, result["b"].price_confidence) == (2540, "estimated")
+
+    async def test_only_unresolved_pages_sent_to_claude(self):
+        async def _claude(items):
+            return {c.id: {"id": c.id, "price_cents": 2750, "verified": True} for c, _ in items}
+
+        claude = AsyncMock(side_effect=_claude)
+        result = await self._run({
+            "a": _page_text("merchant_pages/ticketmaster_event.html"),
+            "b": _page_text("merchant_pages/amazon_product.html"),
+        }, claude)
+
+        sent = claude.await_args.args[0]
+        assert [candidate.id for candidate, _ in sent] == ["b"]
+        assert result["a"].price_cents == 4500
+        assert result["b"].price_cents == 2750
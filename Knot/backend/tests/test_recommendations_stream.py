@@ -0,0 +1,349 @@
+"""
+Tests for POST /api/v1/recommendations/generate/stream (Server-Sent Events).
+
+Covers:
+1. Event sequence — generation_started, card, card_resolved, card_verified,
+   briefing, complete (with persisted IDs), driven by the real LangGraph
+   pipeline with Claude, Brave and page fetches mocked
+2. Time-to-first-card — the first card event arrives long before the
+   pipeline finishes
+3. Errors — pre-stream failures keep their status codes; pipeline failures
+   become an "error" event
+4. The plain /generate endpoint keeps its JSON contract
+
+Runs offline: auth is overridden and vault loading / storage are mocked.
+
+Run with: pytest tests/test_recommendations_stream.py -v
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.agents.state import (
+    BudgetRange,
+    CandidateRecommendation,
+    MilestoneContext,
+    RecommendationState,
+    VaultData,
+)
+from app.api import recommendations as recommendations_api
+from app.core.security import get_active_user_id
+from app.main import app
+from app.models.recommendations import RecommendationGenerateRequest
+from app.services.briefing_generation import BriefingResult
+
+USER_ID = "user-stream-001"
+VAULT_ID = "vault-stream-001"
+
+
+# ===================================================================
+# Sample data factories
+# ===================================================================
+
+def _vault_data() -> VaultData:
+    return VaultData(
+        vault_id=VAULT_ID,
+        partner_name="Alex",
+        location_city="Austin",
+        location_state="TX",
+        location_country="US",
+        interests=["Cooking", "Travel", "Music", "Art", "Hiking"],
+        dislikes=["Gaming", "Cars", "Skiing", "Karaoke", "Surfing"],
+        vibes=["quiet_luxury", "romantic"],
+        primary_love_language="quality_time",
+        secondary_love_language="receiving_gifts",
+        budgets=[],
+    )
+
+
+def _milestone() -> MilestoneContext:
+    return MilestoneContext(
+        id="milestone-stream-001",
+        milestone_type="birthday",
+        milestone_name="Alex's Birthday",
+        milestone_date="2000-03-15",
+        recurrence="yearly",
+        budget_tier="major_milestone",
+        days_until=10,
+    )
+
+
+def _make_candidate(
+    title: str,
+    rec_type: str = "gift",
+    is_idea: bool = False,
+    **overrides,
+) -> CandidateRecommendation:
+    """An unresolved candidate, as unified generation produces it."""
+    data = {
+        "id": str(uuid.uuid4()),
+        "source": "unified",
+        "type": rec_type,
+        "title": title,
+        "description": f"A {rec_type} recommendation",
+        "price_cents": 5000,
+        "merchant_name": "Test Merchant",
+        "is_idea": is_idea,
+        "search_query": None if is_idea else f"buy {title}",
+    }
+    data.update(overrides)
+    return CandidateRecommendation(**data)
+
+
+def _mock_stream(candidates: list[CandidateRecommendation]) -> MagicMock:
+    """Stand-in for stream_unified_recommendations yielding the given candidates."""
+    async def _stream(**kwargs):
+        for candidate in candidates:
+            yield candidate
+    return MagicMock(side_effect=_stream)
+
+
+def _candidates():
+    return [
+        _make_candidate(title="Pottery Class for Two", rec_type="experience"),
+        _make_candidate(title="Italian Leather Journal"),
+        _make_candidate(
+            title="Starlight Picnic",
+            rec_type="idea",
+            is_idea=True,
+            price_cents=None,
+            merchant_name=None,
+            content_sections=[
+                {"type": "overview", "heading": "Overview", "body": "A romantic picnic."},
+                {"type": "steps", "heading": "Steps", "items": ["Step 1"]},
+            ],
+        ),
+    ]
+
+
+def _parse_sse(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.fixture
+def stub_briefing():
+    result = BriefingResult(
+        briefing_text="Alex's birthday is in 10 days.",
+        briefing_snippet="Birthday in 10 days",
+        hint_ids_referenced=[],
+    )
+    with patch(
+        "app.agents.briefing_node.generate_milestone_briefing",
+        new_callable=AsyncMock,
+        return_value=result,
+    ):
+        yield
+
+
+@pytest.fixture
+def stub_generation():
+    with patch(
+        "app.agents.unified_generation_node.stream_unified_recommendations",
+        _mock_stream(_candidates()),
+    ) as m:
+        yield m
+
+
+@pytest.fixture
+def api(stub_briefing):
+    """TestClient with auth, vault loading and storage mocked."""
+    inserted = MagicMock(data=[{"id": f"db-{i}"} for i in range(3)])
+    app.dependency_overrides[get_active_user_id] = lambda: USER_ID
+    with patch(
+        "app.api.recommendations.load_vault_data",
+        new_callable=AsyncMock,
+        return_value=(_vault_data(), VAULT_ID),
+    ), patch(
+        "app.api.recommendations.load_milestone_context",
+        new_callable=AsyncMock,
+        return_value=_milestone(),
+    ), patch(
+        "app.api.recommendations.load_learned_weights",
+        new_callable=AsyncMock,
+        return_value=None,
+    ), patch(
+        "app.api.recommendations._load_recent_titles",
+        new_callable=AsyncMock,
+        return_value=[],
+    ), patch(
+        "app.api.recommendations._load_recent_descriptions",
+        new_callable=AsyncMock,
+        return_value=[],
+    ), patch(
+        "app.api.recommendations.get_service_client",
+        return_value=MagicMock(),
+    ), patch(
+        "app.api.recommendations.run_query",
+        new_callable=AsyncMock,
+        return_value=inserted,
+    ):
+        yield TestClient(app)
+    app.dependency_overrides.pop(get_active_user_id, None)
+
+
+# ===================================================================
+# 1. Event sequence
+# ===================================================================
+
+class TestEventSequence:
+    """The stream reports every pipeline stage, then the stored result."""
+
+    def test_streams_all_events(
+        self, api, stub_generation, mock_embedding, mock_hint_db, mock_url_check,
+    ):
+        resp = api.post(
+            "/api/v1/recommendations/generate/stream",
+            json={"milestone_id": "milestone-pipe-001", "occasion_type": "major_milestone"},
+        )
+
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        events = _parse_sse(resp.text)
+        names = [name for name, _ in events]
+
+        assert names[0] == "generation_started"
+        assert names[-1] == "complete"
+        assert names.count("card") == 3
+        assert names.count("card_resolved") == 3
+        assert names.count("card_verified") == 3
+        assert names.count("briefing") == 1
+        # Each card is sent before its slot is verified
+        assert names.index("card") < names.index("card_verified")
+
+        cards = [data for name, data in events if name == "card"]
+        assert [c["index"] for c in cards] == [0, 1, 2]
+        assert cards[0]["recommendation"]["title"] == "Pottery Class for Two"
+
+        resolved = {
+            data["index"]: data["recommendation"] for name, data in events if name == "card_resolved"
+        }
+        assert resolved[0]["external_url"] and resolved[1]["external_url"]
+        assert resolved[2]["external_url"] is None  # the idea needs no URL
+
+        complete = events[-1][1]
+        assert [r["id"] for r in complete["recommendations"]] == ["db-0", "db-1", "db-2"]
+        assert complete["count"] == 3
+        assert complete["briefing_text"] == "Alex's birthday is in 10 days."
+
+    def test_plain_generate_keeps_json_contract(
+        self, api, stub_generation, mock_embedding, mock_hint_db, mock_url_check,
+    ):
+        resp = api.post(
+            "/api/v1/recommendations/generate",
+            json={"milestone_id": "milestone-pipe-001", "occasion_type": "major_milestone"},
+        )
+
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/json"
+        data = resp.json()
+        assert data["count"] == 3
+        assert [r["id"] for r in data["recommendations"]] == ["db-0", "db-1", "db-2"]
+        assert data["briefing_snippet"] == "Birthday in 10 days"
+
+
+# ===================================================================
+# 2. Time to first card
+# ===================================================================
+
+class TestTimeToFirstCard:
+    """The first card is delivered long before the pipeline completes."""
+
+    async def test_first_card_arrives_early(
+        self, stub_briefing, mock_embedding, mock_hint_db, mock_url_check,
+    ):
+        candidates = _candidates()
+
+        async def _slow_stream(**kwargs):
+            yield candidates[0]
+            await asyncio.sleep(0.3)  # Claude still writing cards 2-3
+            for candidate in candidates[1:]:
+                yield candidate
+
+        payload = RecommendationGenerateRequest(occasion_type="just_because")
+        state = RecommendationState(
+            vault_data=_vault_data(),
+            occasion_type="major_milestone",
+            budget_range=BudgetRange(min_amount=2000, max_amount=25000),
+        )
+        arrivals: dict[str, float] = {}
+
+        with patch(
+            "app.agents.unified_generation_node.stream_unified_recommendations",
+            MagicMock(side_effect=_slow_stream),
+        ), patch(
+            "app.api.recommendations._store_generation",
+            new_callable=AsyncMock,
+            return_value=MagicMock(model_dump=MagicMock(return_value={})),
+        ):
+            start = time.perf_counter()
+            async for chunk in recommendations_api._generate_event_stream(
+                payload, state, VAULT_ID,
+            ):
+                name = chunk.split("\n", 1)[0].removeprefix("event: ")
+                arrivals.setdefault(name, time.perf_counter() - start)
+
+        assert arrivals["card"] < 0.15
+        assert arrivals["complete"] >= 0.3
+        assert arrivals["card"] < arrivals["complete"] / 2
+
+
+# ===================================================================
+# 3. Errors
+# ===================================================================
+
+class TestStreamErrors:
+    """Failures before the stream keep HTTP codes; later ones are events."""
+
+    def test_missing_vault_is_404(self, api):
+        with patch(
+            "app.api.recommendations.load_vault_data",
+            new_callable=AsyncMock,
+            side_effect=ValueError("no vault"),
+        ):
+            resp = api.post(
+                "/api/v1/recommendations/generate/stream",
+                json={"occasion_type": "just_because"},
+            )
+        assert resp.status_code == 404
+
+    def test_empty_generation_emits_error_event(
+        self, api, mock_embedding, mock_hint_db, mock_url_check,
+    ):
+        with patch(
+            "app.agents.unified_generation_node.stream_unified_recommendations",
+            _mock_stream([]),
+        ):
+            resp = api.post(
+                "/api/v1/recommendations/generate/stream",
+                json={"occasion_type": "just_because"},
+            )
+
+        events = _parse_sse(resp.text)
+        assert [name for name, _ in events] == ["generation_started", "error"]
+        assert events[-1][1]["status_code"] == 500
+        assert events[-1][1]["detail"]
+
+    def test_pipeline_exception_emits_error_event(self, api):
+        async def _boom(state):
+            raise RuntimeError("graph exploded")
+            yield  # pragma: no cover
+
+        with patch("app.api.recommendations.stream_recommendation_pipeline", _boom):
+            resp = api.post(
+                "/api/v1/recommendations/generate/stream",
+                json={"occasion_type": "just_because"},
+            )
+
+        events = _parse_sse(resp.text)
+        assert events[-1][0] == "error"
+        assert "graph exploded" not in events[-1][1]["detail"]
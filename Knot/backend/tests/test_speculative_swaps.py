@@ -0,0 +1,266 @@
+"""
+Tests for speculative backup resolution in verify_availability
+(AVAILABILITY_SPECULATIVE_SWAPS, app.agents.availability._SpeculativeSpares).
+
+Covers:
+1. Concurrency — backups resolve in parallel, starting as soon as a slot
+   fails and while other primary pages are still being fetched
+2. Assignment — failing slots get the best-scored bookable spares, in slot
+   order, with the same per-slot lookup budget as the serial loop
+3. Cleanup — lookups still running once every slot is filled are cancelled;
+   a lookup that raises counts as not bookable
+4. Serial mode — with the flag off, backups are tried one at a time
+
+Page fetches and Brave lookups are replaced with slowed stubs; no network
+access.
+
+Run with: pytest tests/test_speculative_swaps.py -v
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, patch
+
+from app.agents.availability import MAX_REPLACEMENT_ATTEMPTS, verify_availability
+from app.agents.state import (
+    BudgetRange,
+    CandidateRecommendation,
+    RecommendationState,
+    VaultData,
+)
+
+LOOKUP_DELAY = 0.2  # seconds per stubbed Brave search + page fetch
+
+
+def _candidate(
+    cid: str,
+    final_score: float,
+    url: str | None = None,
+    is_idea: bool = False,
+) -> CandidateRecommendation:
+    return CandidateRecommendation(
+        id=cid,
+        source="unified",
+        type="idea" if is_idea else "gift",
+        title=f"Card {cid}",
+        description="A recommendation",
+        price_cents=None if is_idea else 5000,
+        external_url=url,
+        merchant_name=None if is_idea else "Shop",
+        search_query=None if is_idea else f"buy {cid}",
+        is_idea=is_idea,
+        final_score=final_score,
+    )
+
+
+def _state(
+    selected: list[CandidateRecommendation],
+    backups: list[CandidateRecommendation],
+) -> RecommendationState:
+    return RecommendationState(
+        vault_data=VaultData(
+            vault_id="vault-speculative",
+            partner_name="Alex",
+            relationship_tenure_months=24,
+            cohabitation_status="living_together",
+            location_city="Austin",
+            location_state="TX",
+            location_country="US",
+            interests=["Cooking", "Travel", "Music", "Art", "Hiking"],
+            dislikes=["Gaming", "Cars", "Skiing", "Karaoke", "Surfing"],
+            vibes=["quiet_luxury"],
+            primary_love_language="quality_time",
+            secondary_love_language="receiving_gifts",
+            budgets=[],
+        ),
+        occasion_type="just_because",
+        budget_range=BudgetRange(min_amount=2000, max_amount=10000),
+        final_three=selected,
+        filtered_recommendations=selected + backups,
+    )
+
+
+class _Stubs:
+    """Slowed page fetches and backup lookups, recording what ran."""
+
+    def __init__(self, live_backups: set[str], dead_pages: set[str] = frozenset(),
+                 page_delay: float = 0.0, hanging: set[str] = frozenset()):
+        self.live_backups = live_backups
+        self.dead_pages = dead_pages
+        self.page_delay = page_delay
+        self.hanging = hanging
+        self.started: list[str] = []
+        self.cancelled: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def fetch(self, url, client):
+        await asyncio.sleep(self.page_delay)
+        return url not in self.dead_pages, ""
+
+    async def resolve(self, candidate, client):
+        self.started.append(candidate.id)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(60 if candidate.id in self.hanging else LOOKUP_DELAY)
+        except asyncio.CancelledError:
+            self.cancelled.append(candidate.id)
+            raise
+        finally:
+            self.in_flight -= 1
+        if candidate.id not in self.live_backups:
+            return None
+        return candidate.model_copy(
+            update={"external_url": f"https://shop.example.com/{candidate.id}"},
+        ), ""
+
+    async def run(self, state: RecommendationState, speculative: bool = True):
+        @asynccontextmanager
+        async def _client(*args, **kwargs):
+            yield None  # the stubs never touch the client
+
+        with patch("app.agents.availability.upstream_client", _client), \
+             patch("app.agents.availability.AVAILABILITY_SPECULATIVE_SWAPS", speculative), \
+             patch("app.agents.availability._fetch_page", side_effect=self.fetch), \
+             patch("app.agents.availability._resolve_and_verify", side_effect=self.resolve), \
+             patch("app.agents.availability._verify_prices_with_claude",
+                   new=AsyncMock(return_value={})):
+            start = time.perf_counter()
+            result = await verify_availability(state)
+        return [c.id for c in result["final_three"]], time.perf_counter() - start
+
+
+def _backups(count: int) -> list[CandidateRecommendation]:
+    return [_candidate(f"b{i}", final_score=4.0 - i * 0.1) for i in range(count)]
+
+
+# ===================================================================
+# 1. Concurrency
+# ===================================================================
+
+class TestConcurrency:
+    async def test_backups_resolve_in_parallel(self):
+        """Three failing lookups cost one lookup's latency, not three."""
+        selected = [_candidate("a", 5.0, url="https://shop.example.com/dead")]
+        stubs = _Stubs(live_backups={"b2"}, dead_pages={"https://shop.example.com/dead"})
+
+        ids, elapsed = await stubs.run(_state(selected, _backups(4)))
+
+        assert ids == ["b2"]
+        assert stubs.max_in_flight == MAX_REPLACEMENT_ATTEMPTS
+        assert elapsed < 2 * LOOKUP_DELAY
+
+    async def test_unresolved_slot_speculates_during_primary_fetches(self):
+        """A slot with no URL starts its spares while other pages load."""
+        selected = [
+            _candidate("a", 5.0, url=None),
+            _candidate("b", 4.5, url="https://shop.example.com/slow"),
+        ]
+        stubs = _Stubs(live_backups={"b0"}, page_delay=LOOKUP_DELAY)
+
+        ids, elapsed = await stubs.run(_state(selected, _backups(3)))
+
+        assert ids == ["b0", "b"]
+        assert elapsed < 1.5 * LOOKUP_DELAY
+
+    async def test_happy_path_resolves_nothing(self):
+        selected = [_candidate("a", 5.0, url="https://shop.example.com/a")]
+        stubs = _Stubs(live_backups={"b0"})
+
+        ids, _ = await stubs.run(_state(selected, _backups(3)))
+
+        assert ids == ["a"]
+        assert stubs.started == []
+
+
+# ===================================================================
+# 2. Assignment
+# ===================================================================
+
+class TestAssignment:
+    async def test_best_spares_assigned_in_slot_order(self):
+        selected = [
+            _candidate("a", 5.0, url="https://shop.example.com/dead-a"),
+            _candidate("b", 4.8, url="https://shop.example.com/ok"),
+            _candidate("c", 4.6, url=None),
+        ]
+        stubs = _Stubs(
+            live_backups={"b1", "b3", "b4"},
+            dead_pages={"https://shop.example.com/dead-a"},
+        )
+
+        ids, _ = await stubs.run(_state(selected, _backups(6)))
+
+        assert ids == ["b1", "b", "b3"]
+
+    async def test_lookup_budget_matches_serial_loop(self):
+        """One failing slot speculates on MAX_REPLACEMENT_ATTEMPTS backups."""
+        selected = [_candidate("a", 5.0, url=None)]
+        stubs = _Stubs(live_backups=set())
+
+        ids, _ = await stubs.run(_state(
+            selected, _backups(MAX_REPLACEMENT_ATTEMPTS + 2)
+            + [_candidate("idea", 0.5, is_idea=True)],
+        ))
+
+        assert ids == ["idea"]
+        assert len(stubs.started) == MAX_REPLACEMENT_ATTEMPTS
+
+    async def test_ideas_never_speculated(self):
+        selected = [_candidate("a", 5.0, url=None)]
+        stubs = _Stubs(live_backups=set())
+
+        ids, _ = await stubs.run(_state(selected, [_candidate("idea", 4.0, is_idea=True)]))
+
+        assert ids == ["idea"]
+        assert stubs.started == []
+
+
+# ===================================================================
+# 3. Cleanup
+# ===================================================================
+
+class TestCleanup:
+    async def test_unneeded_lookups_cancelled(self):
+        selected = [_candidate("a", 5.0, url=None)]
+        stubs = _Stubs(live_backups={"b0"}, hanging={"b1", "b2"})
+
+        ids, elapsed = await stubs.run(_state(selected, _backups(3)))
+
+        assert ids == ["b0"]
+        assert sorted(stubs.cancelled) == ["b1", "b2"]
+        assert elapsed < 2 * LOOKUP_DELAY
+
+    async def test_failing_lookup_is_not_bookable(self):
+        selected = [_candidate("a", 5.0, url=None)]
+        stubs = _Stubs(live_backups={"b1"})
+        original = stubs.resolve
+
+        async def _resolve(candidate, client):
+            if candidate.id == "b0":
+                raise RuntimeError("brave exploded")
+            return await original(candidate, client)
+
+        stubs.resolve = _resolve
+        ids, _ = await stubs.run(_state(selected, _backups(2)))
+
+        assert ids == ["b1"]
+
+
+# ===================================================================
+# 4. Serial mode
+# ===================================================================
+
+class TestSerialMode:
+    async def test_flag_off_tries_one_at_a_time(self):
+        selected = [_candidate("a", 5.0, url=None)]
+        stubs = _Stubs(live_backups={"b2"})
+
+        ids, elapsed = await stubs.run(_state(selected, _backups(4)), speculative=False)
+
+        assert ids == ["b2"]
+        assert stubs.started == ["b0", "b1", "b2"]
+        assert stubs.max_in_flight == 1
+        assert elapsed >= 3 * LOOKUP_DELAY
@@ -0,0 +1,318 @@
+"""
+Tests for streaming unified generation.
+
+Covers:
+1. JSONArrayStreamParser — elements emitted as soon as they close, however
+   the text is chunked
+2. stream_unified_recommendations — cards yielded mid-stream, retries,
+   max_tokens handling
+3. generate_unified node — URL resolution for card 1 overlaps generation of
+   the remaining cards, and resolve_urls doesn't repeat it
+
+All Claude and Brave calls are mocked.
+
+Run with: pytest tests/test_streaming_generation.py -v
+"""
+
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.agents.state import BudgetRange, RecommendationState
+from app.agents.unified_generation_node import generate_unified
+from app.agents.url_resolution import resolve_purchase_urls
+from app.services.json_stream import JSONArrayStreamParser
+from app.services.unified_generation import stream_unified_recommendations
+from tests.test_unified_generation import (
+    _sample_budget_range,
+    _sample_claude_response,
+    _sample_vault_data,
+)
+
+
+class _FakeStream:
+    """Stands in for anthropic's MessageStream: text deltas plus a final message."""
+
+    def __init__(self, chunks: list[str], delay: float = 0.0, stop_reason: str = "end_turn"):
+        self._chunks = chunks
+        self._delay = delay
+        self._stop_reason = stop_reason
+        self.chunks_sent = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    async def text_stream(self):
+        for chunk in self._chunks:
+            if self._delay:
+                await asyncio.sleep(self._delay)
+            self.chunks_sent += 1
+            yield chunk
+
+    async def get_final_message(self):
+        return MagicMock(stop_reason=self._stop_reason)
+
+
+def _chunked(text: str, size: int = 40) -> list[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _mock_claude(*streams: _FakeStream):
+    """Patch get_claude_client so each messages.stream() call returns the next stream."""
+    client = MagicMock()
+    client.messages.stream = MagicMock(side_effect=list(streams))
+    return patch(
+        "app.services.unified_generation.get_claude_client", return_value=client,
+    ), client
+
+
+async def _collect(**overrides) -> list:
+    kwargs = {
+        "vault_data": _sample_vault_data(),
+        "hints": [],
+        "occasion_type": "just_because",
+        "budget_range": _sample_budget_range(),
+    }
+    kwargs.update(overrides)
+    return [rec async for rec in stream_unified_recommendations(**kwargs)]
+
+
+@pytest.fixture
+def anthropic_configured():
+    with patch(
+        "app.services.unified_generation.is_anthropic_configured", return_value=True,
+    ):
+        yield
+
+
+# ======================================================================
+# 1. Incremental parser
+# ======================================================================
+
+class TestJSONArrayStreamParser:
+    """Elements are emitted once complete, independent of chunk boundaries."""
+
+    @pytest.mark.parametrize("size", [1, 3, 17, 10_000])
+    def test_parses_any_chunking(self, size):
+        recs = _sample_claude_response()
+        parser = JSONArrayStreamParser()
+        out = []
+        for chunk in _chunked(json.dumps(recs), size):
+            out.extend(parser.feed(chunk))
+
+        assert out == recs
+        assert parser.finished
+
+    def test_element_emitted_before_array_closes(self):
+        parser = JSONArrayStreamParser()
+        assert parser.feed('[{"a": 1}, {"b": ') == [{"a": 1}]
+        assert parser.feed('2}') == [{"b": 2}]
+        assert not parser.finished
+        assert parser.feed("]") == []
+        assert parser.finished
+
+    def test_braces_and_escapes_inside_strings(self):
+        text = '[{"t": "a } ] { [ \\" quoted \\\\"}, {"u": "ok"}]'
+        parser = JSONArrayStreamParser()
+        out = []
+        for ch in text:
+            out.extend(parser.feed(ch))
+        assert out == [{"t": 'a } ] { [ " quoted \\'}, {"u": "ok"}]
+
+    def test_ignores_code_fence_and_trailing_text(self):
+        parser = JSONArrayStreamParser()
+        out = parser.feed('```json\n[{"a": 1}]\n```')
+        assert out == [{"a": 1}]
+        assert parser.feed('[{"b": 2}]') == []
+
+    def test_truncated_element_not_emitted(self):
+        parser = JSONArrayStreamParser()
+        assert parser.feed('[{"a": 1}, {"b": "cut off mid') == [{"a": 1}]
+        assert not parser.finished
+
+    def test_skips_scalars_and_counts_bad_elements(self):
+        parser = JSONArrayStreamParser()
+        assert parser.feed('[1, "x", {"a": 1,}, {"b": 2}]') == [{"b": 2}]
+        assert parser.errors == 1
+
+
+# ======================================================================
+# 2. stream_unified_recommendations
+# ======================================================================
+
+class TestStreamUnifiedRecommendations:
+    """Cards are validated, normalized and yielded as they complete."""
+
+    async def test_yields_all_valid_cards(self, anthropic_configured):
+        text = json.dumps(_sample_claude_response())
+        patcher, _ = _mock_claude(_FakeStream(_chunked(text)))
+        with patcher:
+            recs = await _collect()
+
+        assert [r.title for r in recs] == [r["title"] for r in _sample_claude_response()]
+        assert recs[2].is_idea
+        assert recs[0].search_query
+
+    async def test_first_card_yielded_before_stream_ends(self, anthropic_configured):
+        stream = _FakeStream(_chunked(json.dumps(_sample_claude_response())))
+        patcher, _ = _mock_claude(stream)
+        with patcher:
+            gen = stream_unified_recommendations(
+                vault_data=_sample_vault_data(),
+                hints=[],
+                occasion_type="just_because",
+                budget_range=_sample_budget_range(),
+            )
+            first = await gen.__anext__()
+            sent_at_first = stream.chunks_sent
+            rest = [r async for r in gen]
+
+        assert first.title == "Ceramic Pottery Class for Two"
+        assert sent_at_first < len(stream._chunks)
+        assert len(rest) == 2
+
+    async def test_invalid_cards_skipped(self, anthropic_configured):
+        recs = _sample_claude_response()
+        recs.insert(1, {"title": "Missing fields"})
+        patcher, _ = _mock_claude(_FakeStream(_chunked(json.dumps(recs))))
+        with patcher:
+            out = await _collect()
+
+        assert len(out) == 3
+        assert "Missing fields" not in [r.title for r in out]
+
+    async def test_max_tokens_keeps_completed_cards(self, anthropic_configured):
+        recs = _sample_claude_response()
+        text = json.dumps(recs)
+        truncated = text[: text.index(recs[2]["title"])]  # cut inside card 3
+        patcher, client = _mock_claude(
+            _FakeStream([truncated], stop_reason="max_tokens"),
+            _FakeStream([json.dumps(recs)]),
+        )
+        with patcher:
+            out = await _collect()
+
+        # Cards 1-2 kept from the truncated attempt; the retry adds only card 3
+        assert [r.title for r in out] == [r["title"] for r in recs]
+        assert client.messages.stream.call_count == 2
+
+    async def test_retries_after_stream_error(self, anthropic_configured):
+        class _Broken(_FakeStream):
+            @property
+            async def text_stream(self):
+                yield '[{"title": '
+                raise RuntimeError("connection reset")
+
+        patcher, client = _mock_claude(
+            _Broken([]), _FakeStream([json.dumps(_sample_claude_response())]),
+        )
+        with patcher:
+            out = await _collect()
+
+        assert len(out) == 3
+        assert client.messages.stream.call_count == 2
+
+    async def test_stops_at_generation_target(self, anthropic_configured):
+        recs = _sample_claude_response()
+        extra = [dict(recs[0], title=f"Extra {i}") for i in range(5)]
+        patcher, _ = _mock_claude(_FakeStream([json.dumps(recs + extra)]))
+        with patcher:
+            out = await _collect()
+
+        assert len(out) == 5
+
+    async def test_not_configured_yields_nothing(self):
+        with patch(
+            "app.services.unified_generation.is_anthropic_configured", return_value=False,
+        ):
+            assert await _collect() == []
+
+
+# ======================================================================
+# 3. Node overlap with URL resolution
+# ======================================================================
+
+def _state() -> RecommendationState:
+    return RecommendationState(
+        vault_data=_sample_vault_data(),
+        occasion_type="just_because",
+        budget_range=BudgetRange(min_amount=2000, max_amount=5000),
+    )
+
+
+class TestStreamingNode:
+    """The node resolves URLs for shown cards while generation continues."""
+
+    async def test_url_resolution_overlaps_generation(self, anthropic_configured):
+        # Five cards, ~0.1s of generation each; Brave takes 0.2s per lookup
+        recs = _sample_claude_response()
+        recs += [dict(recs[1], title=f"Backup Gift {i}") for i in range(2)]
+        chunks = [json.dumps(r) + ("," if i < len(recs) - 1 else "") for i, r in enumerate(recs)]
+        chunks = ["["] + chunks + ["]"]
+        stream = _FakeStream(chunks, delay=0.1)
+
+        search_started: list[int] = []
+
+        async def _slow_search(search_query, merchant_name=None):
+            search_started.append(stream.chunks_sent)
+            await asyncio.sleep(0.2)
+            return f"https://shop.example.com/{len(search_started)}"
+
+        patcher, _ = _mock_claude(stream)
+        with patcher, patch(
+            "app.agents.url_resolution._search_for_purchase_url", side_effect=_slow_search,
+        ), patch("app.agents.unified_generation_node.UNIFIED_GENERATION_STREAMING", True):
+            start = time.perf_counter()
+            result = await generate_unified(_state())
+            elapsed = time.perf_counter() - start
+
+        # Card 1's lookup began while later cards were still streaming
+        assert search_started[0] < len(chunks)
+        # Generation ~0.7s; sequential (generate, then resolve) would be ~0.9s
+        assert elapsed < 0.85
+        assert [r.external_url is not None for r in result["final_three"]] == [True, True, False]
+        assert set(result["url_resolved_ids"]) == {r.id for r in result["final_three"]}
+        assert len(result["filtered_recommendations"]) == 2
+
+    async def test_resolve_urls_skips_already_resolved(self):
+        state = _state()
+        node_patch = patch(
+            "app.agents.url_resolution._search_for_purchase_url",
+            new_callable=AsyncMock,
+            return_value="https://shop.example.com/x",
+        )
+        text = json.dumps(_sample_claude_response())
+        patcher, _ = _mock_claude(_FakeStream([text]))
+        with patcher, node_patch as search, patch(
+            "app.services.unified_generation.is_anthropic_configured", return_value=True,
+        ), patch("app.agents.unified_generation_node.UNIFIED_GENERATION_STREAMING", True):
+            update = await generate_unified(state)
+            assert search.await_count == 2  # the two purchasables
+
+            state = state.model_copy(update=update)
+            resolved = await resolve_purchase_urls(state)
+
+        assert search.await_count == 2  # no repeat lookups
+        assert resolved["final_three"] == update["final_three"]
+
+    async def test_non_streaming_mode_leaves_resolution_to_resolve_urls(self):
+        candidates = [
+            MagicMock(id=f"c{i}", title=f"Card {i}", type="gift") for i in range(3)
+        ]
+        with patch("app.agents.unified_generation_node.UNIFIED_GENERATION_STREAMING", False), \
+             patch(
+                 "app.agents.unified_generation_node.generate_unified_recommendations",
+                 new_callable=AsyncMock,
+                 return_value=candidates,
+             ):
+            result = await generate_unified(_state())
+
+        assert result["final_three"] == candidates
+        assert result["url_resolved_ids"] == []
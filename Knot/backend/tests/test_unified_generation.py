@@ -761,7 +761,7 @@ class TestGenerateUnifiedRecommendations:
         mock_client.messages.create = AsyncMock(return_value=mock_response)
 
         with patch(
-            "app.services.unified_generation.AsyncAnthropic",
+            "app.services.unified_generation.get_claude_client",
             return_value=mock_client,
         ), patch(
             "app.services.unified_generation.is_anthropic_configured",
@@ -887,7 +887,7 @@ class TestGenerateUnifiedRecommendations:
         )
 
         with patch(
-            "app.services.unified_generation.AsyncAnthropic",
+            "app.services.unified_generation.get_claude_client",
             return_value=mock_client,
         ), patch(
             "app.services.unified_generation.is_anthropic_configured",
@@ -913,7 +913,7 @@ class TestGenerateUnifiedRecommendations:
         mock_client.messages.create = AsyncMock(return_value=invalid_response)
 
         with patch(
-            "app.services.unified_generation.AsyncAnthropic",
+            "app.services.unified_generation.get_claude_client",
             return_value=mock_client,
         ), patch(
             "app.services.unified_generation.is_anthropic_configured",
@@ -942,7 +942,7 @@ class TestGenerateUnifiedRecommendations:
         mock_client.messages.create = AsyncMock(return_value=mock_response)
 
         with patch(
-            "app.services.unified_generation.AsyncAnthropic",
+            "app.services.unified_generation.get_claude_client",
             return_value=mock_client,
         ), patch(
             "app.services.unified_generation.is_anthropic_configured",
@@ -973,7 +973,7 @@ class TestGenerateUnifiedRecommendations:
         mock_client.messages.create = AsyncMock(return_value=mock_response)
 
         with patch(
-            "app.services.unified_generation.AsyncAnthropic",
+            "app.services.unified_generation.get_claude_client",
             return_value=mock_client,
         ), patch(
             "app.services.unified_generation.is_anthropic_configured",
@@ -1022,7 +1022,7 @@ class TestGenerateUnifiedRecommendations:
         mock_client.messages.create = AsyncMock(side_effect=[truncated, clean])
 
         with patch(
-            "app.services.unified_generation.AsyncAnthropic",
+            "app.services.unified_generation.get_claude_client",
             return_value=mock_client,
         ), patch(
             "app.services.unified_generation.is_anthropic_configured",
@@ -1049,7 +1049,7 @@ class TestGenerateUnifiedRecommendations:
         mock_client.messages.create = AsyncMock(return_value=truncated)
 
         with patch(
-            "app.services.unified_generation.AsyncAnthropic",
+            "app.services.unified_generation.get_claude_client",
             return_value=mock_client,
         ), patch(
             "app.services.unified_generation.is_anthropic_configured",
@@ -1083,7 +1083,7 @@ class TestGenerateUnifiedRecommendations:
         mock_client.messages.create = AsyncMock(return_value=mock_response)
 
         with patch(
-            "app.services.unified_generation.AsyncAnthropic",
+            "app.services.unified_generation.get_claude_client",
             return_value=mock_client,
         ), patch(
             "app.services.unified_generation.is_anthropic_configured",
@@ -9,10 +9,11 @@ no `location` and are left unchanged.
 Run with: pytest tests/test_url_resolution.py -v
 """
 
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from app.agents.budget import BRAVE_THROTTLED
 from app.agents.state import (
     CandidateRecommendation,
     LocationData,
@@ -27,6 +28,7 @@ from app.agents.url_resolution import (
     is_search_or_shopping_url,
     resolve_purchase_urls,
 )
+from app.services.brave_limiter import BraveQueueTimeout, BraveThrottled
 
 
 class TestIsSearchOrShoppingURL:
@@ -331,6 +333,17 @@ class TestSearchForPurchaseURL:
         with patch("app.agents.url_resolution.is_brave_search_configured", return_value=False):
             assert await _search_for_purchase_url("anything") is None
 
+    @pytest.mark.asyncio
+    async def test_rate_limited_search_raises_throttled(self):
+        """A 429 that outlasted the limiter's retry is not "no page"."""
+        cfg, cli = _patch_brave([])
+        with cfg, cli, patch(
+            "app.agents.url_resolution.brave_get",
+            new=AsyncMock(return_value=MagicMock(status_code=429)),
+        ):
+            with pytest.raises(BraveThrottled):
+                await _search_for_purchase_url("the fonda tickets")
+
 
 def _make_state(candidate: CandidateRecommendation) -> RecommendationState:
     from app.agents.state import BudgetRange, VaultData
@@ -380,6 +393,21 @@ class TestResolvePurchaseURLs:
         item = result["final_three"][0]
         assert item.external_url is None
 
+    @pytest.mark.asyncio
+    async def test_throttled_resolution_is_reported(self):
+        # Brave throttled → unresolved, but listed so availability keeps it.
+        candidate = _make_candidate()
+        state = _make_state(candidate)
+        with patch(
+            "app.agents.url_resolution._search_for_purchase_url",
+            new=AsyncMock(side_effect=BraveQueueTimeout("queue full")),
+        ):
+            result = await resolve_purchase_urls(state)
+
+        assert result["final_three"][0].external_url is None
+        assert result["url_throttled_ids"] == [candidate.id]
+        assert result["degradations"] == [BRAVE_THROTTLED]
+
     @pytest.mark.asyncio
     async def test_idea_skips_resolution(self):
         candidate = _make_candidate(
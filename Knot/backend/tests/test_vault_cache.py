@@ -0,0 +1,303 @@
+"""
+Tests for the versioned in-process vault cache (app.services.vault_cache).
+
+Covers:
+1. load_vault_data / load_learned_weights served from cache, with counters
+2. Invalidation from every write path: vault create, milestone CRUD,
+   upsert_user_weights
+3. load_vault_id (milestones, ideas, recommendations) reuses the cached vault_id
+
+The cache mechanics themselves are covered in tests/test_lru_cache.py.
+
+All tests run offline against mocked Supabase clients.
+
+Run with: pytest tests/test_vault_cache.py -v
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.agents.state import VaultData
+from app.core.security import get_active_user_id
+from app.main import app
+from app.models.feedback_analysis import UserPreferencesWeights
+from app.services import vault_cache
+from app.services.lru_cache import MISS
+from app.services.vault_cache import (
+    cache_vault_data,
+    get_cached_vault_data,
+    get_cached_vault_id,
+    get_vault_cache_stats,
+    invalidate_vault,
+    vault_data_version,
+)
+from app.services.vault_loader import load_learned_weights, load_vault_data
+
+
+USER_ID = "aaaaaaaa-bbbb-cccc-dddd-eeeeeeeeeeee"
+VAULT_ID = "vault-cache-1"
+
+_RPC_DOCUMENT = {
+    "vault": {"id": VAULT_ID, "partner_name": "Sam", "location_country": "US"},
+    "interests": [{"interest_type": "like", "interest_category": "Cooking"}],
+    "vibes": [{"vibe_tag": "romantic"}],
+    "budgets": [],
+    "love_languages": [{"language": "quality_time", "priority": 1}],
+}
+
+
+def _vault_data(name: str = "Sam") -> VaultData:
+    return VaultData(
+        vault_id=VAULT_ID,
+        partner_name=name,
+        interests=["Cooking"],
+        dislikes=[],
+        vibes=["romantic"],
+        primary_love_language="quality_time",
+        secondary_love_language="",
+        budgets=[],
+    )
+
+
+def _chain_client(data) -> MagicMock:
+    """Mock service client whose every query returns `data`."""
+    builder = MagicMock()
+    for method in ("select", "eq", "order", "limit", "insert", "update", "delete", "upsert"):
+        getattr(builder, method).return_value = builder
+    builder.execute.return_value = MagicMock(data=data)
+    client = MagicMock()
+    client.table.return_value = builder
+    client.rpc.return_value = builder
+    return client
+
+
+# ===================================================================
+# 1. Loader integration
+# ===================================================================
+
+class TestCachedVaultLoading:
+    """load_vault_data and load_learned_weights use the cache."""
+
+    async def test_second_load_is_served_from_cache(self):
+        client = _chain_client(_RPC_DOCUMENT)
+        with patch("app.services.vault_loader.get_service_client", return_value=client):
+            first, vault_id = await load_vault_data(USER_ID)
+            second, _ = await load_vault_data(USER_ID)
+
+        assert client.rpc.call_count == 1
+        assert vault_id == VAULT_ID
+        assert second.model_dump() == first.model_dump()
+
+        stats = get_vault_cache_stats()["vault_data"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        # The load also primes the vault_id cache
+        assert get_cached_vault_id(USER_ID) == VAULT_ID
+
+    async def test_cached_copy_is_isolated_from_callers(self):
+        client = _chain_client(_RPC_DOCUMENT)
+        with patch("app.services.vault_loader.get_service_client", return_value=client):
+            first, _ = await load_vault_data(USER_ID)
+            first.interests.append("Mutated")
+            second, _ = await load_vault_data(USER_ID)
+
+        assert second.interests == ["Cooking"]
+
+    async def test_invalidation_forces_reload(self):
+        client = _chain_client(_RPC_DOCUMENT)
+        with patch("app.services.vault_loader.get_service_client", return_value=client):
+            await load_vault_data(USER_ID)
+            invalidate_vault(USER_ID)
+            await load_vault_data(USER_ID)
+
+        assert client.rpc.call_count == 2
+
+    async def test_load_racing_invalidation_is_not_cached(self):
+        """A write landing mid-load must win over the in-flight read."""
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow_fetch(user_id):
+            started.set()
+            await release.wait()
+            return _vault_data("Old Name"), VAULT_ID
+
+        with patch("app.services.vault_loader._fetch_vault_data", side_effect=slow_fetch):
+            load = asyncio.create_task(load_vault_data(USER_ID))
+            await started.wait()
+            invalidate_vault(USER_ID)  # e.g. PUT /api/v1/vault committed
+            release.set()
+            vault, _ = await load
+
+        assert vault.partner_name == "Old Name"
+        assert get_cached_vault_data(USER_ID) is None
+
+    async def test_missing_vault_is_not_cached(self):
+        client = _chain_client(None)
+        with patch("app.services.vault_loader.get_service_client", return_value=client):
+            with pytest.raises(ValueError):
+                await load_vault_data(USER_ID)
+            with pytest.raises(ValueError):
+                await load_vault_data(USER_ID)
+
+        assert client.rpc.call_count == 2
+
+    async def test_no_learned_weights_is_cached(self):
+        client = _chain_client([])
+        with patch("app.services.vault_loader.get_service_client", return_value=client):
+            assert await load_learned_weights(USER_ID) is None
+            assert await load_learned_weights(USER_ID) is None
+
+        assert client.table.call_count == 1
+
+    async def test_learned_weights_query_failure_is_not_cached(self):
+        client = MagicMock()
+        client.table.side_effect = RuntimeError("db down")
+        with patch("app.services.vault_loader.get_service_client", return_value=client):
+            assert await load_learned_weights(USER_ID) is None
+
+        assert vault_cache.get_cached_learned_weights(USER_ID) is MISS
+
+
+# ===================================================================
+# 2. Invalidation from write paths
+# ===================================================================
+
+def _prime_vault_cache():
+    cache_vault_data(USER_ID, _vault_data(), VAULT_ID, vault_data_version(USER_ID))
+    assert get_cached_vault_data(USER_ID) is not None
+
+
+class TestWritePathInvalidation:
+    """Every write to vault, milestone or weights data drops the cache."""
+
+    async def test_upsert_user_weights_invalidates(self):
+        from app.services.feedback_analysis import upsert_user_weights
+
+        client = _chain_client([{"user_id": USER_ID, "feedback_count": 0}])
+        with patch("app.services.vault_loader.get_service_client", return_value=client):
+            await load_learned_weights(USER_ID)
+        assert vault_cache.get_cached_learned_weights(USER_ID) is not MISS
+
+        weights = UserPreferencesWeights(user_id=USER_ID, feedback_count=5)
+        with patch("app.services.feedback_analysis.get_service_client", return_value=_chain_client([])):
+            await upsert_user_weights(weights)
+
+        assert vault_cache.get_cached_learned_weights(USER_ID) is MISS
+
+    def test_vault_create_invalidates(self):
+        _prime_vault_cache()
+        payload = {
+            "partner_name": "Sam",
+            "location_city": "Austin",
+            "location_state": "TX",
+            "location_country": "US",
+            "interests": ["Travel", "Cooking", "Movies", "Music", "Reading"],
+            "dislikes": ["Sports", "Gaming", "Cars", "Skiing", "Karaoke"],
+            "milestones": [{
+                "milestone_type": "birthday",
+                "milestone_name": "Birthday",
+                "milestone_date": "2000-03-15",
+                "recurrence": "yearly",
+            }],
+            "vibes": ["quiet_luxury"],
+            "budgets": [
+                {"occasion_type": "just_because", "min_amount": 2000, "max_amount": 5000},
+                {"occasion_type": "minor_occasion", "min_amount": 5000, "max_amount": 15000},
+                {"occasion_type": "major_milestone", "min_amount": 10000, "max_amount": 50000},
+            ],
+            "love_languages": {"primary": "quality_time", "secondary": "acts_of_service"},
+        }
+
+        app.dependency_overrides[get_active_user_id] = lambda: USER_ID
+        try:
+            with patch("app.api.vault.get_service_client", return_value=_chain_client([{"id": VAULT_ID}])), \
+                 patch("app.api.vault.schedule_notifications_for_milestones", new_callable=AsyncMock):
+                resp = TestClient(app).post("/api/v1/vault", json=payload)
+        finally:
+            app.dependency_overrides.pop(get_active_user_id, None)
+
+        assert resp.status_code == 201, resp.json()
+        assert get_cached_vault_data(USER_ID) is None
+
+    async def test_milestone_create_invalidates(self):
+        from app.api.milestones import create_milestone
+        from app.models.milestones import MilestoneCreateRequest
+
+        _prime_vault_cache()
+        row = {
+            "id": "ms-1",
+            "milestone_type": "custom",
+            "milestone_name": "Game Night",
+            "milestone_date": "2000-03-20",
+            "recurrence": "yearly",
+            "budget_tier": "just_because",
+            "created_at": "2026-01-01T00:00:00Z",
+        }
+        with patch("app.api.milestones.get_service_client", return_value=_chain_client([row])), \
+             patch("app.api.milestones.schedule_milestone_notifications", new_callable=AsyncMock):
+            await create_milestone(
+                MilestoneCreateRequest(
+                    milestone_type="custom",
+                    milestone_name="Game Night",
+                    milestone_date="2000-03-20",
+                ),
+                user_id=USER_ID,
+            )
+
+        assert get_cached_vault_data(USER_ID) is None
+
+    async def test_milestone_delete_invalidates(self):
+        from app.api.milestones import delete_milestone
+
+        _prime_vault_cache()
+        with patch("app.api.milestones.get_service_client", return_value=_chain_client([{"id": "ms-1"}])):
+            await delete_milestone("ms-1", user_id=USER_ID)
+
+        assert get_cached_vault_data(USER_ID) is None
+
+
+# ===================================================================
+# 3. Vault ID lookups
+# ===================================================================
+
+class TestCachedVaultIdLookup:
+    """load_vault_id skips the partner_vaults query on a hit."""
+
+    async def test_get_vault_id_cached_after_first_lookup(self):
+        from app.api.milestones import _get_vault_id
+
+        client = _chain_client([{"id": VAULT_ID}])
+        assert await _get_vault_id(client, USER_ID) == VAULT_ID
+        assert await _get_vault_id(client, USER_ID) == VAULT_ID
+
+        assert client.table.call_count == 1
+        assert get_vault_cache_stats()["vault_id"]["hits"] == 1
+
+    async def test_get_vault_id_uses_id_primed_by_vault_load(self):
+        from app.api.milestones import _get_vault_id
+
+        _prime_vault_cache()
+        client = _chain_client([])
+        assert await _get_vault_id(client, USER_ID) == VAULT_ID
+        client.table.assert_not_called()
+
+    async def test_missing_vault_is_not_cached(self):
+        from app.services.vault_loader import load_vault_id
+
+        assert await load_vault_id(_chain_client([]), USER_ID) is None
+        assert get_cached_vault_id(USER_ID) is None
+
+    async def test_idea_routes_share_the_cached_id(self):
+        from app.api.ideas import list_ideas
+
+        client = _chain_client([{"id": VAULT_ID}])
+        with patch("app.api.ideas.get_service_client", return_value=client):
+            await list_ideas(user_id=USER_ID, limit=20, offset=0)
+            await list_ideas(user_id=USER_ID, limit=20, offset=0)
+
+        tables = [call.args[0] for call in client.table.call_args_list]
+        assert tables.count("partner_vaults") == 1
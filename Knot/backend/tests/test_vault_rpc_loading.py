@@ -0,0 +1,276 @@
+"""
+Tests for single-round-trip vault loading via the get_partner_vault() RPC.
+
+load_vault_data reads the vault and all of its child rows with one RPC call
+(migration 00027). When the function is missing it falls back — for the
+rest of the process — to per-table queries, loading the four child tables
+concurrently. Transient RPC failures fall back for that call only.
+
+All tests run offline against a mocked service client.
+
+Run with: pytest tests/test_vault_rpc_loading.py -v
+"""
+
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from postgrest.exceptions import APIError
+
+from app.services import vault_loader
+from app.services.vault_cache import invalidate_vault
+from app.services.vault_loader import VAULT_RPC_FUNCTION, load_vault_data
+
+
+USER_ID = "11111111-2222-3333-4444-555555555555"
+VAULT_ID = "vault-rpc-1"
+
+_VAULT_ROW = {
+    "id": VAULT_ID,
+    "user_id": USER_ID,
+    "partner_name": "Alex",
+    "relationship_tenure_months": 30,
+    "cohabitation_status": "living_together",
+    "location_city": "Austin",
+    "location_state": "TX",
+    "location_country": "US",
+}
+_CHILD_ROWS = {
+    "partner_interests": [
+        {"interest_type": "like", "interest_category": "Cooking"},
+        {"interest_type": "like", "interest_category": "Hiking"},
+        {"interest_type": "dislike", "interest_category": "Gaming"},
+    ],
+    "partner_vibes": [{"vibe_tag": "romantic"}, {"vibe_tag": "outdoorsy"}],
+    "partner_budgets": [
+        {"occasion_type": "just_because", "min_amount": 2000, "max_amount": 5000, "currency": "USD"},
+    ],
+    "partner_love_languages": [
+        {"language": "quality_time", "priority": 1},
+        {"language": "receiving_gifts", "priority": 2},
+    ],
+}
+_RPC_DOCUMENT = {
+    "vault": _VAULT_ROW,
+    "interests": _CHILD_ROWS["partner_interests"],
+    "vibes": _CHILD_ROWS["partner_vibes"],
+    "budgets": _CHILD_ROWS["partner_budgets"],
+    "love_languages": _CHILD_ROWS["partner_love_languages"],
+}
+
+
+class _FakeVaultDB:
+    """
+    Mock service client serving the vault either through the RPC or the
+    per-table queries. Every execute() blocks for `latency` seconds and is
+    recorded in `calls` as ("rpc", name) or ("table", name).
+    """
+
+    def __init__(self, rpc_result=None, rpc_error=None, has_vault=True, latency=0.0):
+        self.rpc_result = rpc_result
+        self.rpc_error = rpc_error
+        self.has_vault = has_vault
+        self.latency = latency
+        self.calls: list[tuple[str, str]] = []
+
+    def _builder(self, kind: str, name: str, respond) -> MagicMock:
+        builder = MagicMock()
+        for method in ("select", "eq", "order", "limit"):
+            getattr(builder, method).return_value = builder
+
+        def execute():
+            self.calls.append((kind, name))
+            time.sleep(self.latency)
+            return respond()
+
+        builder.execute.side_effect = execute
+        return builder
+
+    def rpc(self, name, params):
+        def respond():
+            if self.rpc_error is not None:
+                raise self.rpc_error
+            return MagicMock(data=self.rpc_result)
+        return self._builder("rpc", name, respond)
+
+    def table(self, name):
+        def respond():
+            if name == "partner_vaults":
+                return MagicMock(data=[_VAULT_ROW] if self.has_vault else [])
+            return MagicMock(data=_CHILD_ROWS[name])
+        return self._builder("table", name, respond)
+
+
+def _missing_function_error() -> APIError:
+    return APIError({
+        "code": "PGRST202",
+        "message": "Could not find the function public.get_partner_vault(p_user_id) in the schema cache",
+    })
+
+
+@pytest.fixture(autouse=True)
+def _reset_rpc_availability():
+    vault_loader._reset_vault_rpc_availability()
+    yield
+    vault_loader._reset_vault_rpc_availability()
+
+
+def _assert_expected_vault(vault_data, vault_id):
+    assert vault_id == VAULT_ID
+    assert vault_data.partner_name == "Alex"
+    assert vault_data.interests == ["Cooking", "Hiking"]
+    assert vault_data.dislikes == ["Gaming"]
+    assert vault_data.vibes == ["romantic", "outdoorsy"]
+    assert vault_data.primary_love_language == "quality_time"
+    assert vault_data.secondary_love_language == "receiving_gifts"
+    assert len(vault_data.budgets) == 1
+    assert vault_data.budgets[0].max_amount == 5000
+
+
+# ===================================================================
+# RPC path
+# ===================================================================
+
+class TestVaultRPCPath:
+    """load_vault_data reads the whole vault in one round trip."""
+
+    async def test_single_rpc_round_trip(self):
+        db = _FakeVaultDB(rpc_result=_RPC_DOCUMENT)
+        with patch("app.services.vault_loader.get_service_client", return_value=db):
+            vault_data, vault_id = await load_vault_data(USER_ID)
+
+        assert db.calls == [("rpc", VAULT_RPC_FUNCTION)]
+        _assert_expected_vault(vault_data, vault_id)
+
+    async def test_rpc_matches_per_table_result(self):
+        """Both paths must build identical VaultData."""
+        with patch(
+            "app.services.vault_loader.get_service_client",
+            return_value=_FakeVaultDB(rpc_result=_RPC_DOCUMENT),
+        ):
+            via_rpc = await load_vault_data(USER_ID)
+        invalidate_vault(USER_ID)
+        with patch(
+            "app.services.vault_loader.get_service_client",
+            return_value=_FakeVaultDB(rpc_error=RuntimeError("boom")),
+        ):
+            via_tables = await load_vault_data(USER_ID)
+
+        assert via_rpc[0].model_dump() == via_tables[0].model_dump()
+        assert via_rpc[1] == via_tables[1]
+
+    async def test_rpc_null_means_no_vault(self):
+        db = _FakeVaultDB(rpc_result=None)
+        with patch("app.services.vault_loader.get_service_client", return_value=db):
+            with pytest.raises(ValueError, match="No partner vault"):
+                await load_vault_data(USER_ID)
+
+        # A missing vault is an answer, not an RPC failure — no fallback
+        assert db.calls == [("rpc", VAULT_RPC_FUNCTION)]
+
+    async def test_rpc_empty_child_arrays(self):
+        document = {
+            "vault": _VAULT_ROW,
+            "interests": [],
+            "vibes": [],
+            "budgets": [],
+            "love_languages": [],
+        }
+        db = _FakeVaultDB(rpc_result=document)
+        with patch("app.services.vault_loader.get_service_client", return_value=db):
+            vault_data, _ = await load_vault_data(USER_ID)
+
+        assert vault_data.interests == []
+        assert vault_data.vibes == []
+        assert vault_data.budgets == []
+        assert vault_data.primary_love_language == ""
+
+
+# ===================================================================
+# Fallback path
+# ===================================================================
+
+class TestVaultRPCFallback:
+    """Per-table loading when the RPC is missing or fails."""
+
+    async def test_missing_function_falls_back_and_is_remembered(self):
+        db = _FakeVaultDB(rpc_error=_missing_function_error())
+        with patch("app.services.vault_loader.get_service_client", return_value=db):
+            vault_data, vault_id = await load_vault_data(USER_ID)
+            _assert_expected_vault(vault_data, vault_id)
+
+            invalidate_vault(USER_ID)
+            db.calls.clear()
+            await load_vault_data(USER_ID)
+
+        # Second load skips the RPC entirely
+        assert ("rpc", VAULT_RPC_FUNCTION) not in db.calls
+        assert len(db.calls) == 5
+
+    async def test_transient_failure_retries_rpc_next_time(self):
+        db = _FakeVaultDB(rpc_error=RuntimeError("connection reset"))
+        with patch("app.services.vault_loader.get_service_client", return_value=db):
+            vault_data, vault_id = await load_vault_data(USER_ID)
+            _assert_expected_vault(vault_data, vault_id)
+
+            db.rpc_error = None
+            db.rpc_result = _RPC_DOCUMENT
+            invalidate_vault(USER_ID)
+            db.calls.clear()
+            await load_vault_data(USER_ID)
+
+        assert db.calls == [("rpc", VAULT_RPC_FUNCTION)]
+
+    async def test_fallback_no_vault_raises(self):
+        db = _FakeVaultDB(rpc_error=_missing_function_error(), has_vault=False)
+        with patch("app.services.vault_loader.get_service_client", return_value=db):
+            with pytest.raises(ValueError, match="No partner vault"):
+                await load_vault_data(USER_ID)
+
+    async def test_fallback_loads_child_tables_concurrently(self):
+        """Vault row first, then the four child tables in parallel."""
+        latency = 0.05
+        db = _FakeVaultDB(rpc_error=_missing_function_error(), latency=latency)
+        with patch("app.services.vault_loader.get_service_client", return_value=db):
+            await load_vault_data(USER_ID)  # RPC probe + fallback
+            invalidate_vault(USER_ID)
+
+            start = time.perf_counter()
+            await load_vault_data(USER_ID)
+            elapsed = time.perf_counter() - start
+
+        # Sequential loading would take 5 * latency
+        assert elapsed < latency * 3.5, (
+            f"Fallback load took {elapsed * 1000:.0f}ms; expected ~{latency * 2 * 1000:.0f}ms"
+        )
+
+
+# ===================================================================
+# Round-trip latency
+# ===================================================================
+
+class TestVaultLoadLatency:
+    """The RPC removes four round trips from every recommendation run."""
+
+    async def test_rpc_faster_than_per_table(self):
+        latency = 0.03
+        with patch(
+            "app.services.vault_loader.get_service_client",
+            return_value=_FakeVaultDB(rpc_result=_RPC_DOCUMENT, latency=latency),
+        ):
+            start = time.perf_counter()
+            await load_vault_data(USER_ID)
+            rpc_s = time.perf_counter() - start
+
+        vault_loader._vault_rpc_available = False
+        invalidate_vault(USER_ID)
+        with patch(
+            "app.services.vault_loader.get_service_client",
+            return_value=_FakeVaultDB(latency=latency),
+        ):
+            start = time.perf_counter()
+            await load_vault_data(USER_ID)
+            table_s = time.perf_counter() - start
+
+        assert rpc_s < table_s
+        print(f"  vault load: {table_s * 1000:.0f}ms per-table -> {rpc_s * 1000:.0f}ms RPC")